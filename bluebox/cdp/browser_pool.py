@@ -0,0 +1,342 @@
+"""
+bluebox/cdp/browser_pool.py
+
+Health-checked pool of Chrome instances (remote debugging endpoints) for spreading routine executions.
+
+Contains:
+- BrowserHealth: Whether a browser takes new executions
+- BrowserEndpoint: One browser's health, load and latency
+- BrowserPool: Health checks over persistent connections and load-aware placement
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field, replace
+from enum import StrEnum
+
+import websocket
+from websocket import WebSocket
+
+from bluebox.cdp.connection import create_cdp_helpers, get_browser_websocket_url
+from bluebox.utils.exceptions import BrowserConnectionError
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+# Seconds between background health checks
+DEFAULT_CHECK_INTERVAL_SECONDS = 5.0
+
+# Seconds a health check may take before it counts as failed
+DEFAULT_CHECK_TIMEOUT_SECONDS = 5.0
+
+# Consecutive failures (checks or executions) after which a browser stops taking executions
+DEFAULT_FAILURE_THRESHOLD = 2
+
+# Weight of the newest latency sample in the moving average
+DEFAULT_LATENCY_ALPHA = 0.3
+
+# Weight of an open target relative to an execution in flight (idle pooled tabs cost little)
+DEFAULT_OPEN_TARGET_WEIGHT = 0.25
+
+
+def _connect(remote_debugging_address: str, timeout: float) -> WebSocket:
+    """Open a browser-level WebSocket to a Chrome debugging server."""
+    return websocket.create_connection(get_browser_websocket_url(remote_debugging_address), timeout=timeout)
+
+
+class BrowserHealth(StrEnum):
+    """
+    Placement state of a browser in a BrowserPool.
+    """
+    HEALTHY = "healthy"      # takes new executions
+    UNHEALTHY = "unhealthy"  # failing checks/executions; drained until a check succeeds again
+    DRAINING = "draining"    # removed by the operator; finishes what it runs, takes nothing new
+
+
+@dataclass
+class BrowserEndpoint:
+    """Health, load and latency of one browser (snapshot copies are returned by BrowserPool.endpoints())."""
+    remote_debugging_address: str
+    health: BrowserHealth = BrowserHealth.HEALTHY
+    in_flight: int = 0
+    open_targets: int = 0
+    latency_seconds: float | None = None
+    consecutive_failures: int = 0
+    executions: int = 0
+    failures: int = 0
+    last_check_at: float | None = None
+    last_error: str | None = None
+
+    def score(self, open_target_weight: float = DEFAULT_OPEN_TARGET_WEIGHT) -> float:
+        """Expected wait for a new execution: queued work times how slowly the browser answers (lower is better)."""
+        load = 1 + self.in_flight + open_target_weight * self.open_targets
+        # the small constant keeps load deciding between browsers that have no latency sample yet
+        return load * ((self.latency_seconds or 0.0) + 1e-3)
+
+    def to_dict(self) -> dict:
+        """Plain dict for logging/metrics."""
+        return {
+            "remote_debugging_address": self.remote_debugging_address,
+            "health": self.health.value,
+            "in_flight": self.in_flight,
+            "open_targets": self.open_targets,
+            "latency_seconds": self.latency_seconds,
+            "consecutive_failures": self.consecutive_failures,
+            "executions": self.executions,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+@dataclass
+class _Connection:
+    """Persistent browser-level connection used for health checks."""
+    ws: WebSocket
+    send_cmd: Callable
+    recv_until: Callable
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class BrowserPool:
+    """
+    Chrome instances that routine executions are spread across.
+
+    Each browser is health-checked over a persistent browser-level connection (Target.getTargets,
+    which also counts its open page targets); the round trip feeds a latency moving average.
+    acquire() places an execution on the healthy browser with the lowest score (executions in
+    flight plus weighted open targets, times latency). Browsers failing failure_threshold checks or
+    executions in a row are drained until a check succeeds; drain() takes one out for good.
+    Checks run in a background thread between start() and stop(), or on demand with check_all().
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        remote_debugging_addresses: Iterable[str],
+        check_interval_seconds: float = DEFAULT_CHECK_INTERVAL_SECONDS,
+        check_timeout_seconds: float = DEFAULT_CHECK_TIMEOUT_SECONDS,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        latency_alpha: float = DEFAULT_LATENCY_ALPHA,
+        open_target_weight: float = DEFAULT_OPEN_TARGET_WEIGHT,
+        connect: Callable[[str, float], WebSocket] = _connect,
+    ) -> None:
+        """
+        Args:
+            remote_debugging_addresses: Chrome debugging server addresses (e.g. 'http://127.0.0.1:9222').
+            check_interval_seconds: Seconds between background health checks.
+            check_timeout_seconds: Seconds a health check may take.
+            failure_threshold: Consecutive failures after which a browser is drained.
+            latency_alpha: Weight of the newest latency sample in the moving average, in (0, 1].
+            open_target_weight: Weight of an open target relative to an execution in flight.
+            connect: Opens a browser-level WebSocket for (address, timeout); defaults to the browser's
+                /json/version WebSocket URL.
+        """
+        addresses = list(dict.fromkeys(remote_debugging_addresses))
+        if not addresses:
+            raise ValueError("BrowserPool needs at least one remote debugging address")
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if not 0 < latency_alpha <= 1:
+            raise ValueError("latency_alpha must be in (0, 1]")
+        self.check_interval_seconds = check_interval_seconds
+        self.check_timeout_seconds = check_timeout_seconds
+        self.failure_threshold = failure_threshold
+        self.latency_alpha = latency_alpha
+        self.open_target_weight = open_target_weight
+        self._connect = connect
+        self._endpoints = {address: BrowserEndpoint(remote_debugging_address=address) for address in addresses}
+        self._connections: dict[str, _Connection] = {}
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "BrowserPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def addresses(self) -> list[str]:
+        """Addresses of every browser in the pool (including drained ones)."""
+        with self._lock:
+            return list(self._endpoints)
+
+    def endpoints(self) -> list[BrowserEndpoint]:
+        """Snapshot of every browser's state."""
+        with self._lock:
+            return [replace(endpoint) for endpoint in self._endpoints.values()]
+
+    # Placement ____________________________________________________________________________________________________________
+
+    def acquire(self, exclude: Iterable[str] = (), timeout: float | None = None) -> str:
+        """
+        Reserve the healthy browser with the lowest score for one execution.
+
+        Args:
+            exclude: Addresses not to place on (e.g. browsers an execution already failed on).
+            timeout: Seconds to wait for a browser to become healthy (None: do not wait).
+        Returns:
+            The browser's remote debugging address (give it back with release()).
+        Raises:
+            BrowserConnectionError: No healthy browser (outside `exclude`) within the timeout.
+        """
+        excluded = set(exclude)
+        deadline = time.monotonic() + (timeout or 0.0)
+        with self._available:
+            while True:
+                candidates = [
+                    endpoint for endpoint in self._endpoints.values()
+                    if endpoint.health == BrowserHealth.HEALTHY and endpoint.remote_debugging_address not in excluded
+                ]
+                if candidates:
+                    endpoint = min(candidates, key=lambda e: e.score(self.open_target_weight))
+                    endpoint.in_flight += 1
+                    return endpoint.remote_debugging_address
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise BrowserConnectionError(
+                        f"No healthy browser available ({len(self._endpoints)} in pool, {len(excluded)} excluded)"
+                    )
+                self._available.wait(remaining)
+
+    def release(self, address: str, ok: bool = True, error: str | None = None) -> None:
+        """
+        End an execution placed by acquire().
+
+        Args:
+            address: The browser it ran on.
+            ok: False if the execution failed because of the browser (counts toward draining it).
+            error: The browser failure, for the endpoint's last_error.
+        """
+        with self._available:
+            endpoint = self._endpoints.get(address)
+            if endpoint is None:
+                return
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+            endpoint.executions += 1
+            if ok:
+                endpoint.consecutive_failures = 0
+            else:
+                endpoint.failures += 1
+                self._record_failure(endpoint, error or "execution failed")
+            self._available.notify_all()
+
+    def drain(self, address: str) -> None:
+        """Stop placing executions on a browser (running ones finish); it stays drained until undrain()."""
+        with self._lock:
+            self._endpoints[address].health = BrowserHealth.DRAINING
+        logger.info("Draining browser %s", address)
+
+    def undrain(self, address: str) -> None:
+        """Let a drained browser take executions again (after its next successful check)."""
+        with self._lock:
+            endpoint = self._endpoints[address]
+            if endpoint.health == BrowserHealth.DRAINING:
+                endpoint.health = BrowserHealth.UNHEALTHY
+        self.check(address)
+
+    # Health checks ________________________________________________________________________________________________________
+
+    def check(self, address: str) -> bool:
+        """
+        Health-check one browser over its persistent connection (reconnecting if needed).
+
+        Returns:
+            Whether the browser answered.
+        """
+        start = time.monotonic()
+        try:
+            connection = self._connection(address)
+            with connection.lock:
+                command_id = connection.send_cmd("Target.getTargets")
+                reply = connection.recv_until(
+                    lambda m: m.get("id") == command_id, time.time() + self.check_timeout_seconds,
+                )
+            if "error" in reply:
+                raise BrowserConnectionError(str(reply["error"]))
+            targets = (reply.get("result") or {}).get("targetInfos") or []
+        except Exception as e:
+            self._close_connection(address)
+            with self._available:
+                endpoint = self._endpoints[address]
+                endpoint.last_check_at = time.time()
+                self._record_failure(endpoint, f"health check failed: {e}")
+            return False
+
+        latency = time.monotonic() - start
+        with self._available:
+            endpoint = self._endpoints[address]
+            endpoint.last_check_at = time.time()
+            endpoint.open_targets = sum(1 for target in targets if target.get("type") == "page")
+            endpoint.latency_seconds = latency if endpoint.latency_seconds is None else (
+                self.latency_alpha * latency + (1 - self.latency_alpha) * endpoint.latency_seconds
+            )
+            endpoint.consecutive_failures = 0
+            if endpoint.health == BrowserHealth.UNHEALTHY:
+                endpoint.health = BrowserHealth.HEALTHY
+                logger.info("Browser %s is healthy again", address)
+                self._available.notify_all()
+        return True
+
+    def check_all(self) -> dict[str, bool]:
+        """Health-check every browser; returns address -> answered."""
+        return {address: self.check(address) for address in self.addresses}
+
+    def start(self) -> None:
+        """Check every browser now, then keep checking in a background thread."""
+        self.check_all()
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._check_loop, name="browser-pool-health", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop background checks and close the persistent connections."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.check_timeout_seconds + 1)
+            self._thread = None
+        for address in self.addresses:
+            self._close_connection(address)
+
+    # Internals ____________________________________________________________________________________________________________
+
+    def _check_loop(self) -> None:
+        while not self._stop.wait(self.check_interval_seconds):
+            self.check_all()
+
+    def _record_failure(self, endpoint: BrowserEndpoint, error: str) -> None:
+        """Count a failure (lock held); drain the browser once the threshold is reached."""
+        endpoint.consecutive_failures += 1
+        endpoint.last_error = error
+        if endpoint.health == BrowserHealth.HEALTHY and endpoint.consecutive_failures >= self.failure_threshold:
+            endpoint.health = BrowserHealth.UNHEALTHY
+            logger.warning("Browser %s is unhealthy, draining it: %s", endpoint.remote_debugging_address, error)
+
+    def _connection(self, address: str) -> _Connection:
+        with self._lock:
+            connection = self._connections.get(address)
+        if connection is not None:
+            return connection
+        ws = self._connect(address, self.check_timeout_seconds)
+        send_cmd, _, recv_until = create_cdp_helpers(ws)
+        connection = _Connection(ws=ws, send_cmd=send_cmd, recv_until=recv_until)
+        with self._lock:
+            existing = self._connections.setdefault(address, connection)
+        if existing is not connection:
+            ws.close()
+        return existing
+
+    def _close_connection(self, address: str) -> None:
+        with self._lock:
+            connection = self._connections.pop(address, None)
+        if connection is not None:
+            try:
+                connection.ws.close()
+            except Exception:
+                pass
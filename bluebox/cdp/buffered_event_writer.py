@@ -0,0 +1,115 @@
+"""
+bluebox/cdp/buffered_event_writer.py
+
+Buffering and background flushing shared by the CDP event writers.
+
+Contains:
+- BufferedEventWriter: Per-key in-memory buffers drained by a lazily started daemon thread
+  (base of FileEventWriter and CaptureDBEventWriter)
+"""
+
+import threading
+from typing import Any, Hashable
+
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+
+class BufferedEventWriter:
+    """
+    Base of event writers whose sink must not block the CDP receiver.
+
+    Subclasses convert events on the caller's event loop and `_enqueue` them under a key (an
+    output file, a table, ...). A daemon writer thread, started on the first event, swaps the
+    buffers out and hands each key's items to `_drain` once `flush_threshold` is buffered
+    (in whatever size unit the subclass enqueues with) or every `flush_interval_seconds`.
+    Flushes are serialized, so items reach the sink in enqueue order.
+    """
+
+    def __init__(self, flush_interval_seconds: float, flush_threshold: int, thread_name: str) -> None:
+        """
+        Args:
+            flush_interval_seconds: Max time buffered items wait before the writer thread drains them.
+            flush_threshold: Buffered size that triggers an early drain.
+            thread_name: Name of the writer thread.
+        """
+        if flush_interval_seconds <= 0:
+            raise ValueError("flush_interval_seconds must be positive")
+        self.flush_interval_seconds = flush_interval_seconds
+        self._flush_threshold = flush_threshold
+        self._thread_name = thread_name
+
+        # pending items per key; guarded by _buffer_lock
+        self._buffers: dict[Hashable, list[Any]] = {}
+        self._buffered_size = 0
+        self._buffer_lock = threading.Lock()
+        # serializes flushes so items reach the sink in enqueue order; subclasses guard their sink state with it
+        self._io_lock = threading.Lock()
+
+        # background writer thread (started lazily on first event)
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._writer_thread: threading.Thread | None = None
+
+    def flush(self) -> None:
+        """Synchronously drain all buffered items. Safe to call from any thread."""
+        with self._io_lock:
+            with self._buffer_lock:
+                pending = self._buffers
+                self._buffers = {}
+                self._buffered_size = 0
+            for key, items in pending.items():
+                try:
+                    self._drain(key, items)
+                except Exception as e:
+                    logger.error("❌ Failed to write %d event(s) to %s: %s", len(items), key, e)
+
+    def close(self) -> None:
+        """Stop the writer thread and drain remaining items (subclasses then release their sink)."""
+        thread = self._writer_thread
+        if thread is not None:
+            self._stop_event.set()
+            self._wake_event.set()
+            thread.join()
+            self._writer_thread = None
+        self.flush()
+
+    def _enqueue(self, key: Hashable, item: Any, size: int = 1) -> None:
+        """Buffer an item for key, waking the writer thread once the threshold is reached."""
+        with self._buffer_lock:
+            self._buffers.setdefault(key, []).append(item)
+            self._buffered_size += size
+            threshold_reached = self._buffered_size >= self._flush_threshold
+
+        self._ensure_writer_thread()
+        if threshold_reached:
+            self._wake_event.set()
+
+    def _drain(self, key: Hashable, items: list[Any]) -> None:
+        """Write one key's buffered items to the sink (called with _io_lock held)."""
+        raise NotImplementedError
+
+    def _background_work(self) -> None:
+        """What the writer thread does on every wake-up (subclasses may add work after the flush)."""
+        self.flush()
+
+    def _ensure_writer_thread(self) -> None:
+        """Start the background writer thread if it is not running."""
+        if self._writer_thread is not None:
+            return
+        self._stop_event.clear()
+        self._wake_event.clear()
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop,
+            name=self._thread_name,
+            daemon=True,
+        )
+        self._writer_thread.start()
+
+    def _writer_loop(self) -> None:
+        """Drain buffers on threshold (wake event) or every flush interval until stopped."""
+        while not self._stop_event.is_set():
+            self._wake_event.wait(timeout=self.flush_interval_seconds)
+            self._wake_event.clear()
+            self._background_work()
@@ -0,0 +1,428 @@
+"""
+bluebox/cdp/capture_db.py
+
+SQLite-backed store for CDP captures.
+
+Contains:
+- CaptureDB: sqlite3 database with tables for transactions, storage events, window properties
+  and interactions, plus an FTS5 (trigram) index over response bodies
+- CaptureDBEventWriter: FileEventWriter-compatible sink that writes events into a CaptureDB
+  incrementally from a background thread
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import urlparse
+
+from bluebox.cdp.buffered_event_writer import BufferedEventWriter
+from bluebox.utils.jsonl_utils import iter_jsonl_lines, jsonl_exists
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+
+class CaptureDB:
+    """
+    SQLite database holding one CDP capture session.
+
+    Transactions keep their queryable fields (url, host, method, status, mime type, ...) as columns,
+    the response body in its own column (indexed by FTS5 when available), and every other field in a
+    JSON `data` column, so the original event can be reconstructed losslessly via `transaction_from_row`.
+    Other categories store their routing fields as columns and the full event as JSON.
+
+    Thread-safe: all access goes through one connection guarded by a lock.
+    """
+
+    # Map monitor category names (as emitted by AsyncCDPSession) to tables
+    CATEGORY_TO_TABLE = {
+        "AsyncNetworkMonitor": "transactions",
+        "AsyncStorageMonitor": "storage_events",
+        "AsyncWindowPropertyMonitor": "window_properties",
+        "AsyncInteractionMonitor": "interactions",
+    }
+
+    # JSONL capture layout (see FileEventWriter.create_from_output_dir) -> category
+    CAPTURE_FILES = {
+        "network/events.jsonl": "AsyncNetworkMonitor",
+        "network/javascript_events.jsonl": "AsyncNetworkMonitor",
+        "storage/events.jsonl": "AsyncStorageMonitor",
+        "window_properties/events.jsonl": "AsyncWindowPropertyMonitor",
+        "interaction/events.jsonl": "AsyncInteractionMonitor",
+    }
+
+    # FTS5 trigram queries need at least this many characters
+    MIN_FTS_QUERY_CHARS = 3
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            transaction_id TEXT NOT NULL,
+            request_id TEXT,
+            url TEXT NOT NULL DEFAULT '',
+            host TEXT NOT NULL DEFAULT '',
+            path TEXT NOT NULL DEFAULT '',
+            method TEXT NOT NULL DEFAULT '',
+            type TEXT,
+            status INTEGER,
+            mime_type TEXT NOT NULL DEFAULT '',
+            timestamp REAL NOT NULL DEFAULT 0,
+            has_post_data INTEGER NOT NULL DEFAULT 0,
+            is_javascript INTEGER NOT NULL DEFAULT 0,
+            response_body TEXT NOT NULL DEFAULT '',
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_request_id ON transactions(request_id);
+        CREATE INDEX IF NOT EXISTS idx_transactions_transaction_id ON transactions(transaction_id);
+        CREATE INDEX IF NOT EXISTS idx_transactions_host ON transactions(host);
+        CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions(timestamp);
+
+        CREATE TABLE IF NOT EXISTS storage_events (
+            id INTEGER PRIMARY KEY,
+            type TEXT,
+            origin TEXT,
+            timestamp REAL NOT NULL DEFAULT 0,
+            data TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS window_properties (
+            id INTEGER PRIMARY KEY,
+            url TEXT,
+            timestamp REAL NOT NULL DEFAULT 0,
+            data TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS interactions (
+            id INTEGER PRIMARY KEY,
+            type TEXT,
+            url TEXT,
+            timestamp REAL NOT NULL DEFAULT 0,
+            data TEXT NOT NULL
+        );
+    """
+
+    _FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+            response_body, content='transactions', content_rowid='id', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+            INSERT INTO transactions_fts(rowid, response_body) VALUES (new.id, new.response_body);
+        END;
+        CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+            INSERT INTO transactions_fts(transactions_fts, rowid, response_body)
+            VALUES ('delete', old.id, old.response_body);
+        END;
+    """
+
+    def __init__(self, db_path: str | Path, enable_fts: bool = True) -> None:
+        """
+        Open (creating if needed) a capture database.
+
+        Args:
+            db_path: Path to the SQLite file (":memory:" for an in-memory database).
+            enable_fts: Build the FTS5 body index. Falls back to instr() scans when False or when
+                the linked SQLite lacks FTS5/trigram support.
+        """
+        self.db_path = str(db_path)
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self._SCHEMA)
+            self.has_fts = enable_fts and self._create_fts()
+            self._conn.commit()
+
+    def _create_fts(self) -> bool:
+        """Create the FTS5 index; returns False if this SQLite build does not support it."""
+        existing = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'transactions_fts'"
+        ).fetchone()
+        try:
+            self._conn.executescript(self._FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            logger.info("FTS5 unavailable, falling back to substring scans: %s", e)
+            return False
+        if not existing:
+            # index rows inserted before the FTS table existed (e.g. database created with enable_fts=False)
+            self._conn.execute("INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')")
+        return True
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "CaptureDB":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+    # Writing ______________________________________________________________________________________________________________
+
+    @staticmethod
+    def make_transaction_id(record: dict[str, Any]) -> str:
+        """Transaction id in the `timestamp_url` format used by LocalDiscoveryDataStore."""
+        url = record.get("url") or "unknown"
+        timestamp = record.get("timestamp", 0)
+        safe_url = url.replace("/", "_").replace(":", "_")[:100]
+        return f"{timestamp}_{safe_url}"
+
+    def insert_events(self, category: str, records: list[dict[str, Any]]) -> int:
+        """
+        Insert events of one category in a single transaction.
+
+        Args:
+            category: Monitor category name (e.g. "AsyncNetworkMonitor").
+            records: Event dicts (as written to the JSONL captures).
+        Returns:
+            Number of inserted rows (0 for categories without a table).
+        """
+        table = self.CATEGORY_TO_TABLE.get(category)
+        if table is None or not records:
+            return 0
+
+        if table == "transactions":
+            sql = (
+                "INSERT INTO transactions (transaction_id, request_id, url, host, path, method, type, status, "
+                "mime_type, timestamp, has_post_data, is_javascript, response_body, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            )
+            rows = [self._transaction_row(record) for record in records]
+        elif table == "storage_events":
+            sql = "INSERT INTO storage_events (type, origin, timestamp, data) VALUES (?, ?, ?, ?)"
+            rows = [
+                (r.get("type"), r.get("origin"), r.get("timestamp") or 0, json.dumps(r, ensure_ascii=False))
+                for r in records
+            ]
+        elif table == "window_properties":
+            sql = "INSERT INTO window_properties (url, timestamp, data) VALUES (?, ?, ?)"
+            rows = [(r.get("url"), r.get("timestamp") or 0, json.dumps(r, ensure_ascii=False)) for r in records]
+        else:
+            sql = "INSERT INTO interactions (type, url, timestamp, data) VALUES (?, ?, ?, ?)"
+            rows = [
+                (r.get("type"), r.get("url"), r.get("timestamp") or 0, json.dumps(r, ensure_ascii=False))
+                for r in records
+            ]
+
+        with self._lock:
+            self._conn.executemany(sql, rows)
+            self._conn.commit()
+        return len(rows)
+
+    def _transaction_row(self, record: dict[str, Any]) -> tuple:
+        url = record.get("url") or ""
+        parsed_url = urlparse(url)
+        mime_type = record.get("mime_type") or ""
+        content_type = mime_type or (record.get("response_headers") or {}).get("content-type", "")
+        data = {k: v for k, v in record.items() if k != "response_body"}
+        return (
+            self.make_transaction_id(record),
+            record.get("request_id"),
+            url,
+            parsed_url.netloc,
+            parsed_url.path,
+            record.get("method") or "",
+            record.get("type"),
+            record.get("status"),
+            mime_type,
+            record.get("timestamp") or 0,
+            1 if record.get("post_data") else 0,
+            1 if "javascript" in content_type else 0,
+            record.get("response_body") or "",
+            json.dumps(data, ensure_ascii=False),
+        )
+
+    def ingest_jsonl(self, category: str, jsonl_path: str | Path, batch_size: int = 500) -> int:
+        """
+        Load a JSONL capture (all rotated segments) into the database.
+
+        Args:
+            category: Monitor category of the events in the file.
+            jsonl_path: Base capture path.
+            batch_size: Rows per insert transaction.
+        Returns:
+            Number of inserted rows.
+        """
+        count = 0
+        batch: list[dict[str, Any]] = []
+        for line in iter_jsonl_lines(jsonl_path):
+            if not line.strip():
+                continue
+            try:
+                batch.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                logger.warning("Skipping unparseable line in %s: %s", jsonl_path, e)
+                continue
+            if len(batch) >= batch_size:
+                count += self.insert_events(category, batch)
+                batch = []
+        count += self.insert_events(category, batch)
+        return count
+
+    @classmethod
+    def from_capture_dir(cls, captures_dir: str | Path, db_path: str | Path | None = None) -> "CaptureDB":
+        """
+        Build a database from an existing JSONL capture directory.
+
+        Args:
+            captures_dir: Capture output directory (network/, storage/, ... subdirectories).
+            db_path: Database path. Defaults to `<captures_dir>/capture.db`.
+        Returns:
+            The populated CaptureDB.
+        """
+        captures_dir = Path(captures_dir)
+        db = cls(db_path if db_path is not None else captures_dir / "capture.db")
+        for relative_path, category in cls.CAPTURE_FILES.items():
+            jsonl_path = captures_dir / relative_path
+            if jsonl_exists(jsonl_path):
+                count = db.ingest_jsonl(category, jsonl_path)
+                logger.info("Imported %d events from %s", count, jsonl_path)
+        return db
+
+
+    # Reading ______________________________________________________________________________________________________________
+
+    def query(self, sql: str, params: tuple | list = ()) -> list[sqlite3.Row]:
+        """Run a read query and return all rows."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def iter_query(self, sql: str, params: tuple | list = (), batch_size: int = 200) -> Iterator[sqlite3.Row]:
+        """Run a read query and yield rows in batches (keeps large body scans out of memory)."""
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            rows = cursor.fetchmany(batch_size)
+        while rows:
+            yield from rows
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+
+    def register_function(self, name: str, num_params: int, func: Any) -> None:
+        """Register a deterministic Python function usable in SQL queries."""
+        with self._lock:
+            self._conn.create_function(name, num_params, func, deterministic=True)
+
+    def count(self, table: str) -> int:
+        """Number of rows in one of the capture tables."""
+        if table not in self.CATEGORY_TO_TABLE.values():
+            raise ValueError(f"Unknown capture table: {table}")
+        return self.query(f"SELECT COUNT(*) FROM {table}")[0][0]
+
+    @staticmethod
+    def transaction_from_row(row: sqlite3.Row) -> dict[str, Any]:
+        """Reconstruct the original network event dict from a `transactions` row (needs data and response_body)."""
+        record = json.loads(row["data"])
+        record["response_body"] = row["response_body"]
+        return record
+
+    def body_match_clause(self, value: str, case_sensitive: bool = True) -> tuple[str, list[Any]]:
+        """
+        SQL condition (over the `transactions` table) selecting rows whose response body may contain value.
+
+        Case-sensitive matches are exact (instr), narrowed first by the FTS5 trigram index when possible.
+        Case-insensitive matches use the (Unicode case-folding) trigram index alone, or no condition at all
+        without FTS, so callers must re-check candidates in Python.
+
+        Args:
+            value: Substring to look for.
+            case_sensitive: Whether the match must respect case.
+        Returns:
+            (sql condition, parameters)
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+        if self.has_fts and len(value) >= self.MIN_FTS_QUERY_CHARS:
+            clauses.append("transactions.id IN (SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH ?)")
+            params.append('"' + value.replace('"', '""') + '"')
+        if case_sensitive:
+            clauses.append("instr(transactions.response_body, ?) > 0")
+            params.append(value)
+        return (" AND ".join(clauses) or "1"), params
+
+
+class CaptureDBEventWriter(BufferedEventWriter):
+    """
+    Event callback that writes CDP events into a CaptureDB.
+
+    Drop-in alternative (or companion) to FileEventWriter: events are converted on the caller's
+    event loop and inserted in batches by a daemon thread, on a size threshold or time interval.
+    Call `close()` after `AsyncCDPSession.finalize()`.
+
+    Usage:
+        db_writer = CaptureDBEventWriter("./captures/capture.db")
+        session = AsyncCDPSession(..., event_callback_fn=db_writer.write_event, ...)
+        ...
+        await session.finalize()
+        db_writer.close()
+    """
+
+    DEFAULT_FLUSH_INTERVAL_SECONDS = 1.0
+    DEFAULT_FLUSH_THRESHOLD_EVENTS = 200
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        flush_interval_seconds: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        flush_threshold_events: int = DEFAULT_FLUSH_THRESHOLD_EVENTS,
+    ) -> None:
+        """
+        Initialize CaptureDBEventWriter.
+
+        Args:
+            db_path: Path to the capture database (created if missing).
+            flush_interval_seconds: Max time buffered events wait before being inserted.
+            flush_threshold_events: Number of buffered events that triggers an early insert.
+        """
+        super().__init__(flush_interval_seconds, flush_threshold_events, thread_name="CaptureDBEventWriter")
+        if flush_threshold_events <= 0:
+            raise ValueError("flush_threshold_events must be positive")
+
+        self.db = CaptureDB(db_path)
+        self.flush_threshold_events = flush_threshold_events
+        self._closed = False
+
+    async def write_event(self, category: str, event: Any) -> None:
+        """
+        Async callback that queues an event for insertion.
+
+        Args:
+            category: Event category (monitor class name, e.g., "AsyncNetworkMonitor").
+            event: Event data (Pydantic model with .model_dump() or dict).
+        """
+        if self._closed:
+            logger.warning("⚠️ CaptureDBEventWriter is closed; dropping %s event", category)
+            return
+        if category not in CaptureDB.CATEGORY_TO_TABLE:
+            if category != "AsyncDOMMonitor":
+                logger.warning("⚠️ Unknown event category: %s", category)
+            return
+
+        if hasattr(event, "model_dump"):
+            event_dict = event.model_dump(mode="json")
+        elif isinstance(event, dict):
+            event_dict = event
+        else:
+            event_dict = {"data": str(event)}
+
+        self._enqueue(category, event_dict)
+
+    def close(self) -> None:
+        """Stop the writer thread, insert remaining events and close the database. Idempotent."""
+        if self._closed:
+            return
+        super().close()
+        self.db.close()
+        self._closed = True
+
+    def _drain(self, category: str, records: list[dict[str, Any]]) -> None:
+        """Insert one category's buffered events."""
+        self.db.insert_events(category, records)
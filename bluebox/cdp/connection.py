@@ -285,3 +285,31 @@ def dispose_context(remote_debugging_address: str, browser_context_id: str) -> N
             ws.close()
         except Exception:
             pass
+
+
+def cdp_close_tab(
+    remote_debugging_address: str,
+    target_id: str,
+    browser_context_id: str | None = None,
+) -> None:
+    """
+    Close a tab and, if given, dispose of its browser context. Best-effort.
+
+    Args:
+        remote_debugging_address: Chrome debugging server address.
+        target_id: The target ID of the tab to close.
+        browser_context_id: The tab's (incognito) browser context ID to dispose afterwards.
+    """
+    ws = websocket.create_connection(get_browser_websocket_url(remote_debugging_address), timeout=10)
+    try:
+        send_cmd, _, recv_until = create_cdp_helpers(ws)
+        close_id = send_cmd("Target.closeTarget", {"targetId": target_id})
+        recv_until(lambda m: m.get("id") == close_id, time.time() + 10)
+        if browser_context_id:
+            dispose_id = send_cmd("Target.disposeBrowserContext", {"browserContextId": browser_context_id})
+            recv_until(lambda m: m.get("id") == dispose_id, time.time() + 10)
+    finally:
+        try:
+            ws.close()
+        except Exception:
+            pass
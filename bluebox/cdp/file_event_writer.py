@@ -3,21 +3,60 @@ bluebox/cdp/file_event_writer.py
 
 File-based event writer callback for AsyncCDPSession.
 Used by Bluebox CLI and SDK to write CDP events to disk.
+
+Contains:
+- FsyncPolicy: When buffered writes are fsync'd to disk
+- FileEventWriter: Buffered JSONL writer with long-lived handles, a background flush thread
+  and size-based rotation into compressed segments (see bluebox/utils/jsonl_utils.py)
 """
 
 import json
+import os
+from enum import StrEnum
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
+from bluebox.cdp.buffered_event_writer import BufferedEventWriter
+from bluebox.utils.jsonl_utils import (
+    JsonlIndexEntry,
+    SegmentCompression,
+    compress_jsonl_segment,
+    default_segment_compression,
+    get_index_path,
+    get_segment_path,
+    is_zstd_available,
+    next_segment_index,
+)
 from bluebox.utils.logger import get_logger
 
 logger = get_logger(name=__name__)
 
 
-class FileEventWriter:
+class FsyncPolicy(StrEnum):
+    """When the writer calls os.fsync on its open handles."""
+    NEVER = "never"        # leave durability to the OS page cache
+    ON_FLUSH = "on_flush"  # fsync after every buffer flush
+    ON_CLOSE = "on_close"  # fsync once when the writer is closed
+
+
+class FileEventWriter(BufferedEventWriter):
     """
     Callback adapter that writes CDP events to files.
 
+    Events are serialized on the caller's event loop and appended to per-file in-memory
+    buffers. A daemon writer thread drains the buffers into long-lived file handles once
+    `flush_threshold_bytes` is buffered or every `flush_interval_seconds`, so the CDP receiver
+    never blocks on open/write/close syscalls. Call `close()` (or at least `flush()`) before
+    reading the output files.
+
+    Once an output file reaches `max_segment_bytes` it is rotated into a numbered segment
+    (events.jsonl -> events.000001.jsonl) which the writer thread then compresses. Read captures
+    with `bluebox.utils.jsonl_utils.iter_jsonl_lines`, which walks all segments in order.
+
+    Alongside each output file the writer appends a sidecar index (events.index.jsonl) with the
+    segment, byte offset and length of every record plus its request_id, url, timestamp,
+    mime_type and status. Index lines are only written after the records they point to.
+
     Usage:
         writer = FileEventWriter(paths={
             "network_events_path": "./captures/network/events.jsonl",
@@ -30,6 +69,9 @@ class FileEventWriter:
             event_callback_fn=writer.write_event,
             paths=writer.paths,
         )
+        ...
+        await session.finalize()
+        writer.close()
     """
 
     # Map monitor category names to path keys
@@ -41,7 +83,20 @@ class FileEventWriter:
         "AsyncDOMMonitor": "dom_events_path",
     }
 
-    def __init__(self, paths: dict[str, str]) -> None:
+    DEFAULT_FLUSH_INTERVAL_SECONDS = 1.0
+    DEFAULT_FLUSH_THRESHOLD_BYTES = 256 * 1024
+    DEFAULT_MAX_SEGMENT_BYTES = 64 * 1024 * 1024
+
+    def __init__(
+        self,
+        paths: dict[str, str],
+        flush_interval_seconds: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        flush_threshold_bytes: int = DEFAULT_FLUSH_THRESHOLD_BYTES,
+        fsync_policy: FsyncPolicy = FsyncPolicy.NEVER,
+        max_segment_bytes: int | None = DEFAULT_MAX_SEGMENT_BYTES,
+        segment_compression: SegmentCompression | None = None,
+        write_index: bool = True,
+    ) -> None:
         """
         Initialize FileEventWriter.
 
@@ -52,8 +107,39 @@ class FileEventWriter:
                 - 'window_properties_path': Path for window property events JSONL
                 - 'interaction_events_path': Path for interaction events JSONL
                 Additional keys are preserved and passed through to AsyncCDPSession.
+            flush_interval_seconds: Max time buffered events wait before the writer thread flushes them.
+            flush_threshold_bytes: Buffered size (across all files) that triggers an early flush.
+            fsync_policy: When to fsync the open handles.
+            max_segment_bytes: Rotate an output file once it reaches this size. None disables rotation.
+            segment_compression: Codec for rotated segments. Defaults to zstd if installed, else gzip.
+            write_index: Maintain a sidecar byte-offset index next to each output file.
         """
+        super().__init__(flush_interval_seconds, flush_threshold_bytes, thread_name="FileEventWriter")
+        if flush_threshold_bytes <= 0:
+            raise ValueError("flush_threshold_bytes must be positive")
+        if max_segment_bytes is not None and max_segment_bytes <= 0:
+            raise ValueError("max_segment_bytes must be positive or None")
+        if segment_compression is None:
+            segment_compression = default_segment_compression()
+        segment_compression = SegmentCompression(segment_compression)
+        if segment_compression == SegmentCompression.ZSTD and not is_zstd_available():
+            raise ValueError("zstd segment compression requires the 'zstandard' package")
+
         self.paths = paths
+        self.flush_threshold_bytes = flush_threshold_bytes
+        self.fsync_policy = FsyncPolicy(fsync_policy)
+        self.max_segment_bytes = max_segment_bytes
+        self.segment_compression = segment_compression
+        self.write_index = write_index
+
+        # buffered items are (encoded line, routing record for the index) per output file;
+        # per-file state below is guarded by _io_lock
+        self._handles: dict[Path, BinaryIO] = {}
+        self._index_handles: dict[Path, BinaryIO] = {}  # keyed by output file
+        self._segment_sizes: dict[Path, int] = {}  # bytes in the active segment
+        self._next_segment_index: dict[Path, int] = {}  # number the active segment gets on rotation
+        # rotated segments waiting for the writer thread to compress them; guarded by _buffer_lock
+        self._segments_to_compress: list[Path] = []
 
         # Get specific paths (with defaults)
         self.network_events_path = Path(
@@ -131,16 +217,152 @@ class FileEventWriter:
             logger.warning("⚠️ Unknown event category: %s", category)
             return
 
-        # Write to JSONL file (append mode)
         try:
-            with open(output_path, mode="a", encoding="utf-8") as f:
-                json_line = json.dumps(event_dict, ensure_ascii=False)
-                f.write(json_line + "\n")
+            json_line = (json.dumps(event_dict, ensure_ascii=False) + "\n").encode("utf-8")
+        except (TypeError, ValueError) as e:
+            logger.error("❌ Failed to serialize event for %s: %s", output_path, e)
+            return
+
+        self._enqueue(output_path, (json_line, self._get_routing_fields(event_dict)), size=len(json_line))
+
+    def close(self) -> None:
+        """
+        Stop the writer thread, flush remaining events, compress rotated segments and close all file handles.
+        Idempotent; events written afterwards reopen the handles and restart the thread.
+        """
+        super().close()
+
+        with self._io_lock:
+            for output_path in list(self._handles):
+                self._close_handle(output_path, fsync=self.fsync_policy != FsyncPolicy.NEVER)
+            for output_path, index_handle in self._index_handles.items():
+                try:
+                    if self.fsync_policy != FsyncPolicy.NEVER:
+                        os.fsync(index_handle.fileno())
+                    index_handle.close()
+                except Exception as e:
+                    logger.error("❌ Failed to close index for %s: %s", output_path, e)
+            self._index_handles = {}
+
+        self._compress_rotated_segments()
+
+    def _drain(self, output_path: Path, lines: list[tuple[bytes, dict[str, Any]]]) -> None:
+        """
+        Append lines to the active segment of output_path, rotating whenever it would exceed max_segment_bytes.
+        Index entries are written only after the data they reference has been flushed; fsyncs if the
+        policy is ON_FLUSH.
+        """
+        handle = self._get_handle(output_path)
+        batch: list[bytes] = []
+        index_lines: list[bytes] = []
+        size = self._segment_sizes[output_path]
+        for line, routing in lines:
+            if self.max_segment_bytes is not None and size > 0 and size + len(line) > self.max_segment_bytes:
+                handle.write(b"".join(batch))
+                self._segment_sizes[output_path] = size
+                self._rotate(output_path)
+                handle = self._get_handle(output_path)
+                batch, size = [], 0
+            if self.write_index:
+                segment = self._next_segment_index[output_path]
+                index_lines.append(JsonlIndexEntry.from_record(routing, segment, size, len(line)).to_json_line())
+            batch.append(line)
+            size += len(line)
+
+        handle.write(b"".join(batch))
+        handle.flush()
+        self._segment_sizes[output_path] = size
+        if self.fsync_policy == FsyncPolicy.ON_FLUSH:
+            os.fsync(handle.fileno())
+
+        if index_lines:
+            index_handle = self._index_handles.get(output_path)
+            if index_handle is None:
+                index_handle = open(get_index_path(output_path), mode="ab")  # pylint: disable=consider-using-with
+                self._index_handles[output_path] = index_handle
+            index_handle.write(b"".join(index_lines))
+            index_handle.flush()
+            if self.fsync_policy == FsyncPolicy.ON_FLUSH:
+                os.fsync(index_handle.fileno())
+
+    @staticmethod
+    def _get_routing_fields(event_dict: dict[str, Any]) -> dict[str, Any]:
+        """Fields of an event copied into its index entry."""
+        return {
+            "request_id": event_dict.get("request_id"),
+            "url": event_dict.get("url"),
+            "timestamp": event_dict.get("timestamp"),
+            "mime_type": event_dict.get("mime_type"),
+            "status": event_dict.get("status"),
+        }
+
+    def _get_handle(self, output_path: Path) -> BinaryIO:
+        """Return the long-lived append handle for output_path, opening it on first use."""
+        handle = self._handles.get(output_path)
+        if handle is None:
+            handle = open(output_path, mode="ab")  # pylint: disable=consider-using-with
+            self._handles[output_path] = handle
+            self._segment_sizes[output_path] = os.path.getsize(output_path)
+            self._next_segment_index.setdefault(output_path, next_segment_index(output_path))
+        return handle
+
+    def _close_handle(self, output_path: Path, fsync: bool) -> None:
+        """Flush, optionally fsync, and close the handle for output_path."""
+        handle = self._handles.pop(output_path, None)
+        self._segment_sizes.pop(output_path, None)
+        if handle is None:
+            return
+        try:
+            handle.flush()
+            if fsync:
+                os.fsync(handle.fileno())
+            handle.close()
         except Exception as e:
-            logger.error("❌ Failed to write event to %s: %s", output_path, e)
+            logger.error("❌ Failed to close %s: %s", output_path, e)
+
+    def _rotate(self, output_path: Path) -> None:
+        """Close the active segment and move it to the next numbered segment for compression."""
+        self._close_handle(output_path, fsync=self.fsync_policy != FsyncPolicy.NEVER)
+
+        index = self._next_segment_index[output_path]
+        segment_path = get_segment_path(output_path, index)
+        os.replace(output_path, segment_path)
+        self._next_segment_index[output_path] = index + 1
+        logger.debug("Rotated %s -> %s", output_path, segment_path.name)
+
+        if self.segment_compression != SegmentCompression.NONE:
+            with self._buffer_lock:
+                self._segments_to_compress.append(segment_path)
+            self._wake_event.set()
+
+    def _compress_rotated_segments(self) -> None:
+        """Compress all segments rotated since the last call."""
+        with self._buffer_lock:
+            segments = self._segments_to_compress
+            self._segments_to_compress = []
+        for segment_path in segments:
+            try:
+                compress_jsonl_segment(segment_path, self.segment_compression)
+            except Exception as e:
+                logger.error("❌ Failed to compress segment %s: %s", segment_path, e)
+
+    def _background_work(self) -> None:
+        """Flush, then compress the segments the flush rotated."""
+        self.flush()
+        self._compress_rotated_segments()
 
     @classmethod
-    def create_from_output_dir(cls, output_dir: str | Path) -> "FileEventWriter":
+    def create_from_output_dir(
+        cls,
+        output_dir: str | Path,
+        *,
+        flush_interval_seconds: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        flush_threshold_bytes: int = DEFAULT_FLUSH_THRESHOLD_BYTES,
+        fsync_policy: FsyncPolicy = FsyncPolicy.NEVER,
+        max_segment_bytes: int | None = DEFAULT_MAX_SEGMENT_BYTES,
+        segment_compression: SegmentCompression | None = None,
+        write_index: bool = True,
+    ) -> "FileEventWriter":
         """
         Factory method to create FileEventWriter from an output directory.
 
@@ -158,6 +380,12 @@ class FileEventWriter:
 
         Args:
             output_dir: Base output directory path.
+            flush_interval_seconds: See __init__.
+            flush_threshold_bytes: See __init__.
+            fsync_policy: See __init__.
+            max_segment_bytes: See __init__.
+            segment_compression: See __init__.
+            write_index: See __init__.
 
         Returns:
             Configured FileEventWriter instance.
@@ -181,4 +409,12 @@ class FileEventWriter:
             # Other output paths
             "summary_path": str(output_dir / "session_summary.json"),
         }
-        return cls(paths=paths)
+        return cls(
+            paths=paths,
+            flush_interval_seconds=flush_interval_seconds,
+            flush_threshold_bytes=flush_threshold_bytes,
+            fsync_policy=fsync_policy,
+            max_segment_bytes=max_segment_bytes,
+            segment_compression=segment_compression,
+            write_index=write_index,
+        )
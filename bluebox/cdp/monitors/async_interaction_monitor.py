@@ -8,13 +8,13 @@ Tracks mouse clicks, keyboard events, and element details via JavaScript injecti
 from __future__ import annotations
 
 import json
-import os
 from collections import defaultdict
 from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 from bluebox.cdp.monitors.abstract_async_monitor import AbstractAsyncMonitor
 from bluebox.data_models.ui_elements import UIElement, BoundingBox
 from bluebox.data_models.cdp import UIInteractionEvent, InteractionType, Interaction
+from bluebox.utils.jsonl_utils import iter_jsonl_lines, jsonl_exists
 from bluebox.utils.logger import get_logger
 
 if TYPE_CHECKING:
@@ -55,7 +55,7 @@ class AsyncInteractionMonitor(AbstractAsyncMonitor):
         Consolidate all interactions from JSONL file into a single JSON structure.
 
         Args:
-            interaction_events_path: Path to interaction events JSONL file.
+            interaction_events_path: Path to interaction events JSONL file (rotated segments included).
             output_path: Optional path to write consolidated JSON file.
 
         Returns:
@@ -69,7 +69,7 @@ class AsyncInteractionMonitor(AbstractAsyncMonitor):
                 }
             }
         """
-        if not os.path.exists(interaction_events_path):
+        if not jsonl_exists(interaction_events_path):
             return {"interactions": [], "summary": {"total": 0, "by_type": {}, "by_url": {}}}
 
         interactions = []
@@ -77,23 +77,22 @@ class AsyncInteractionMonitor(AbstractAsyncMonitor):
         by_url: dict[str, int] = defaultdict(int)
 
         try:
-            with open(interaction_events_path, mode="r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        interaction = json.loads(line)
-                        interactions.append(interaction)
-
-                        # Update statistics
-                        interaction_type = interaction.get("type", "unknown")
-                        by_type[interaction_type] += 1
-                        url = interaction.get("url", "unknown")
-                        by_url[url] += 1
-                    except json.JSONDecodeError as e:
-                        logger.warning("Failed to parse interaction line: %s", e)
-                        continue
+            for line in iter_jsonl_lines(interaction_events_path):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    interaction = json.loads(line)
+                    interactions.append(interaction)
+
+                    # Update statistics
+                    interaction_type = interaction.get("type", "unknown")
+                    by_type[interaction_type] += 1
+                    url = interaction.get("url", "unknown")
+                    by_url[url] += 1
+                except json.JSONDecodeError as e:
+                    logger.warning("Failed to parse interaction line: %s", e)
+                    continue
         except Exception as e:
             logger.error("Failed to read interaction log: %s", e)
             return {"interactions": [], "summary": {"total": 0, "by_type": {}, "by_url": {}}}
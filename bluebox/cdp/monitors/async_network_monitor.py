@@ -12,7 +12,7 @@ import re
 from typing import TYPE_CHECKING, Any, Awaitable, Callable, ClassVar
 
 from bluebox.cdp.monitors.abstract_async_monitor import AbstractAsyncMonitor
-from bluebox.constants.network import THIRD_PARTY_TRACKING_ANALYTICS_DOMAINS
+from bluebox.constants.network import STATIC_ASSET_HINTS, THIRD_PARTY_TRACKING_ANALYTICS_DOMAINS
 from bluebox.data_models.cdp import NetworkTransactionEvent
 from bluebox.data_models.routine.endpoint import ResourceType
 from bluebox.utils.data_utils import get_text_from_html
@@ -39,9 +39,7 @@ class AsyncNetworkMonitor(AbstractAsyncMonitor):
         ResourceType.SCRIPT,
         ResourceType.XHR,
     })
-    STATIC_ASSET_HINTS: ClassVar[tuple[str, ...]] = (
-        ".css", ".woff", ".woff2", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico"
-    )
+    STATIC_ASSET_HINTS: ClassVar[tuple[str, ...]] = STATIC_ASSET_HINTS
     NOISY_NETWORK_EVENTS: ClassVar[frozenset[str]] = frozenset({})
 
     # for streaming/storage limits
@@ -0,0 +1,336 @@
+"""
+bluebox/cdp/replay_server.py
+
+Local HTTP server that replays a network capture, for offline and reproducible routine execution.
+
+Contains:
+- ReplayServer: serves captured responses keyed by method + URL (+ body), with a URL template
+  fallback and configurable latency injection
+- CapturedResponse: one replayable response
+- make_url_template(): URL -> template with ID-like path segments and query values removed
+
+Routines are pointed at the server with `RoutineExecutionOptions(url_rewriter=server.rewrite_url)`:
+`https://example.com/api?q=1` becomes `http://127.0.0.1:<port>/https/example.com/api?q=1`. Every
+rewritten URL shares the server's origin, so replayed fetches never hit CORS. Resources that pages
+load with root-relative URLs are not rewritten and will 404.
+"""
+
+import base64
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlparse, urlunparse
+
+from bluebox.utils.jsonl_utils import iter_jsonl_lines, jsonl_exists
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+# path segments treated as variable when building URL templates
+_VARIABLE_SEGMENT_PATTERN = re.compile(
+    r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|(?=.*\d)[\w-]{16,})$"
+)
+
+# captured response headers that do not apply to the replayed (decoded, re-framed) body
+_SKIPPED_RESPONSE_HEADERS = frozenset({
+    "content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive",
+})
+
+
+def make_url_template(url: str) -> str:
+    """
+    Reduce a URL to a template: numeric, UUID and long ID-like path segments become `{}`,
+    query parameters keep their (sorted) names but drop their values.
+
+    Args:
+        url: Absolute URL.
+    Returns:
+        Template string, e.g. "https://example.com/users/{}/posts?page&sort".
+    """
+    parsed = urlparse(url)
+    segments = ["{}" if _VARIABLE_SEGMENT_PATTERN.match(s) else s for s in parsed.path.split("/")]
+    query_keys = sorted({key for key, _ in parse_qsl(parsed.query, keep_blank_values=True)})
+    template = f"{parsed.scheme}://{parsed.netloc}{'/'.join(segments)}"
+    return f"{template}?{'&'.join(query_keys)}" if query_keys else template
+
+
+def _body_key(body: str | bytes | None) -> str:
+    """Normalize a request body for matching (JSON bodies compare by value, not formatting)."""
+    if not body:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+    except (json.JSONDecodeError, ValueError):
+        return body
+
+
+@dataclass
+class CapturedResponse:
+    """A captured response ready to be replayed."""
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+
+    @classmethod
+    def from_event(cls, event: dict[str, Any]) -> "CapturedResponse":
+        """Build from a NetworkTransactionEvent dict."""
+        body_text = event.get("response_body") or ""
+        if event.get("response_body_base64"):
+            body = base64.b64decode(body_text)
+        else:
+            body = body_text.encode("utf-8")
+
+        headers: list[tuple[str, str]] = []
+        for name, value in (event.get("response_headers") or {}).items():
+            if name.lower() in _SKIPPED_RESPONSE_HEADERS:
+                continue
+            # CDP joins repeated headers with newlines
+            headers.extend((name, v) for v in str(value).split("\n"))
+        if event.get("mime_type") and not any(name.lower() == "content-type" for name, _ in headers):
+            headers.append(("Content-Type", event["mime_type"]))
+
+        return cls(status=event.get("status") or 200, headers=headers, body=body)
+
+
+@dataclass
+class ReplayStats:
+    """Counters for a replay run."""
+    served: int = 0
+    matched_exact: int = 0
+    matched_url: int = 0
+    matched_template: int = 0
+    unmatched: list[str] = field(default_factory=list)
+
+
+class ReplayServer:
+    """
+    Threaded HTTP server replaying the responses in a network capture.
+
+    Requests are matched against the capture in order of precision:
+        1. method + URL + request body
+        2. method + URL
+        3. method + URL template (see make_url_template)
+    When a key matches several captured responses they are replayed in capture order, cycling.
+    Unmatched requests get a 404 and are recorded in `stats.unmatched`.
+
+    Usage:
+        with ReplayServer("./cdp_captures/network/events.jsonl", latency_seconds=0.05) as server:
+            options = RoutineExecutionOptions(url_rewriter=server.rewrite_url)
+            result = routine.execute(parameters_dict=params, options=options)
+    """
+
+    def __init__(
+        self,
+        jsonl_path: str | Path,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_seconds: float = 0.0,
+        latency_jitter_seconds: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        """
+        Load a capture and prepare the server (call start() or use it as a context manager).
+
+        Args:
+            jsonl_path: Network capture (network/events.jsonl, rotated segments included).
+            host: Interface to bind.
+            port: Port to bind (0 picks a free port).
+            latency_seconds: Fixed delay added before every response.
+            latency_jitter_seconds: Extra uniformly distributed delay in [0, jitter).
+            seed: Seed for the jitter, for reproducible runs.
+        """
+        if latency_seconds < 0 or latency_jitter_seconds < 0:
+            raise ValueError("latency_seconds and latency_jitter_seconds must be non-negative")
+        if not jsonl_exists(jsonl_path):
+            raise ValueError(f"JSONL file does not exist: {jsonl_path}")
+
+        self.host = host
+        self.port = port
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.stats = ReplayStats()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._responses: dict[tuple, list[CapturedResponse]] = {}
+        self._cursors: dict[tuple, int] = {}
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+        count = self._load(jsonl_path)
+        logger.info("ReplayServer loaded %d captured responses from %s", count, jsonl_path)
+
+    def _load(self, jsonl_path: str | Path) -> int:
+        """Index captured responses by every match key."""
+        count = 0
+        for line in iter_jsonl_lines(jsonl_path):
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning("Skipping unparseable capture line: %s", e)
+                continue
+            url, method = event.get("url"), (event.get("method") or "GET").upper()
+            if not url or event.get("failed"):
+                continue
+
+            response = CapturedResponse.from_event(event)
+            for key in self._match_keys(method, url, event.get("post_data")):
+                self._responses.setdefault(key, []).append(response)
+            count += 1
+        return count
+
+    @staticmethod
+    def _match_keys(method: str, url: str, body: str | bytes | None) -> list[tuple]:
+        """Lookup keys for a request, most precise first."""
+        return [
+            ("exact", method, url, _body_key(body)),
+            ("url", method, url),
+            ("template", method, make_url_template(url)),
+        ]
+
+    def match(self, method: str, url: str, body: str | bytes | None = None) -> CapturedResponse | None:
+        """
+        Find the captured response for a request (advancing the replay cursor of the matched key).
+
+        Args:
+            method: HTTP method.
+            url: Original (un-rewritten) absolute URL.
+            body: Request body.
+        Returns:
+            The response to replay, or None.
+        """
+        with self._lock:
+            for key in self._match_keys(method.upper(), url, body):
+                responses = self._responses.get(key)
+                if not responses:
+                    continue
+                cursor = self._cursors.get(key, 0)
+                self._cursors[key] = cursor + 1
+                setattr(self.stats, f"matched_{key[0]}", getattr(self.stats, f"matched_{key[0]}") + 1)
+                return responses[cursor % len(responses)]
+            self.stats.unmatched.append(f"{method.upper()} {url}")
+            return None
+
+    # URL rewriting ________________________________________________________________________________________________________
+
+    @property
+    def base_url(self) -> str:
+        """Server origin, e.g. http://127.0.0.1:54321."""
+        return f"http://{self.host}:{self.port}"
+
+    def rewrite_url(self, url: str) -> str:
+        """
+        Map an http(s) URL onto the server (other schemes, e.g. about:blank, pass through).
+
+        Args:
+            url: Original absolute URL.
+        Returns:
+            `<base_url>/<scheme>/<netloc><path>[?query][#fragment]`.
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            return url
+        rewritten = f"{self.base_url}/{parsed.scheme}/{parsed.netloc}{parsed.path or '/'}"
+        if parsed.query:
+            rewritten += f"?{parsed.query}"
+        if parsed.fragment:
+            rewritten += f"#{parsed.fragment}"
+        return rewritten
+
+    @staticmethod
+    def original_url(request_path: str) -> str | None:
+        """Invert rewrite_url for a request path ("/https/example.com/api?q=1"); None if malformed."""
+        parsed = urlparse(request_path)
+        parts = parsed.path.split("/", 3)
+        if len(parts) < 3 or parts[1] not in ("http", "https") or not parts[2]:
+            return None
+        path = "/" + parts[3] if len(parts) == 4 else "/"
+        return urlunparse((parts[1], parts[2], path, "", parsed.query, ""))
+
+    # Lifecycle ____________________________________________________________________________________________________________
+
+    def start(self) -> "ReplayServer":
+        """Start serving on a background thread."""
+        if self._server is not None:
+            return self
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ReplayServer", daemon=True)
+        self._thread.start()
+        logger.info("ReplayServer listening on %s", self.base_url)
+        return self
+
+    def stop(self) -> None:
+        """Stop the server. Idempotent."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _delay(self) -> None:
+        """Sleep for the configured latency."""
+        delay = self.latency_seconds
+        if self.latency_jitter_seconds:
+            with self._lock:
+                delay += self._random.uniform(0, self.latency_jitter_seconds)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        """Build the request handler class bound to this server."""
+        replay_server = self
+
+        class _ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else None
+                url = replay_server.original_url(self.path)
+                response = replay_server.match(self.command, url, body) if url else None
+
+                replay_server._delay()
+                if response is None:
+                    payload = json.dumps({"error": "no captured response", "url": url or self.path}).encode()
+                    self.send_response(404)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+
+                self.send_response(response.status)
+                for name, value in response.headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(response.body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(response.body)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+            def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+                logger.debug("ReplayServer: " + format, *args)
+
+        return _ReplayHandler
@@ -0,0 +1,158 @@
+"""
+bluebox/cdp/tab_pool.py
+
+Session-affinity tab reuse for routine execution.
+
+Contains:
+- TabReusePolicy: What happens to a routine's tab when the run finishes
+- PooledTab: An idle tab kept for reuse, with the page it sits on
+- TabPool: Idle tabs keyed by origin and incognito profile
+- url_origin(): scheme://host[:port] of a URL
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import StrEnum
+from urllib.parse import urlparse
+
+from bluebox.cdp.connection import cdp_close_tab
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+# Idle tabs kept across all origins before the least recently used one is closed
+DEFAULT_MAX_IDLE_TABS = 8
+
+# Idle tabs older than this are closed instead of reused
+DEFAULT_IDLE_TTL_SECONDS = 300.0
+
+
+class TabReusePolicy(StrEnum):
+    """What happens to a routine's tab when the run finishes."""
+    CLOSE = "close"  # close the tab (and dispose its incognito context)
+    KEEP = "keep"    # leave the tab open, untracked
+    POOL = "pool"    # clean routine state and return the tab to a TabPool for the next run on its origin
+
+
+def url_origin(url: str | None) -> str | None:
+    """scheme://host[:port] of an http(s) URL, or None (about:blank, data:, malformed URLs)."""
+    if not url:
+        return None
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        return None
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+@dataclass
+class PooledTab:
+    """A tab owned by a TabPool."""
+    target_id: str
+    browser_context_id: str | None
+    incognito: bool
+    current_url: str = "about:blank"
+    released_at: float = field(default_factory=time.monotonic)
+    runs: int = 0
+
+    @property
+    def origin(self) -> str | None:
+        """Origin of the page the tab sits on."""
+        return url_origin(self.current_url)
+
+
+class TabPool:
+    """
+    Idle routine tabs keyed by (origin, incognito), reused by runs targeting the same origin.
+
+    A run acquires a tab already on its target origin (so fetches skip the bootstrap navigation),
+    and releases it after routine-scoped state is cleaned up. Tabs idle longer than
+    idle_ttl_seconds, or beyond max_idle_tabs, are closed. Thread-safe; one pool per browser.
+    """
+
+    def __init__(
+        self,
+        remote_debugging_address: str = "http://127.0.0.1:9222",
+        max_idle_tabs: int = DEFAULT_MAX_IDLE_TABS,
+        idle_ttl_seconds: float = DEFAULT_IDLE_TTL_SECONDS,
+        close_tab: Callable[[str, str, str | None], None] = cdp_close_tab,
+    ) -> None:
+        """
+        Args:
+            remote_debugging_address: Chrome debugging server address the tabs belong to.
+            max_idle_tabs: Idle tabs kept across all origins.
+            idle_ttl_seconds: Idle tabs older than this are closed.
+            close_tab: Closes (address, target_id, browser_context_id); defaults to cdp_close_tab.
+        """
+        if max_idle_tabs < 0:
+            raise ValueError("max_idle_tabs must not be negative")
+        self.remote_debugging_address = remote_debugging_address
+        self.max_idle_tabs = max_idle_tabs
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._close_tab = close_tab
+        self._idle: list[PooledTab] = []  # least recently released first
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def acquire(self, origin: str | None, incognito: bool) -> PooledTab | None:
+        """
+        Take the most recently released idle tab on `origin` with the same incognito profile.
+
+        Args:
+            origin: Target origin of the run (None never matches).
+            incognito: Whether the run wants an incognito tab.
+        Returns:
+            The tab (removed from the pool), or None if there is no match.
+        """
+        with self._lock:
+            expired = self._pop_expired()
+            tab = None
+            if origin is not None:
+                for candidate in reversed(self._idle):
+                    if candidate.origin == origin and candidate.incognito == incognito:
+                        tab = candidate
+                        self._idle.remove(candidate)
+                        break
+        self._close_all(expired)
+        if tab is not None:
+            logger.info("Reusing tab %s on %s (run %d)", tab.target_id, origin, tab.runs + 1)
+        return tab
+
+    def release(self, tab: PooledTab) -> None:
+        """Return a cleaned-up tab to the pool (closing the oldest idle tabs beyond capacity)."""
+        tab.released_at = time.monotonic()
+        tab.runs += 1
+        with self._lock:
+            self._idle.append(tab)
+            evicted = self._pop_expired()
+            while len(self._idle) > self.max_idle_tabs:
+                evicted.append(self._idle.pop(0))
+        self._close_all(evicted)
+
+    def discard(self, tab: PooledTab) -> None:
+        """Close a tab that must not be reused (e.g. its run failed)."""
+        self._close_all([tab])
+
+    def close_all(self) -> None:
+        """Close every idle tab."""
+        with self._lock:
+            tabs, self._idle = self._idle, []
+        self._close_all(tabs)
+
+    def _pop_expired(self) -> list[PooledTab]:
+        now = time.monotonic()
+        expired = [tab for tab in self._idle if now - tab.released_at > self.idle_ttl_seconds]
+        if expired:
+            self._idle = [tab for tab in self._idle if tab not in expired]
+        return expired
+
+    def _close_all(self, tabs: list[PooledTab]) -> None:
+        for tab in tabs:
+            try:
+                self._close_tab(self.remote_debugging_address, tab.target_id, tab.browser_context_id)
+            except Exception as e:
+                logger.debug("Failed to close pooled tab %s: %s", tab.target_id, e)
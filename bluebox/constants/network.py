@@ -28,6 +28,11 @@ EXCLUDED_MIME_PREFIXES: tuple[str, ...] = (
     "application/octet-stream",
 )
 
+# URL suffixes of static assets (stylesheets, fonts, images) that carry no API data
+STATIC_ASSET_HINTS: tuple[str, ...] = (
+    ".css", ".woff", ".woff2", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico"
+)
+
 INCLUDED_MIME_PREFIXES: tuple[str, ...] = (
     "application/json",
     "text/html",
@@ -14,6 +14,7 @@ from .operation import (
     RoutineReturnOperation,
 )
 from .execution import RoutineExecutionContext, RoutineExecutionResult
+from .execution_options import RoutineExecutionOptions
 from .placeholder import PlaceholderQuoteType, ExtractedPlaceholder, extract_placeholders_from_json_str
 
 __all__ = [
@@ -30,6 +31,7 @@ __all__ = [
     "RoutineReturnOperation",
     "RoutineExecutionContext",
     "RoutineExecutionResult",
+    "RoutineExecutionOptions",
     "PlaceholderQuoteType",
     "ExtractedPlaceholder",
     "extract_placeholders_from_json_str",
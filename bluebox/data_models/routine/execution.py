@@ -11,12 +11,21 @@ Contains:
 """
 
 import re
+import time
+from contextlib import AbstractContextManager, nullcontext
+from io import IOBase
+from pathlib import Path
 from typing import Any, Callable
 
 from pydantic import BaseModel, ConfigDict, Field
 from websocket import WebSocket
 
 from bluebox.data_models.routine.endpoint import MimeType
+from bluebox.data_models.routine.plan import OperationPlan
+from bluebox.data_models.routine.trace import ExecutionTracer, OperationTrace
+from bluebox.utils.cdp_origin_utils import OriginBootstrapStrategy
+from bluebox.utils.cdp_transfer_utils import PageTransferReader
+from bluebox.utils.js_utils import generate_runtime_library_js
 
 
 class OperationExecutionMetadata(BaseModel):
@@ -25,6 +34,7 @@ class OperationExecutionMetadata(BaseModel):
     duration_seconds: float = Field(description="How long the operation took to execute")
     details: dict = Field(default_factory=dict, description="Operation-specific data")
     error: str | None = Field(default=None, description="Error message from the operation execution.")
+    trace: OperationTrace | None = Field(default=None, description="Spans and CDP/byte counters (traced runs only).")
 
 
 class RoutineExecutionResult(BaseModel):
@@ -39,15 +49,31 @@ class RoutineExecutionResult(BaseModel):
         is_base64 (bool): Whether the data is base64-encoded binary content (from RoutineDownloadOperation).
         content_type (str | None): MIME type of the data (e.g., 'application/pdf', 'image/png').
         filename (str | None): Suggested filename for the data.
+        file_path (str | None): Where a streamed download was written (data is None in that case).
+        size_bytes (int | None): Size of the streamed download in bytes.
     """
     ok: bool = Field(default=True, description="Whether the routine execution was successful.")
     error: str | None = Field(default=None, description="Error message from the routine execution.")
     warnings: list[str] = Field(default_factory=list, description="Warnings from the routine execution.")
-    operations_metadata: list[OperationExecutionMetadata] = Field(default_factory=list, description="Metadata for each operation executed in order")
-    placeholder_resolution: dict[str, str | None] = Field(default_factory=dict, description="The placeholder resolution of the routine execution.")
+    operations_metadata: list[OperationExecutionMetadata] = Field(
+        default_factory=list,
+        description="Metadata for each operation executed in order",
+    )
+    placeholder_resolution: dict[str, str | None] = Field(
+        default_factory=dict,
+        description="The placeholder resolution of the routine execution.",
+    )
     is_base64: bool = Field(default=False, description="Whether the data is base64-encoded binary content.")
-    content_type: MimeType | str | None = Field(default=None, description="MIME type of the data (e.g., 'application/pdf', 'image/png').")
+    content_type: MimeType | str | None = Field(
+        default=None,
+        description="MIME type of the data (e.g., 'application/pdf', 'image/png').",
+    )
     filename: str | None = Field(default=None, description="Suggested filename for the data.")
+    file_path: str | None = Field(
+        default=None,
+        description="Where a streamed download was written (data is None in that case).",
+    )
+    size_bytes: int | None = Field(default=None, description="Size of the streamed download in bytes.")
     data: dict | list | str | None = Field(default=None, description="The result of the routine execution.")
 
 
@@ -72,12 +98,77 @@ class RoutineExecutionContext(BaseModel):
     # Current page URL (updated by navigate operations, used by fetch to detect blank page)
     current_url: str = Field(default="about:blank", description="Current page URL, updated by navigate operations")
 
+    # Optional rewriting of navigate/fetch/download URLs (e.g. ReplayServer.rewrite_url for offline replay)
+    url_rewriter: Callable[[str], str] | None = None
+
+    # How a fetch from a blank tab gets a same-origin document (see bootstrap_origin)
+    origin_bootstrap: OriginBootstrapStrategy = OriginBootstrapStrategy.HOMEPAGE
+
+    # Optional adjustment of navigation wait bounds: (url, configured seconds) -> seconds
+    # (e.g. AdaptiveWaitPolicy.wait_seconds)
+    wait_tuner: Callable[[str, float], float] | None = None
+
+    # Gzip large return/return_html/download values in page before transferring them (CompressionStream)
+    compress_transfers: bool = False
+
+    # Stream downloads to disk instead of returning base64 data: a directory (file named after the
+    # operation's filename) or a writable binary file object
+    download_target: str | Path | IOBase | None = None
+
     # Result (operations update this directly)
     result: RoutineExecutionResult = Field(default_factory=RoutineExecutionResult)
 
     # Current operation metadata (set by execute(), operations can add to details)
     current_operation_metadata: OperationExecutionMetadata | None = None
 
+    # Current operation's compiled interpolation plan (set by execute(), used to render parameters)
+    current_operation_plan: OperationPlan | None = None
+
+    # Records per-operation spans when the run is traced (send_cmd/recv_until are then wrapped by it)
+    tracer: ExecutionTracer | None = None
+
+    def resolve_url(self, url: str) -> str:
+        """Apply url_rewriter (if any) to a URL the browser is about to load."""
+        return self.url_rewriter(url) if self.url_rewriter is not None else url
+
+    def navigation_wait(self, url: str, configured_seconds: float) -> float:
+        """Page load wait bound for a navigation to url (wait_tuner's choice, if any; 0 stays 0)."""
+        if self.wait_tuner is None or configured_seconds <= 0:
+            return configured_seconds
+        return self.wait_tuner(url, configured_seconds)
+
+    def trace_span(self, name: str, category: str, **args: Any) -> AbstractContextManager:
+        """Context manager recording the enclosed block as a span of the current operation (no-op untraced)."""
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, category, **args)
+
+    def sleep(self, seconds: float) -> None:
+        """time.sleep, recorded as a 'sleep' span when traced."""
+        with self.trace_span("sleep", "sleep", seconds=seconds):
+            time.sleep(seconds)
+
+    def transfer_reader(self) -> PageTransferReader:
+        """Reader for values staged in the page (return, return_html, download)."""
+        return PageTransferReader(self.send_cmd, self.recv_until, self.session_id, self.timeout)
+
+    def install_runtime(self) -> None:
+        """
+        Evaluate the routine JS helper library in the current document.
+
+        Routine.execute registers the library for every new document; this covers documents that
+        were already loaded (or replaced it). Idempotent.
+        """
+        eval_id = self.send_cmd(
+            "Runtime.evaluate",
+            {"expression": generate_runtime_library_js(), "returnByValue": True},
+            session_id=self.session_id,
+        )
+        reply = self.recv_until(lambda m: m.get("id") == eval_id, time.time() + self.timeout)
+        if "error" in reply:
+            raise RuntimeError(f"Failed to install routine runtime library: {reply['error']}")
+
+
 class FetchExecutionResult(BaseModel):
     """
     Result of a fetch execution.
@@ -85,4 +176,7 @@ class FetchExecutionResult(BaseModel):
     ok: bool = Field(description="Whether the fetch execution was successful.")
     result: dict | str | None = Field(default=None, description="The result of the fetch execution.")
     error: str | None = Field(default=None, description="Error message from the fetch execution.")
-    resolved_values: dict[str, str | None] = Field(default_factory=dict, description="The placeholder resolution of the fetch execution.")
+    resolved_values: dict[str, str | None] = Field(
+        default_factory=dict,
+        description="The placeholder resolution of the fetch execution.",
+    )
@@ -0,0 +1,293 @@
+"""
+bluebox/data_models/routine/execution_history.py
+
+SQLite-backed history of routine executions and adaptive page load waits learned from it.
+
+Contains:
+- ExecutionHistoryStore: sqlite3 database of executions and their per-operation timings/outcomes
+- WaitRecommendation: Navigation wait bound for a domain, with the evidence behind it
+- AdaptiveWaitPolicy: Shrinks navigation waits toward observed readiness, backs off on failures
+"""
+
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from urllib.parse import urlparse
+
+from bluebox.data_models.routine.execution import RoutineExecutionResult
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+# Most recent navigations per domain the adaptive policy looks at
+DEFAULT_WINDOW = 100
+
+# Navigations a domain needs before its waits are adjusted
+DEFAULT_MIN_SAMPLES = 5
+
+
+def _domain(url: str | None) -> str:
+    """Host of a URL ('' for blank/relative URLs)."""
+    if not url:
+        return ""
+    return urlparse(url).netloc.lower()
+
+
+class ExecutionHistoryStore:
+    """
+    SQLite database of routine executions.
+
+    Every execution gets a row (routine, outcome, duration) and each of its operations one more,
+    keyed by the domain it ran against: the URL it loaded or requested, else the page it ran on.
+    Navigations also keep the wait bound they used and the seconds the page took to be ready
+    (load event plus network idle; NULL when the bound was hit first).
+
+    Thread-safe: all access goes through one connection guarded by a lock.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS executions (
+            id INTEGER PRIMARY KEY,
+            routine TEXT NOT NULL,
+            recorded_at REAL NOT NULL,
+            ok INTEGER NOT NULL,
+            error TEXT,
+            duration_seconds REAL NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS operations (
+            id INTEGER PRIMARY KEY,
+            execution_id INTEGER NOT NULL REFERENCES executions(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            domain TEXT NOT NULL DEFAULT '',
+            duration_seconds REAL NOT NULL DEFAULT 0,
+            wait_bound_seconds REAL,
+            ready_seconds REAL,
+            timed_out INTEGER NOT NULL DEFAULT 0,
+            status INTEGER,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_operations_domain_type ON operations(domain, type, id);
+        CREATE INDEX IF NOT EXISTS idx_operations_execution_id ON operations(execution_id);
+    """
+
+    def __init__(self, db_path: str | Path) -> None:
+        """
+        Open (creating if needed) a history database.
+
+        Args:
+            db_path: Path to the SQLite file (":memory:" for an in-memory database).
+        """
+        self.db_path = str(db_path)
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            if self.db_path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(self._SCHEMA)
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+    # Writes _______________________________________________________________________________________________________________
+
+    def record(self, routine_name: str, result: RoutineExecutionResult) -> int:
+        """
+        Record an execution and its operations from result.operations_metadata.
+
+        Args:
+            routine_name: Name of the executed routine.
+            result: Its result.
+        Returns:
+            Row id of the execution.
+        """
+        rows = []
+        page_domain = ""
+        for position, metadata in enumerate(result.operations_metadata):
+            details = metadata.details
+            request = details.get("request") or {}
+            response = details.get("response") or {}
+            page_load = details.get("page_load") or {}
+            domain = _domain(details.get("url") or request.get("url")) or page_domain
+            if metadata.type == "navigate" and domain:
+                page_domain = domain
+            settled = bool(page_load) and page_load.get("loaded") and not page_load.get("timed_out")
+            rows.append((
+                position,
+                str(metadata.type),
+                domain,
+                metadata.duration_seconds,
+                details.get("wait_bound_seconds"),
+                page_load.get("waited_seconds") if settled else None,
+                int(bool(page_load.get("timed_out"))),
+                response.get("status") if isinstance(response.get("status"), int) else None,
+                metadata.error or page_load.get("error"),
+            ))
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO executions (routine, recorded_at, ok, error, duration_seconds) VALUES (?, ?, ?, ?, ?)",
+                (
+                    routine_name,
+                    time.time(),
+                    int(result.ok),
+                    result.error,
+                    sum(metadata.duration_seconds for metadata in result.operations_metadata),
+                ),
+            )
+            execution_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO operations (execution_id, position, type, domain, duration_seconds, wait_bound_seconds, "
+                "ready_seconds, timed_out, status, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(execution_id, *row) for row in rows],
+            )
+            self._conn.commit()
+        return execution_id
+
+    def prune(self, older_than_seconds: float) -> int:
+        """Delete executions recorded more than older_than_seconds ago; returns how many."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM executions WHERE recorded_at < ?", (time.time() - older_than_seconds,),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    # Queries ______________________________________________________________________________________________________________
+
+    def query(self, sql: str, params: tuple | list = ()) -> list[sqlite3.Row]:
+        """Run a read query and return all rows."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def recent_navigations(self, domain: str, limit: int = DEFAULT_WINDOW) -> list[sqlite3.Row]:
+        """
+        The domain's latest navigations, newest first, with their execution's outcome.
+
+        Columns: wait_bound_seconds, ready_seconds, timed_out, error, ok.
+        """
+        return self.query(
+            """
+            SELECT o.wait_bound_seconds, o.ready_seconds, o.timed_out, o.error, e.ok
+            FROM operations o JOIN executions e ON e.id = o.execution_id
+            WHERE o.domain = ? AND o.type = 'navigate'
+            ORDER BY o.id DESC LIMIT ?
+            """,
+            (domain.lower(), limit),
+        )
+
+
+@dataclass
+class WaitRecommendation:
+    """A navigation wait bound chosen by AdaptiveWaitPolicy."""
+    domain: str
+    configured_seconds: float
+    seconds: float
+    samples: int = 0
+    ready_percentile_seconds: float | None = None
+    consecutive_failures: int = 0
+
+    def to_dict(self) -> dict:
+        """Plain dict for logging/metrics."""
+        return asdict(self)
+
+
+class AdaptiveWaitPolicy:
+    """
+    Picks each navigation's page load wait bound from the domain's execution history.
+
+    With at least min_samples recorded navigations, the bound becomes the `percentile` of the
+    seconds pages took to be ready, times `headroom`. Navigations of successful runs that hit their
+    bound count as taking the whole bound (the page never settled, yet the routine did not need
+    more). Every consecutive latest navigation whose run failed multiplies the bound (or the last
+    bound used, if larger) by `failure_backoff`. The result stays within
+    [min_seconds, configured * max_scale]; a configured wait of 0 stays 0.
+    """
+
+    def __init__(
+        self,
+        history: ExecutionHistoryStore,
+        percentile: float = 99.0,
+        headroom: float = 1.25,
+        min_seconds: float = 0.5,
+        max_scale: float = 2.0,
+        failure_backoff: float = 2.0,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        window: int = DEFAULT_WINDOW,
+    ) -> None:
+        """
+        Args:
+            history: Store the readiness times and outcomes are read from.
+            percentile: Percentile of observed readiness times to aim for, in [0, 100].
+            headroom: Factor applied on top of the percentile.
+            min_seconds: Lower bound of an adapted wait.
+            max_scale: Upper bound of an adapted wait, as a multiple of the configured wait.
+            failure_backoff: Factor applied per consecutive failed run.
+            min_samples: Navigations a domain needs before its waits shrink.
+            window: Latest navigations considered per domain.
+        """
+        if not 0 <= percentile <= 100:
+            raise ValueError("percentile must be in [0, 100]")
+        if headroom < 1 or failure_backoff < 1 or max_scale < 1:
+            raise ValueError("headroom, failure_backoff and max_scale must be at least 1")
+        self.history = history
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_seconds = min_seconds
+        self.max_scale = max_scale
+        self.failure_backoff = failure_backoff
+        self.min_samples = min_samples
+        self.window = window
+
+    def wait_seconds(self, url: str, configured_seconds: float) -> float:
+        """Wait bound for a navigation to url configured with configured_seconds."""
+        return self.recommend(_domain(url), configured_seconds).seconds
+
+    def recommend(self, domain: str, configured_seconds: float) -> WaitRecommendation:
+        """Wait bound for a navigation on a domain, with the samples it was derived from."""
+        recommendation = WaitRecommendation(
+            domain=domain, configured_seconds=configured_seconds, seconds=configured_seconds,
+        )
+        if configured_seconds <= 0 or not domain:
+            return recommendation
+        rows = self.history.recent_navigations(domain, self.window)
+
+        for row in rows:
+            if row["ok"] and not row["error"]:
+                break
+            recommendation.consecutive_failures += 1
+
+        ready = []
+        for row in rows:
+            if not row["ok"]:
+                continue
+            if row["ready_seconds"] is not None:
+                ready.append(row["ready_seconds"])
+            elif row["timed_out"] and row["wait_bound_seconds"] is not None:
+                ready.append(row["wait_bound_seconds"])
+        recommendation.samples = len(ready)
+
+        seconds = configured_seconds
+        if len(ready) >= self.min_samples:
+            ordered = sorted(ready)
+            rank = min(len(ordered) - 1, max(0, round(self.percentile / 100 * len(ordered) + 0.5) - 1))
+            recommendation.ready_percentile_seconds = ordered[rank]
+            seconds = ordered[rank] * self.headroom
+        if recommendation.consecutive_failures:
+            last_bound = rows[0]["wait_bound_seconds"] or configured_seconds
+            seconds = max(seconds, last_bound) * self.failure_backoff ** recommendation.consecutive_failures
+        floor = min(self.min_seconds, configured_seconds)
+        recommendation.seconds = min(max(seconds, floor), configured_seconds * self.max_scale)
+        logger.debug("Navigation wait for %s: %s", domain, recommendation.to_dict())
+        return recommendation
@@ -0,0 +1,127 @@
+"""
+bluebox/data_models/routine/execution_options.py
+
+How a routine is executed: browser, tab handling and opt-in optimizations.
+
+Contains:
+- RoutineExecutionOptions: Options of Routine.execute() / Routine.execute_batch()
+"""
+
+from io import IOBase
+from pathlib import Path
+from typing import Callable
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from bluebox.cdp.tab_pool import TabPool, TabReusePolicy
+from bluebox.data_models.routine.execution_history import AdaptiveWaitPolicy
+from bluebox.data_models.routine.result_cache import RoutineResultCache
+from bluebox.data_models.routine.session_state import SessionStateStore
+
+
+class RoutineExecutionOptions(BaseModel):
+    """
+    Options of a routine execution, passed as one argument to Routine.execute() and
+    Routine.execute_batch() (which ignores download_target, parallel and result_cache).
+
+    Everything past the tab settings is opt-in and off by default.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    # Browser and tab
+    remote_debugging_address: str = Field(
+        default="http://127.0.0.1:9222",
+        description="Chrome debugging server address.",
+    )
+    timeout: float = Field(default=180.0, description="Operation timeout in seconds.")
+    close_tab_when_done: bool = Field(
+        default=True,
+        description=(
+            "Whether to close the tab when finished "
+            "(used when tab_reuse is None: CLOSE if True, KEEP if False)."
+        ),
+    )
+    tab_id: str | None = Field(
+        default=None,
+        description="If provided, attach to this existing tab. If None, create (or reuse) a tab.",
+    )
+    tab_reuse: TabReusePolicy | None = Field(
+        default=None,
+        description="What happens to the tab afterwards (defaults to POOL when tab_pool is given).",
+    )
+    tab_pool: TabPool | None = Field(
+        default=None,
+        description="Pool to take a tab already on the routine's origin from, and to return the tab to.",
+    )
+
+    # URLs and transfers
+    url_rewriter: Callable[[str], str] | None = Field(
+        default=None,
+        description=(
+            "Function applied to every navigate/fetch/download URL, "
+            "e.g. ReplayServer.rewrite_url to run against a replayed capture."
+        ),
+    )
+    compress_transfers: bool = Field(
+        default=False,
+        description="Gzip large return/return_html/download values in page before transferring them over CDP.",
+    )
+    download_target: str | Path | IOBase | None = Field(
+        default=None,
+        description=(
+            "Stream downloads here instead of returning base64 data: a directory "
+            "(file named after the operation's filename) or a writable binary file object."
+        ),
+    )
+
+    # Opt-in optimizations
+    parallel: bool = Field(
+        default=False,
+        description="Run fetch operations that do not depend on each other concurrently in page (see routine.schedule).",
+    )
+    result_cache: RoutineResultCache | None = Field(
+        default=None,
+        description=(
+            "Return a fresh cached result for the same routine and parameters instead of executing, "
+            "and cache successful results. Not used with download_target, url_rewriter or trace."
+        ),
+    )
+    trace: bool = Field(
+        default=False,
+        description="Record spans, CDP round trips and bytes per operation in its metadata (see routine.trace).",
+    )
+    preconnect: bool = Field(
+        default=False,
+        description=(
+            "Warm up connections to every origin the routine uses from its first page "
+            "(the page can see the injected hints)."
+        ),
+    )
+    session_state: SessionStateStore | None = Field(
+        default=None,
+        description=(
+            "Restore the cookies and web storage a previous successful run on the same origins left, "
+            "and store this run's."
+        ),
+    )
+    wait_policy: AdaptiveWaitPolicy | None = Field(
+        default=None,
+        description="Adjust navigation wait bounds from the execution history of their domain.",
+    )
+
+    @property
+    def bypasses_result_cache(self) -> bool:
+        """
+        Whether results of these options must not share cache entries with plain runs: streamed
+        downloads live on disk, rewritten URLs (e.g. replays) are not the live site's results, and
+        traces are per run.
+        """
+        return self.download_target is not None or self.url_rewriter is not None or self.trace
+
+    def resolved_tab_reuse(self) -> TabReusePolicy:
+        """tab_reuse, defaulting to POOL with a tab_pool, else CLOSE or KEEP per close_tab_when_done."""
+        if self.tab_reuse is not None:
+            return self.tab_reuse
+        if self.tab_pool is not None:
+            return TabReusePolicy.POOL
+        return TabReusePolicy.CLOSE if self.close_tab_when_done else TabReusePolicy.KEEP
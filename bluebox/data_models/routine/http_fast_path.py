@@ -0,0 +1,530 @@
+"""
+bluebox/data_models/routine/http_fast_path.py
+
+Browserless execution of fetch-only routines over a pooled HTTP client.
+
+Contains:
+- HttpEligibility: Whether a routine can run without a browser, and why not
+- check_http_eligibility(): Analyze a routine's operations and placeholders
+- HttpFastPath: Runs eligible routines with requests, seeded with cookies from a one-time browser bootstrap
+
+A routine is eligible when it only navigates, sleeps, fetches, reads cookies and returns, and its
+fetches only use parameters, builtins, cookies and sessionStorage keys written by an earlier
+operation. Navigations and sleeps are skipped (the bootstrap already loaded the page and its
+cookies); fetch responses, get_cookies output and Set-Cookie headers are kept in memory exactly
+where the browser would keep them.
+"""
+
+import json
+import re
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import create_cookie
+
+from bluebox.cdp.tab_pool import url_origin
+from bluebox.data_models.routine.endpoint import CREDENTIALS
+from bluebox.data_models.routine.execution import (
+    OperationExecutionMetadata,
+    RoutineExecutionResult,
+)
+from bluebox.data_models.routine.execution_options import RoutineExecutionOptions
+from bluebox.data_models.routine.operation import (
+    RoutineFetchOperation,
+    RoutineGetCookiesOperation,
+    RoutineNavigateOperation,
+    RoutineReturnOperation,
+    RoutineSleepOperation,
+)
+from bluebox.data_models.routine.parameter import BUILTIN_PARAMETERS
+from bluebox.data_models.routine.plan import OperationPlan, RoutinePlan
+from bluebox.data_models.routine.placeholder import extract_placeholder_contents
+from bluebox.data_models.routine.routine import Routine
+from bluebox.utils.data_utils import parse_string_result
+from bluebox.utils.exceptions import HttpFastPathError
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+# Responses that suggest the browser session matters after all (expired cookies, bot checks):
+# the run is abandoned so the caller can fall back to the browser
+DEFAULT_FALLBACK_STATUSES = frozenset({401, 403})
+
+# Connections kept per host by the pooled HTTP client
+DEFAULT_POOL_MAXSIZE = 32
+
+# sessionStorage key the bootstrap routine stores the browser's cookies under
+_BOOTSTRAP_COOKIES_KEY = "__bbBootstrapCookies"
+
+# Same patterns as the runtime library's placeholder helpers (js_utils)
+_SIMPLE_TOKEN_PATTERN = re.compile(r"\"?\{\{\s*(epoch_milliseconds|uuid)\s*\}\}\"?")
+_STORAGE_PLACEHOLDER_PATTERN = re.compile(
+    r"\"?\{\{\s*(sessionStorage|localStorage|cookie|meta|windowProperty)\s*:\s*([^}]+?)\s*\}\}\"?"
+)
+
+# Characters encodeURIComponent leaves alone
+_URI_COMPONENT_SAFE = "-_.!~*'()"
+
+_BUILTIN_GENERATORS = {builtin.name: builtin.value_generator for builtin in BUILTIN_PARAMETERS}
+
+
+@dataclass(frozen=True)
+class HttpEligibility:
+    """Result of check_http_eligibility()."""
+    eligible: bool
+    reason: str | None = None
+
+
+def check_http_eligibility(routine: Routine) -> HttpEligibility:
+    """
+    Whether a routine can run over plain HTTP (see module docstring).
+
+    Args:
+        routine: The routine.
+    Returns:
+        HttpEligibility with the first reason it cannot, if any.
+    """
+    written: set[str] = set()
+    has_fetch = False
+    for index, operation in enumerate(routine.operations, start=1):
+        if isinstance(operation, (RoutineNavigateOperation, RoutineSleepOperation)):
+            continue
+        if isinstance(operation, RoutineGetCookiesOperation):
+            written.add(operation.session_storage_key)
+            continue
+        if isinstance(operation, RoutineReturnOperation):
+            if operation.session_storage_key not in written:
+                return HttpEligibility(
+                    False, f"operation {index} returns '{operation.session_storage_key}', which no earlier operation writes"
+                )
+            continue
+        if not isinstance(operation, RoutineFetchOperation):
+            return HttpEligibility(False, f"operation {index} ({operation.type}) needs a browser")
+
+        has_fetch = True
+        for content in extract_placeholder_contents(json.dumps(operation.endpoint.model_dump(mode="json"))):
+            source, sep, path = content.split("||", 1)[0].partition(":")
+            if not sep:
+                continue  # user or builtin parameter
+            source = source.strip()
+            if source == "sessionStorage":
+                key = path.strip().split(".", 1)[0]
+                if key not in written:
+                    return HttpEligibility(
+                        False, f"operation {index} reads sessionStorage '{key}', which no earlier operation writes"
+                    )
+            elif source != "cookie":
+                return HttpEligibility(False, f"operation {index} reads {source}, which only the page has")
+        if operation.session_storage_key:
+            written.add(operation.session_storage_key)
+
+    if not has_fetch:
+        return HttpEligibility(False, "routine has no fetch operation")
+    return HttpEligibility(True)
+
+
+# Placeholder resolution (mirrors the runtime library's JS semantics) ______________________________________________________
+
+def _js_string(value: Any) -> str:
+    """String(value) as JavaScript would produce it for JSON-like values (objects as compact JSON)."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    if value is None:
+        return "null"
+    return str(value)
+
+
+def _ensure_parsed(value: Any) -> Any:
+    if isinstance(value, str) and value.strip().startswith("{") and value.strip().endswith("}"):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _read_storage(storage: dict[str, str], key_path: str) -> Any:
+    """Value at key.path in a storage dict (JSON values are traversed like readStorage in the page)."""
+    key, *rest = key_path.split(".")
+    raw = storage.get(key)
+    if raw is None:
+        return None
+    try:
+        value = _ensure_parsed(json.loads(raw))
+    except ValueError:
+        return None if rest else raw
+    for part in rest:
+        if value is None:
+            return None
+        value = _ensure_parsed(value)
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+        value = _ensure_parsed(value)
+    return value
+
+
+class _Resolver:
+    """Resolves storage/cookie/builtin placeholders of one request, recording resolved values."""
+
+    def __init__(self, storage: dict[str, str], cookie: Callable[[str], str | None]) -> None:
+        self.storage = storage
+        self.cookie = cookie  # name -> value or None
+        self.resolved_values: dict[str, str | None] = {}
+
+    def _resolve_one(self, kind: str, inner: str) -> Any:
+        lhs, _, fallback = inner.partition("||")
+        if kind == "sessionStorage":
+            value = _read_storage(self.storage, lhs.strip())
+        elif kind == "cookie":
+            value = self.cookie(lhs.strip())
+        else:
+            value = None  # page-only sources (rejected by check_http_eligibility)
+        if value in (None, "") and fallback:
+            fallback = fallback.strip()
+            value = _BUILTIN_GENERATORS["uuid"]() if fallback == "uuid" else fallback
+        return value
+
+    def resolve(self, text: Any) -> Any:
+        if not isinstance(text, str):
+            return text
+        text = _SIMPLE_TOKEN_PATTERN.sub(lambda m: _BUILTIN_GENERATORS[m.group(1)](), text)
+
+        def replace(match: re.Match) -> str:
+            kind, inner = match.group(1), match.group(2)
+            value = self._resolve_one(kind, inner)
+            self.resolved_values[f"{kind}:{inner}"] = None if value is None else _js_string(value)
+            if value is None:
+                return match.group(0)
+            quoted = match.group(0).startswith('"') and match.group(0).endswith('"') and len(match.group(0)) > 2
+            if quoted and isinstance(value, str):
+                return value
+            return _js_string(value)
+
+        return _STORAGE_PLACEHOLDER_PATTERN.sub(replace, text)
+
+    def deep_resolve(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.resolve(value)
+        if isinstance(value, list):
+            return [self.deep_resolve(item) for item in value]
+        if isinstance(value, dict):
+            return {self.resolve(k): self.deep_resolve(v) for k, v in value.items()}
+        return value
+
+
+def _encode_body(body: Any, headers: dict[str, str]) -> str:
+    """Request body as the runtime library would send it (form-encoded, raw JSON object text, or JSON)."""
+    content_type = (headers.get("content-type") or headers.get("Content-Type") or "").lower()
+    if "application/x-www-form-urlencoded" in content_type and isinstance(body, dict):
+        return "&".join(
+            f"{quote(str(k), safe=_URI_COMPONENT_SAFE)}="
+            f"{quote('' if v is None else _js_string(v), safe=_URI_COMPONENT_SAFE)}"
+            for k, v in body.items()
+        )
+    if isinstance(body, str) and body.strip().startswith("{") and body.strip().endswith("}"):
+        return body
+    return json.dumps(body, separators=(",", ":"))
+
+
+# Executor _________________________________________________________________________________________________________________
+
+class HttpFastPath:
+    """
+    Runs eligible routines (see check_http_eligibility) over a pooled requests.Session.
+
+    Cookies come from a one-time browser bootstrap per origin (navigate + get_cookies, see
+    bootstrap()) or seed_cookies(), and are then maintained by the session from Set-Cookie
+    headers. execute() raises HttpFastPathError when the HTTP run cannot stand in for the browser
+    (transport errors, responses in fallback_statuses); callers then run the routine in the
+    browser and call invalidate() so the next run bootstraps fresh cookies.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        fallback_statuses: frozenset[int] = DEFAULT_FALLBACK_STATUSES,
+        default_headers: dict[str, str] | None = None,
+    ) -> None:
+        """
+        Args:
+            session: Client to use (a new pooled session if None).
+            pool_maxsize: Connections kept per host (applied to a new session only).
+            fallback_statuses: Response statuses that abandon the run (HttpFastPathError).
+            default_headers: Headers sent with every request (e.g. the browser's User-Agent).
+        """
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        if default_headers:
+            session.headers.update(default_headers)
+        self.session = session
+        self.fallback_statuses = frozenset(fallback_statuses)
+        self._bootstrapped: set[str] = set()
+        self._lock = threading.Lock()
+
+    # Cookies ______________________________________________________________________________________________________________
+
+    def seed_cookies(self, cookies: list[dict]) -> None:
+        """Add cookies in CDP Network.getAllCookies format (RoutineGetCookiesOperation output) to the session."""
+        for cookie in cookies:
+            expires = cookie.get("expires")
+            self.session.cookies.set_cookie(create_cookie(
+                name=cookie["name"],
+                value=cookie.get("value", ""),
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+                secure=bool(cookie.get("secure")),
+                expires=int(expires) if isinstance(expires, (int, float)) and expires > 0 else None,
+                rest={"HttpOnly": None} if cookie.get("httpOnly") else {},
+            ))
+
+    def is_bootstrapped(self, origin: str | None) -> bool:
+        """Whether cookies were bootstrapped for an origin."""
+        with self._lock:
+            return origin in self._bootstrapped
+
+    def invalidate(self, origin: str | None) -> None:
+        """Forget an origin's bootstrap (its next run bootstraps again)."""
+        with self._lock:
+            self._bootstrapped.discard(origin)
+
+    @staticmethod
+    def _bootstrap_page(routine: Routine, parameters_dict: dict, plan: RoutinePlan) -> tuple[str | None, float]:
+        """(URL, load wait) of the page a bootstrap loads: the first navigate, else the first fetch's origin."""
+        for operation, operation_plan in zip(routine.operations, plan.operations):
+            if isinstance(operation, RoutineNavigateOperation):
+                return operation_plan.render("url", parameters_dict), operation.sleep_after_navigation_seconds
+        return routine.target_origin(plan, parameters_dict, None), 3.0
+
+    def ensure_bootstrapped(
+        self,
+        routine: Routine,
+        parameters_dict: dict | None = None,
+        plan: RoutinePlan | None = None,
+        remote_debugging_address: str = "http://127.0.0.1:9222",
+        timeout: float = 180.0,
+    ) -> str | None:
+        """
+        Bootstrap cookies for the routine's origin unless that was already done.
+
+        Returns:
+            The origin (pass it to invalidate() if the HTTP run has to fall back to the browser).
+        """
+        plan = plan if plan is not None else routine.compile()
+        url, _ = self._bootstrap_page(routine, parameters_dict or {}, plan)
+        origin = url_origin(url)
+        if not self.is_bootstrapped(origin):
+            self.bootstrap(routine, parameters_dict, plan, remote_debugging_address, timeout)
+        return origin
+
+    def bootstrap(
+        self,
+        routine: Routine,
+        parameters_dict: dict | None = None,
+        plan: RoutinePlan | None = None,
+        remote_debugging_address: str = "http://127.0.0.1:9222",
+        timeout: float = 180.0,
+    ) -> None:
+        """
+        Load the routine's first page in the browser once and seed the session with its cookies.
+
+        Args:
+            routine: The routine (its first navigate URL, or its target origin, is loaded).
+            parameters_dict: Parameters to render that URL with.
+            plan: Precompiled plan of the routine.
+            remote_debugging_address: Chrome debugging server address.
+            timeout: Bootstrap timeout in seconds.
+        Raises:
+            HttpFastPathError: If the browser run fails.
+        """
+        plan = plan if plan is not None else routine.compile()
+        url, wait_seconds = self._bootstrap_page(routine, parameters_dict or {}, plan)
+        if not url:
+            raise HttpFastPathError("Cannot bootstrap cookies: routine loads no URL")
+
+        bootstrap_routine = Routine(
+            name=f"{routine.name}_http_bootstrap",
+            description=f"Load {url} and collect its cookies",
+            incognito=routine.incognito,
+            operations=[
+                RoutineNavigateOperation(url=url, sleep_after_navigation_seconds=wait_seconds),
+                RoutineGetCookiesOperation(session_storage_key=_BOOTSTRAP_COOKIES_KEY),
+                RoutineReturnOperation(session_storage_key=_BOOTSTRAP_COOKIES_KEY),
+            ],
+        )
+        result = bootstrap_routine.execute(
+            options=RoutineExecutionOptions(remote_debugging_address=remote_debugging_address, timeout=timeout),
+        )
+        if not result.ok or not isinstance(result.data, list):
+            raise HttpFastPathError(f"Cookie bootstrap failed: {result.error or 'no cookies returned'}")
+        self.seed_cookies(result.data)
+        with self._lock:
+            self._bootstrapped.add(url_origin(url))
+        logger.info("Bootstrapped %d cookies from %s", len(result.data), url)
+
+    def _cookie_lookup(self, page_url: str | None) -> Callable[[str], str | None]:
+        """document.cookie-style lookup by name, preferring cookies scoped to the page's host."""
+        host = (url_origin(page_url) or "").split("://", 1)[-1].split(":", 1)[0]
+
+        def lookup(name: str) -> str | None:
+            fallback = None
+            for cookie in self.session.cookies:
+                if cookie.name != name:
+                    continue
+                domain = cookie.domain.lstrip(".")
+                if host and (host == domain or host.endswith("." + domain)):
+                    return cookie.value
+                fallback = fallback if fallback is not None else cookie.value
+            return fallback
+
+        return lookup
+
+    # Execution ____________________________________________________________________________________________________________
+
+    def execute(
+        self,
+        routine: Routine,
+        parameters_dict: dict | None = None,
+        plan: RoutinePlan | None = None,
+        timeout: float = 180.0,
+    ) -> RoutineExecutionResult:
+        """
+        Run an eligible routine over HTTP.
+
+        Args:
+            routine: The routine (must pass check_http_eligibility).
+            parameters_dict: Parameters for URL/header/body interpolation.
+            plan: Precompiled plan of the routine (compiled per call if None).
+            timeout: Per-request timeout in seconds.
+        Returns:
+            RoutineExecutionResult shaped like the browser's (operation metadata has
+            details["transport"] == "http"; skipped operations have details["skipped"]).
+        Raises:
+            HttpFastPathError: If the routine is not eligible or the HTTP run must be abandoned.
+        """
+        eligibility = check_http_eligibility(routine)
+        if not eligibility.eligible:
+            raise HttpFastPathError(f"Routine is not eligible for the HTTP fast path: {eligibility.reason}")
+        parameters_dict = parameters_dict or {}
+        plan = plan if plan is not None else routine.compile()
+
+        result = RoutineExecutionResult()
+        storage: dict[str, str] = {}
+        page_url: str | None = None
+        for operation, operation_plan in zip(routine.operations, plan.operations):
+            metadata = OperationExecutionMetadata(type=operation.type, duration_seconds=0.0, details={"transport": "http"})
+            start = time.perf_counter()
+            try:
+                if isinstance(operation, RoutineNavigateOperation):
+                    page_url = operation_plan.render("url", parameters_dict)
+                    metadata.details["skipped"] = "page state comes from the cookie bootstrap"
+                elif isinstance(operation, RoutineSleepOperation):
+                    metadata.details["skipped"] = "no page to wait for"
+                elif isinstance(operation, RoutineGetCookiesOperation):
+                    storage[operation.session_storage_key] = json.dumps(self._cookies_as_cdp(operation.domain_filter))
+                elif isinstance(operation, RoutineReturnOperation):
+                    value = storage.get(operation.session_storage_key)
+                    result.data = None if value is None else parse_string_result(value)
+                else:
+                    fetch_url = operation_plan.render("endpoint.url", parameters_dict)
+                    page_url = page_url or fetch_url  # the browser path navigates to the fetch's origin
+                    self._fetch(operation, operation_plan, parameters_dict, storage, page_url, timeout, metadata, result)
+            except HttpFastPathError:
+                raise
+            except Exception as e:
+                metadata.error = str(e)
+            finally:
+                metadata.duration_seconds = time.perf_counter() - start
+                result.operations_metadata.append(metadata)
+
+        # Same final parse as Routine.execute applies to string results
+        if isinstance(result.data, str):
+            result.data = parse_string_result(result.data)
+        return result
+
+    def _cookies_as_cdp(self, domain_filter: str) -> list[dict]:
+        """Session cookies in Network.getAllCookies format, filtered like RoutineGetCookiesOperation."""
+        cookies = [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "expires": cookie.expires if cookie.expires is not None else -1,
+                "httpOnly": cookie.has_nonstandard_attr("HttpOnly"),
+                "secure": cookie.secure,
+            }
+            for cookie in self.session.cookies
+        ]
+        if domain_filter != "*":
+            cookies = [cookie for cookie in cookies if domain_filter in cookie["domain"]]
+        return cookies
+
+    def _fetch(
+        self,
+        operation: RoutineFetchOperation,
+        operation_plan: OperationPlan,
+        parameters_dict: dict,
+        storage: dict[str, str],
+        page_url: str,
+        timeout: float,
+        metadata: OperationExecutionMetadata,
+        result: RoutineExecutionResult,
+    ) -> None:
+        """Send one fetch operation's request and store its response text like the page would."""
+        resolver = _Resolver(storage, self._cookie_lookup(page_url))
+        url = resolver.resolve(operation_plan.render("endpoint.url", parameters_dict))
+        headers = {
+            k: resolver.resolve(v) if isinstance(v, str) else _js_string(v)
+            for k, v in (operation_plan.render_json("endpoint.headers", parameters_dict) or {}).items()
+        }
+        body_text = operation_plan.render("endpoint.body", parameters_dict)
+        body = None
+        if body_text is not None and (body_value := json.loads(body_text)) is not None:
+            body = _encode_body(resolver.deep_resolve(body_value), headers)
+        method = str(operation.endpoint.method)
+        metadata.details["request"] = {"url": url, "method": method, "headers": headers, "body": body}
+
+        send_cookies = operation.endpoint.credentials == CREDENTIALS.INCLUDE or (
+            operation.endpoint.credentials == CREDENTIALS.SAME_ORIGIN and url_origin(url) == url_origin(page_url)
+        )
+        prepared = self.session.prepare_request(requests.Request(method, url, headers=headers, data=body))
+        if not send_cookies:
+            prepared.headers.pop("Cookie", None)
+        try:
+            response = self.session.send(prepared, timeout=timeout)
+        except requests.RequestException as e:
+            raise HttpFastPathError(f"HTTP request to {url} failed: {e}") from e
+
+        metadata.details["response"] = {
+            "status": response.status_code,
+            "statusText": response.reason,
+            "headers": dict(response.headers),
+        }
+        if response.status_code in self.fallback_statuses:
+            raise HttpFastPathError(f"{url} answered {response.status_code}; the browser session is needed")
+
+        if operation.session_storage_key:
+            storage[operation.session_storage_key] = response.text
+        if resolver.resolved_values:
+            result.placeholder_resolution.update(resolver.resolved_values)
+            for k, v in resolver.resolved_values.items():
+                if v is None:
+                    result.warnings.append(f"Could not resolve placeholder: {k}")
@@ -21,12 +21,15 @@ Contains:
 - RoutineJsEvaluateOperation: Execute custom JavaScript
 """
 
-import ast
 import json
+import os
 import re
 import time
+from contextlib import contextmanager
+from dataclasses import asdict
 from enum import StrEnum
-from typing import Annotated, ClassVar, Literal, Union
+from pathlib import Path
+from typing import IO, Annotated, ClassVar, Iterator, Literal, Union
 from urllib.parse import urlparse
 
 from pydantic import BaseModel, Field, field_validator
@@ -34,28 +37,39 @@ from pydantic import BaseModel, Field, field_validator
 from bluebox.data_models.routine.endpoint import Endpoint
 from bluebox.data_models.routine.execution import RoutineExecutionContext, FetchExecutionResult, OperationExecutionMetadata
 from bluebox.data_models.routine.parameter import VALID_PLACEHOLDER_PREFIXES, BUILTIN_PARAMETERS
-from bluebox.data_models.ui_elements import MouseButton, ScrollBehavior, HTMLScope
-from bluebox.utils.data_utils import apply_params, assert_balanced_js_delimiters
+from bluebox.data_models.routine.plan import OperationPlan
+from bluebox.data_models.routine.rate_limiter import BatchPacing
+from bluebox.data_models.ui_elements import MouseButton, ScrollBehavior, HTMLScope, TypingMode
+from bluebox.utils.cdp_transfer_utils import (
+    DEFAULT_COMPRESS_MIN_SIZE,
+    PageTransferReader,
+    StagedTransfer,
+    new_transfer_id,
+)
+from bluebox.utils.cdp_origin_utils import bootstrap_origin
+from bluebox.utils.cdp_wait_utils import wait_for_page_load, wait_for_url
+from bluebox.utils.data_utils import assert_balanced_js_delimiters, parse_string_result
 from bluebox.utils.logger import get_logger
 from bluebox.utils.js_utils import (
+    RUNTIME_MISSING_KEY,
     generate_fetch_js,
+    generate_fetch_batch_js,
     generate_click_js,
     generate_type_js,
     generate_scroll_element_js,
     generate_scroll_window_js,
-    generate_wait_for_url_js,
     generate_store_in_session_storage_js,
-    generate_get_session_storage_length_js,
-    generate_get_session_storage_chunk_js,
-    generate_get_download_chunk_js,
     generate_get_html_js,
+    generate_stage_transfer_js,
     generate_download_js,
     generate_js_evaluate_wrapper_js,
 )
-from bluebox.utils.web_socket_utils import send_cmd, recv_until
 
 logger = get_logger(name=__name__)
 
+# Fetches kept in flight at once by RoutineFetchOperation.execute_batch
+DEFAULT_BATCH_CONCURRENCY = 8
+
 
 # Enums ___________________________________________________________________________________________
 
@@ -83,6 +97,57 @@ class RoutineOperationTypes(StrEnum):
 
 # Base operation class ____________________________________________________________________________
 
+class _OperationRun:
+    """
+    Bookkeeping of one operation execution: its metadata, plan, timing and trace span.
+
+    Created when the operation starts (metadata created, trace started, clock started). The
+    operation's work runs inside `active()` blocks, possibly several of them (a concurrent fetch is
+    sent in one and applied in another); `finish()` records the duration and appends the metadata
+    to the routine result.
+    """
+
+    def __init__(
+        self,
+        operation: "RoutineOperation",
+        routine_execution_context: RoutineExecutionContext,
+        plan: OperationPlan | None,
+    ) -> None:
+        self.context = routine_execution_context
+        self.plan = plan if plan is not None else operation.compile_plan()
+        self.metadata = OperationExecutionMetadata(type=operation.type, duration_seconds=0.0)
+        if self.context.tracer is not None:
+            self.metadata.trace = self.context.tracer.start_operation()
+            self.context.tracer.activate(None)
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def active(self) -> Iterator[OperationExecutionMetadata]:
+        """
+        Make this operation the context's current one (metadata, plan, trace span) for the block.
+        An exception raised in the block is recorded as the operation's error instead of propagating.
+        """
+        context = self.context
+        context.current_operation_metadata = self.metadata
+        context.current_operation_plan = self.plan
+        if context.tracer is not None:
+            context.tracer.activate(self.metadata.trace)
+        try:
+            yield self.metadata
+        except Exception as e:
+            self.metadata.error = str(e)
+        finally:
+            context.current_operation_metadata = None
+            context.current_operation_plan = None
+            if context.tracer is not None:
+                context.tracer.activate(None)
+
+    def finish(self, end: float | None = None) -> None:
+        """Record the duration (until `end`, a perf_counter() value, or now) and append the metadata."""
+        self.metadata.duration_seconds = (end if end is not None else time.perf_counter()) - self.start
+        self.context.result.operations_metadata.append(self.metadata)
+
+
 class RoutineOperation(BaseModel):
     """
     Base class for routine operations.
@@ -95,7 +160,24 @@ class RoutineOperation(BaseModel):
     """
     type: RoutineOperationTypes
 
-    def execute(self, routine_execution_context: RoutineExecutionContext) -> None:
+    # Fields interpolated with parameters at execution time (dotted paths, compiled into an OperationPlan)
+    _TEMPLATE_FIELDS: ClassVar[tuple[str, ...]] = ()
+
+    def compile_plan(self) -> OperationPlan:
+        """Tokenize this operation's interpolated fields (see Routine.compile())."""
+        fields = {}
+        for path in self._TEMPLATE_FIELDS:
+            value = self
+            for attr in path.split("."):
+                value = getattr(value, attr)
+            fields[path] = value
+        return OperationPlan.from_fields(fields)
+
+    def execute(
+        self,
+        routine_execution_context: RoutineExecutionContext,
+        plan: OperationPlan | None = None,
+    ) -> None:
         """
         Execute this operation with automatic metadata collection.
 
@@ -106,24 +188,49 @@ class RoutineOperation(BaseModel):
 
         Args:
             routine_execution_context: Execution context containing parameters, CDP functions, and mutable state.
+            plan: Precompiled plan for this operation (from Routine.compile()); compiled on the fly if None.
         """
-        # Create metadata and set on context so _execute_operation can add details
-        routine_execution_context.current_operation_metadata = OperationExecutionMetadata(
-            type=self.type,
-            duration_seconds=0.0,
-        )
-        start = time.perf_counter()
-        try:
+        # Metadata is set on the context while running so _execute_operation can add details
+        run = _OperationRun(self, routine_execution_context, plan)
+        with run.active():
             self._execute_operation(routine_execution_context)
-        except Exception as e:
-            routine_execution_context.current_operation_metadata.error = str(e)
-        finally:
-            duration = time.perf_counter() - start
-            routine_execution_context.current_operation_metadata.duration_seconds = duration
-            routine_execution_context.result.operations_metadata.append(
-                routine_execution_context.current_operation_metadata
-            )
-            routine_execution_context.current_operation_metadata = None
+        run.finish()
+
+    def _render(self, routine_execution_context: RoutineExecutionContext, field: str) -> str | None:
+        """Render an interpolated field with the execution parameters."""
+        plan = routine_execution_context.current_operation_plan or self.compile_plan()
+        return plan.render(field, routine_execution_context.parameters_dict)
+
+    def _render_endpoint(
+        self,
+        routine_execution_context: RoutineExecutionContext,
+        parameters_dict: dict | None = None,
+    ) -> tuple[str, dict, str]:
+        """
+        Render endpoint.url/headers/body (operations with an `endpoint` field).
+
+        Args:
+            routine_execution_context: Execution context (plan, parameters, URL rewriting).
+            parameters_dict: Parameters to render with instead of the context's (batch fetches).
+
+        Returns:
+            (resolved URL, headers dict, body as a JS literal)
+        """
+        plan = routine_execution_context.current_operation_plan or self.compile_plan()
+        if parameters_dict is None:
+            parameters_dict = routine_execution_context.parameters_dict
+        url = routine_execution_context.resolve_url(plan.render("endpoint.url", parameters_dict))
+        headers = plan.render_json("endpoint.headers", parameters_dict) or {}
+
+        body_text = plan.render("endpoint.body", parameters_dict)
+        body = None if body_text is None else json.loads(body_text)
+        if body is None:
+            body_js_literal = "null"
+        elif isinstance(body, (dict, list)):
+            body_js_literal = body_text  # already JSON (validated by json.loads above)
+        else:
+            body_js_literal = json.dumps(str(body))
+        return url, headers, body_js_literal
 
     def _store_request_response_metadata(
         self,
@@ -136,13 +243,25 @@ class RoutineOperation(BaseModel):
                 routine_execution_context.current_operation_metadata.details["request"] = payload["request"]
             if payload.get("response"):
                 routine_execution_context.current_operation_metadata.details["response"] = payload["response"]
+        if routine_execution_context.tracer is not None:
+            routine_execution_context.tracer.record_page_fetch(payload.get("request"), payload.get("response"))
+
+    def _store_transfer_metadata(
+        self,
+        routine_execution_context: RoutineExecutionContext,
+        reader: PageTransferReader,
+    ) -> None:
+        """Store page -> Python transfer stats into operation metadata."""
+        if routine_execution_context.current_operation_metadata is not None:
+            routine_execution_context.current_operation_metadata.details["transfer"] = reader.stats.to_dict()
 
     def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
         """
         Implementation of operation execution.
 
         Subclasses must override this method to implement their specific behavior.
-        Operations modify routine_execution_context directly (e.g., routine_execution_context.result, routine_execution_context.current_url).
+        Operations modify routine_execution_context directly
+        (e.g., routine_execution_context.result, routine_execution_context.current_url).
         Errors should be raised as exceptions.
 
         Args:
@@ -169,19 +288,38 @@ class RoutineNavigateOperation(RoutineOperation):
     url: str
     sleep_after_navigation_seconds: float = Field(
         default=3.0,
-        description="Seconds to wait after navigation for page to load (allows JS to execute and populate storage)"
+        description=(
+            "Maximum seconds to wait after navigation for the page to load and its network to go idle "
+            "(allows JS to execute and populate storage)"
+        )
     )
 
+    _TEMPLATE_FIELDS: ClassVar[tuple[str, ...]] = ("url",)
+
     def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
         """Navigate to the specified URL."""
-        url = apply_params(self.url, routine_execution_context.parameters_dict)
-        routine_execution_context.send_cmd("Page.navigate", {"url": url}, session_id=routine_execution_context.session_id)
+        url = routine_execution_context.resolve_url(self._render(routine_execution_context, "url"))
+        navigate_id = routine_execution_context.send_cmd(
+            "Page.navigate", {"url": url}, session_id=routine_execution_context.session_id
+        )
         routine_execution_context.current_url = url
+        wait_seconds = routine_execution_context.navigation_wait(url, self.sleep_after_navigation_seconds)
+        if routine_execution_context.current_operation_metadata is not None:
+            routine_execution_context.current_operation_metadata.details["url"] = url
+            routine_execution_context.current_operation_metadata.details["wait_bound_seconds"] = wait_seconds
 
         # Wait for page to load (allows JS to execute and populate localStorage/sessionStorage)
-        if self.sleep_after_navigation_seconds > 0:
-            logger.info(f"Waiting {self.sleep_after_navigation_seconds}s after navigation to {url}")
-            time.sleep(self.sleep_after_navigation_seconds)
+        if wait_seconds > 0:
+            logger.info(f"Waiting up to {wait_seconds:.2f}s for {url} to load")
+            with routine_execution_context.trace_span("page_load", "wait", url=url):
+                page_load = wait_for_page_load(
+                    routine_execution_context.recv_until,
+                    routine_execution_context.session_id,
+                    navigate_id,
+                    timeout=wait_seconds,
+                )
+            if routine_execution_context.current_operation_metadata is not None:
+                routine_execution_context.current_operation_metadata.details["page_load"] = page_load.to_dict()
 
 
 class RoutineSleepOperation(RoutineOperation):
@@ -200,7 +338,7 @@ class RoutineSleepOperation(RoutineOperation):
 
     def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
         """Sleep for the specified duration."""
-        time.sleep(self.timeout_seconds)
+        routine_execution_context.sleep(self.timeout_seconds)
 
 
 class RoutineFetchOperation(RoutineOperation):
@@ -219,36 +357,12 @@ class RoutineFetchOperation(RoutineOperation):
     endpoint: Endpoint
     session_storage_key: str | None = None
 
-    def _execute_fetch(
-        self,
-        routine_execution_context: RoutineExecutionContext,
-    ) -> FetchExecutionResult:
-        """Execute the fetch request and return the result."""
-        parameters_dict = routine_execution_context.parameters_dict or {}
+    _TEMPLATE_FIELDS: ClassVar[tuple[str, ...]] = ("endpoint.url", "endpoint.headers", "endpoint.body")
 
+    def _send_fetch(self, routine_execution_context: RoutineExecutionContext) -> int:
+        """Send the Runtime.evaluate call for this fetch (without waiting); returns the message id."""
         # Apply parameters to endpoint
-        fetch_url = apply_params(self.endpoint.url, parameters_dict)
-        headers: dict = {}
-        if self.endpoint.headers:
-            headers_str = json.dumps(self.endpoint.headers)
-            headers_str_interpolated = apply_params(headers_str, parameters_dict)
-            headers = json.loads(headers_str_interpolated)
-
-        body = None
-        if self.endpoint.body:
-            body_str = json.dumps(self.endpoint.body)
-            body_str_interpolated = apply_params(body_str, parameters_dict)
-            body = json.loads(body_str_interpolated)
-
-        # Serialize body to JS string literal
-        if body is None:
-            body_js_literal = "null"
-        elif isinstance(body, (dict, list)):
-            body_js_literal = json.dumps(body)
-        elif isinstance(body, bytes):
-            body_js_literal = json.dumps(body.decode("utf-8", errors="ignore"))
-        else:
-            body_js_literal = json.dumps(str(body))
+        fetch_url, headers, body_js_literal = self._render_endpoint(routine_execution_context)
 
         # Build JS using the shared generator
         expr = generate_fetch_js(
@@ -260,14 +374,9 @@ class RoutineFetchOperation(RoutineOperation):
             session_storage_key=self.session_storage_key,
         )
 
-        # Execute the fetch
-        ws = routine_execution_context.ws
-        session_id = routine_execution_context.session_id
         timeout = routine_execution_context.timeout
-
         logger.info(f"Sending Runtime.evaluate for fetch with timeout={timeout}s")
-        eval_id = send_cmd(
-            ws,
+        return routine_execution_context.send_cmd(
             "Runtime.evaluate",
             {
                 "expression": expr,
@@ -275,16 +384,22 @@ class RoutineFetchOperation(RoutineOperation):
                 "returnByValue": True,
                 "timeout": int(timeout * 1000),
             },
-            session_id=session_id,
+            session_id=routine_execution_context.session_id,
         )
 
-        reply = recv_until(ws, lambda m: m.get("id") == eval_id, time.time() + timeout)
-
+    def _fetch_result_from_reply(
+        self,
+        routine_execution_context: RoutineExecutionContext,
+        reply: dict,
+    ) -> FetchExecutionResult:
+        """Turn the Runtime.evaluate reply of a fetch into a FetchExecutionResult."""
         if "error" in reply:
             logger.error(f"Error in _execute_fetch (CDP error): {reply['error']}")
             return FetchExecutionResult(ok=False, error=reply["error"])
 
         payload = reply["result"]["result"].get("value")
+        if isinstance(payload, dict) and payload.get(RUNTIME_MISSING_KEY):
+            return FetchExecutionResult(ok=False, error="Routine runtime library is not available in the page")
 
         # Store request/response metadata (returned from JS)
         if isinstance(payload, dict):
@@ -306,29 +421,62 @@ class RoutineFetchOperation(RoutineOperation):
             resolved_values=payload.get("resolvedValues", {}),
         )
 
-    def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
-        """Execute the fetch operation."""
+    @staticmethod
+    def _is_runtime_missing(reply: dict) -> bool:
+        """Whether a fetch reply reports that the runtime library is not installed in the document."""
+        payload = ((reply.get("result") or {}).get("result") or {}).get("value")
+        return isinstance(payload, dict) and bool(payload.get(RUNTIME_MISSING_KEY))
 
-        if routine_execution_context.ws is None:
-            raise RuntimeError("WebSocket not available in RoutineExecutionContext for fetch operation")
-
-        # If current page is blank, navigate to the target origin first to avoid CORS
-        if not routine_execution_context.current_url or routine_execution_context.current_url == "about:blank":
-            # Extract origin URL from the fetch endpoint (scheme + netloc)
-            fetch_url = apply_params(self.endpoint.url, routine_execution_context.parameters_dict)
-            parsed = urlparse(fetch_url)
-            origin_url = f"{parsed.scheme}://{parsed.netloc}"
-            logger.info(f"Current page is blank, navigating to {origin_url} before fetch")
-            routine_execution_context.send_cmd(
-                "Page.navigate",
-                {"url": origin_url},
-                session_id=routine_execution_context.session_id
-            )
-            routine_execution_context.current_url = origin_url
-            time.sleep(3)  # Wait for page to load
+    def _execute_fetch(
+        self,
+        routine_execution_context: RoutineExecutionContext,
+    ) -> FetchExecutionResult:
+        """Execute the fetch request and return the result."""
+        timeout = routine_execution_context.timeout
+        for attempt in range(2):
+            eval_id = self._send_fetch(routine_execution_context)
+            reply = routine_execution_context.recv_until(lambda m: m.get("id") == eval_id, time.time() + timeout)
+            if attempt or not self._is_runtime_missing(reply):
+                break
+            # document loaded before the runtime library was registered (or the page replaced it)
+            routine_execution_context.install_runtime()
+        return self._fetch_result_from_reply(routine_execution_context, reply)
 
-        fetch_result = self._execute_fetch(routine_execution_context)
+    def _ensure_origin(
+        self,
+        routine_execution_context: RoutineExecutionContext,
+        parameters_dict: dict | None = None,
+    ) -> None:
+        """If the current page is blank, load a document on the target origin first to avoid CORS."""
+        if routine_execution_context.current_url and routine_execution_context.current_url != "about:blank":
+            return
+        # Extract origin URL from the fetch endpoint (scheme + netloc)
+        if parameters_dict is None:
+            fetch_url = self._render(routine_execution_context, "endpoint.url")
+        else:
+            fetch_url = routine_execution_context.current_operation_plan.render("endpoint.url", parameters_dict)
+        parsed = urlparse(fetch_url)
+        origin_url = routine_execution_context.resolve_url(f"{parsed.scheme}://{parsed.netloc}")
+        strategy = routine_execution_context.origin_bootstrap
+        logger.info(f"Current page is blank, bootstrapping {origin_url} ({strategy}) before fetch")
+        with routine_execution_context.trace_span("origin_bootstrap", "wait", url=origin_url, strategy=strategy):
+            bootstrap = bootstrap_origin(
+                routine_execution_context.send_cmd,
+                routine_execution_context.recv_until,
+                routine_execution_context.session_id,
+                origin_url,
+                strategy=strategy,
+            )
+        routine_execution_context.current_url = bootstrap.url
+        if routine_execution_context.current_operation_metadata is not None:
+            routine_execution_context.current_operation_metadata.details["origin_bootstrap"] = bootstrap.to_dict()
 
+    @staticmethod
+    def _apply_fetch_result(
+        routine_execution_context: RoutineExecutionContext,
+        fetch_result: FetchExecutionResult,
+    ) -> None:
+        """Raise on fetch errors and collect resolved placeholder values into the routine result."""
         # Check for errors
         if not fetch_result.ok:
             raise RuntimeError(f"Fetch failed: {fetch_result.error}")
@@ -340,6 +488,170 @@ class RoutineFetchOperation(RoutineOperation):
                 if v is None:
                     routine_execution_context.result.warnings.append(f"Could not resolve placeholder: {k}")
 
+    def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
+        """Execute the fetch operation."""
+        self._ensure_origin(routine_execution_context)
+        self._apply_fetch_result(routine_execution_context, self._execute_fetch(routine_execution_context))
+
+    def execute_batch(
+        self,
+        routine_execution_context: RoutineExecutionContext,
+        parameter_sets: list[dict],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        plan: OperationPlan | None = None,
+        pacing: BatchPacing | None = None,
+    ) -> list[FetchExecutionResult]:
+        """
+        Run this fetch once per parameter set, all from a single evaluation in the current page.
+
+        The page runs the fetches with at most `concurrency` in flight (sharing the placeholder
+        resolution helpers) and stages the per-request results, which come back through the chunked
+        transfer path. Nothing is written to session storage. Operation metadata is recorded once,
+        with the batch size, failure count, final statuses and retried (throttled) statuses under details["batch"].
+
+        Args:
+            routine_execution_context: Execution context.
+            parameter_sets: Parameters for each fetch.
+            concurrency: Maximum fetches in flight at once.
+            plan: Precompiled plan for this operation; compiled on the fly if None.
+            pacing: Request spacing and throttle retries applied in page; none if None.
+
+        Returns:
+            One FetchExecutionResult per parameter set, in order (failed sets carry their error).
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        run = _OperationRun(self, routine_execution_context, plan)
+        results: list[FetchExecutionResult] | None = None
+        with run.active():
+            results = self._run_batch(routine_execution_context, parameter_sets, concurrency, pacing)
+        run.finish()
+        if results is None:
+            # the batch failed as a whole
+            return [FetchExecutionResult(ok=False, error=f"Fetch failed: {run.metadata.error}") for _ in parameter_sets]
+        return results
+
+    def _run_batch(
+        self,
+        routine_execution_context: RoutineExecutionContext,
+        parameter_sets: list[dict],
+        concurrency: int,
+        pacing: BatchPacing | None,
+    ) -> list[FetchExecutionResult]:
+        """Evaluate the batch in page and collect its results (the body of execute_batch)."""
+        if not parameter_sets:
+            return []
+        self._ensure_origin(routine_execution_context, parameter_sets[0])
+        batch_js = generate_fetch_batch_js(
+            requests=[self._render_endpoint(routine_execution_context, params) for params in parameter_sets],
+            endpoint_method=self.endpoint.method,
+            endpoint_credentials=self.endpoint.credentials,
+            transfer_id=new_transfer_id(),
+            concurrency=concurrency,
+            compress=routine_execution_context.compress_transfers,
+            compress_min_chars=DEFAULT_COMPRESS_MIN_SIZE,
+            **(asdict(pacing) if pacing is not None else {}),
+        )
+
+        reader = routine_execution_context.transfer_reader()
+        timeout_ms = int(routine_execution_context.timeout * 1000)
+        staged = reader.stage(batch_js, timeout_ms=timeout_ms)
+        if staged.payload.get(RUNTIME_MISSING_KEY):
+            # document loaded before the runtime library was registered (or the page replaced it)
+            routine_execution_context.install_runtime()
+            staged = reader.stage(batch_js, timeout_ms=timeout_ms)
+        if staged.payload.get(RUNTIME_MISSING_KEY):
+            raise RuntimeError("Routine runtime library is not available in the page")
+
+        items = json.loads(reader.read_text(staged))
+        self._store_transfer_metadata(routine_execution_context, reader)
+        routine_execution_context.current_operation_metadata.details["batch"] = {
+            "size": len(parameter_sets),
+            "concurrency": concurrency,
+            "failed": staged.payload.get("failed", 0),
+            "statuses": staged.payload.get("statuses", []),
+            "throttled": staged.payload.get("throttled", []),
+            "retry_after_seconds": staged.payload.get("retryAfterMs", 0) / 1000,
+        }
+        return [
+            FetchExecutionResult(
+                ok=not item.get("error"),
+                result=item.get("value"),
+                error=item.get("error"),
+                resolved_values=item.get("resolvedValues") or {},
+            )
+            for item in items
+        ]
+
+    @classmethod
+    def execute_concurrently(
+        cls,
+        routine_execution_context: RoutineExecutionContext,
+        operations: list[tuple["RoutineFetchOperation", OperationPlan | None]],
+    ) -> None:
+        """
+        Execute independent fetch operations with all their evaluations in flight at once.
+
+        The page runs the fetches concurrently; replies are then applied in list order, so results,
+        warnings and operation metadata come out exactly as if the operations had run one by one.
+        Callers must ensure the operations do not depend on each other (see routine.schedule).
+
+        Args:
+            routine_execution_context: Execution context.
+            operations: (operation, precompiled plan or None) pairs, in routine order.
+        """
+        operations = list(operations)
+        if not operations:
+            return
+        if len(operations) == 1 or routine_execution_context.current_url in ("", "about:blank"):
+            # the first fetch navigates to its origin; the others must wait for that page
+            operation, plan = operations.pop(0)
+            operation.execute(routine_execution_context, plan=plan)
+        if not operations:
+            return
+
+        # Send every evaluation first
+        sent: list[tuple[RoutineFetchOperation, _OperationRun, int]] = []
+        for operation, plan in operations:
+            run = _OperationRun(operation, routine_execution_context, plan)
+            eval_id = -1
+            with run.active():
+                eval_id = operation._send_fetch(routine_execution_context)
+            sent.append((operation, run, eval_id))
+
+        # Collect replies as they arrive
+        replies: dict[int, dict] = {}
+        finished: dict[int, float] = {}
+        waiting = {eval_id for _, _, eval_id in sent if eval_id != -1}
+        deadline = time.time() + routine_execution_context.timeout
+        try:
+            while waiting:
+                reply = routine_execution_context.recv_until(lambda m: m.get("id") in waiting, deadline)
+                waiting.discard(reply["id"])
+                replies[reply["id"]] = reply
+                finished[reply["id"]] = time.perf_counter()
+        except TimeoutError as e:
+            for eval_id in waiting:
+                replies[eval_id] = {"id": eval_id, "error": f"Timed out waiting for fetch: {e}"}
+
+        # Apply in routine order
+        runtime_installed = False
+        for operation, run, eval_id in sent:
+            with run.active() as metadata:
+                if metadata.error is None:
+                    reply = replies[eval_id]
+                    if cls._is_runtime_missing(reply):
+                        # document predates the runtime library: install it once and retry this fetch alone
+                        if not runtime_installed:
+                            routine_execution_context.install_runtime()
+                            runtime_installed = True
+                        fetch_result = operation._execute_fetch(routine_execution_context)
+                        finished[eval_id] = time.perf_counter()
+                    else:
+                        fetch_result = operation._fetch_result_from_reply(routine_execution_context, reply)
+                    cls._apply_fetch_result(routine_execution_context, fetch_result)
+            run.finish(finished.get(eval_id))
+
 
 class RoutineReturnOperation(RoutineOperation):
     """
@@ -357,62 +669,23 @@ class RoutineReturnOperation(RoutineOperation):
 
     def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
         """Get result from session storage and set it as the routine result."""
-
-        chunk_size = 256 * 1024  # 256KB chunks
-
-        # First get the length
-        len_js = generate_get_session_storage_length_js(self.session_storage_key)
-        eval_id = routine_execution_context.send_cmd(
-            "Runtime.evaluate",
-            {"expression": len_js, "returnByValue": True},
-            session_id=routine_execution_context.session_id,
-        )
-        reply = routine_execution_context.recv_until(
-            lambda m: m.get("id") == eval_id, time.time() + routine_execution_context.timeout
-        )
-        if "error" in reply:
-            raise RuntimeError(f"Failed to get storage length: {reply['error']}")
-
-        total_len = reply["result"]["result"].get("value", 0)
-
-        if total_len == 0:
+        reader = routine_execution_context.transfer_reader()
+        staged = reader.stage(generate_stage_transfer_js(
+            f"window.sessionStorage.getItem({json.dumps(self.session_storage_key)})",
+            new_transfer_id(),
+            compress=routine_execution_context.compress_transfers,
+            compress_min_chars=DEFAULT_COMPRESS_MIN_SIZE,
+        ))
+
+        if staged.length == 0:
+            reader.release(staged)
             routine_execution_context.result.data = None
         else:
-            stored_value = ""
-            for offset in range(0, total_len, chunk_size):
-                end = min(offset + chunk_size, total_len)
-                chunk_js = generate_get_session_storage_chunk_js(
-                    self.session_storage_key,
-                    offset,
-                    end,
-                )
-                eval_id = routine_execution_context.send_cmd(
-                    "Runtime.evaluate",
-                    {"expression": chunk_js, "returnByValue": True},
-                    session_id=routine_execution_context.session_id,
-                )
-                reply = routine_execution_context.recv_until(
-                    lambda m: m.get("id") == eval_id, time.time() + routine_execution_context.timeout
-                )
-                if "error" in reply:
-                    raise RuntimeError(f"Failed to retrieve chunk at offset {offset}: {reply['error']}")
-
-                chunk = reply["result"]["result"].get("value", "")
-                stored_value += chunk
-                time.sleep(0.01)
+            stored_value = reader.read_text(staged)
+            self._store_transfer_metadata(routine_execution_context, reader)
 
             # Try to parse as JSON
-            try:
-                routine_execution_context.result.data = json.loads(stored_value)
-            except Exception:
-                try:
-                    result_literal = ast.literal_eval(stored_value)
-                    if isinstance(result_literal, (dict, list)):
-                        routine_execution_context.result.data = result_literal
-                    else:
-                        routine_execution_context.result.data = stored_value
-                except Exception:
-                    routine_execution_context.result.data = stored_value
+            routine_execution_context.result.data = parse_string_result(stored_value)
 
 
 class RoutineGetCookiesOperation(RoutineOperation):
@@ -498,6 +771,16 @@ class RoutineGetCookiesOperation(RoutineOperation):
 
 # UI automation operations ________________________________________________________________________
 
+def _await_replies(routine_execution_context: RoutineExecutionContext, message_ids: list[int], deadline: float) -> None:
+    """Wait for the replies to pipelined CDP commands (in any order); raise on the first error."""
+    pending = set(message_ids)
+    while pending:
+        reply = routine_execution_context.recv_until(lambda m: m.get("id") in pending, deadline)
+        pending.discard(reply["id"])
+        if "error" in reply:
+            raise RuntimeError(f"Input command failed: {reply['error']}")
+
+
 class RoutineClickOperation(RoutineOperation):
     """
     Click operation for routine - clicks on an element by CSS selector.
@@ -520,9 +803,11 @@ class RoutineClickOperation(RoutineOperation):
     timeout_ms: int = 20_000
     ensure_visible: bool = True
 
+    _TEMPLATE_FIELDS: ClassVar[tuple[str, ...]] = ("selector",)
+
     def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
         """Click on an element by CSS selector."""
-        selector = apply_params(self.selector, routine_execution_context.parameters_dict)
+        selector = self._render(routine_execution_context, "selector")
         click_js = generate_click_js(selector, self.ensure_visible)
 
         eval_id = routine_execution_context.send_cmd(
@@ -558,37 +843,25 @@ class RoutineClickOperation(RoutineOperation):
         if routine_execution_context.current_operation_metadata is not None:
             routine_execution_context.current_operation_metadata.details["click_coordinates"] = {"x": x, "y": y}
 
-        # Perform the click(s) using CDP Input domain
+        # Perform the click(s) using CDP Input domain; each event is acknowledged once the page handled it
         for _ in range(self.click_count):
-            # Mouse pressed
-            routine_execution_context.send_cmd(
-                "Input.dispatchMouseEvent",
-                {
-                    "type": "mousePressed",
-                    "x": x,
-                    "y": y,
-                    "button": self.button,
-                    "clickCount": 1,
-                },
-                session_id=routine_execution_context.session_id,
-            )
-            time.sleep(0.05)
-
-            # Mouse released
-            routine_execution_context.send_cmd(
-                "Input.dispatchMouseEvent",
-                {
-                    "type": "mouseReleased",
-                    "x": x,
-                    "y": y,
-                    "button": self.button,
-                    "clickCount": 1,
-                },
-                session_id=routine_execution_context.session_id,
-            )
-
-            if self.click_count > 1:
-                time.sleep(0.1)
+            for event_type in ("mousePressed", "mouseReleased"):
+                event_id = routine_execution_context.send_cmd(
+                    "Input.dispatchMouseEvent",
+                    {
+                        "type": event_type,
+                        "x": x,
+                        "y": y,
+                        "button": self.button,
+                        "clickCount": 1,
+                    },
+                    session_id=routine_execution_context.session_id,
+                )
+                event_reply = routine_execution_context.recv_until(
+                    lambda m, event_id=event_id: m.get("id") == event_id, time.time() + (self.timeout_ms / 1000)
+                )
+                if "error" in event_reply:
+                    raise RuntimeError(f"Failed to dispatch {event_type}: {event_reply['error']}")
 
 
 class RoutineTypeOperation(RoutineOperation):
@@ -604,17 +877,26 @@ class RoutineTypeOperation(RoutineOperation):
         text (str): Text to type into the element.
         clear (bool): Whether to clear existing text before typing. Defaults to False.
         timeout_ms (int): Maximum time to wait for element in milliseconds. Defaults to 20_000.
+        typing_mode (TypingMode): Key events for every character, or opt-in Input.insertText (INSERT)
+            or both (INSERT_THEN_KEY: key events for the last character only) for plain inputs that
+            do not need per-key events. Defaults to KEYS.
+        key_delay_ms (int): Pause between characters typed with key events (0 sends them all at once).
+            Defaults to 20.
     """
     type: Literal[RoutineOperationTypes.INPUT_TEXT] = RoutineOperationTypes.INPUT_TEXT
     selector: str
     text: str
     clear: bool = False
     timeout_ms: int = 20_000
+    typing_mode: TypingMode = TypingMode.KEYS
+    key_delay_ms: int = Field(default=20, ge=0)
+
+    _TEMPLATE_FIELDS: ClassVar[tuple[str, ...]] = ("selector", "text")
 
     def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
         """Type text into an input element."""
-        selector = apply_params(self.selector, routine_execution_context.parameters_dict)
-        text = apply_params(self.text, routine_execution_context.parameters_dict)
+        selector = self._render(routine_execution_context, "selector")
+        text = self._render(routine_execution_context, "text")
         type_js = generate_type_js(selector, self.clear)
 
         eval_id = routine_execution_context.send_cmd(
@@ -644,19 +926,34 @@ class RoutineTypeOperation(RoutineOperation):
         if "error" in type_data:
             raise RuntimeError(type_data["error"])
 
-        # Type the text character by character using CDP Input domain
-        for char in text:
-            routine_execution_context.send_cmd(
-                "Input.dispatchKeyEvent",
-                {"type": "keyDown", "text": char},
-                session_id=routine_execution_context.session_id,
-            )
-            routine_execution_context.send_cmd(
-                "Input.dispatchKeyEvent",
-                {"type": "keyUp", "text": char},
+        if self.typing_mode == TypingMode.KEYS:
+            inserted, keyed = "", text
+        elif self.typing_mode == TypingMode.INSERT_THEN_KEY:
+            inserted, keyed = text[:-1], text[-1:]
+        else:
+            inserted, keyed = text, ""
+
+        # Send every input command without waiting, then collect the acknowledgements
+        sent: list[int] = []
+        if inserted:
+            sent.append(routine_execution_context.send_cmd(
+                "Input.insertText",
+                {"text": inserted},
                 session_id=routine_execution_context.session_id,
-            )
-            time.sleep(0.02)
+            ))
+        for i, char in enumerate(keyed):
+            if i and self.key_delay_ms:
+                routine_execution_context.sleep(self.key_delay_ms / 1000)
+            for event_type in ("keyDown", "keyUp"):
+                sent.append(routine_execution_context.send_cmd(
+                    "Input.dispatchKeyEvent",
+                    {"type": event_type, "text": char},
+                    session_id=routine_execution_context.session_id,
+                ))
+        _await_replies(routine_execution_context, sent, time.time() + (self.timeout_ms / 1000))
+
+        if routine_execution_context.current_operation_metadata is not None:
+            routine_execution_context.current_operation_metadata.details["input_commands"] = len(sent)
 
 
 class RoutinePressOperation(RoutineOperation):
@@ -699,17 +996,14 @@ class RoutinePressOperation(RoutineOperation):
 
         cdp_key = key_mapping.get(key, key)
 
-        routine_execution_context.send_cmd(
-            "Input.dispatchKeyEvent",
-            {"type": "keyDown", "key": cdp_key},
-            session_id=routine_execution_context.session_id,
-        )
-        time.sleep(0.0525)
-        routine_execution_context.send_cmd(
-            "Input.dispatchKeyEvent",
-            {"type": "keyUp", "key": cdp_key},
-            session_id=routine_execution_context.session_id,
-        )
+        # keyUp follows once the page has handled keyDown
+        for event_type in ("keyDown", "keyUp"):
+            event_id = routine_execution_context.send_cmd(
+                "Input.dispatchKeyEvent",
+                {"type": event_type, "key": cdp_key},
+                session_id=routine_execution_context.session_id,
+            )
+            _await_replies(routine_execution_context, [event_id], time.time() + routine_execution_context.timeout)
 
 
 class RoutineWaitForUrlOperation(RoutineOperation):
@@ -717,47 +1011,48 @@ class RoutineWaitForUrlOperation(RoutineOperation):
     Wait for URL operation for routine - waits for the current URL to match a regex pattern.
     Args:
         type (Literal[RoutineOperationTypes.WAIT_FOR_URL]): The type of operation.
-        url_regex (str): Regex pattern to match against window.location.href.
+        url_regex (str): Regex pattern searched for (re.search) in the page URL. Python `re` syntax,
+            checked when the routine is loaded: JavaScript-only syntax such as `(?<name>...)`,
+            `\\u{...}` or `[^]` is rejected (use `(?P<name>...)`, `\\U0001F600`, `[\\s\\S]`).
         timeout_ms (int): Maximum time to wait in milliseconds. Defaults to 20_000.
     """
     type: Literal[RoutineOperationTypes.WAIT_FOR_URL] = RoutineOperationTypes.WAIT_FOR_URL
     url_regex: str
     timeout_ms: int = 20_000
 
+    @field_validator("url_regex")
+    @classmethod
+    def validate_url_regex(cls, v: str) -> str:
+        """Validate that url_regex compiles as a Python regex."""
+        try:
+            re.compile(v)
+        except re.error as e:
+            raise ValueError(
+                f"Invalid url_regex '{v}': {e} (patterns use Python re syntax, not JavaScript RegExp)"
+            ) from e
+        return v
+
     def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
-        """Wait for URL to match a regex pattern."""
-        timeout_sec = self.timeout_ms / 1000
-        start_time = time.time()
-        wait_js = generate_wait_for_url_js(self.url_regex)
-
-        matched = False
-        wait_data = {}
-        while time.time() - start_time < timeout_sec:
-            eval_id = routine_execution_context.send_cmd(
-                "Runtime.evaluate",
-                {"expression": wait_js, "returnByValue": True},
-                session_id=routine_execution_context.session_id,
+        """Wait for URL to match a regex pattern (one check of the current URL, then navigation events)."""
+        pattern = re.compile(self.url_regex)
+
+        with routine_execution_context.trace_span("wait_for_url", "wait", url_regex=self.url_regex):
+            url_wait = wait_for_url(
+                routine_execution_context.send_cmd,
+                routine_execution_context.recv_until,
+                routine_execution_context.session_id,
+                pattern,
+                timeout=self.timeout_ms / 1000,
             )
-            reply = routine_execution_context.recv_until(
-                lambda m: m.get("id") == eval_id, time.time() + 5
-            )
-
-            if "error" in reply:
-                raise RuntimeError(f"Failed to evaluate wait for URL script: {reply['error']}")
-
-            wait_data = reply["result"]["result"].get("value", {})
-
-            if wait_data.get("matches"):
-                matched = True
-                break
-
-            time.sleep(0.2)
+        if routine_execution_context.current_operation_metadata is not None:
+            routine_execution_context.current_operation_metadata.details["url_wait"] = url_wait.to_dict()
 
-        if not matched:
+        if not url_wait.matched:
             raise RuntimeError(
                 f"Timeout waiting for URL to match pattern '{self.url_regex}'. "
-                f"Current URL: {wait_data.get('currentUrl', 'unknown')}"
+                f"Current URL: {url_wait.url or 'unknown'}"
             )
+        routine_execution_context.current_url = url_wait.url
 
 
 class RoutineScrollOperation(RoutineOperation):
@@ -783,10 +1078,12 @@ class RoutineScrollOperation(RoutineOperation):
     behavior: ScrollBehavior = ScrollBehavior.AUTO
     timeout_ms: int = 20_000
 
+    _TEMPLATE_FIELDS: ClassVar[tuple[str, ...]] = ("selector",)
+
     def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
         """Scroll the page or a specific element."""
         if self.selector:
-            selector = apply_params(self.selector, routine_execution_context.parameters_dict)
+            selector = self._render(routine_execution_context, "selector")
             scroll_js = generate_scroll_element_js(
                 selector,
                 self.delta_x or 0,
@@ -802,11 +1099,13 @@ class RoutineScrollOperation(RoutineOperation):
                 self.behavior,
             )
 
+        # the script resolves once the scroll has settled (immediately for "auto" behavior)
         eval_id = routine_execution_context.send_cmd(
             "Runtime.evaluate",
             {
                 "expression": scroll_js,
                 "returnByValue": True,
+                "awaitPromise": True,
                 "timeout": self.timeout_ms,
             },
             session_id=routine_execution_context.session_id,
@@ -823,8 +1122,6 @@ class RoutineScrollOperation(RoutineOperation):
         if "error" in scroll_data:
             raise RuntimeError(scroll_data["error"])
 
-        time.sleep(0.1)
-
 
 class RoutineReturnHTMLOperation(RoutineOperation):
     """
@@ -841,31 +1138,34 @@ class RoutineReturnHTMLOperation(RoutineOperation):
     selector: str | None = None
     timeout_ms: int = 20_000
 
+    _TEMPLATE_FIELDS: ClassVar[tuple[str, ...]] = ("selector",)
+
     def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
         """Get HTML from the page or a specific element."""
         if self.scope == HTMLScope.PAGE or not self.selector:
             js = generate_get_html_js()
         else:
-            selector = apply_params(self.selector, routine_execution_context.parameters_dict)
+            selector = self._render(routine_execution_context, "selector")
             js = generate_get_html_js(selector)
 
-        eval_id = routine_execution_context.send_cmd(
-            "Runtime.evaluate",
-            {
-                "expression": js,
-                "returnByValue": True,
-                "timeout": self.timeout_ms,
-            },
-            session_id=routine_execution_context.session_id,
-        )
-        reply = routine_execution_context.recv_until(
-            lambda m: m.get("id") == eval_id, time.time() + routine_execution_context.timeout
-        )
-
-        if "error" in reply:
+        reader = routine_execution_context.transfer_reader()
+        try:
+            staged = reader.stage(
+                generate_stage_transfer_js(
+                    js,
+                    new_transfer_id(),
+                    compress=routine_execution_context.compress_transfers,
+                    compress_min_chars=DEFAULT_COMPRESS_MIN_SIZE,
+                ),
+                timeout_ms=self.timeout_ms,
+            )
+        except RuntimeError as e:
+            logger.warning("Failed to get HTML: %s", e)
             routine_execution_context.result.data = None
-        else:
-            routine_execution_context.result.data = reply["result"]["result"].get("value", "")
+            return
+
+        routine_execution_context.result.data = reader.read_text(staged)
+        self._store_transfer_metadata(routine_execution_context, reader)
 
 
 class RoutineDownloadOperation(RoutineOperation):
@@ -876,6 +1176,9 @@ class RoutineDownloadOperation(RoutineOperation):
     converts it to base64, and directly sets it as the routine's result. This is
     typically the last operation in a routine.
 
+    When the execution context has a download_target, the file is streamed there
+    chunk by chunk instead, and the result carries file_path and size_bytes (data is None).
+
     Args:
         type (Literal[RoutineOperationTypes.DOWNLOAD]): The type of operation.
         endpoint (Endpoint): The endpoint to download from.
@@ -888,34 +1191,17 @@ class RoutineDownloadOperation(RoutineOperation):
         description="Filename for the downloaded file (e.g., 'report.pdf', 'image.png')"
     )
 
+    _TEMPLATE_FIELDS: ClassVar[tuple[str, ...]] = ("endpoint.url", "endpoint.headers", "endpoint.body", "filename")
+
     def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
         """Download a file and return it as base64."""
         # Apply parameters to endpoint
-        download_url = apply_params(self.endpoint.url, routine_execution_context.parameters_dict)
-        download_headers = {}
-        if self.endpoint.headers:
-            headers_str = json.dumps(self.endpoint.headers)
-            headers_str_interpolated = apply_params(headers_str, routine_execution_context.parameters_dict)
-            download_headers = json.loads(headers_str_interpolated)
-
-        download_body = None
-        if self.endpoint.body:
-            body_str = json.dumps(self.endpoint.body)
-            body_str_interpolated = apply_params(body_str, routine_execution_context.parameters_dict)
-            download_body = json.loads(body_str_interpolated)
-
-        # Serialize body for JS
-        if download_body is None:
-            body_js_literal = "null"
-        elif isinstance(download_body, (dict, list)):
-            body_js_literal = json.dumps(download_body)
-        else:
-            body_js_literal = json.dumps(str(download_body))
+        download_url, download_headers, body_js_literal = self._render_endpoint(routine_execution_context)
 
         # Interpolate filename
-        download_filename = apply_params(self.filename, routine_execution_context.parameters_dict)
+        download_filename = self._render(routine_execution_context, "filename")
 
-        # Generate JS to fetch as binary and convert to base64
+        # Generate JS to fetch as binary and stage it (base64, optionally gzipped) for chunked retrieval
         download_js = generate_download_js(
             download_url=download_url,
             headers=download_headers,
@@ -923,72 +1209,92 @@ class RoutineDownloadOperation(RoutineOperation):
             endpoint_method=self.endpoint.method.value,
             endpoint_credentials=self.endpoint.credentials.value,
             filename=download_filename,
+            transfer_id=new_transfer_id(),
+            compress=routine_execution_context.compress_transfers,
+            compress_min_bytes=DEFAULT_COMPRESS_MIN_SIZE,
         )
 
-        eval_id = routine_execution_context.send_cmd(
-            "Runtime.evaluate",
-            {
-                "expression": download_js,
-                "awaitPromise": True,
-                "returnByValue": True,
-                "timeout": int(routine_execution_context.timeout * 1000),
-            },
-            session_id=routine_execution_context.session_id,
-        )
-
-        reply = routine_execution_context.recv_until(
-            lambda m: m.get("id") == eval_id, time.time() + routine_execution_context.timeout
-        )
-
-        if "error" in reply:
-            raise RuntimeError(f"Download failed (CDP error): {reply['error']}")
-
-        payload = reply["result"]["result"].get("value", {})
+        reader = routine_execution_context.transfer_reader()
+        try:
+            staged = reader.stage(download_js, timeout_ms=int(routine_execution_context.timeout * 1000))
+            if staged.payload.get(RUNTIME_MISSING_KEY):
+                # document loaded before the runtime library was registered (or the page replaced it)
+                routine_execution_context.install_runtime()
+                staged = reader.stage(download_js, timeout_ms=int(routine_execution_context.timeout * 1000))
+        except RuntimeError as e:
+            raise RuntimeError(f"Download failed (CDP error): {e}") from e
+        payload = staged.payload
+        if payload.get(RUNTIME_MISSING_KEY):
+            raise RuntimeError("Download failed: routine runtime library is not available in the page")
 
         # Store request/response metadata (returned from JS)
-        if isinstance(payload, dict):
-            self._store_request_response_metadata(routine_execution_context, payload)
+        self._store_request_response_metadata(routine_execution_context, payload)
 
-        if isinstance(payload, dict) and payload.get("__err"):
+        if payload.get("__err"):
             raise RuntimeError(f"Download failed: {payload.get('__err')}")
 
         # Get metadata from initial response
         result_content_type = payload.get("contentType")
         result_filename = payload.get("filename")
-        base64_length = payload.get("base64Length", 0)
-
-        # Retrieve base64 data in chunks from window.__downloadData
-        chunk_size = 256 * 1024  # 256KB chunks
 
-        if base64_length == 0:
+        if routine_execution_context.download_target is not None:
+            file_path, size = self._stream_to_target(
+                reader, staged, routine_execution_context.download_target, result_filename or download_filename
+            )
+            self._store_transfer_metadata(routine_execution_context, reader)
+            routine_execution_context.result.data = None
+            routine_execution_context.result.is_base64 = False
+            routine_execution_context.result.file_path = file_path
+            routine_execution_context.result.size_bytes = size
+            routine_execution_context.result.content_type = result_content_type
+            routine_execution_context.result.filename = result_filename
+            return
+
+        if payload.get("size", 0) == 0:
+            reader.release(staged)
             routine_execution_context.result.data = None
         else:
-            chunks = []
-            for offset in range(0, base64_length, chunk_size):
-                end = min(offset + chunk_size, base64_length)
-                chunk_js = generate_get_download_chunk_js(offset, end)
-
-                chunk_eval_id = routine_execution_context.send_cmd(
-                    "Runtime.evaluate",
-                    {"expression": chunk_js, "returnByValue": True},
-                    session_id=routine_execution_context.session_id,
-                )
-                chunk_reply = routine_execution_context.recv_until(
-                    lambda m: m.get("id") == chunk_eval_id, time.time() + routine_execution_context.timeout
-                )
-
-                if "error" in chunk_reply:
-                    raise RuntimeError(f"Failed to retrieve chunk at offset {offset}: {chunk_reply['error']}")
-
-                chunk_data = chunk_reply["result"]["result"].get("value", "")
-                chunks.append(chunk_data)
-
-            routine_execution_context.result.data = "".join(chunks)
+            routine_execution_context.result.data = reader.read_base64(staged)
+            self._store_transfer_metadata(routine_execution_context, reader)
 
         routine_execution_context.result.is_base64 = True
         routine_execution_context.result.content_type = result_content_type
         routine_execution_context.result.filename = result_filename
 
+    @staticmethod
+    def _stream_to_target(
+        reader: PageTransferReader,
+        staged: StagedTransfer,
+        target: str | Path | IO[bytes],
+        filename: str,
+    ) -> tuple[str | None, int]:
+        """
+        Stream the staged download into a directory or file object.
+
+        Files are written to `<name>.part` and renamed when complete, so a failed
+        download never leaves a truncated file under the final name.
+
+        Returns:
+            (file path or None for anonymous file objects, bytes written)
+        """
+        if not isinstance(target, (str, Path)):
+            size = reader.write_to(staged, target)
+            name = getattr(target, "name", None)
+            return (name if isinstance(name, str) else None), size
+
+        file_path = Path(filename) if os.path.isabs(filename) else Path(target) / filename
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = file_path.with_name(file_path.name + ".part")
+        try:
+            with open(part_path, mode="wb") as f:
+                size = reader.write_to(staged, f)
+            os.replace(part_path, file_path)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+        logger.info("Streamed download to %s (%d bytes)", file_path, size)
+        return str(file_path), size
+
 
 class RoutineJsEvaluateOperation(RoutineOperation):
     """
@@ -1057,6 +1363,8 @@ class RoutineJsEvaluateOperation(RoutineOperation):
         r'window\.close\s*\(',
     ]
 
+    _TEMPLATE_FIELDS: ClassVar[tuple[str, ...]] = ("js",)
+
     @field_validator("js")
     @classmethod
     def validate_js_code(cls, v: str) -> str:
@@ -1136,7 +1444,7 @@ class RoutineJsEvaluateOperation(RoutineOperation):
 
     def _execute_operation(self, routine_execution_context: RoutineExecutionContext) -> None:
         """Execute JavaScript code and optionally store result in session storage."""
-        js_code = apply_params(self.js, routine_execution_context.parameters_dict)
+        js_code = self._render(routine_execution_context, "js")
 
         # Validate again after parameter interpolation to prevent injection attacks
         RoutineJsEvaluateOperation.validate_js_code(js_code)
@@ -1189,9 +1497,10 @@ class RoutineJsEvaluateOperation(RoutineOperation):
 
         # Store console logs and errors in metadata
         if routine_execution_context.current_operation_metadata is not None and isinstance(result_value, dict):
-            routine_execution_context.current_operation_metadata.details["console_logs"] = result_value.get("console_logs")
-            routine_execution_context.current_operation_metadata.details["execution_error"] = result_value.get("execution_error")
-            routine_execution_context.current_operation_metadata.details["storage_error"] = result_value.get("storage_error")
+            details = routine_execution_context.current_operation_metadata.details
+            details["console_logs"] = result_value.get("console_logs")
+            details["execution_error"] = result_value.get("execution_error")
+            details["storage_error"] = result_value.get("storage_error")
 
         # 4. Wrapper-level runtime errors
         if isinstance(result_value, dict):
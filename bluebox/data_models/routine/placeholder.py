@@ -7,6 +7,7 @@ Contains:
 - PlaceholderQuoteType: Enum (QUOTED, ESCAPE_QUOTED)
 - ExtractedPlaceholder: Parsed placeholder with source type and path
 - extract_placeholders(): Find all {{...}} patterns in text
+- extract_placeholder_contents(): Contents of every {{...}} pattern, quoted or not
 - Supports: user params, sessionStorage, localStorage, cookies, windowProperty
 """
 
@@ -14,6 +15,9 @@ import re
 from dataclasses import dataclass
 from enum import StrEnum
 
+# Placeholders not wrapped in quotes, e.g. in the middle of a URL ("/items/{{sessionStorage:item.id}}")
+_ANY_PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([^{}]*?)\s*\}\}")
+
 
 class PlaceholderQuoteType(StrEnum):
     """Type of quoting around a placeholder."""
@@ -79,3 +83,9 @@ def extract_placeholders_from_json_str(json_string: str) -> list[ExtractedPlaceh
     
     return placeholders
 
+
+def extract_placeholder_contents(json_string: str) -> set[str]:
+    """Contents of every {{...}} placeholder in a JSON string, quoted or not."""
+    contents = {placeholder.content for placeholder in extract_placeholders_from_json_str(json_string)}
+    contents.update(match.strip() for match in _ANY_PLACEHOLDER_PATTERN.findall(json_string))
+    return contents
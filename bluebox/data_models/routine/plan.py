@@ -0,0 +1,64 @@
+"""
+bluebox/data_models/routine/plan.py
+
+Precompiled parameter interpolation plans for routine execution.
+
+Contains:
+- OperationPlan: Pre-tokenized templates for one operation's interpolated fields
+- RoutinePlan: Immutable per-operation plans for a routine (see Routine.compile())
+"""
+
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from bluebox.utils.data_utils import ParamTemplate, compile_params_template
+
+
+@dataclass(frozen=True)
+class OperationPlan:
+    """
+    Interpolated fields of one operation, tokenized once.
+
+    Keys are field paths such as "url", "selector" or "endpoint.body". Dict and list fields are
+    serialized to JSON at compile time; render_json() parses the rendered text back. Fields that
+    were unset (None, or an empty dict/list) map to None and render as None.
+    """
+    templates: Mapping[str, ParamTemplate | None]
+
+    @classmethod
+    def from_fields(cls, fields: dict[str, Any]) -> "OperationPlan":
+        """
+        Compile raw field values (strings, dicts, lists or None).
+
+        Args:
+            fields: Field path -> value as stored on the operation.
+        Returns:
+            The compiled plan.
+        """
+        templates: dict[str, ParamTemplate | None] = {}
+        for name, value in fields.items():
+            if value is None or (isinstance(value, (dict, list)) and not value):
+                templates[name] = None
+            elif isinstance(value, (dict, list)):
+                templates[name] = compile_params_template(json.dumps(value))
+            else:
+                templates[name] = compile_params_template(str(value))
+        return cls(templates=MappingProxyType(templates))
+
+    def render(self, field: str, parameters_dict: dict | None) -> str | None:
+        """Render a field with the given parameters (None if the field was unset)."""
+        template = self.templates[field]
+        return None if template is None else template.render(parameters_dict)
+
+    def render_json(self, field: str, parameters_dict: dict | None) -> Any:
+        """Render a JSON field and parse it (None if the field was unset)."""
+        rendered = self.render(field, parameters_dict)
+        return None if rendered is None else json.loads(rendered)
+
+
+@dataclass(frozen=True)
+class RoutinePlan:
+    """Compiled plans for a routine's operations, in operation order. Safe to share across executions."""
+    operations: tuple[OperationPlan, ...]
@@ -0,0 +1,416 @@
+"""
+bluebox/data_models/routine/rate_limiter.py
+
+Per-host adaptive rate limiting shared by routine executors.
+
+Contains:
+- BatchPacing: Concurrency, pacing and retry settings a batch fetch applies in page
+- RequestOutcome: Status and Retry-After of one execution, as seen by the limiter
+- HostStats: Live counters and limits of one host
+- HostRateLimiter: AIMD concurrency limits, token buckets, Retry-After pauses and jittered retries per host
+- parse_retry_after(): Retry-After header value -> seconds
+- routine_outcome(): RequestOutcome of a routine result, from its recorded response metadata
+- routine_host(): Host a routine's requests go to
+"""
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, NamedTuple, TypeVar
+from urllib.parse import urlparse
+
+from bluebox.data_models.routine.execution import RoutineExecutionResult
+from bluebox.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from bluebox.data_models.routine.plan import RoutinePlan
+    from bluebox.data_models.routine.routine import Routine
+
+logger = get_logger(name=__name__)
+
+_T = TypeVar("_T")
+
+# Statuses that mean "slow down": they shrink the host's concurrency limit and are retried
+DEFAULT_THROTTLE_STATUSES = frozenset({429, 503})
+
+# Concurrency a host starts at, and the bounds AIMD keeps it in
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MAX_CONCURRENCY = 32
+
+# Retries of throttled executions, with full-jitter exponential backoff between them
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE_SECONDS = 0.5
+DEFAULT_BACKOFF_MAX_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class BatchPacing:
+    """How a batch fetch paces and retries its requests in page (see RoutineFetchOperation.execute_batch)."""
+    min_interval_seconds: float = 0.0
+    max_retries: int = 0
+    retry_statuses: frozenset[int] = DEFAULT_THROTTLE_STATUSES
+    backoff_base_seconds: float = DEFAULT_BACKOFF_BASE_SECONDS
+    backoff_max_seconds: float = DEFAULT_BACKOFF_MAX_SECONDS
+
+
+class RequestOutcome(NamedTuple):
+    """What the limiter learns from one execution."""
+    status: int | None
+    retry_after: str | None = None
+    failed: bool = False
+
+
+@dataclass
+class HostStats:
+    """Live counters and limits of one host."""
+    host: str
+    concurrency_limit: float
+    rate_per_second: float | None
+    in_flight: int = 0
+    requests: int = 0
+    successes: int = 0
+    throttled: int = 0
+    errors: int = 0
+    retries: int = 0
+    wait_seconds: float = 0.0
+    paused_until: float = 0.0  # monotonic time before which no request starts (Retry-After)
+    last_status: int | None = None
+
+    def to_dict(self, now: float | None = None) -> dict:
+        """Plain dict for logging/metrics (`now` on the limiter's clock, defaults to time.monotonic())."""
+        data = asdict(self)
+        data["concurrency"] = int(self.concurrency_limit)
+        data["paused_seconds_remaining"] = max(0.0, self.paused_until - (time.monotonic() if now is None else now))
+        del data["paused_until"]
+        return data
+
+
+@dataclass
+class _HostState:
+    stats: HostStats
+    tokens: float
+    tokens_updated_at: float
+    last_decrease_at: float = field(default=float("-inf"))
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """
+    Seconds to wait according to a Retry-After header.
+
+    Args:
+        value: Header value: delay in seconds or an HTTP date.
+        now: Current Unix time (defaults to time.time()).
+    Returns:
+        Non-negative seconds, or None if absent or malformed.
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+def routine_outcome(result: RoutineExecutionResult) -> RequestOutcome:
+    """
+    Outcome of a routine execution from the responses recorded in its operation metadata.
+
+    The first throttling status (429/503) wins, else the last recorded status. Failed results
+    without any response (e.g. a cross-origin 429 without CORS headers, reported as "Fetch
+    failed") have status None.
+    """
+    status: int | None = None
+    retry_after: str | None = None
+    for metadata in result.operations_metadata:
+        response = metadata.details.get("response") or {}
+        if not isinstance(response.get("status"), int):
+            continue
+        status = response["status"]
+        headers = {str(k).lower(): v for k, v in (response.get("headers") or {}).items()}
+        retry_after = headers.get("retry-after")
+        if status in DEFAULT_THROTTLE_STATUSES:
+            break
+    return RequestOutcome(status=status, retry_after=retry_after, failed=not result.ok)
+
+
+def routine_host(
+    routine: "Routine",
+    parameters_dict: dict | None = None,
+    plan: "RoutinePlan | None" = None,
+    url_rewriter: Callable[[str], str] | None = None,
+) -> str | None:
+    """
+    Host (netloc) a routine's requests go to: its first fetch/download endpoint, else its first page.
+
+    Args:
+        routine: The routine.
+        parameters_dict: Parameters to render the URL with.
+        plan: Precompiled plan of the routine.
+        url_rewriter: URL rewriting applied at execution time.
+    Returns:
+        The host, or None if the routine loads no URL.
+    """
+    plan = plan if plan is not None else routine.compile()
+    parameters_dict = parameters_dict or {}
+    for operation, operation_plan in zip(routine.operations, plan.operations):
+        if hasattr(operation, "endpoint"):
+            url = operation_plan.render("endpoint.url", parameters_dict)
+            url = url_rewriter(url) if url_rewriter is not None and url else url
+            return urlparse(url).netloc or None
+    origin = routine.target_origin(plan, parameters_dict, url_rewriter)
+    return (urlparse(origin).netloc or None) if origin else None
+
+
+class HostRateLimiter:
+    """
+    Shares request capacity per host between all executions (threads) using it.
+
+    Each host has an AIMD concurrency limit: every successful response adds 1/limit (about one
+    slot per window), a throttling status multiplies it by `decrease_factor` (at most once per
+    `decrease_cooldown_seconds`, so one burst of 429s counts as one congestion event). An optional
+    token bucket caps the request rate, and Retry-After pauses the host. Throttled executions are
+    retried after full-jitter exponential backoff. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        initial_concurrency: int = DEFAULT_INITIAL_CONCURRENCY,
+        min_concurrency: int = 1,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        decrease_factor: float = 0.5,
+        decrease_cooldown_seconds: float = 1.0,
+        rate_per_second: float | None = None,
+        burst: int | None = None,
+        rate_by_host: dict[str, float] | None = None,
+        throttle_statuses: frozenset[int] = DEFAULT_THROTTLE_STATUSES,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base_seconds: float = DEFAULT_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds: float = DEFAULT_BACKOFF_MAX_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
+    ) -> None:
+        """
+        Args:
+            initial_concurrency: Concurrency limit of a host before any feedback.
+            min_concurrency: Lower bound of the limit.
+            max_concurrency: Upper bound of the limit.
+            decrease_factor: Multiplier applied to the limit on throttling.
+            decrease_cooldown_seconds: Minimum time between two decreases of one host.
+            rate_per_second: Default token bucket rate per host (None: unlimited).
+            burst: Token bucket capacity (defaults to max(1, rate)).
+            rate_by_host: Host -> rate overriding rate_per_second.
+            throttle_statuses: Statuses treated as throttling.
+            max_retries: Retries of a throttled execution.
+            backoff_base_seconds: Backoff before the first retry (doubling per retry, fully jittered).
+            backoff_max_seconds: Backoff cap.
+            clock: Monotonic clock (injectable for tests).
+            sleep: Sleep function (injectable for tests).
+            rng: Random source for jitter.
+        """
+        if not 1 <= min_concurrency <= initial_concurrency <= max_concurrency:
+            raise ValueError("Expected 1 <= min_concurrency <= initial_concurrency <= max_concurrency")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown_seconds = decrease_cooldown_seconds
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.rate_by_host = dict(rate_by_host or {})
+        self.throttle_statuses = frozenset(throttle_statuses)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._hosts: dict[str, _HostState] = {}
+        self._cond = threading.Condition()
+
+    # Slots ________________________________________________________________________________________________________________
+
+    def acquire(self, host: str | None) -> None:
+        """Block until `host` has a free concurrency slot, a rate token, and is not paused; take them."""
+        start = self._clock()
+        with self._cond:
+            state = self._state(host)
+            while True:
+                now = self._clock()
+                self._refill(state, now)
+                stats = state.stats
+                if now < stats.paused_until:
+                    self._cond.wait(timeout=stats.paused_until - now)
+                elif stats.in_flight >= int(stats.concurrency_limit):
+                    self._cond.wait()
+                elif stats.rate_per_second is not None and state.tokens < 1:
+                    self._cond.wait(timeout=(1 - state.tokens) / stats.rate_per_second)
+                else:
+                    break
+            if stats.rate_per_second is not None:
+                state.tokens -= 1
+            stats.in_flight += 1
+            stats.wait_seconds += self._clock() - start
+
+    def release(self, host: str | None, outcome: RequestOutcome) -> None:
+        """Free a slot taken by acquire() and learn from the outcome."""
+        with self._cond:
+            state = self._state(host)
+            state.stats.in_flight -= 1
+            self._learn(state, outcome)
+            self._cond.notify_all()
+
+    def record(self, host: str | None, outcome: RequestOutcome) -> None:
+        """Learn from an outcome that did not hold a slot (e.g. each request of a batch fetch)."""
+        with self._cond:
+            self._learn(self._state(host), outcome)
+            self._cond.notify_all()
+
+    def wait_until_ready(self, host: str | None) -> None:
+        """Block while the host is paused by Retry-After."""
+        with self._cond:
+            state = self._state(host)
+            while (remaining := state.stats.paused_until - self._clock()) > 0:
+                self._cond.wait(timeout=remaining)
+
+    # Executions ___________________________________________________________________________________________________________
+
+    def call_with_retries(
+        self,
+        host: str | None,
+        call: Callable[[], _T],
+        outcome: Callable[[_T], RequestOutcome],
+        retry_failures: bool = False,
+    ) -> _T:
+        """
+        Run call() in a slot of `host`, retrying throttled results with jittered backoff.
+
+        Args:
+            host: Host key (None shares one unnamed bucket).
+            call: The execution.
+            outcome: Extracts the RequestOutcome of a result (e.g. routine_outcome).
+            retry_failures: Also retry failed results that carry no status.
+        Returns:
+            The last result (throttled if retries ran out).
+        """
+        attempt = 0
+        while True:
+            self.acquire(host)
+            try:
+                result = call()
+            except BaseException:
+                self.release(host, RequestOutcome(status=None, failed=True))
+                raise
+            result_outcome = outcome(result)
+            self.release(host, result_outcome)
+
+            retry = result_outcome.status in self.throttle_statuses or (
+                retry_failures and result_outcome.failed and result_outcome.status is None
+            )
+            if not retry or attempt >= self.max_retries:
+                return result
+            delay = self.backoff_delay(attempt)
+            with self._cond:
+                self._state(host).stats.retries += 1
+            logger.info(
+                "Host %s answered %s, retrying in %.2fs (retry %d/%d)",
+                host, result_outcome.status, delay, attempt + 1, self.max_retries,
+            )
+            self._sleep(delay)
+            attempt += 1
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number attempt + 1."""
+        return self._rng.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+
+    def batch_pacing(self, host: str | None) -> tuple[int, BatchPacing]:
+        """
+        (concurrency, pacing) for a batch fetch to `host`, from the host's current limits.
+
+        The page then spaces request starts by the host's rate, pauses on Retry-After and retries
+        throttled requests itself; feed its statuses back with record().
+        """
+        with self._cond:
+            stats = self._state(host).stats
+            rate = stats.rate_per_second
+            concurrency = int(stats.concurrency_limit)
+        return concurrency, BatchPacing(
+            min_interval_seconds=1 / rate if rate else 0.0,
+            max_retries=self.max_retries,
+            retry_statuses=self.throttle_statuses,
+            backoff_base_seconds=self.backoff_base_seconds,
+            backoff_max_seconds=self.backoff_max_seconds,
+        )
+
+    # Stats ________________________________________________________________________________________________________________
+
+    def stats(self) -> dict[str, dict]:
+        """Live stats per host."""
+        with self._cond:
+            now = self._clock()
+            return {host: state.stats.to_dict(now) for host, state in self._hosts.items()}
+
+    def host_stats(self, host: str | None) -> HostStats:
+        """Snapshot of one host's stats."""
+        with self._cond:
+            return HostStats(**asdict(self._state(host).stats))
+
+    # Internals ____________________________________________________________________________________________________________
+
+    def _state(self, host: str | None) -> _HostState:
+        key = host or ""
+        state = self._hosts.get(key)
+        if state is None:
+            rate = self.rate_by_host.get(key, self.rate_per_second)
+            state = _HostState(
+                stats=HostStats(host=key, concurrency_limit=float(self.initial_concurrency), rate_per_second=rate),
+                tokens=self._capacity(rate),
+                tokens_updated_at=self._clock(),
+            )
+            self._hosts[key] = state
+        return state
+
+    def _capacity(self, rate: float | None) -> float:
+        if rate is None:
+            return 0.0
+        return float(self.burst if self.burst is not None else max(1.0, rate))
+
+    def _refill(self, state: _HostState, now: float) -> None:
+        rate = state.stats.rate_per_second
+        if rate is not None:
+            state.tokens = min(self._capacity(rate), state.tokens + (now - state.tokens_updated_at) * rate)
+        state.tokens_updated_at = now
+
+    def _learn(self, state: _HostState, outcome: RequestOutcome) -> None:
+        stats = state.stats
+        now = self._clock()
+        stats.requests += 1
+        stats.last_status = outcome.status
+        if outcome.status in self.throttle_statuses:
+            stats.throttled += 1
+            if now - state.last_decrease_at >= self.decrease_cooldown_seconds:
+                stats.concurrency_limit = max(float(self.min_concurrency), stats.concurrency_limit * self.decrease_factor)
+                state.last_decrease_at = now
+                logger.info(
+                    "Host %s throttled (%s): concurrency limit now %d",
+                    stats.host, outcome.status, int(stats.concurrency_limit),
+                )
+            delay = parse_retry_after(outcome.retry_after)
+            if delay:
+                stats.paused_until = max(stats.paused_until, now + delay)
+        elif outcome.status is None and outcome.failed:
+            stats.errors += 1
+        else:
+            stats.successes += 1
+            stats.concurrency_limit = min(
+                float(self.max_concurrency), stats.concurrency_limit + 1 / stats.concurrency_limit
+            )
@@ -0,0 +1,145 @@
+"""
+bluebox/data_models/routine/resource_blocking.py
+
+Resource blocking for routine page loads.
+
+Contains:
+- ResourceCategory: Kinds of page resources a routine can skip loading
+- ResourceBlockingPolicy: Per-routine choice of categories and URL patterns to block
+- blocked_url_patterns(): Network.setBlockedURLs patterns for a set of categories
+"""
+
+import re
+from collections.abc import Iterable
+from enum import StrEnum
+from functools import lru_cache
+
+from pydantic import BaseModel, Field
+
+from bluebox.constants.network import (
+    EXCLUDED_MIME_PREFIXES,
+    THIRD_PARTY_TRACKING_ANALYTICS_DOMAINS,
+)
+
+
+class ResourceCategory(StrEnum):
+    """
+    Kinds of page resources that fetch/return routines do not need.
+    """
+    IMAGE = "image"
+    FONT = "font"
+    STYLESHEET = "stylesheet"
+    MEDIA = "media"
+    TRACKING = "tracking"
+
+
+# URL suffixes per MIME prefix of EXCLUDED_MIME_PREFIXES (blocking works on URLs, not response types)
+_SUFFIXES_BY_MIME_PREFIX: dict[str, tuple[str, ...]] = {
+    "image/": (".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".webp", ".avif", ".bmp"),
+    "font/": (".woff", ".woff2", ".ttf", ".otf", ".eot"),
+    "video/": (".mp4", ".webm", ".ogv", ".mov", ".m4v"),
+    "audio/": (".mp3", ".m4a", ".aac", ".ogg", ".oga", ".wav", ".flac"),
+}
+
+_CATEGORY_MIME_PREFIXES: dict[ResourceCategory, tuple[str, ...]] = {
+    ResourceCategory.IMAGE: ("image/",),
+    ResourceCategory.FONT: ("font/",),
+    ResourceCategory.MEDIA: ("video/", "audio/"),
+}
+
+# Unresolved {{...}} placeholders in a URL template
+_PLACEHOLDER_PATTERN = re.compile(r"\{\{[^{}]*\}\}")
+
+
+def _category_suffixes(category: ResourceCategory) -> tuple[str, ...]:
+    """URL suffixes of a category: .css for stylesheets, excluded MIME types' extensions otherwise."""
+    if category == ResourceCategory.STYLESHEET:
+        return (".css",)
+    return tuple(
+        suffix
+        for prefix in _CATEGORY_MIME_PREFIXES[category]
+        if prefix in EXCLUDED_MIME_PREFIXES
+        for suffix in _SUFFIXES_BY_MIME_PREFIX[prefix]
+    )
+
+
+def blocked_url_patterns(categories: Iterable[ResourceCategory]) -> list[str]:
+    """
+    Network.setBlockedURLs patterns ('*' wildcards) for the given categories.
+
+    Suffix patterns are emitted with and without a query string ("*.png", "*.png?*"); tracking
+    domains match any scheme and subdomain.
+    """
+    patterns: list[str] = []
+    for category in dict.fromkeys(categories):
+        if category == ResourceCategory.TRACKING:
+            for domain in THIRD_PARTY_TRACKING_ANALYTICS_DOMAINS:
+                patterns.extend((f"*://{domain}/*", f"*.{domain}/*"))
+            continue
+        for suffix in _category_suffixes(category):
+            patterns.extend((f"*{suffix}", f"*{suffix}?*"))
+    return patterns
+
+
+def _may_match(pattern: str, url: str) -> bool:
+    """
+    Whether a '*' wildcard pattern can match a URL once its {{...}} placeholders are resolved.
+
+    A placeholder stands for any text without '/' (a path segment, file name or query value).
+    """
+    # URL as a sequence of characters, with None for each placeholder
+    tokens: list[str | None] = []
+    position = 0
+    for match in _PLACEHOLDER_PATTERN.finditer(url):
+        tokens.extend(url[position:match.start()])
+        tokens.append(None)
+        position = match.end()
+    tokens.extend(url[position:])
+
+    @lru_cache(maxsize=None)
+    def match_from(i: int, j: int) -> bool:
+        if i == len(pattern):
+            return all(token is None for token in tokens[j:])
+        if pattern[i] == "*":
+            return match_from(i + 1, j) or (j < len(tokens) and match_from(i, j + 1))
+        if j == len(tokens):
+            return False
+        if tokens[j] is None:
+            return match_from(i, j + 1) or (pattern[i] != "/" and match_from(i + 1, j))
+        return pattern[i] == tokens[j] and match_from(i + 1, j + 1)
+
+    return match_from(0, 0)
+
+
+class ResourceBlockingPolicy(BaseModel):
+    """
+    Resources to block while a routine runs, so page loads skip what fetches and returns never use.
+
+    Blocked requests fail immediately in the browser (net::ERR_BLOCKED_BY_CLIENT), the page's own
+    fetch() calls included, so patterns matching a URL the routine requests itself are left out
+    (see blocked_urls). Keep stylesheets (and images, if the page lays out around them) for
+    routines that click, type or scroll: element visibility and coordinates depend on them.
+    """
+    categories: list[ResourceCategory] = Field(
+        default_factory=lambda: list(ResourceCategory),
+        description="Resource categories to block",
+    )
+    url_patterns: list[str] = Field(
+        default_factory=list,
+        description="Additional Network.setBlockedURLs patterns ('*' wildcards) to block",
+    )
+
+    def blocked_urls(self, keep_urls: Iterable[str] = ()) -> list[str]:
+        """
+        All patterns to pass to Network.setBlockedURLs.
+
+        Args:
+            keep_urls: URLs the routine navigates to, fetches or downloads; patterns that could
+                match one are dropped ({{...}} placeholders left in a URL stand for any text
+                without '/').
+        Returns:
+            The patterns, without duplicates.
+        """
+        keep = [url for url in keep_urls if url]
+        patterns = list(dict.fromkeys([*blocked_url_patterns(self.categories), *self.url_patterns]))
+        return [pattern for pattern in patterns if not any(_may_match(pattern, url) for url in keep)]
@@ -0,0 +1,278 @@
+"""
+bluebox/data_models/routine/result_cache.py
+
+Opt-in cache of routine execution results (see RoutineExecutionOptions.result_cache).
+
+Contains:
+- CacheStats: Hit/miss counters
+- routine_cache_key(): Canonical routine hash + normalized parameters
+- ttl_from_cache_control(): Freshness lifetime of the responses recorded in operation metadata
+- RoutineResultCache: In-memory LRU with an optional on-disk tier and TTLs
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+from bluebox.data_models.routine.execution import RoutineExecutionResult
+from bluebox.utils.file_store_utils import JsonFileTier, StoreStats
+from bluebox.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from bluebox.data_models.routine.routine import Routine
+
+logger = get_logger(name=__name__)
+
+# Entries kept in memory before the least recently used one is evicted
+DEFAULT_MAX_ENTRIES = 256
+
+# Lifetime of a cached result when neither a per-routine TTL nor Cache-Control applies
+DEFAULT_TTL_SECONDS = 300.0
+
+_MAX_AGE_PATTERN = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)\"?", re.IGNORECASE)
+_NO_CACHE_PATTERN = re.compile(r"(?:^|,)\s*(no-store|no-cache)\b", re.IGNORECASE)
+
+
+@dataclass
+class CacheStats(StoreStats):
+    """Counters for a RoutineResultCache."""
+    hits: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    uncacheable: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Hits over lookups (0.0 before the first lookup)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict:
+        """Plain dict for logging/metrics."""
+        return {**super().to_dict(), "hit_rate": self.hit_rate}
+
+
+def routine_cache_key(routine: "Routine", parameters_dict: dict | None) -> str:
+    """
+    Cache key for executing a routine with parameters.
+
+    The routine is hashed from its canonical JSON (any change to it yields a new key). Parameters
+    are normalized: only the routine's declared parameters count, in sorted order.
+
+    Args:
+        routine: The routine.
+        parameters_dict: Execution parameters.
+    Returns:
+        Hex SHA-256 digest.
+    """
+    declared = {parameter.name for parameter in routine.parameters}
+    parameters = {k: v for k, v in (parameters_dict or {}).items() if k in declared}
+    canonical = json.dumps(
+        {"routine": routine.model_dump(mode="json"), "parameters": parameters},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def ttl_from_cache_control(result: RoutineExecutionResult) -> float | None:
+    """
+    Freshness lifetime allowed by the Cache-Control headers of the responses a routine received.
+
+    Uses the response headers recorded in operation metadata (details["response"]["headers"]):
+    the smallest max-age minus Age wins, and no-store/no-cache on any response gives 0.
+
+    Args:
+        result: An execution result.
+    Returns:
+        Seconds, or None if no response carried a Cache-Control directive.
+    """
+    ttl: float | None = None
+    for metadata in result.operations_metadata:
+        response = metadata.details.get("response") or {}
+        headers = {str(k).lower(): str(v) for k, v in (response.get("headers") or {}).items()}
+        cache_control = headers.get("cache-control")
+        if not cache_control:
+            continue
+        if _NO_CACHE_PATTERN.search(cache_control):
+            return 0.0
+        match = _MAX_AGE_PATTERN.search(cache_control)
+        if match is None:
+            continue
+        age = float(headers["age"]) if headers.get("age", "").isdigit() else 0.0
+        lifetime = max(0.0, float(match.group(1)) - age)
+        ttl = lifetime if ttl is None else min(ttl, lifetime)
+    return ttl
+
+
+class RoutineResultCache:
+    """
+    Cache of successful routine results keyed by routine_cache_key().
+
+    Entries live in an in-memory LRU and, if cache_dir is set, in one JSON file per key on disk
+    (surviving restarts and shared between processes). A result's TTL is the routine's entry in
+    ttl_by_routine if present, else what Cache-Control on its responses allows, else default_ttl_seconds.
+    Results that failed, had operation errors, or point at streamed download files are not cached.
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        default_ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        ttl_by_routine: dict[str, float] | None = None,
+        cache_dir: str | Path | None = None,
+        respect_cache_control: bool = True,
+    ) -> None:
+        """
+        Args:
+            max_entries: In-memory LRU capacity.
+            default_ttl_seconds: TTL when no per-routine TTL or Cache-Control applies.
+            ttl_by_routine: Routine name -> TTL in seconds (0 disables caching for that routine).
+            cache_dir: Directory for the on-disk tier (None keeps the cache in memory only).
+            respect_cache_control: Derive TTLs from Cache-Control on captured responses.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self.ttl_by_routine = dict(ttl_by_routine or {})
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.respect_cache_control = respect_cache_control
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()  # key -> (expires at, result JSON)
+        self._lock = threading.Lock()
+        self._disk = JsonFileTier(self.cache_dir, "cache entry") if self.cache_dir is not None else None
+
+    # Lookup _______________________________________________________________________________________________________________
+
+    def get(self, routine: "Routine", parameters_dict: dict | None) -> RoutineExecutionResult | None:
+        """Cached result for the execution, or None (counted as a miss)."""
+        key = routine_cache_key(routine, parameters_dict)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.stats.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                self.stats.memory_hits += 1
+                return RoutineExecutionResult.model_validate_json(entry[1])
+
+            entry = self._read_disk(key, now)
+            if entry is not None:
+                self._remember(key, entry)
+                self.stats.hits += 1
+                self.stats.disk_hits += 1
+                return RoutineExecutionResult.model_validate_json(entry[1])
+
+            self.stats.misses += 1
+            return None
+
+    def put(self, routine: "Routine", parameters_dict: dict | None, result: RoutineExecutionResult) -> bool:
+        """
+        Store a result if it is cacheable.
+
+        Returns:
+            Whether the result was stored.
+        """
+        ttl = self.ttl_for(routine, result)
+        if ttl <= 0 or not self._is_cacheable(result):
+            with self._lock:
+                self.stats.uncacheable += 1
+            return False
+        key = routine_cache_key(routine, parameters_dict)
+        entry = (time.time() + ttl, result.model_dump_json())
+        with self._lock:
+            self._remember(key, entry)
+            self._write_disk(key, entry)
+            self.stats.stores += 1
+        return True
+
+    def get_or_execute(
+        self,
+        routine: "Routine",
+        parameters_dict: dict | None,
+        execute: Callable[[], RoutineExecutionResult],
+    ) -> RoutineExecutionResult:
+        """Return the cached result, or call execute() and cache what it returns."""
+        cached = self.get(routine, parameters_dict)
+        if cached is not None:
+            return cached
+        result = execute()
+        self.put(routine, parameters_dict, result)
+        return result
+
+    def ttl_for(self, routine: "Routine", result: RoutineExecutionResult) -> float:
+        """TTL in seconds for a result of the routine (see class docstring)."""
+        if routine.name in self.ttl_by_routine:
+            return self.ttl_by_routine[routine.name]
+        if self.respect_cache_control:
+            ttl = ttl_from_cache_control(result)
+            if ttl is not None:
+                return ttl
+        return self.default_ttl_seconds
+
+    # Maintenance __________________________________________________________________________________________________________
+
+    def invalidate(self, routine: "Routine", parameters_dict: dict | None) -> None:
+        """Drop the cached result of one execution."""
+        key = routine_cache_key(routine, parameters_dict)
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._disk is not None:
+                self._disk.delete(key)
+
+    def clear(self) -> None:
+        """Drop every entry (memory and disk)."""
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.clear()
+
+    # Internals ____________________________________________________________________________________________________________
+
+    @staticmethod
+    def _is_cacheable(result: RoutineExecutionResult) -> bool:
+        return (
+            result.ok
+            and result.file_path is None
+            and not any(metadata.error for metadata in result.operations_metadata)
+        )
+
+    def _remember(self, key: str, entry: tuple[float, str]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _read_disk(self, key: str, now: float) -> tuple[float, str] | None:
+        if self._disk is None:
+            return None
+        stored = self._disk.read(key, json.loads)
+        if stored is None:
+            return None
+        if stored.get("expires_at", 0) <= now:
+            self._disk.delete(key)
+            self.stats.expirations += 1
+            return None
+        return stored["expires_at"], stored["result"]
+
+    def _write_disk(self, key: str, entry: tuple[float, str]) -> None:
+        if self._disk is not None:
+            self._disk.write(key, json.dumps({"expires_at": entry[0], "result": entry[1]}))
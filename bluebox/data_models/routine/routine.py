@@ -6,23 +6,34 @@ Main Routine model for browser automation workflows.
 Contains:
 - Routine: JSON-serializable workflow with operations, parameters, validation
 - execute(): Run routine with CDP connection
+- execute_batch(): Run routine for many parameter sets, fanning out its last fetch in one page
 - execute_with_session(): Run with existing CDP session
+- target_origin(): Origin of the first page/endpoint a run loads
 - Validation: parameter usage, placeholder resolution, builtin handling
 """
 
-import ast
-import json
 import time
+from typing import Callable, TypeVar
 
 from pydantic import BaseModel, Field, model_validator
 
+from bluebox.data_models.routine.endpoint import CREDENTIALS
 from bluebox.data_models.routine.execution import RoutineExecutionContext, RoutineExecutionResult
+from bluebox.data_models.routine.execution_options import RoutineExecutionOptions
 from bluebox.data_models.routine.operation import (
+    DEFAULT_BATCH_CONCURRENCY,
     RoutineDownloadOperation,
     RoutineFetchOperation,
     RoutineNavigateOperation,
     RoutineOperationUnion,
+    RoutineReturnOperation,
 )
+from bluebox.data_models.routine.plan import RoutinePlan
+from bluebox.data_models.routine.rate_limiter import BatchPacing
+from bluebox.data_models.routine.resource_blocking import ResourceBlockingPolicy
+from bluebox.data_models.routine.schedule import execute_operations
+from bluebox.data_models.routine.session_state import cookie_params
+from bluebox.data_models.routine.trace import ExecutionTracer
 from bluebox.data_models.routine.parameter import (
     Parameter,
     ParameterType,
@@ -30,16 +41,27 @@ from bluebox.data_models.routine.parameter import (
     VALID_PLACEHOLDER_PREFIXES,
 )
 from bluebox.cdp.connection import cdp_new_tab, cdp_attach_to_existing_tab, dispose_context
+from bluebox.cdp.tab_pool import PooledTab, TabReusePolicy, url_origin
 from bluebox.data_models.routine.placeholder import (
     PlaceholderQuoteType,
     extract_placeholders_from_json_str,
 )
-from bluebox.utils.data_utils import extract_base_url_from_url
+from bluebox.utils.cdp_origin_utils import OriginBootstrapStrategy
+from bluebox.utils.data_utils import extract_base_url_from_url, parse_string_result
 from bluebox.utils.logger import get_logger
+from bluebox.utils.js_utils import (
+    generate_preconnect_js,
+    generate_runtime_library_js,
+    generate_storage_restore_js,
+    generate_storage_snapshot_js,
+    generate_tab_hygiene_js,
+)
 from bluebox.utils.web_socket_utils import send_cmd, recv_until
 
 logger = get_logger(name=__name__)
 
+_T = TypeVar("_T")
+
 
 # Routine model ___________________________________________________________________________________
 
@@ -59,6 +81,17 @@ class Routine(BaseModel):
         default_factory=list,
         description="List of parameters"
     )
+    resource_blocking: ResourceBlockingPolicy | None = Field(
+        default=None,
+        description="Resources (images, fonts, stylesheets, media, tracking) the browser skips while the routine runs"
+    )
+    origin_bootstrap: OriginBootstrapStrategy = Field(
+        default=OriginBootstrapStrategy.HOMEPAGE,
+        description=(
+            "How a fetch from a blank tab gets a same-origin document: homepage (also sets its cookies), "
+            "lightweight (/robots.txt) or synthetic (no network)"
+        )
+    )
 
     @model_validator(mode='after')
     def validate_parameter_usage(self) -> 'Routine':
@@ -186,13 +219,25 @@ class Routine(BaseModel):
         # Return comma-separated unique base URLs (sorted for consistency)
         return ','.join(sorted(base_urls))
 
+    def compile(self) -> RoutinePlan:
+        """
+        Compile the routine's parameter interpolation into an immutable execution plan.
+
+        Every interpolated field (URLs, headers, bodies, selectors, JS) is tokenized into static
+        fragments and placeholder slots once, so each execution renders it in a single pass.
+        Batch runners should compile once and pass the plan to every execute() call. The plan
+        snapshots the operations: compile again after modifying them.
+
+        Returns:
+            RoutinePlan: One OperationPlan per operation, in order.
+        """
+        return RoutinePlan(operations=tuple(operation.compile_plan() for operation in self.operations))
+
     def execute(
         self,
         parameters_dict: dict | None = None,
-        remote_debugging_address: str = "http://127.0.0.1:9222",
-        timeout: float = 180.0,
-        close_tab_when_done: bool = True,
-        tab_id: str | None = None,
+        options: RoutineExecutionOptions | None = None,
+        plan: RoutinePlan | None = None,
     ) -> RoutineExecutionResult:
         """
         Execute this routine using Chrome DevTools Protocol.
@@ -202,24 +247,275 @@ class Routine(BaseModel):
 
         Args:
             parameters_dict: Parameters for URL/header/body interpolation.
-            remote_debugging_address: Chrome debugging server address.
-            timeout: Operation timeout in seconds.
-            close_tab_when_done: Whether to close the tab when finished.
-            tab_id: If provided, attach to this existing tab. If None, create a new tab.
+            options: Browser, tab and opt-in optimization settings (defaults if None; see
+                RoutineExecutionOptions).
+            plan: Plan from compile() to reuse across executions (compiled per call if None).
 
         Returns:
             RoutineExecutionResult: Result of the routine execution.
         """
+        if options is None:
+            options = RoutineExecutionOptions()
         if parameters_dict is None:
             parameters_dict = {}
+        if plan is None:
+            plan = self.compile()
+        elif len(plan.operations) != len(self.operations):
+            return RoutineExecutionResult(
+                ok=False,
+                error=f"Plan has {len(plan.operations)} operations, routine has {len(self.operations)}",
+            )
+        result_cache = None if options.bypasses_result_cache else options.result_cache
+        if result_cache is not None:
+            cached = result_cache.get(self, parameters_dict)
+            if cached is not None:
+                logger.info(f"Returning cached result for routine '{self.name}'")
+                return cached
+
+        def run(routine_execution_context: RoutineExecutionContext) -> RoutineExecutionResult:
+            # Execute operations (independent fetches run concurrently in page)
+            logger.info(f"Executing routine '{self.name}' with {len(self.operations)} operations")
+            execute_operations(self.operations, plan, routine_execution_context, parallel=options.parallel)
+
+            # Try to parse string results as JSON or Python literals (skip for base64)
+            result = routine_execution_context.result
+            if isinstance(result.data, str) and not result.is_base64:
+                result.data = parse_string_result(result.data)
+            return result
+
+        result = self._execute_in_tab(
+            run,
+            on_error=lambda error: RoutineExecutionResult(ok=False, error=error),
+            parameters_dict=parameters_dict,
+            plan=plan,
+            options=options,
+        )
+        if result_cache is not None:
+            result_cache.put(self, parameters_dict, result)
+        return result
+
+    def execute_batch(
+        self,
+        parameter_sets: list[dict],
+        options: RoutineExecutionOptions | None = None,
+        plan: RoutinePlan | None = None,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        pacing: BatchPacing | None = None,
+    ) -> list[RoutineExecutionResult]:
+        """
+        Execute this routine for many parameter sets in one page context.
+
+        The routine's last fetch is fanned out: every operation before it runs once (it must not
+        use parameters whose values differ between the sets), then the fetch runs for all sets
+        from a single evaluation with at most `concurrency` requests in flight (see
+        RoutineFetchOperation.execute_batch). Only a return of the fetch's session_storage_key
+        may follow it. Equivalent to one execute() per set, without the per-run tab setup and
+        navigation.
+
+        Args:
+            parameter_sets: Parameters for each run.
+            options: Browser, tab and opt-in optimization settings (defaults if None); download_target,
+                parallel and result_cache do not apply to batches.
+            plan: Plan from compile() to reuse across executions (compiled per call if None).
+            concurrency: Maximum fetches in flight at once.
+            pacing: Request spacing and throttle retries for the batch fetch (see HostRateLimiter.batch_pacing).
+
+        Returns:
+            One RoutineExecutionResult per parameter set, in order. Each carries the shared setup
+            operations' metadata followed by the batch fetch's.
+        """
+        if not parameter_sets:
+            return []
+
+        def fail_all(error: str) -> list[RoutineExecutionResult]:
+            return [RoutineExecutionResult(ok=False, error=error) for _ in parameter_sets]
+
+        if plan is None:
+            plan = self.compile()
+        elif len(plan.operations) != len(self.operations):
+            return fail_all(f"Plan has {len(plan.operations)} operations, routine has {len(self.operations)}")
+
+        fetch_index = next(
+            (i for i in range(len(self.operations) - 1, -1, -1) if isinstance(self.operations[i], RoutineFetchOperation)),
+            None,
+        )
+        if fetch_index is None:
+            return fail_all("Batch execution requires a fetch operation")
+        fetch_operation: RoutineFetchOperation = self.operations[fetch_index]
+        trailing = self.operations[fetch_index + 1:]
+        returns_result = bool(trailing)
+        if trailing and not (
+            len(trailing) == 1
+            and isinstance(trailing[0], RoutineReturnOperation)
+            and trailing[0].session_storage_key == fetch_operation.session_storage_key
+        ):
+            return fail_all("Batch execution requires the last fetch to be followed only by a return of its result")
+
+        # Setup operations run once, so they may only use parameters shared by every set
+        shared = {
+            name: value for name, value in parameter_sets[0].items()
+            if all(name in params and params[name] == value for params in parameter_sets[1:])
+        }
+        varying = {name for params in parameter_sets for name in params} - set(shared)
+        for operation_plan in plan.operations[:fetch_index]:
+            used = {
+                name for template in operation_plan.templates.values() if template is not None
+                for name, _ in template.slots
+            }
+            if used & varying:
+                return fail_all(
+                    f"Operations before the batch fetch use parameters that vary between sets: {sorted(used & varying)}"
+                )
+
+        def run(routine_execution_context: RoutineExecutionContext) -> list[RoutineExecutionResult]:
+            logger.info(
+                f"Executing routine '{self.name}' for {len(parameter_sets)} parameter sets "
+                f"(batch fetch at operation {fetch_index + 1}, concurrency {concurrency})"
+            )
+            execute_operations(self.operations[:fetch_index], plan, routine_execution_context)
+            shared_result = routine_execution_context.result
+            fetch_results = fetch_operation.execute_batch(
+                routine_execution_context,
+                parameter_sets,
+                concurrency=concurrency,
+                plan=plan.operations[fetch_index],
+                pacing=pacing,
+            )
+            setup_metadata = shared_result.operations_metadata[:-1]
+            fetch_metadata = shared_result.operations_metadata[-1]
+
+            results = []
+            for fetch_result in fetch_results:
+                result = RoutineExecutionResult(
+                    ok=fetch_result.ok,
+                    error=None if fetch_result.ok else fetch_result.error,
+                    warnings=list(shared_result.warnings),
+                    operations_metadata=[*setup_metadata, fetch_metadata],
+                    placeholder_resolution={**shared_result.placeholder_resolution, **fetch_result.resolved_values},
+                )
+                for k, v in fetch_result.resolved_values.items():
+                    if v is None:
+                        result.warnings.append(f"Could not resolve placeholder: {k}")
+                if returns_result and isinstance(fetch_result.result, str):
+                    result.data = parse_string_result(fetch_result.result)
+                results.append(result)
+            return results
+
+        return self._execute_in_tab(
+            run,
+            on_error=fail_all,
+            parameters_dict=shared,
+            plan=plan,
+            options=(options or RoutineExecutionOptions()).model_copy(update={"download_target": None}),
+        )
+
+    def target_origin(
+        self,
+        plan: RoutinePlan,
+        parameters_dict: dict,
+        url_rewriter: Callable[[str], str] | None,
+    ) -> str | None:
+        """Origin of the first page/endpoint the routine loads (the tab affinity key)."""
+        for operation, operation_plan in zip(self.operations, plan.operations):
+            if isinstance(operation, RoutineNavigateOperation):
+                url = operation_plan.render("url", parameters_dict)
+            elif isinstance(operation, (RoutineFetchOperation, RoutineDownloadOperation)):
+                url = operation_plan.render("endpoint.url", parameters_dict)
+            else:
+                continue
+            return url_origin(url_rewriter(url) if url_rewriter is not None and url else url)
+        return None
+
+    def _preconnect_origins(
+        self,
+        plan: RoutinePlan,
+        parameters_dict: dict,
+        url_rewriter: Callable[[str], str] | None,
+    ) -> dict[str, bool]:
+        """
+        Every origin the routine's navigations and requests go to, mapped to whether they carry cookies.
+
+        Like compute_base_urls_from_operations, but with full origins rendered from the parameters
+        (URLs still holding unresolved placeholders are skipped). Navigations and fetches with
+        credentials "include" use credentialed connections, other requests anonymous ones.
+        """
+        origins: dict[str, bool] = {}
+        for operation, operation_plan in zip(self.operations, plan.operations):
+            if isinstance(operation, RoutineNavigateOperation):
+                url, credentialed = operation_plan.render("url", parameters_dict), True
+            elif isinstance(operation, (RoutineFetchOperation, RoutineDownloadOperation)):
+                url = operation_plan.render("endpoint.url", parameters_dict)
+                credentialed = operation.endpoint.credentials == CREDENTIALS.INCLUDE
+            else:
+                continue
+            if not url or "{{" in url:
+                continue
+            origin = url_origin(url_rewriter(url) if url_rewriter is not None else url)
+            if origin is not None:
+                origins[origin] = origins.get(origin, False) or credentialed
+        return origins
+
+    def _request_urls(
+        self,
+        plan: RoutinePlan,
+        parameters_dict: dict,
+        url_rewriter: Callable[[str], str] | None,
+    ) -> list[str]:
+        """URLs the routine navigates to, fetches or downloads (unresolved placeholders are kept)."""
+        urls = []
+        for operation, operation_plan in zip(self.operations, plan.operations):
+            if isinstance(operation, RoutineNavigateOperation):
+                url = operation_plan.render("url", parameters_dict)
+            elif isinstance(operation, (RoutineFetchOperation, RoutineDownloadOperation)):
+                url = operation_plan.render("endpoint.url", parameters_dict)
+            else:
+                continue
+            if url and url_rewriter is not None and "{{" not in url:
+                url = url_rewriter(url)
+            urls.append(url)
+        return urls
+
+    def _session_storage_keys(self) -> list[str]:
+        """sessionStorage keys the routine's operations write or read (cleared before a tab is reused)."""
+        keys = {getattr(operation, "session_storage_key", None) for operation in self.operations}
+        return sorted(key for key in keys if key)
+
+    def _execute_in_tab(
+        self,
+        run: Callable[[RoutineExecutionContext], _T],
+        on_error: Callable[[str], _T],
+        parameters_dict: dict,
+        plan: RoutinePlan,
+        options: RoutineExecutionOptions,
+    ) -> _T:
+        """
+        Get a tab (attach to tab_id, reuse a pooled tab on the routine's origin, or open a new one),
+        set up the CDP session and execution context (restoring session state), call run() with it,
+        capture session state, then close, keep or pool the tab according to the reuse policy.
+        """
+        remote_debugging_address = options.remote_debugging_address
+        timeout = options.timeout
+        tab_id = options.tab_id
+        tab_pool = options.tab_pool
+        url_rewriter = options.url_rewriter
+        session_state = options.session_state
+        tab_reuse = options.resolved_tab_reuse()
+        if tab_reuse == TabReusePolicy.POOL and tab_pool is None:
+            return on_error("Tab reuse policy 'pool' requires a tab_pool")
+
+        pooled: PooledTab | None = None
+        if tab_id is None and tab_reuse == TabReusePolicy.POOL:
+            pooled = tab_pool.acquire(self.target_origin(plan, parameters_dict, url_rewriter), self.incognito)
 
         # Get a tab for the routine (returns browser-level WebSocket)
         try:
-            if tab_id is not None:
+            if tab_id is not None or pooled is not None:
                 target_id, browser_context_id, browser_ws = cdp_attach_to_existing_tab(
                     remote_debugging_address=remote_debugging_address,
-                    target_id=tab_id,
+                    target_id=tab_id if tab_id is not None else pooled.target_id,
                 )
+                if pooled is not None:
+                    browser_context_id = pooled.browser_context_id
             else:
                 target_id, browser_context_id, browser_ws = cdp_new_tab(
                     remote_debugging_address=remote_debugging_address,
@@ -227,65 +523,163 @@ class Routine(BaseModel):
                     url="about:blank",
                 )
         except Exception as e:
-            return RoutineExecutionResult(
-                ok=False,
-                error=f"Failed to {'attach to' if tab_id else 'create'} tab: {e}"
+            if pooled is not None:
+                tab_pool.discard(pooled)
+            return on_error(f"Failed to {'attach to' if tab_id or pooled else 'create'} tab: {e}")
+
+        def evaluate(session_id: str, expression: str) -> object:
+            eval_id = send_cmd(
+                browser_ws, "Runtime.evaluate", {"expression": expression, "returnByValue": True}, session_id=session_id,
             )
+            eval_reply = recv_until(browser_ws, lambda m: m.get("id") == eval_id, time.time() + timeout)
+            return ((eval_reply.get("result") or {}).get("result") or {}).get("value")
 
+        return_to_pool = False
         try:
             # Attach to target using flattened session (allows multiplexing via session_id)
             attach_id = send_cmd(browser_ws, "Target.attachToTarget", {"targetId": target_id, "flatten": True})
             reply = recv_until(browser_ws, lambda m: m.get("id") == attach_id, time.time() + timeout)
+            if "error" in reply:
+                raise RuntimeError(f"Failed to attach to tab {target_id}: {reply['error']}")
             session_id = reply["result"]["sessionId"]
 
             # Enable domains
             send_cmd(browser_ws, "Page.enable", session_id=session_id)
+            send_cmd(browser_ws, "Page.setLifecycleEventsEnabled", {"enabled": True}, session_id=session_id)
             send_cmd(browser_ws, "Runtime.enable", session_id=session_id)
             send_cmd(browser_ws, "Network.enable", session_id=session_id)
             send_cmd(browser_ws, "DOM.enable", session_id=session_id)
 
-            # Create execution context
+            # Restore what a previous run on the same origins left: cookies now, storage in each new document
+            request_origins = (
+                self._preconnect_origins(plan, parameters_dict, url_rewriter)
+                if options.preconnect or session_state is not None else {}
+            )
+            snapshot = session_state.get(request_origins) if session_state is not None and request_origins else None
+            storage_restore_js = None
+            if snapshot is not None:
+                cookies = cookie_params(snapshot.cookies)
+                if cookies:
+                    cookies_id = send_cmd(browser_ws, "Network.setCookies", {"cookies": cookies}, session_id=session_id)
+                    reply = recv_until(browser_ws, lambda m: m.get("id") == cookies_id, time.time() + timeout)
+                    if "error" in reply:
+                        logger.warning("Failed to restore session cookies: %s", reply["error"])
+                if snapshot.storage:
+                    storage_restore_js = generate_storage_restore_js(snapshot.storage)
+                    send_cmd(
+                        browser_ws,
+                        "Page.addScriptToEvaluateOnNewDocument",
+                        {"source": storage_restore_js},
+                        session_id=session_id,
+                    )
+
+            # Fail blocked resources fast (an attached tab may still carry another routine's list)
+            blocked_urls = []
+            if self.resource_blocking is not None:
+                own_urls = self._request_urls(plan, parameters_dict, url_rewriter)
+                blocked_urls = self.resource_blocking.blocked_urls(keep_urls=own_urls)
+            if blocked_urls or tab_id is not None or pooled is not None:
+                send_cmd(browser_ws, "Network.setBlockedURLs", {"urls": blocked_urls}, session_id=session_id)
+
+            # Install the routine JS helper library in every document this tab loads
+            send_cmd(
+                browser_ws,
+                "Page.addScriptToEvaluateOnNewDocument",
+                {"source": generate_runtime_library_js()},
+                session_id=session_id,
+            )
+
+            # Open connections to the routine's other origins while its first page loads
+            # (a new tab's first page is on one of them, so a single origin needs no hint there)
+            preconnect_js = None
+            preconnect_origins = request_origins if options.preconnect else {}
+            if len(preconnect_origins) > 1 or (preconnect_origins and (tab_id is not None or pooled is not None)):
+                preconnect_js = generate_preconnect_js(preconnect_origins)
+                send_cmd(
+                    browser_ws, "Page.addScriptToEvaluateOnNewDocument", {"source": preconnect_js}, session_id=session_id,
+                )
+
+            # An existing tab may already sit on the right origin (fetches then skip the bootstrap navigation)
+            current_url = "about:blank"
+            if tab_id is not None or pooled is not None:
+                current_url = evaluate(session_id, "window.location.href") or "about:blank"
+                for script in (storage_restore_js, preconnect_js):
+                    if script is not None and current_url != "about:blank":
+                        send_cmd(browser_ws, "Runtime.evaluate", {"expression": script}, session_id=session_id)
+
+            # Create execution context (tracing wraps the CDP helpers to attribute commands to operations)
+            def context_send_cmd(method: str, params: dict | None = None, **kwargs) -> int:
+                return send_cmd(browser_ws, method, params, **kwargs)
+
+            def context_recv_until(predicate: Callable[[dict], bool], deadline: float) -> dict:
+                return recv_until(browser_ws, predicate, deadline)
+
+            tracer = ExecutionTracer() if options.trace else None
+            if tracer is not None:
+                context_send_cmd = tracer.wrap_send_cmd(context_send_cmd)
+                context_recv_until = tracer.wrap_recv_until(context_recv_until)
             routine_execution_context = RoutineExecutionContext(
                 session_id=session_id,
                 ws=browser_ws,
-                send_cmd=lambda method, params=None, **kwargs: send_cmd(browser_ws, method, params, **kwargs),
-                recv_until=lambda predicate, deadline: recv_until(browser_ws, predicate, deadline),
+                send_cmd=context_send_cmd,
+                recv_until=context_recv_until,
                 parameters_dict=parameters_dict,
                 timeout=timeout,
+                current_url=current_url,
+                url_rewriter=url_rewriter,
+                origin_bootstrap=self.origin_bootstrap,
+                wait_tuner=options.wait_policy.wait_seconds if options.wait_policy is not None else None,
+                compress_transfers=options.compress_transfers,
+                download_target=options.download_target,
+                tracer=tracer,
             )
-
-            # Execute operations
-            logger.info(f"Executing routine '{self.name}' with {len(self.operations)} operations")
-            for i, operation in enumerate(self.operations):
-                logger.info(
-                    f"Executing operation {i+1}/{len(self.operations)}: {type(operation).__name__}"
-                )
-                operation.execute(routine_execution_context)
-
-            # Try to parse string results as JSON or Python literals (skip for base64)
-            result = routine_execution_context.result
-            if isinstance(result.data, str) and not result.is_base64:
-                try:
-                    result.data = json.loads(result.data)
-                except Exception:
+            result = run(routine_execution_context)
+
+            # Keep the session for the next run on these origins, unless it was rejected
+            if session_state is not None and request_origins:
+                results = result if isinstance(result, list) else [result]
+                rejected_status = session_state.should_invalidate(results)
+                if rejected_status is not None:
+                    logger.info(f"Dropping session state of routine '{self.name}' (got {rejected_status})")
+                    session_state.invalidate(request_origins)
+                elif any(r.ok for r in results):
                     try:
-                        result_literal = ast.literal_eval(result.data)
-                        if isinstance(result_literal, (dict, list)):
-                            result.data = result_literal
-                    except Exception:
-                        pass  # Keep as string if both fail
-
-            return routine_execution_context.result
+                        cookies_id = send_cmd(
+                            browser_ws,
+                            "Network.getCookies",
+                            {"urls": [f"{origin}/" for origin in request_origins]},
+                            session_id=session_id,
+                        )
+                        reply = recv_until(browser_ws, lambda m: m.get("id") == cookies_id, time.time() + timeout)
+                        storage = dict(snapshot.storage) if snapshot is not None else {}
+                        page_storage = evaluate(session_id, generate_storage_snapshot_js(self._session_storage_keys()))
+                        if isinstance(page_storage, dict) and page_storage.get("origin") not in (None, "null"):
+                            storage[page_storage["origin"]] = {
+                                "localStorage": page_storage.get("localStorage") or {},
+                                "sessionStorage": page_storage.get("sessionStorage") or {},
+                            }
+                        session_state.put(request_origins, (reply.get("result") or {}).get("cookies") or [], storage)
+                    except Exception as e:
+                        logger.warning(f"Failed to capture session state of routine '{self.name}': {e}")
+
+            if tab_reuse == TabReusePolicy.POOL:
+                # Hygiene: drop routine-scoped state so the next run starts clean
+                href = evaluate(session_id, generate_tab_hygiene_js(self._session_storage_keys()))
+                if pooled is None:
+                    pooled = PooledTab(target_id=target_id, browser_context_id=browser_context_id, incognito=self.incognito)
+                pooled.current_url = href or routine_execution_context.current_url
+                return_to_pool = True
+            return result
 
         except Exception as e:
-            return RoutineExecutionResult(
-                ok=False,
-                error=f"Routine execution failed: {e}",
-            )
+            return on_error(f"Routine execution failed: {e}")
 
         finally:
             try:
-                if close_tab_when_done:
+                close_tab = tab_reuse == TabReusePolicy.CLOSE or (
+                    tab_reuse == TabReusePolicy.POOL and not return_to_pool and tab_id is None
+                )
+                if close_tab:
                     send_cmd(browser_ws, "Target.closeTarget", {"targetId": target_id})
                     if browser_context_id and self.incognito:
                         dispose_context(remote_debugging_address, browser_context_id)
@@ -295,5 +689,7 @@ class Routine(BaseModel):
                 browser_ws.close()
             except Exception:
                 pass
+            if return_to_pool and tab_id is None:
+                tab_pool.release(pooled)
 
 
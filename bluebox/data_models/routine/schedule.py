@@ -0,0 +1,178 @@
+"""
+bluebox/data_models/routine/schedule.py
+
+Dependency-aware scheduling of routine operations.
+
+Contains:
+- OperationDependencies: Storage keys an operation reads and writes, and whether it may run concurrently
+- get_operation_dependencies(): Derive an operation's dependencies from its type and placeholders
+- build_execution_waves(): Group operations into waves of mutually independent operations
+- execute_operations(): Run operations wave by wave (fetch waves concurrently in page)
+
+Only fetch operations are reordered: navigate, click, return, etc. touch page state that cannot be
+analyzed statically and stay barriers in routine order. Between two barriers, a fetch depends on an
+earlier fetch when one writes a sessionStorage key the other reads or writes, or when their cookie
+accesses conflict. Credentialed fetches (credentials 'include' or 'same-origin', the default) both
+read cookies (sent with the request) and write them (any response may Set-Cookie); `{{cookie:...}}`
+placeholders read them. So only fetches with credentials 'omit' run concurrently with each other.
+"""
+
+import json
+from dataclasses import dataclass, field
+
+from bluebox.data_models.routine.endpoint import CREDENTIALS
+from bluebox.data_models.routine.execution import RoutineExecutionContext
+from bluebox.data_models.routine.operation import (
+    RoutineFetchOperation,
+    RoutineNavigateOperation,
+    RoutineOperation,
+)
+from bluebox.data_models.routine.placeholder import extract_placeholder_contents
+from bluebox.data_models.routine.plan import RoutinePlan
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+
+@dataclass(frozen=True)
+class OperationDependencies:
+    """What an operation reads and writes, as far as scheduling is concerned."""
+    concurrent: bool = False
+    reads: frozenset[str] = field(default_factory=frozenset)
+    writes: frozenset[str] = field(default_factory=frozenset)
+    reads_cookies: bool = False
+    writes_cookies: bool = False
+
+
+def get_operation_dependencies(operation: RoutineOperation) -> OperationDependencies:
+    """
+    Derive the scheduling dependencies of an operation.
+
+    Args:
+        operation: The operation.
+    Returns:
+        OperationDependencies; only fetch operations are concurrent.
+    """
+    if isinstance(operation, RoutineNavigateOperation):
+        return OperationDependencies(reads_cookies=True, writes_cookies=True)
+    if not isinstance(operation, RoutineFetchOperation):
+        return OperationDependencies()
+
+    reads: set[str] = set()
+    # credentialed requests send the page's cookies, and their responses may set new ones
+    credentialed = operation.endpoint.credentials != CREDENTIALS.OMIT
+    reads_cookies = credentialed
+    for content in extract_placeholder_contents(json.dumps(operation.endpoint.model_dump(mode="json"))):
+        source, sep, path = content.partition(":")
+        if not sep:
+            continue  # user or builtin parameter, resolved in Python
+        source = source.strip()
+        if source == "sessionStorage":
+            reads.add(path.strip().split(".", 1)[0])
+        elif source == "cookie":
+            reads_cookies = True
+
+    writes = frozenset({operation.session_storage_key}) if operation.session_storage_key else frozenset()
+    return OperationDependencies(
+        concurrent=True,
+        reads=frozenset(reads),
+        writes=writes,
+        reads_cookies=reads_cookies,
+        writes_cookies=credentialed,
+    )
+
+
+def _depends_on(later: OperationDependencies, earlier: OperationDependencies) -> bool:
+    """Whether `later` must run after `earlier` (both concurrent)."""
+    return bool(
+        later.reads_cookies and earlier.writes_cookies
+        or later.writes_cookies and (earlier.reads_cookies or earlier.writes_cookies)
+        or later.reads & earlier.writes
+        or later.writes & earlier.writes
+        or later.writes & earlier.reads
+    )
+
+
+def build_execution_waves(operations: list[RoutineOperation]) -> list[list[int]]:
+    """
+    Group operations into waves; operations in a wave are independent and run together.
+
+    Non-concurrent operations are single-operation waves in routine order. Each run of concurrent
+    operations between them is split into levels: an operation goes one wave after the latest
+    operation it depends on. Waves list operation indices in routine order.
+
+    Args:
+        operations: The routine's operations.
+    Returns:
+        List of waves (lists of operation indices); executing them in order respects all dependencies.
+    """
+    waves: list[list[int]] = []
+    run: list[tuple[int, OperationDependencies]] = []
+
+    def flush_run() -> None:
+        levels: list[int] = []
+        for position, (_, deps) in enumerate(run):
+            level = 0
+            for earlier_position in range(position):
+                if _depends_on(deps, run[earlier_position][1]):
+                    level = max(level, levels[earlier_position] + 1)
+            levels.append(level)
+        run_waves: list[list[int]] = [[] for _ in range(max(levels, default=-1) + 1)]
+        for (index, _), level in zip(run, levels):
+            run_waves[level].append(index)
+        waves.extend(run_waves)
+        run.clear()
+
+    for index, operation in enumerate(operations):
+        deps = get_operation_dependencies(operation)
+        if deps.concurrent:
+            run.append((index, deps))
+        else:
+            flush_run()
+            waves.append([index])
+    flush_run()
+    return waves
+
+
+def execute_operations(
+    operations: list[RoutineOperation],
+    plan: RoutinePlan,
+    routine_execution_context: RoutineExecutionContext,
+    parallel: bool = False,
+) -> None:
+    """
+    Execute a routine's operations, running independent fetches concurrently in page.
+
+    Operation metadata is appended in routine order regardless of the wave order.
+
+    Args:
+        operations: The routine's operations.
+        plan: The routine's compiled plan (one OperationPlan per operation).
+        routine_execution_context: Execution context.
+        parallel: Run independent fetches concurrently (False runs everything in routine order).
+    """
+    waves = build_execution_waves(operations) if parallel else [[i] for i in range(len(operations))]
+    metadata = routine_execution_context.result.operations_metadata
+    first = len(metadata)
+    executed: list[int] = []
+
+    for wave in waves:
+        logger.info(
+            "Executing operation%s %s/%d: %s",
+            "s" if len(wave) > 1 else "",
+            ", ".join(str(i + 1) for i in wave),
+            len(operations),
+            ", ".join(type(operations[i]).__name__ for i in wave),
+        )
+        if len(wave) > 1:
+            RoutineFetchOperation.execute_concurrently(
+                routine_execution_context,
+                [(operations[i], plan.operations[i]) for i in wave],
+            )
+        else:
+            operations[wave[0]].execute(routine_execution_context, plan=plan.operations[wave[0]])
+        executed.extend(wave)
+
+    # waves may run operations out of routine order; restore it for the metadata
+    if executed != sorted(executed) and len(metadata) - first == len(executed):
+        metadata[first:] = [entry for _, entry in sorted(zip(executed, metadata[first:]), key=lambda x: x[0])]
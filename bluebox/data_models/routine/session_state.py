@@ -0,0 +1,249 @@
+"""
+bluebox/data_models/routine/session_state.py
+
+Opt-in store of browser session state (cookies, web storage) carried across routine executions
+(see RoutineExecutionOptions.session_state).
+
+Contains:
+- SessionSnapshot: Cookies and local/session storage captured after a successful run
+- SessionStateStats: Restore/capture/invalidation counters
+- session_state_key(): Key of the state shared by executions on the same origins
+- auth_failure_status(): First 401/403 among the responses of a result
+- cookie_params(): CDP cookies (Network.getCookies) as Network.setCookies parameters
+- SessionStateStore: In-memory store with an optional on-disk tier and TTLs
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+from bluebox.data_models.routine.execution import RoutineExecutionResult
+from bluebox.utils.file_store_utils import JsonFileTier, StoreStats
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+# Lifetime of a snapshot (session cookies and tokens usually outlive this)
+DEFAULT_TTL_SECONDS = 1800.0
+
+# Response statuses that mean the restored session is no longer accepted
+DEFAULT_INVALIDATE_STATUSES = frozenset({401, 403})
+
+# Network.CookieParam fields copied from captured Network.Cookie objects
+_COOKIE_PARAM_FIELDS = (
+    "name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "priority", "sourceScheme", "sourcePort",
+    "partitionKey",
+)
+
+
+class SessionSnapshot(BaseModel):
+    """
+    Browser session state of a set of origins, captured after a successful run.
+    """
+    origins: list[str] = Field(default_factory=list, description="Origins the snapshot was captured for")
+    cookies: list[dict] = Field(default_factory=list, description="Cookies as returned by Network.getCookies")
+    storage: dict[str, dict[str, dict[str, str]]] = Field(
+        default_factory=dict,
+        description="Origin -> {'localStorage': {...}, 'sessionStorage': {...}}",
+    )
+    captured_at: float = Field(default_factory=time.time, description="Unix time of the capture")
+    expires_at: float = Field(default=0.0, description="Unix time after which the snapshot is not restored")
+
+
+@dataclass
+class SessionStateStats(StoreStats):
+    """Counters for a SessionStateStore."""
+    restores: int = 0
+    misses: int = 0
+    captures: int = 0
+    invalidations: int = 0
+    expirations: int = 0
+
+
+def session_state_key(origins: Iterable[str]) -> str:
+    """
+    Key of the session state for a set of origins.
+
+    Routines talking to the same origins share their state (the point is to reuse one routine's
+    login or bootstrap in the next), so the key ignores the routine itself.
+
+    Returns:
+        Hex SHA-256 digest.
+    """
+    canonical = json.dumps(sorted(set(origins)), separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def auth_failure_status(
+    results: RoutineExecutionResult | Iterable[RoutineExecutionResult],
+    statuses: Iterable[int] = DEFAULT_INVALIDATE_STATUSES,
+) -> int | None:
+    """
+    First response status in `statuses` recorded in the results' operation metadata.
+
+    Args:
+        results: An execution result, or the results of a batch.
+        statuses: Statuses that reject the session.
+    Returns:
+        The status, or None if no response was rejected.
+    """
+    statuses = set(statuses)
+    for result in [results] if isinstance(results, RoutineExecutionResult) else results:
+        for metadata in result.operations_metadata:
+            response = metadata.details.get("response") or {}
+            if response.get("status") in statuses:
+                return response["status"]
+            for status in (metadata.details.get("batch") or {}).get("statuses") or []:
+                if status in statuses:
+                    return status
+    return None
+
+
+def cookie_params(cookies: list[dict]) -> list[dict]:
+    """
+    Network.setCookies parameters for cookies captured with Network.getCookies.
+
+    Session cookies are restored as session cookies (no expires); already expired cookies are dropped.
+    """
+    now = time.time()
+    params = []
+    for cookie in cookies:
+        if not cookie.get("name") or "domain" not in cookie:
+            continue
+        expires = cookie.get("expires")
+        if not cookie.get("session") and isinstance(expires, (int, float)) and expires > 0:
+            if expires <= now:
+                continue
+            param = {"expires": expires}
+        else:
+            param = {}
+        param.update({field: cookie[field] for field in _COOKIE_PARAM_FIELDS if field in cookie})
+        params.append(param)
+    return params
+
+
+class SessionStateStore:
+    """
+    Session snapshots keyed by session_state_key() of a routine's origins.
+
+    After a successful run the executing routine captures its origins' cookies plus the web
+    storage of the page it ended on; the next execution on the same origins restores them before
+    its first operation, so it can skip a login or token bootstrap. A run that gets a 401/403
+    (invalidate_statuses) drops the snapshot instead. Snapshots live in memory and, if state_dir
+    is set, in one JSON file per key (they hold credentials: keep the directory private).
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        default_ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        state_dir: str | Path | None = None,
+        invalidate_statuses: Iterable[int] = DEFAULT_INVALIDATE_STATUSES,
+    ) -> None:
+        """
+        Args:
+            default_ttl_seconds: How long a snapshot is restored after its capture.
+            state_dir: Directory for the on-disk tier (None keeps snapshots in memory only).
+            invalidate_statuses: Response statuses that drop the snapshot of the origins.
+        """
+        if default_ttl_seconds <= 0:
+            raise ValueError("default_ttl_seconds must be positive")
+        self.default_ttl_seconds = default_ttl_seconds
+        self.state_dir = Path(state_dir) if state_dir is not None else None
+        self.invalidate_statuses = frozenset(invalidate_statuses)
+        self.stats = SessionStateStats()
+        self._snapshots: dict[str, SessionSnapshot] = {}
+        self._lock = threading.Lock()
+        self._disk = (
+            JsonFileTier(self.state_dir, "session state", private=True) if self.state_dir is not None else None
+        )
+
+    # Lookup _______________________________________________________________________________________________________________
+
+    def get(self, origins: Iterable[str]) -> SessionSnapshot | None:
+        """Unexpired snapshot for the origins, or None (counted as a miss)."""
+        key = session_state_key(origins)
+        now = time.time()
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None and self._disk is not None:
+                snapshot = self._disk.read(key, SessionSnapshot.model_validate_json)
+            if snapshot is not None and snapshot.expires_at <= now:
+                self._drop(key)
+                self.stats.expirations += 1
+                snapshot = None
+            if snapshot is None:
+                self.stats.misses += 1
+                return None
+            self._snapshots[key] = snapshot
+            self.stats.restores += 1
+            return snapshot.model_copy(deep=True)
+
+    def put(
+        self,
+        origins: Iterable[str],
+        cookies: list[dict],
+        storage: dict[str, dict[str, dict[str, str]]] | None = None,
+        ttl_seconds: float | None = None,
+    ) -> SessionSnapshot:
+        """
+        Store a snapshot for the origins (replacing the previous one).
+
+        Args:
+            origins: The routine's origins.
+            cookies: Cookies from Network.getCookies.
+            storage: Web storage by origin (see SessionSnapshot.storage).
+            ttl_seconds: Lifetime (default_ttl_seconds if None).
+        Returns:
+            The stored snapshot.
+        """
+        origins = sorted(set(origins))
+        now = time.time()
+        snapshot = SessionSnapshot(
+            origins=origins,
+            cookies=cookies,
+            storage=storage or {},
+            captured_at=now,
+            expires_at=now + (self.default_ttl_seconds if ttl_seconds is None else ttl_seconds),
+        )
+        key = session_state_key(origins)
+        with self._lock:
+            self._snapshots[key] = snapshot
+            if self._disk is not None:
+                self._disk.write(key, snapshot.model_dump_json())
+            self.stats.captures += 1
+        return snapshot
+
+    def should_invalidate(self, results: RoutineExecutionResult | Iterable[RoutineExecutionResult]) -> int | None:
+        """Status among invalidate_statuses that the results received, if any."""
+        return auth_failure_status(results, self.invalidate_statuses)
+
+    # Maintenance __________________________________________________________________________________________________________
+
+    def invalidate(self, origins: Iterable[str]) -> None:
+        """Drop the snapshot of the origins."""
+        key = session_state_key(origins)
+        with self._lock:
+            if self._drop(key):
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every snapshot (memory and disk)."""
+        with self._lock:
+            self._snapshots.clear()
+            if self._disk is not None:
+                self._disk.clear()
+
+    # Internals ____________________________________________________________________________________________________________
+
+    def _drop(self, key: str) -> bool:
+        dropped = self._snapshots.pop(key, None) is not None
+        if self._disk is not None:
+            dropped = self._disk.delete(key) or dropped
+        return dropped
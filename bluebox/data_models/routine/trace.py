@@ -0,0 +1,338 @@
+"""
+bluebox/data_models/routine/trace.py
+
+Per-operation execution tracing (see RoutineExecutionOptions.trace).
+
+Contains:
+- TraceSpan: A timed step inside an operation (CDP command, sleep, wait, in-page fetch)
+- OperationTrace: An operation's span tree plus CDP, byte and sleep counters
+- ExecutionTracer: Records traces by wrapping the context's send_cmd/recv_until
+- OperationTypeProfile: Aggregated counters for one operation type across runs
+- build_trace_profile(): Aggregate traced results per operation type
+- to_chrome_trace(): Export traced results as Chrome trace-event JSON (chrome://tracing, Perfetto)
+"""
+
+import json
+import statistics
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, Field
+
+if TYPE_CHECKING:
+    from bluebox.data_models.routine.execution import RoutineExecutionResult
+
+
+class TraceSpan(BaseModel):
+    """A timed step inside an operation."""
+    name: str = Field(description="What ran (CDP method, 'sleep', 'page_load', 'page_fetch', ...)")
+    category: str = Field(description="Span kind: 'cdp', 'sleep', 'wait' or 'page'")
+    start_seconds: float = Field(description="Start, relative to the start of the operation")
+    duration_seconds: float = Field(default=0.0, description="How long the step took")
+    args: dict = Field(default_factory=dict, description="Step-specific data (bytes, status, ...)")
+    children: list["TraceSpan"] = Field(default_factory=list, description="Nested steps")
+
+
+class OperationTrace(BaseModel):
+    """Span tree and counters recorded for one operation."""
+    started_at: float = Field(description="Wall-clock start of the operation (Unix seconds)")
+    cdp_commands: int = Field(default=0, description="CDP commands sent")
+    cdp_round_trip_seconds: float = Field(default=0.0, description="Summed send -> reply latency of the commands")
+    bytes_sent: int = Field(default=0, description="Serialized size of the commands sent")
+    bytes_received: int = Field(default=0, description="Serialized size of the replies and events received")
+    sleep_seconds: float = Field(default=0.0, description="Time spent in explicit sleeps")
+    page_fetch_seconds: float = Field(default=0.0, description="In-page fetch time reported by the page")
+    spans: list[TraceSpan] = Field(default_factory=list, description="Top-level spans, in start order")
+
+
+def _message_size(message: Any) -> int:
+    """Approximate wire size of a CDP message (its compact JSON)."""
+    try:
+        return len(json.dumps(message, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class ExecutionTracer:
+    """
+    Records an OperationTrace per operation of a routine run.
+
+    The tracer wraps the execution context's send_cmd/recv_until: each command becomes a 'cdp'
+    span of the operation that sent it, closed when its reply comes back (even if another
+    operation is active by then, as with concurrent fetches). Only messages returned by
+    recv_until are counted as received; events it skips internally are not.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        """
+        Args:
+            clock: Monotonic clock in seconds (injectable for tests).
+        """
+        self._clock = clock
+        self._current: OperationTrace | None = None
+        self._starts: dict[int, float] = {}  # id(trace) -> clock() at start
+        self._pending: dict[int, tuple[OperationTrace, TraceSpan, float]] = {}  # message id -> command span
+
+    @property
+    def current(self) -> OperationTrace | None:
+        """Trace of the operation currently running, if any."""
+        return self._current
+
+    def start_operation(self) -> OperationTrace:
+        """Start and activate the trace of a new operation."""
+        trace = OperationTrace(started_at=time.time())
+        self._starts[id(trace)] = self._clock()
+        self._current = trace
+        return trace
+
+    def activate(self, trace: OperationTrace | None) -> None:
+        """Make `trace` the one new spans are attributed to (None stops attributing)."""
+        self._current = trace
+
+    def _offset(self, trace: OperationTrace) -> float:
+        return self._clock() - self._starts.get(id(trace), self._clock())
+
+    # CDP instrumentation __________________________________________________________________________________________________
+
+    def wrap_send_cmd(self, send_cmd: Callable) -> Callable:
+        """Wrap a context send_cmd(method, params=None, **kwargs) to record command spans."""
+
+        def traced_send_cmd(method: str, params: dict | None = None, **kwargs: Any) -> int:
+            msg_id = send_cmd(method, params, **kwargs)
+            trace = self._current
+            if trace is not None:
+                size = _message_size({"id": msg_id, "method": method, "params": params or {}})
+                span = TraceSpan(
+                    name=method,
+                    category="cdp",
+                    start_seconds=self._offset(trace),
+                    args={"bytes_sent": size},
+                )
+                trace.spans.append(span)
+                trace.cdp_commands += 1
+                trace.bytes_sent += size
+                if isinstance(msg_id, int):
+                    self._pending[msg_id] = (trace, span, self._clock())
+            return msg_id
+
+        return traced_send_cmd
+
+    def wrap_recv_until(self, recv_until: Callable) -> Callable:
+        """Wrap a context recv_until(predicate, deadline) to record replies and received bytes."""
+
+        def traced_recv_until(predicate: Callable[[dict], bool], deadline: float) -> dict:
+            message = recv_until(predicate, deadline)
+            received_at = self._clock()
+            pending = self._pending.pop(message.get("id"), None) if isinstance(message, dict) else None
+            size = _message_size(message)
+            if pending is not None:
+                trace, span, sent_at = pending
+                span.duration_seconds = received_at - sent_at
+                span.args["bytes_received"] = size
+                if "error" in message:
+                    span.args["error"] = str(message["error"])
+                trace.cdp_round_trip_seconds += span.duration_seconds
+                trace.bytes_received += size
+            elif self._current is not None:
+                self._current.bytes_received += size
+            return message
+
+        return traced_recv_until
+
+    # Spans ________________________________________________________________________________________________________________
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[TraceSpan | None]:
+        """Record the enclosed block as a span of the current operation ('sleep' spans add to sleep_seconds)."""
+        trace = self._current
+        if trace is None:
+            yield None
+            return
+        span = TraceSpan(name=name, category=category, start_seconds=self._offset(trace), args=args)
+        trace.spans.append(span)
+        start = self._clock()
+        try:
+            yield span
+        finally:
+            span.duration_seconds = self._clock() - start
+            if category == "sleep":
+                trace.sleep_seconds += span.duration_seconds
+
+    def record_page_fetch(self, request: dict | None, response: dict | None) -> None:
+        """
+        Record the in-page fetch timing the runtime library returns in response["timing"].
+
+        The span nests under the Runtime.evaluate span that carried it (ending when its reply
+        arrived), with the headers/body phases and resource timing as its children and args.
+        """
+        trace = self._current
+        timing = (response or {}).get("timing")
+        if trace is None or not isinstance(timing, dict):
+            return
+        total = float(timing.get("totalMs") or 0.0) / 1000
+        headers = float(timing.get("headersMs") or 0.0) / 1000
+        parent = next(
+            (s for s in reversed(trace.spans) if s.name == "Runtime.evaluate" and "bytes_received" in s.args),
+            None,
+        )
+        end = parent.start_seconds + parent.duration_seconds if parent is not None else self._offset(trace)
+        start = max(parent.start_seconds if parent is not None else 0.0, end - total)
+        args = {key: value for key, value in timing.items() if key not in ("totalMs", "headersMs", "bodyMs")}
+        args["url"] = (request or {}).get("url")
+        args["status"] = (response or {}).get("status")
+        span = TraceSpan(
+            name="page_fetch",
+            category="page",
+            start_seconds=start,
+            duration_seconds=total,
+            args=args,
+            children=[
+                TraceSpan(name="headers", category="page", start_seconds=start, duration_seconds=headers),
+                TraceSpan(name="body", category="page", start_seconds=start + headers, duration_seconds=total - headers),
+            ],
+        )
+        (parent.children if parent is not None else trace.spans).append(span)
+        trace.page_fetch_seconds += total
+
+
+# Aggregation and export ___________________________________________________________________________________________________
+
+@dataclass
+class OperationTypeProfile:
+    """Counters for one operation type, summed over traced runs."""
+    count: int = 0
+    errors: int = 0
+    cdp_commands: int = 0
+    cdp_round_trip_seconds: float = 0.0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    sleep_seconds: float = 0.0
+    page_fetch_seconds: float = 0.0
+    durations: list[float] = field(default_factory=list, repr=False)
+
+    @property
+    def total_seconds(self) -> float:
+        """Summed duration."""
+        return sum(self.durations)
+
+    @property
+    def mean_seconds(self) -> float:
+        """Mean duration (0.0 without samples)."""
+        return statistics.fmean(self.durations) if self.durations else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Duration at percentile p in [0, 100] (nearest rank; 0.0 without samples)."""
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered) + 0.5) - 1))]
+
+    def to_dict(self) -> dict:
+        """Plain dict for logging/metrics (durations summarized)."""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.mean_seconds,
+            "p50_seconds": self.percentile(50),
+            "p95_seconds": self.percentile(95),
+            "max_seconds": max(self.durations, default=0.0),
+            "cdp_commands": self.cdp_commands,
+            "cdp_round_trip_seconds": self.cdp_round_trip_seconds,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "sleep_seconds": self.sleep_seconds,
+            "page_fetch_seconds": self.page_fetch_seconds,
+        }
+
+
+def build_trace_profile(results: list["RoutineExecutionResult"]) -> dict[str, OperationTypeProfile]:
+    """
+    Aggregate operation metadata per operation type across runs.
+
+    Metadata shared between results (the fan-out fetch of Routine.execute_batch) counts once.
+    Counters other than count/errors/durations only include traced operations.
+
+    Args:
+        results: Execution results, typically of runs with trace=True.
+    Returns:
+        Operation type -> OperationTypeProfile.
+    """
+    profiles: dict[str, OperationTypeProfile] = {}
+    seen: set[int] = set()
+    for result in results:
+        for metadata in result.operations_metadata:
+            if id(metadata) in seen:
+                continue
+            seen.add(id(metadata))
+            profile = profiles.setdefault(str(metadata.type), OperationTypeProfile())
+            profile.count += 1
+            profile.errors += metadata.error is not None
+            profile.durations.append(metadata.duration_seconds)
+            trace = metadata.trace
+            if trace is None:
+                continue
+            profile.cdp_commands += trace.cdp_commands
+            profile.cdp_round_trip_seconds += trace.cdp_round_trip_seconds
+            profile.bytes_sent += trace.bytes_sent
+            profile.bytes_received += trace.bytes_received
+            profile.sleep_seconds += trace.sleep_seconds
+            profile.page_fetch_seconds += trace.page_fetch_seconds
+    return profiles
+
+
+def _span_events(span: TraceSpan, origin_us: float, pid: int, tid: int) -> list[dict]:
+    events = [{
+        "name": span.name,
+        "cat": span.category,
+        "ph": "X",
+        "ts": origin_us + span.start_seconds * 1e6,
+        "dur": span.duration_seconds * 1e6,
+        "pid": pid,
+        "tid": tid,
+        "args": span.args,
+    }]
+    for child in span.children:
+        events.extend(_span_events(child, origin_us, pid, tid))
+    return events
+
+
+def to_chrome_trace(results: list["RoutineExecutionResult"]) -> dict:
+    """
+    Export results as Chrome trace-event JSON (load in chrome://tracing or ui.perfetto.dev).
+
+    Each result is a process ("run N") and each operation a thread of it, so concurrent fetches
+    get their own rows. Operations without a trace are left out.
+
+    Args:
+        results: Execution results, typically of runs with trace=True.
+    Returns:
+        {"traceEvents": [...], "displayTimeUnit": "ms"}; json.dump it to a .json file.
+    """
+    events: list[dict] = []
+    for pid, result in enumerate(results, start=1):
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"run {pid}"}})
+        for tid, metadata in enumerate(result.operations_metadata, start=1):
+            trace = metadata.trace
+            if trace is None:
+                continue
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                "args": {"name": f"{tid} {metadata.type}"},
+            })
+            args = trace.model_dump(exclude={"started_at", "spans"})
+            if "batch" in metadata.details:
+                args["batch"] = metadata.details["batch"]
+            if metadata.error is not None:
+                args["error"] = metadata.error
+            origin_us = trace.started_at * 1e6
+            events.append({
+                "name": str(metadata.type), "cat": "operation", "ph": "X", "ts": origin_us,
+                "dur": metadata.duration_seconds * 1e6, "pid": pid, "tid": tid, "args": args,
+            })
+            for span in trace.spans:
+                events.extend(_span_events(span, origin_us, pid, tid))
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -8,7 +8,7 @@ Contains:
 - Identifier: CSS/XPath/ID selectors for element targeting
 - KeyboardKey: Enum of keyboard keys (Enter, Tab, Escape, etc.)
 - MouseButton: Enum (left, right, middle)
-- ScrollBehavior, HTMLScope: Operation configuration enums
+- ScrollBehavior, HTMLScope, TypingMode: Operation configuration enums
 """
 
 from enum import StrEnum
@@ -326,6 +326,15 @@ class HTMLScope(StrEnum):
     ELEMENT = "element"
 
 
+class TypingMode(StrEnum):
+    """
+    How input_text operations enter their text.
+    """
+    KEYS = "keys"                        # key events for every character (default)
+    INSERT = "insert"                    # one Input.insertText (input events only, no key events)
+    INSERT_THEN_KEY = "insert_then_key"  # insertText for all but the last character, key events for the last
+
+
 # Utility functions _______________________________________________________________________________
 
 def get_key_mapping(key_str: str) -> tuple[str, str]:
@@ -9,6 +9,7 @@ Data store for routine discovery with vectorstore support.
 Contains:
 - DiscoveryDataStore: Abstract base class for data access
 - LocalDiscoveryDataStore: File-based implementation with OpenAI vectorstores
+- CaptureDBDiscoveryDataStore: LocalDiscoveryDataStore reading CDP data from a SQLite CaptureDB
 - CDP data access: transactions, storage, window properties
 - Documentation/code vectorstore creation for agent context
 """
@@ -23,12 +24,22 @@ from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from threading import Event
+from typing import ClassVar, Iterable
 
 from openai import OpenAI
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
 
+from bluebox.cdp.capture_db import CaptureDB
 from bluebox.utils.data_utils import get_text_from_html
 from bluebox.utils.infra_utils import resolve_glob_patterns
+from bluebox.utils.jsonl_utils import (
+    IndexedJsonlReader,
+    JsonlIndexEntry,
+    iter_jsonl_lines,
+    jsonl_exists,
+    load_jsonl_index,
+    read_indexed_lines,
+)
 from bluebox.utils.logger import get_logger
 
 logger = get_logger(name=__name__)
@@ -137,6 +148,12 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
     # CDP captures vectorstore
     cdp_captures_vectorstore_id: str | None = None
     uploaded_transaction_ids: set[str] = Field(default_factory=set, exclude=True)
+    # transaction_id -> record location in network/events.jsonl (populated when the capture has an index;
+    # rebuilt from the index on first use by a store that did not process the capture itself)
+    transaction_locations: dict[str, JsonlIndexEntry] = Field(default_factory=dict, exclude=True)
+    _transaction_locations_loaded: bool = PrivateAttr(default=False)
+    # keeps capture segments mapped between full-transaction reads; closed by clean_up()
+    _capture_reader: IndexedJsonlReader | None = PrivateAttr(default=None)
 
     # documentation and code related fields (both go into same vectorstore)
     documentation_vectorstore_id: str | None = None
@@ -238,17 +255,7 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
         if self.cdp_captures_dir is None:
             raise ValueError("cdp_captures_dir is required for CDP captures vectorstore")
 
-        # Validate events.jsonl files exist
-        network_events_path = Path(self.cdp_captures_dir) / "network" / "events.jsonl"
-        storage_events_path = Path(self.cdp_captures_dir) / "storage" / "events.jsonl"
-        window_props_events_path = Path(self.cdp_captures_dir) / "window_properties" / "events.jsonl"
-
-        if not network_events_path.exists():
-            raise ValueError(f"Network events file not found: {network_events_path}")
-        if not storage_events_path.exists():
-            raise ValueError(f"Storage events file not found: {storage_events_path}")
-        if not window_props_events_path.exists():
-            raise ValueError(f"Window properties events file not found: {window_props_events_path}")
+        self._validate_cdp_captures()
 
         if self.cdp_captures_vectorstore_id is not None:
             raise ValueError(f"Vectorstore ID already exists: {self.cdp_captures_vectorstore_id}")
@@ -302,6 +309,19 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
 
         logger.info("CDP captures vectorstore created: %s", self.cdp_captures_vectorstore_id)
 
+    def _validate_cdp_captures(self) -> None:
+        """Raise ValueError if any of the capture sources read by the _process_* methods is missing."""
+        network_events_path = Path(self.cdp_captures_dir) / "network" / "events.jsonl"
+        storage_events_path = Path(self.cdp_captures_dir) / "storage" / "events.jsonl"
+        window_props_events_path = Path(self.cdp_captures_dir) / "window_properties" / "events.jsonl"
+
+        if not jsonl_exists(network_events_path):
+            raise ValueError(f"Network events file not found: {network_events_path}")
+        if not jsonl_exists(storage_events_path):
+            raise ValueError(f"Storage events file not found: {storage_events_path}")
+        if not jsonl_exists(window_props_events_path):
+            raise ValueError(f"Window properties events file not found: {window_props_events_path}")
+
     def _group_transaction_details(self, transaction_details: dict) -> dict:
         """
         Group flat transaction details into request/response structure.
@@ -359,56 +379,55 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
         Process network/events.jsonl into consolidated transactions.
 
         Steps:
-            1. Read JSONL file line by line
+            1. Read JSONL file line by line (via the sidecar index when it is complete)
             2. Generate transaction_id (timestamp_url)
             3. Group into request/response structure
-            4. Save individual tx files + consolidated JSON
+            4. Record index locations (or save individual tx files) + consolidated JSON
         """
-        network_events_path = Path(self.cdp_captures_dir) / "network" / "events.jsonl"
+        network_events_path = self._network_events_path()
         consolidated_transactions: dict[str, dict] = {}
 
         logger.info("Processing network events from: %s", network_events_path)
 
-        with open(network_events_path, mode="r", encoding="utf-8") as f:
-            for line in f:
-                if not line.strip():
-                    continue
+        # With a complete sidecar index, full transactions are later read back by seeking into the capture
+        # instead of being copied into one file per transaction
+        index = load_jsonl_index(network_events_path)
+        self._transaction_locations_loaded = True
+        if index is not None:
+            located_lines: Iterable[tuple[JsonlIndexEntry | None, str]] = (
+                (entry, line.decode("utf-8")) for entry, line in read_indexed_lines(network_events_path, index)
+            )
+        else:
+            located_lines = ((None, line) for line in iter_jsonl_lines(network_events_path))
+
+        for location, line in located_lines:
+            if not line.strip():
+                continue
 
-                try:
-                    # Parse the event (NetworkTransactionEvent format)
-                    transaction_details = json.loads(line)
+            try:
+                # Parse the event (NetworkTransactionEvent format)
+                transaction_details = json.loads(line)
 
-                    # Generate transaction_id (timestamp_url format)
-                    url = transaction_details.get('url', 'unknown')
-                    timestamp = transaction_details.get('timestamp', 0)
-                    safe_url = url.replace('/', '_').replace(':', '_')[:100]
-                    transaction_id = f"{timestamp}_{safe_url}"
+                transaction_id = self._transaction_id(transaction_details)
 
-                    # Group transaction details
-                    grouped_transaction = self._group_transaction_details(transaction_details)
+                # Group transaction details
+                grouped_transaction = self._group_transaction_details(transaction_details)
 
-                    # Save full transaction to individual file
+                # Keep the full transaction reachable: by index location, else as an individual file
+                if location is not None:
+                    self.transaction_locations[transaction_id] = location
+                else:
                     transaction_file_path = Path(self.network_transactions_dir) / f"{transaction_id}.json"
                     with open(transaction_file_path, mode="w", encoding="utf-8") as out_f:
                         json.dump(grouped_transaction, out_f, indent=1, ensure_ascii=False)
 
-                    # Create truncated version for consolidated file
-                    response_body = grouped_transaction['response']['body']
-                    if response_body and len(str(response_body)) > 1000:
-                        truncated_response = dict(grouped_transaction['response'])
-                        truncated_response['body'] = str(response_body)[:1000] + "...[truncated]"
-                        truncated_response['body_truncated'] = True
-                        consolidated_transactions[transaction_id] = {
-                            **grouped_transaction,
-                            'response': truncated_response,
-                        }
-                    else:
-                        consolidated_transactions[transaction_id] = grouped_transaction
-
-                except json.JSONDecodeError as e:
-                    logger.warning("Failed to parse network event line: %s", e)
-                except Exception as e:
-                    logger.error("Error processing network event: %s", e)
+                # Create truncated version for consolidated file
+                consolidated_transactions[transaction_id] = self._truncate_grouped_transaction(grouped_transaction)
+
+            except json.JSONDecodeError as e:
+                logger.warning("Failed to parse network event line: %s", e)
+            except Exception as e:
+                logger.error("Error processing network event: %s", e)
 
         # Write consolidated transactions file
         with open(self.consolidated_transactions_file_path, mode="w", encoding="utf-8") as f:
@@ -416,6 +435,72 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
 
         logger.info("Processed %d network transactions", len(consolidated_transactions))
 
+    @staticmethod
+    def _transaction_id(transaction_details: dict) -> str:
+        """Transaction id of a network event (timestamp_url format)."""
+        url = transaction_details.get('url', 'unknown')
+        timestamp = transaction_details.get('timestamp', 0)
+        safe_url = url.replace('/', '_').replace(':', '_')[:100]
+        return f"{timestamp}_{safe_url}"
+
+    def _network_events_path(self) -> Path:
+        """Base path of the network capture."""
+        return Path(self.cdp_captures_dir) / "network" / "events.jsonl"
+
+    def _get_transaction_locations(self) -> dict[str, JsonlIndexEntry]:
+        """
+        Index locations of the full transactions, rebuilt from the capture's sidecar index when this
+        store did not process the capture itself (e.g. it was reloaded over an existing tmp_dir).
+        """
+        if not self._transaction_locations_loaded and not self.transaction_locations and self.cdp_captures_dir:
+            index = load_jsonl_index(self._network_events_path())
+            for entry in index or []:
+                # same fields (and defaults) the id was generated from at processing time
+                routing_fields = {'url': entry.url, 'timestamp': entry.timestamp}
+                transaction_id = self._transaction_id({k: v for k, v in routing_fields.items() if v is not None})
+                self.transaction_locations[transaction_id] = entry
+        self._transaction_locations_loaded = True
+        return self.transaction_locations
+
+    def _read_full_transactions(self, transaction_ids: Iterable[str]) -> dict[str, dict]:
+        """
+        Full (untruncated) grouped transactions, read from the capture via the index in one batch,
+        else from the individual transaction files. Ids with neither are omitted.
+        """
+        locations = self._get_transaction_locations()
+        full_transactions: dict[str, dict] = {}
+        located: dict[JsonlIndexEntry, str] = {}
+        for transaction_id in transaction_ids:
+            location = locations.get(transaction_id)
+            if location is not None:
+                located[location] = transaction_id
+                continue
+            transaction_file_path = Path(self.network_transactions_dir) / f"{transaction_id}.json"
+            if transaction_file_path.exists():
+                with open(transaction_file_path, mode="r", encoding="utf-8") as f:
+                    full_transactions[transaction_id] = json.load(f)
+
+        if located:
+            if self._capture_reader is None:
+                self._capture_reader = IndexedJsonlReader(self._network_events_path())
+            for location, line in self._capture_reader.read_lines(located):
+                full_transactions[located[location]] = self._group_transaction_details(json.loads(line))
+        return full_transactions
+
+    @staticmethod
+    def _truncate_grouped_transaction(grouped_transaction: dict) -> dict:
+        """Consolidated-file version of a grouped transaction (response body cut to 1000 chars)."""
+        response_body = grouped_transaction['response']['body']
+        if response_body and len(str(response_body)) > 1000:
+            truncated_response = dict(grouped_transaction['response'])
+            truncated_response['body'] = str(response_body)[:1000] + "...[truncated]"
+            truncated_response['body_truncated'] = True
+            return {
+                **grouped_transaction,
+                'response': truncated_response,
+            }
+        return grouped_transaction
+
     def _process_storage_files(self) -> None:
         """
         Process storage/events.jsonl into consolidated storage items.
@@ -425,15 +510,14 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
 
         logger.info("Processing storage events from: %s", storage_events_path)
 
-        with open(storage_events_path, mode="r", encoding="utf-8") as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    storage_event = json.loads(line)
-                    consolidated_storage_items.append(storage_event)
-                except json.JSONDecodeError as e:
-                    logger.warning("Failed to parse storage event line: %s", e)
+        for line in iter_jsonl_lines(storage_events_path):
+            if not line.strip():
+                continue
+            try:
+                storage_event = json.loads(line)
+                consolidated_storage_items.append(storage_event)
+            except json.JSONDecodeError as e:
+                logger.warning("Failed to parse storage event line: %s", e)
 
         # Write consolidated storage file
         with open(self.consolidated_storage_items_file_path, mode="w", encoding="utf-8") as f:
@@ -450,15 +534,14 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
 
         logger.info("Processing window properties events from: %s", window_props_events_path)
 
-        with open(window_props_events_path, mode="r", encoding="utf-8") as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    window_prop_event = json.loads(line)
-                    consolidated_window_properties.append(window_prop_event)
-                except json.JSONDecodeError as e:
-                    logger.warning("Failed to parse window property event line: %s", e)
+        for line in iter_jsonl_lines(window_props_events_path):
+            if not line.strip():
+                continue
+            try:
+                window_prop_event = json.loads(line)
+                consolidated_window_properties.append(window_prop_event)
+            except json.JSONDecodeError as e:
+                logger.warning("Failed to parse window property event line: %s", e)
 
         # Write consolidated window properties file
         with open(self.consolidated_window_properties_file_path, mode="w", encoding="utf-8") as f:
@@ -503,16 +586,23 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
 
         transaction_details = consolidated_transactions[transaction_id]
 
-        # If body was truncated, load full version from individual file
+        # If body was truncated, load full version from the capture (via index) or the individual file
         if transaction_details.get('response', {}).get('body_truncated', False):
-            transaction_file_path = Path(self.network_transactions_dir) / f"{transaction_id}.json"
-            if transaction_file_path.exists():
-                with open(transaction_file_path, mode="r", encoding="utf-8") as f:
-                    transaction_details = json.load(f)
+            transaction_details = self._read_full_transactions([transaction_id]).get(
+                transaction_id, transaction_details,
+            )
 
         # Clean HTML response body if requested
+        if clean_response_body:
+            self._clean_html_response_body(transaction_details)
+
+        return transaction_details
+
+    @staticmethod
+    def _clean_html_response_body(transaction_details: dict) -> None:
+        """Replace an HTML response body with its text content, in place."""
         mime_type = transaction_details.get('response', {}).get('mime_type', '')
-        if clean_response_body and "html" in mime_type.lower():
+        if "html" in mime_type.lower():
             try:
                 response_body = transaction_details.get('response', {}).get('body', '')
                 if response_body:
@@ -520,8 +610,6 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
             except Exception as e:
                 logger.warning("Error cleaning response body (leaving as-is): %s", e)
 
-        return transaction_details
-
     def clean_up(self) -> None:
         """
         Clean up all data store resources (CDP captures and documentation vectorstores).
@@ -545,6 +633,10 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
                 logger.error("Failed to delete documentation vectorstore: %s", e)
             self.documentation_vectorstore_id = None
 
+        if self._capture_reader is not None:
+            self._capture_reader.close()
+            self._capture_reader = None
+
         # Clean up processed temporary files
         if self.tmp_dir and Path(self.tmp_dir).exists():
             try:
@@ -659,7 +751,10 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
         Returns:
             The timestamp of the transaction.
         """
-        # Try to read from individual transaction file first
+        # Try the capture index, then the individual transaction file
+        location = self._get_transaction_locations().get(transaction_id)
+        if location is not None and location.timestamp is not None:
+            return float(location.timestamp)
         if self.network_transactions_dir:
             transaction_file_path = Path(self.network_transactions_dir) / f"{transaction_id}.json"
             if transaction_file_path.exists():
@@ -699,14 +794,22 @@ class LocalDiscoveryDataStore(DiscoveryDataStore):
             key=lambda x: float(x.split('_')[0]) if x.split('_')[0].replace('.', '').isdigit() else 0
         )
 
+        # Check timestamp constraint
+        if max_timestamp is not None:
+            for position, transaction_id in enumerate(all_transaction_ids):
+                if float(consolidated_transactions[transaction_id].get('timestamp', 0)) > max_timestamp:
+                    all_transaction_ids = all_transaction_ids[:position]
+                    break
+
+        # Load the full versions of truncated bodies in one batch
+        full_transactions = self._read_full_transactions(
+            transaction_id for transaction_id in all_transaction_ids
+            if consolidated_transactions[transaction_id].get('response', {}).get('body_truncated', False)
+        )
+
         results: list[str] = []
         for transaction_id in all_transaction_ids:
-            transaction_details = self.get_transaction_by_id(transaction_id)
-
-            # Check timestamp constraint
-            timestamp = transaction_details.get('timestamp', 0)
-            if max_timestamp is not None and float(timestamp) > max_timestamp:
-                break
+            transaction_details = full_transactions.get(transaction_id, consolidated_transactions[transaction_id])
 
             # Check if value is in response body
             response_body = transaction_details.get('response', {}).get('body')
@@ -940,3 +1043,156 @@ Contains browser session data captured via Chrome DevTools Protocol:
             return ""
 
         return "# Available Data Stores\n\n" + "\n\n".join(prompts)
+
+
+class CaptureDBDiscoveryDataStore(LocalDiscoveryDataStore):
+    """
+    LocalDiscoveryDataStore that reads CDP data from a SQLite CaptureDB instead of processed JSONL files.
+
+    Transaction lookups, URL filters and value scans are answered by the database (response body
+    scans use its FTS5 index), so they work without processing the capture first. The consolidated
+    files uploaded to the CDP captures vectorstore are exported from the database.
+    Only non-JavaScript transactions are visible, mirroring network/events.jsonl.
+    """
+
+    # SQLite capture database; defaults to <cdp_captures_dir>/capture.db, built from the JSONL capture if missing
+    capture_db_path: str | None = None
+
+    _capture_db: CaptureDB | None = PrivateAttr(default=None)
+
+    # latest row per transaction id (consolidated transactions keep the last event for duplicate ids)
+    _LATEST_TRANSACTIONS: ClassVar[str] = (
+        "is_javascript = 0 AND id IN (SELECT MAX(id) FROM transactions WHERE is_javascript = 0 GROUP BY transaction_id)"
+    )
+
+    @model_validator(mode='after')
+    def setup_capture_db(self) -> CaptureDBDiscoveryDataStore:
+        """Open the capture database, importing the JSONL capture into it if it does not exist yet."""
+        if self.capture_db_path is None:
+            if self.cdp_captures_dir is None:
+                raise ValueError("capture_db_path or cdp_captures_dir is required")
+            self.capture_db_path = str(Path(self.cdp_captures_dir) / "capture.db")
+
+        if Path(self.capture_db_path).exists():
+            self._capture_db = CaptureDB(self.capture_db_path)
+        elif self.cdp_captures_dir is not None:
+            self._capture_db = CaptureDB.from_capture_dir(self.cdp_captures_dir, db_path=self.capture_db_path)
+        else:
+            raise ValueError(f"Capture database does not exist: {self.capture_db_path}")
+        return self
+
+    @property
+    def capture_db(self) -> CaptureDB:
+        """The open capture database."""
+        if self._capture_db is None:
+            raise ValueError("Capture database is not open")
+        return self._capture_db
+
+    def _validate_cdp_captures(self) -> None:
+        """Nothing to check: the capture database is opened (or built) at construction."""
+
+    def _process_network_transaction_files(self) -> None:
+        """Export consolidated transactions from the capture database (full bodies stay in the database)."""
+        consolidated_transactions: dict[str, dict] = {}
+        for row in self.capture_db.iter_query(
+            "SELECT transaction_id, response_body, data FROM transactions WHERE is_javascript = 0 ORDER BY id"
+        ):
+            grouped_transaction = self._group_transaction_details(CaptureDB.transaction_from_row(row))
+            consolidated_transactions[row["transaction_id"]] = self._truncate_grouped_transaction(grouped_transaction)
+
+        with open(self.consolidated_transactions_file_path, mode="w", encoding="utf-8") as f:
+            json.dump(consolidated_transactions, f, indent=1, ensure_ascii=False)
+
+        logger.info("Processed %d network transactions", len(consolidated_transactions))
+
+    def _process_storage_files(self) -> None:
+        """Export consolidated storage items from the capture database."""
+        storage_items = self._load_events("storage_events")
+        with open(self.consolidated_storage_items_file_path, mode="w", encoding="utf-8") as f:
+            json.dump(storage_items, f, indent=1, ensure_ascii=False)
+
+        logger.info("Processed %d storage events", len(storage_items))
+
+    def _process_window_properties_files(self) -> None:
+        """Export consolidated window properties from the capture database."""
+        window_properties = self._load_events("window_properties")
+        with open(self.consolidated_window_properties_file_path, mode="w", encoding="utf-8") as f:
+            json.dump(window_properties, f, indent=1, ensure_ascii=False)
+
+        logger.info("Processed %d window property events", len(window_properties))
+
+    def _load_events(self, table: str) -> list[dict]:
+        """All events of a storage/window property table, in capture order."""
+        if table not in ("storage_events", "window_properties"):
+            raise ValueError(f"Unsupported table: {table}")
+        return [json.loads(row["data"]) for row in self.capture_db.iter_query(f"SELECT data FROM {table} ORDER BY id")]
+
+    def get_all_transaction_ids(self) -> list[str]:
+        """Get all transaction ids, in capture order."""
+        rows = self.capture_db.query(
+            "SELECT transaction_id FROM transactions WHERE is_javascript = 0 GROUP BY transaction_id ORDER BY MIN(id)"
+        )
+        return [row["transaction_id"] for row in rows]
+
+    def get_transaction_by_id(self, transaction_id: str, clean_response_body: bool = False) -> dict:
+        """
+        Get a transaction by id from the capture database.
+        Returns grouped structure: {timestamp, request_id, request{}, response{}} with the full response body.
+        """
+        rows = self.capture_db.query(
+            f"SELECT response_body, data FROM transactions WHERE {self._LATEST_TRANSACTIONS} AND transaction_id = ?",
+            [transaction_id],
+        )
+        if not rows:
+            raise ValueError(f"Transaction id not found: {transaction_id}")
+
+        transaction_details = self._group_transaction_details(CaptureDB.transaction_from_row(rows[0]))
+        if clean_response_body:
+            self._clean_html_response_body(transaction_details)
+        return transaction_details
+
+    def get_transaction_ids_by_request_url(self, request_url: str) -> list[str]:
+        """Get all transaction ids whose request url contains request_url."""
+        rows = self.capture_db.query(
+            f"SELECT transaction_id FROM transactions WHERE {self._LATEST_TRANSACTIONS} AND instr(url, ?) > 0 "
+            "ORDER BY id",
+            [request_url],
+        )
+        return [row["transaction_id"] for row in rows]
+
+    def get_transaction_timestamp(self, transaction_id: str) -> float:
+        """Get the timestamp of a transaction (falls back to parsing the transaction id)."""
+        rows = self.capture_db.query(
+            f"SELECT timestamp FROM transactions WHERE {self._LATEST_TRANSACTIONS} AND transaction_id = ?",
+            [transaction_id],
+        )
+        if rows:
+            return float(rows[0]["timestamp"])
+        return super().get_transaction_timestamp(transaction_id)
+
+    def scan_transaction_responses(self, value: str, max_timestamp: float | None = None) -> list[str]:
+        """
+        Scan the network transaction responses for a value, using the database's body index.
+
+        Args:
+            value: The value to scan for in the network transaction responses.
+            max_timestamp: latest timestamp to scan for.
+        Returns:
+            A list of transaction ids that contain the value in the response body, by ascending timestamp.
+        """
+        clause, params = self.capture_db.body_match_clause(value, case_sensitive=True)
+        where = f"{self._LATEST_TRANSACTIONS} AND ({clause})"
+        if max_timestamp is not None:
+            where += " AND timestamp <= ?"
+            params.append(max_timestamp)
+
+        rows = self.capture_db.query(f"SELECT transaction_id FROM transactions WHERE {where} ORDER BY timestamp, id", params)
+        return [row["transaction_id"] for row in rows]
+
+    def scan_storage_for_value(self, value: str) -> list[str]:
+        """Scan the storage events for a value; returns matching items as JSON strings."""
+        return [json.dumps(item) for item in self._load_events("storage_events") if value in str(item)]
+
+    def scan_window_properties_for_value(self, value: str) -> list[dict]:
+        """Scan the window property events for a value."""
+        return [prop for prop in self._load_events("window_properties") if value in str(prop)]
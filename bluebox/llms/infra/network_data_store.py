@@ -7,7 +7,8 @@ bluebox/llms/infra/network_data_store.py
 Data store for network traffic analysis.
 
 Parses JSONL files with NetworkTransactionEvent entries and provides
-structured access to network traffic data.
+structured access to network traffic data. CaptureDBNetworkDataStore answers
+the same queries from a SQLite capture database (bluebox.cdp.capture_db).
 """
 
 import fnmatch
@@ -15,9 +16,10 @@ import json
 from collections import Counter
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 from urllib.parse import urlparse
 
+from bluebox.cdp.capture_db import CaptureDB
 from bluebox.constants.network import (
     API_KEY_TERMS,
     API_VERSION_PATTERN,
@@ -28,6 +30,7 @@ from bluebox.constants.network import (
 )
 from bluebox.data_models.cdp import NetworkTransactionEvent
 from bluebox.utils.data_utils import extract_object_schema
+from bluebox.utils.jsonl_utils import iter_jsonl_lines, jsonl_exists, load_jsonl_index, read_indexed_lines
 from bluebox.utils.logger import get_logger
 
 
@@ -125,7 +128,22 @@ class NetworkDataStore:
 
         Only includes HTML and JSON responses, excludes JS, images, media, fonts.
         """
-        mime = entry.mime_type.lower()
+        is_relevant = NetworkDataStore._is_relevant_metadata(entry.mime_type, entry.url)
+        if is_relevant is not None:
+            return is_relevant
+
+        # Default: include if it has response body
+        return bool(entry.response_body)
+
+    @staticmethod
+    def _is_relevant_metadata(mime_type: str, url: str) -> bool | None:
+        """
+        Decide relevance from mime type and URL alone (both available in the capture index).
+
+        Returns:
+            True/False when decidable, None when the response body must be inspected.
+        """
+        mime = mime_type.lower()
 
         # Exclude known non-relevant types
         for prefix in EXCLUDED_MIME_PREFIXES:
@@ -138,12 +156,11 @@ class NetworkDataStore:
                 return True
 
         # Exclude by URL extension as fallback
-        url_lower = entry.url.lower().split("?")[0]
+        url_lower = url.lower().split("?")[0]
         if url_lower.endswith(SKIP_FILE_EXTENSIONS):
             return False
 
-        # Default: include if it has response body
-        return bool(entry.response_body)
+        return None
 
     def __init__(self, jsonl_path: str) -> None:
         """
@@ -151,33 +168,47 @@ class NetworkDataStore:
 
         Args:
             jsonl_path: Path to JSONL file containing NetworkTransactionEvent entries.
+                Rotated/compressed segments of the file (events.000001.jsonl.gz, ...) are read too,
+                and a complete sidecar index (events.index.jsonl) is used to skip irrelevant records.
         """
         self._entries: list[NetworkTransactionEvent] = []
         self._entry_index: dict[str, NetworkTransactionEvent] = {}  # request_id -> event
         self._stats: NetworkStats = NetworkStats()
 
-        path = Path(jsonl_path)
-        if not path.exists():
+        if not jsonl_exists(jsonl_path):
             raise ValueError(f"JSONL file does not exist: {jsonl_path}")
 
-        # Load entries from JSONL, filtering to only relevant entries
+        # Load entries from JSONL (all rotated segments), filtering to only relevant entries.
+        # With a sidecar index, records that are irrelevant by mime type/URL are never read or parsed.
         skipped = 0
-        with open(path, mode="r", encoding="utf-8") as f:
-            for line_num, line in enumerate(f):
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    data = json.loads(line)
-                    event = NetworkTransactionEvent.model_validate(data)
-                    if self._is_relevant_entry(event):
-                        self._entries.append(event)
-                        self._entry_index[event.request_id] = event
-                    else:
-                        skipped += 1
-                except (json.JSONDecodeError, ValueError) as e:
-                    logger.warning("Failed to parse line %d: %s", line_num + 1, e)
-                    continue
+        index = load_jsonl_index(jsonl_path)
+        if index is not None:
+            candidates = [
+                entry for entry in index
+                if self._is_relevant_metadata(entry.mime_type or "", entry.url or "") is not False
+            ]
+            skipped = len(index) - len(candidates)
+            lines: Iterable[str] = (
+                line.decode("utf-8") for _, line in read_indexed_lines(jsonl_path, candidates)
+            )
+        else:
+            lines = iter_jsonl_lines(jsonl_path)
+
+        for line_num, line in enumerate(lines):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+                event = NetworkTransactionEvent.model_validate(data)
+                if self._is_relevant_entry(event):
+                    self._entries.append(event)
+                    self._entry_index[event.request_id] = event
+                else:
+                    skipped += 1
+            except (json.JSONDecodeError, ValueError) as e:
+                logger.warning("Failed to parse line %d: %s", line_num + 1, e)
+                continue
 
         self._compute_stats()
 
@@ -211,23 +242,18 @@ class NetworkDataStore:
     @property
     def api_urls(self) -> list[str]:
         """URLs that are likely API endpoints, sorted alphabetically."""
-        matching_urls: set[str] = set()
+        return sorted({entry.url for entry in self._entries if self._is_api_url(entry.url)})
 
-        for entry in self._entries:
-            url_lower = entry.url.lower()
-
-            # Check for versioned API pattern (/v1/, /v2/, etc.)
-            if API_VERSION_PATTERN.search(entry.url):
-                matching_urls.add(entry.url)
-                continue
-
-            # Check for key terms in URL
-            for term in API_KEY_TERMS:
-                if term in url_lower:
-                    matching_urls.add(entry.url)
-                    break
+    @staticmethod
+    def _is_api_url(url: str) -> bool:
+        """Whether a URL looks like an API endpoint (versioned path or API key term)."""
+        # Check for versioned API pattern (/v1/, /v2/, etc.)
+        if API_VERSION_PATTERN.search(url):
+            return True
 
-        return sorted(matching_urls)
+        # Check for key terms in URL
+        url_lower = url.lower()
+        return any(term in url_lower for term in API_KEY_TERMS)
 
     def _compute_stats(self) -> None:
         """Compute aggregate statistics from entries."""
@@ -383,48 +409,54 @@ class NetworkDataStore:
         """
         results: list[dict[str, Any]] = []
         terms_lower = [t.lower() for t in terms]
-        num_terms = len(terms_lower)
 
-        if num_terms == 0:
+        if not terms_lower:
             return results
 
         for entry in self._entries:
             if not entry.response_body:
                 continue
 
-            content_lower = entry.response_body.lower()
-
-            # Count hits for each term
-            unique_terms_found = 0
-            total_hits = 0
-
-            for term in terms_lower:
-                count = content_lower.count(term)
-                if count > 0:
-                    unique_terms_found += 1
-                    total_hits += count
-
-            # Skip entries with no hits
-            if unique_terms_found == 0:
-                continue
-
-            # Calculate score: avg hits per term * unique terms
-            avg_hits = total_hits / num_terms
-            score = avg_hits * unique_terms_found
-
-            results.append({
-                "id": entry.request_id,
-                "url": entry.url,
-                "unique_terms_found": unique_terms_found,
-                "total_hits": total_hits,
-                "score": score,
-            })
+            result = self._score_terms(entry.request_id, entry.url, entry.response_body, terms_lower)
+            if result is not None:
+                results.append(result)
 
         # Sort by score descending
         results.sort(key=lambda x: x["score"], reverse=True)
 
         return results[:top_n]
 
+    @staticmethod
+    def _score_terms(request_id: str, url: str, response_body: str, terms_lower: list[str]) -> dict[str, Any] | None:
+        """Score one response body against lowercased search terms; None when no term is found."""
+        content_lower = response_body.lower()
+
+        # Count hits for each term
+        unique_terms_found = 0
+        total_hits = 0
+
+        for term in terms_lower:
+            count = content_lower.count(term)
+            if count > 0:
+                unique_terms_found += 1
+                total_hits += count
+
+        # Skip entries with no hits
+        if unique_terms_found == 0:
+            return None
+
+        # Calculate score: avg hits per term * unique terms
+        avg_hits = total_hits / len(terms_lower)
+        score = avg_hits * unique_terms_found
+
+        return {
+            "id": request_id,
+            "url": url,
+            "unique_terms_found": unique_terms_found,
+            "total_hits": total_hits,
+            "score": score,
+        }
+
     def get_host_stats(self, host_filter: str | None = None) -> list[dict[str, Any]]:
         """
         Get per-host summary statistics.
@@ -495,41 +527,53 @@ class NetworkDataStore:
         if not value:
             return results
 
-        search_value = value if case_sensitive else value.lower()
-
         for entry in self._entries:
             if not entry.response_body:
                 continue
 
-            content = entry.response_body if case_sensitive else entry.response_body.lower()
-            original_content = entry.response_body
+            result = self._match_body(entry.request_id, entry.url, entry.response_body, value, case_sensitive)
+            if result is not None:
+                results.append(result)
 
-            # Count occurrences
-            count = content.count(search_value)
-            if count == 0:
-                continue
+        return results
 
-            # Find first occurrence and extract context
-            pos = content.find(search_value)
-            context_start = max(0, pos - 50)
-            context_end = min(len(original_content), pos + len(value) + 50)
+    @staticmethod
+    def _match_body(
+        request_id: str,
+        url: str,
+        response_body: str,
+        value: str,
+        case_sensitive: bool,
+    ) -> dict[str, Any] | None:
+        """Count occurrences of value in one response body with a context sample; None when absent."""
+        search_value = value if case_sensitive else value.lower()
+        content = response_body if case_sensitive else response_body.lower()
+        original_content = response_body
 
-            sample = original_content[context_start:context_end]
+        # Count occurrences
+        count = content.count(search_value)
+        if count == 0:
+            return None
 
-            # Add ellipsis if truncated
-            if context_start > 0:
-                sample = "..." + sample
-            if context_end < len(original_content):
-                sample = sample + "..."
+        # Find first occurrence and extract context
+        pos = content.find(search_value)
+        context_start = max(0, pos - 50)
+        context_end = min(len(original_content), pos + len(value) + 50)
 
-            results.append({
-                "id": entry.request_id,
-                "url": entry.url,
-                "count": count,
-                "sample": sample,
-            })
+        sample = original_content[context_start:context_end]
 
-        return results
+        # Add ellipsis if truncated
+        if context_start > 0:
+            sample = "..." + sample
+        if context_end < len(original_content):
+            sample = sample + "..."
+
+        return {
+            "id": request_id,
+            "url": url,
+            "count": count,
+            "sample": sample,
+        }
 
     def get_response_body_schema(self, request_id: str) -> dict[str, Any] | None:
         """Get the schema of an entry's JSON response body."""
@@ -542,3 +586,295 @@ class NetworkDataStore:
             return extract_object_schema(data)
         except json.JSONDecodeError:
             return None
+
+
+class CaptureDBNetworkDataStore(NetworkDataStore):
+    """
+    NetworkDataStore backed by a CaptureDB instead of in-memory entries.
+
+    Queries run against SQLite: filters and aggregates are pushed into SQL, and body searches use the
+    FTS5 trigram index to pick candidate rows before the exact (shared) matching logic runs on them.
+    Only non-JavaScript transactions are visible, mirroring network/events.jsonl, and the same
+    relevance rules as the JSONL store apply. `entries` materializes every relevant entry; prefer
+    the query methods on large captures.
+    """
+
+    # relevant, non-JavaScript transactions (see _sql_is_relevant)
+    _RELEVANT_WHERE = "is_javascript = 0 AND bluebox_is_relevant(mime_type, url, length(response_body))"
+
+    def __init__(self, db: CaptureDB | str | Path) -> None:  # pylint: disable=super-init-not-called
+        """
+        Initialize the CaptureDBNetworkDataStore.
+
+        Args:
+            db: An open CaptureDB, or the path to an existing capture database.
+        """
+        if not isinstance(db, CaptureDB):
+            if not Path(db).exists():
+                raise ValueError(f"Capture database does not exist: {db}")
+            db = CaptureDB(db)
+        self._db = db
+        self._db.register_function("bluebox_is_relevant", 3, self._sql_is_relevant)
+
+        self._compute_stats()
+
+        total = self._db.query("SELECT COUNT(*) FROM transactions WHERE is_javascript = 0")[0][0]
+        logger.info(
+            "CaptureDBNetworkDataStore initialized with %d entries (skipped %d non-relevant)",
+            self._stats.total_requests,
+            total - self._stats.total_requests,
+        )
+
+    @staticmethod
+    def _sql_is_relevant(mime_type: str | None, url: str | None, body_length: int | None) -> int:
+        """SQL version of _is_relevant_entry (the body check only needs its length)."""
+        is_relevant = NetworkDataStore._is_relevant_metadata(mime_type or "", url or "")
+        if is_relevant is None:
+            is_relevant = bool(body_length)
+        return int(is_relevant)
+
+    def _query_entries(self, where: str = "1", params: list[Any] | None = None) -> Iterator[NetworkTransactionEvent]:
+        """Yield relevant entries matching an extra SQL condition, in capture order."""
+        rows = self._db.iter_query(
+            f"SELECT id, response_body, data FROM transactions WHERE {self._RELEVANT_WHERE} AND ({where}) ORDER BY id",
+            params or [],
+        )
+        for row in rows:
+            try:
+                yield NetworkTransactionEvent.model_validate(CaptureDB.transaction_from_row(row))
+            except ValueError as e:
+                logger.warning("Failed to parse transaction row %d: %s", row["id"], e)
+
+    @property
+    def entries(self) -> list[NetworkTransactionEvent]:
+        """Return all network transaction events (loaded from the database on each access)."""
+        return list(self._query_entries())
+
+    @property
+    def raw_data(self) -> dict[str, Any]:
+        """Return entries as a dict for compatibility."""
+        return {"entries": [e.model_dump() for e in self._query_entries()]}
+
+    @property
+    def url_counts(self) -> dict[str, int]:
+        """Mapping of each unique URL to its occurrence count."""
+        rows = self._db.query(
+            f"SELECT url, COUNT(*) AS n FROM transactions WHERE {self._RELEVANT_WHERE} "
+            "GROUP BY url ORDER BY n DESC, MIN(id)"
+        )
+        return {row["url"]: row["n"] for row in rows}
+
+    @property
+    def api_urls(self) -> list[str]:
+        """URLs that are likely API endpoints, sorted alphabetically."""
+        rows = self._db.query(f"SELECT DISTINCT url FROM transactions WHERE {self._RELEVANT_WHERE}")
+        return sorted(row["url"] for row in rows if self._is_api_url(row["url"]))
+
+    def _compute_stats(self) -> None:
+        """Compute aggregate statistics without loading response bodies."""
+        methods: Counter[str] = Counter()
+        status_codes: Counter[int] = Counter()
+        content_types: Counter[str] = Counter()
+        hosts: Counter[str] = Counter()
+        paths: set[str] = set()
+        urls: set[str] = set()
+
+        total_requests = 0
+        total_resp_bytes = 0
+
+        has_auth = False
+        has_json = False
+        has_form = False
+
+        rows = self._db.iter_query(
+            "SELECT method, status, host, path, url, mime_type, has_post_data, length(response_body) AS body_length, "
+            f"json_extract(data, '$.request_headers') AS request_headers FROM transactions WHERE {self._RELEVANT_WHERE}"
+        )
+        for row in rows:
+            total_requests += 1
+            methods[row["method"]] += 1
+            if row["status"]:
+                status_codes[row["status"]] += 1
+            hosts[row["host"]] += 1
+            paths.add(row["path"])
+            urls.add(row["url"])
+
+            if row["mime_type"]:
+                # Simplify mime type
+                ctype = row["mime_type"].split(";")[0].strip()
+                content_types[ctype] += 1
+
+            total_resp_bytes += row["body_length"] or 0
+
+            # Feature detection
+            req_headers = json.loads(row["request_headers"]) if row["request_headers"] else {}
+            if any(header in req_headers for header in AUTH_HEADERS):
+                has_auth = True
+
+            if row["has_post_data"]:
+                content_type = req_headers.get("content-type", "")
+                if "json" in content_type:
+                    has_json = True
+                if "form" in content_type:
+                    has_form = True
+
+        self._stats = NetworkStats(
+            total_requests=total_requests,
+            total_request_bytes=0,
+            total_response_bytes=total_resp_bytes,
+            total_time_ms=0.0,
+            methods=dict(methods),
+            status_codes=dict(status_codes),
+            content_types=dict(content_types),
+            hosts=dict(hosts),
+            unique_hosts=len(hosts),
+            unique_paths=len(paths),
+            unique_urls=len(urls),
+            has_cookies=False,
+            has_auth_headers=has_auth,
+            has_json_requests=has_json,
+            has_form_data=has_form,
+        )
+
+    def search_entries(
+        self,
+        method: str | None = None,
+        host_contains: str | None = None,
+        path_contains: str | None = None,
+        status_code: int | None = None,
+        content_type_contains: str | None = None,
+        has_post_data: bool | None = None,
+    ) -> list[NetworkTransactionEvent]:
+        """Search entries with filters (see NetworkDataStore.search_entries), evaluated in SQL."""
+        clauses: list[str] = []
+        params: list[Any] = []
+        if method:
+            clauses.append("upper(method) = ?")
+            params.append(method.upper())
+        if host_contains:
+            clauses.append("instr(lower(host), ?) > 0")
+            params.append(host_contains.lower())
+        if path_contains:
+            clauses.append("instr(lower(path), ?) > 0")
+            params.append(path_contains.lower())
+        if status_code is not None:
+            clauses.append("status = ?")
+            params.append(status_code)
+        if content_type_contains:
+            clauses.append("instr(lower(mime_type), ?) > 0")
+            params.append(content_type_contains.lower())
+        if has_post_data is not None:
+            clauses.append("has_post_data = ?")
+            params.append(int(has_post_data))
+
+        return list(self._query_entries(" AND ".join(clauses) or "1", params))
+
+    def get_entry(self, request_id: str) -> NetworkTransactionEvent | None:
+        """Get entry by request_id (the last one captured, as in the JSONL store)."""
+        rows = self._db.query(
+            f"SELECT MAX(id) FROM transactions WHERE {self._RELEVANT_WHERE} AND request_id = ?",
+            [request_id],
+        )
+        if rows[0][0] is None:
+            return None
+        return next(self._query_entries("id = ?", [rows[0][0]]), None)
+
+    def get_entry_ids_by_url_pattern(self, pattern: str) -> list[str]:
+        """Get all request_ids whose URLs match the given glob pattern."""
+        rows = self._db.query(f"SELECT request_id, url FROM transactions WHERE {self._RELEVANT_WHERE} ORDER BY id")
+        return [row["request_id"] for row in rows if fnmatch.fnmatch(row["url"], pattern)]
+
+    def search_entries_by_terms(
+        self,
+        terms: list[str],
+        top_n: int = 20,
+    ) -> list[dict[str, Any]]:
+        """Search entries by terms and rank by relevance (see NetworkDataStore.search_entries_by_terms)."""
+        results: list[dict[str, Any]] = []
+        terms_lower = [t.lower() for t in terms]
+
+        if not terms_lower:
+            return results
+
+        for row in self._iter_body_candidates([(term, False) for term in terms_lower]):
+            result = self._score_terms(row["request_id"], row["url"], row["response_body"], terms_lower)
+            if result is not None:
+                results.append(result)
+
+        # Sort by score descending
+        results.sort(key=lambda x: x["score"], reverse=True)
+
+        return results[:top_n]
+
+    def get_host_stats(self, host_filter: str | None = None) -> list[dict[str, Any]]:
+        """Get per-host summary statistics (see NetworkDataStore.get_host_stats), aggregated in SQL."""
+        where, params = self._RELEVANT_WHERE, []
+        if host_filter:
+            where += " AND instr(lower(host), ?) > 0"
+            params.append(host_filter.lower())
+
+        host_rows = self._db.query(
+            f"SELECT host, COUNT(*) AS n FROM transactions WHERE {where} GROUP BY host ORDER BY n DESC, MIN(id)",
+            params,
+        )
+        methods: dict[str, dict[str, int]] = {}
+        for row in self._db.query(
+            f"SELECT host, method, COUNT(*) AS n FROM transactions WHERE {where} GROUP BY host, method ORDER BY MIN(id)",
+            params,
+        ):
+            methods.setdefault(row["host"], {})[row["method"]] = row["n"]
+        status_codes: dict[str, dict[str, int]] = {}
+        for row in self._db.query(
+            f"SELECT host, status, COUNT(*) AS n FROM transactions WHERE {where} AND status "
+            "GROUP BY host, status ORDER BY MIN(id)",
+            params,
+        ):
+            status_codes.setdefault(row["host"], {})[str(row["status"])] = row["n"]
+
+        return [
+            {
+                "host": row["host"],
+                "request_count": row["n"],
+                "methods": methods.get(row["host"], {}),
+                "status_codes": status_codes.get(row["host"], {}),
+            }
+            for row in host_rows
+        ]
+
+    def search_response_bodies(
+        self,
+        value: str,
+        case_sensitive: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Search response bodies for a value (see NetworkDataStore.search_response_bodies), using the FTS index."""
+        results: list[dict[str, Any]] = []
+
+        if not value:
+            return results
+
+        for row in self._iter_body_candidates([(value, case_sensitive)]):
+            result = self._match_body(row["request_id"], row["url"], row["response_body"], value, case_sensitive)
+            if result is not None:
+                results.append(result)
+
+        return results
+
+    def _iter_body_candidates(self, needles: list[tuple[str, bool]]) -> Iterator[Any]:
+        """
+        Yield (request_id, url, response_body) rows whose body may contain any of the needles.
+
+        Args:
+            needles: (value, case_sensitive) pairs; rows matching any of them are returned.
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+        for value, case_sensitive in needles:
+            clause, clause_params = self._db.body_match_clause(value, case_sensitive)
+            clauses.append(f"({clause})")
+            params.extend(clause_params)
+
+        yield from self._db.iter_query(
+            "SELECT request_id, url, response_body FROM transactions "
+            f"WHERE {self._RELEVANT_WHERE} AND response_body != '' AND ({' OR '.join(clauses)}) ORDER BY id",
+            params,
+        )
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end routine latency with and without resource blocking.
+
+Runs a routine against a local Chrome, alternating between:
+    - unblocked: the routine as loaded (its resource_blocking removed)
+    - blocked:   the routine with a ResourceBlockingPolicy (its own, or every category)
+
+Each run opens a fresh tab, so page loads are not served from an already open document.
+
+Usage:
+    python -m bluebox.scripts.benchmark_resource_blocking --routine-path <path> [--parameters-dict '<json>'] [--runs 5]
+    python -m bluebox.scripts.benchmark_resource_blocking --routine-path <path> --categories image font media tracking
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from bluebox.data_models.routine.execution_options import RoutineExecutionOptions
+from bluebox.data_models.routine.resource_blocking import ResourceBlockingPolicy, ResourceCategory
+from bluebox.data_models.routine.routine import Routine
+from bluebox.utils.terminal_utils import CYAN, GREEN, print_colored
+
+DEFAULT_RUNS = 5
+
+
+def _run(routine: Routine, parameters: dict, remote_debugging_address: str, timeout: float) -> tuple[float, bool]:
+    """Execute the routine once in a new tab; returns (seconds, ok)."""
+    start = time.perf_counter()
+    result = routine.execute(
+        parameters_dict=parameters,
+        options=RoutineExecutionOptions(
+            remote_debugging_address=remote_debugging_address,
+            timeout=timeout,
+            close_tab_when_done=True,
+        ),
+    )
+    return time.perf_counter() - start, result.ok
+
+
+def main() -> None:
+    """Run the resource blocking benchmark against a local Chrome."""
+    parser = argparse.ArgumentParser(description="Benchmark routine latency with and without resource blocking")
+    parser.add_argument("--routine-path", type=str, required=True)
+    parser.add_argument("--parameters-path", type=str)
+    parser.add_argument("--parameters-dict", type=str)
+    parser.add_argument("--remote-debugging-address", type=str, default="http://127.0.0.1:9222")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Runs per mode")
+    parser.add_argument(
+        "--categories", type=str, nargs="+", choices=[c.value for c in ResourceCategory],
+        help="Categories to block (default: the routine's policy, else every category)",
+    )
+    parser.add_argument("--timeout", type=float, default=180.0)
+    args = parser.parse_args()
+
+    with open(args.routine_path, encoding="utf-8") as f:
+        routine = Routine.model_validate(json.load(f))
+    parameters: dict = {}
+    if args.parameters_path:
+        with open(args.parameters_path, encoding="utf-8") as f:
+            parameters = json.load(f)
+    elif args.parameters_dict:
+        parameters = json.loads(args.parameters_dict)
+
+    if args.categories:
+        policy = ResourceBlockingPolicy(categories=[ResourceCategory(c) for c in args.categories])
+    else:
+        policy = routine.resource_blocking or ResourceBlockingPolicy()
+    modes = {
+        "unblocked": routine.model_copy(update={"resource_blocking": None}),
+        "blocked": routine.model_copy(update={"resource_blocking": policy}),
+    }
+    print_colored(f"Blocking {len(policy.blocked_urls())} URL patterns ({', '.join(policy.categories)})", CYAN)
+
+    timings: dict[str, list[float]] = {mode: [] for mode in modes}
+    failures: dict[str, int] = {mode: 0 for mode in modes}
+    for run in range(args.runs):
+        # alternate modes so network/site drift affects both equally
+        for mode in (modes if run % 2 == 0 else reversed(modes)):
+            seconds, ok = _run(modes[mode], parameters, args.remote_debugging_address, args.timeout)
+            timings[mode].append(seconds)
+            failures[mode] += not ok
+            print(f"run {run + 1:>3} {mode:>10} {seconds:>8.2f}s {'ok' if ok else 'FAILED'}")
+
+    print_colored(f"{'mode':>10} {'median':>9} {'mean':>9} {'min':>9} {'max':>9} {'failed':>7}", CYAN)
+    for mode, values in timings.items():
+        print(
+            f"{mode:>10} {statistics.median(values):>8.2f}s {statistics.mean(values):>8.2f}s "
+            f"{min(values):>8.2f}s {max(values):>8.2f}s {failures[mode]:>7}"
+        )
+    speedup = statistics.median(timings["unblocked"]) / statistics.median(timings["blocked"])
+    print_colored(f"Median speedup with blocking: {speedup:.2f}x", GREEN)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark page -> Python transfer throughput for large routine results.
+
+Generates JSON-like strings of 1MB-100MB in a Chrome tab and reads them back with:
+    - sequential: one 256KB chunk request at a time (the previous return/download behaviour)
+    - pipelined:  adaptive chunk sizes with several chunk requests in flight
+    - gzip:       pipelined, gzip-compressed in page with CompressionStream
+
+Usage:
+    python -m bluebox.scripts.benchmark_transfer [--remote-debugging-address http://127.0.0.1:9222] [--sizes-mb 1 10 50 100]
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from bluebox.cdp.connection import cdp_new_tab
+from bluebox.utils.cdp_transfer_utils import DEFAULT_COMPRESS_MIN_SIZE, PageTransferReader, new_transfer_id
+from bluebox.utils.js_utils import generate_stage_transfer_js
+from bluebox.utils.terminal_utils import CYAN, GREEN, print_colored
+from bluebox.utils.web_socket_utils import recv_until, send_cmd
+
+DEFAULT_SIZES_MB = [1, 10, 50, 100]
+
+_SEQUENTIAL_CHUNK_CHARS = 256 * 1024
+
+
+def _generate_value_js(size_mb: int) -> str:
+    """JS that builds a ~size_mb JSON-like string in window.__bbBenchValue and returns its length."""
+    return f"""
+(() => {{
+    const rows = [];
+    let length = 0, i = 0;
+    while (length < {size_mb} * 1024 * 1024) {{
+        const row = JSON.stringify({{ id: i, name: 'item-' + i, price: (i * 7919) % 10007, tags: ['a', 'b'] }});
+        rows.push(row);
+        length += row.length + 1;
+        i++;
+    }}
+    window.__bbBenchValue = '[' + rows.join(',') + ']';
+    return window.__bbBenchValue.length;
+}})()
+"""
+
+
+def _run_mode(make_reader: Callable[[], PageTransferReader], compress: bool) -> tuple[float, int, dict]:
+    """Stage and read window.__bbBenchValue; returns (seconds, characters read, stats)."""
+    reader = make_reader()
+    start = time.perf_counter()
+    staged = reader.stage(generate_stage_transfer_js(
+        "window.__bbBenchValue", new_transfer_id(), compress=compress, compress_min_chars=DEFAULT_COMPRESS_MIN_SIZE,
+    ))
+    value = reader.read_text(staged)
+    return time.perf_counter() - start, len(value), reader.stats.to_dict()
+
+
+def main() -> None:
+    """Run the transfer benchmark against a local Chrome."""
+    parser = argparse.ArgumentParser(description="Benchmark page -> Python transfer throughput")
+    parser.add_argument("--remote-debugging-address", type=str, default="http://127.0.0.1:9222")
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=DEFAULT_SIZES_MB)
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for each CDP reply")
+    args = parser.parse_args()
+
+    target_id, _, browser_ws = cdp_new_tab(
+        remote_debugging_address=args.remote_debugging_address, incognito=False, url="about:blank"
+    )
+    try:
+        attach_id = send_cmd(browser_ws, "Target.attachToTarget", {"targetId": target_id, "flatten": True})
+        attach_reply = recv_until(browser_ws, lambda m: m.get("id") == attach_id, time.time() + args.timeout)
+        session_id = attach_reply["result"]["sessionId"]
+
+        def sender(method: str, params: dict | None = None, **kwargs) -> int:
+            return send_cmd(browser_ws, method, params, **kwargs)
+
+        def receiver(predicate: Callable[[dict], bool], deadline: float) -> dict:
+            return recv_until(browser_ws, predicate, deadline)
+
+        modes: dict[str, tuple[Callable[[], PageTransferReader], bool]] = {
+            "sequential": (lambda: PageTransferReader(
+                sender, receiver, session_id, args.timeout,
+                min_chunk_chars=_SEQUENTIAL_CHUNK_CHARS, max_chunk_chars=_SEQUENTIAL_CHUNK_CHARS, max_in_flight=1,
+            ), False),
+            "pipelined": (lambda: PageTransferReader(sender, receiver, session_id, args.timeout), False),
+            "gzip": (lambda: PageTransferReader(sender, receiver, session_id, args.timeout), True),
+        }
+
+        print_colored(f"{'size':>8} {'mode':>12} {'seconds':>9} {'MB/s':>9} {'chunks':>7} {'max chunk':>10}", CYAN)
+        for size_mb in args.sizes_mb:
+            eval_id = sender("Runtime.evaluate", {"expression": _generate_value_js(size_mb), "returnByValue": True},
+                             session_id=session_id)
+            length = receiver(lambda m: m.get("id") == eval_id, time.time() + args.timeout)["result"]["result"]["value"]
+            for mode, (make_reader, compress) in modes.items():
+                seconds, read_chars, stats = _run_mode(make_reader, compress)
+                if read_chars != length:
+                    raise RuntimeError(f"{mode}: read {read_chars} characters, expected {length}")
+                print(
+                    f"{size_mb:>6}MB {mode:>12} {seconds:>9.2f} {length / 1024 / 1024 / seconds:>9.1f} "
+                    f"{stats['chunks']:>7} {stats['max_chunk_chars']:>10}"
+                )
+        print_colored("Done.", GREEN)
+    finally:
+        try:
+            send_cmd(browser_ws, "Target.closeTarget", {"targetId": target_id})
+        except Exception:
+            pass
+        browser_ws.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -215,6 +215,12 @@ async def async_main(args: argparse.Namespace, tab_id: str | None) -> None:
         except Exception as e:
             logger.warning(f"Could not finalize session: {e}")
 
+        # Flush buffered events and close the event files
+        try:
+            writer.close()
+        except Exception as e:
+            logger.warning(f"Could not flush event files: {e}")
+
         # Dispose browser context if we created one
         if created_tab and context_id:
             try:
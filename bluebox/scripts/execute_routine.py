@@ -4,6 +4,8 @@ Execute a routine from the command line.
 Usage:
     bluebox-execute --routine-path <path> --parameters-path <path> [--output <path>] [--download-dir <dir>] [--keep-open]
     bluebox-execute --routine-path <path> --parameters-dict '<json>' [--output <path>] [--download-dir <dir>] [--keep-open]
+    bluebox-execute ... --replay-capture <cdp_captures/network/events.jsonl> [--replay-latency <seconds>]
+    bluebox-execute ... --compress-transfers
 
 Examples:
     bluebox-execute --routine-path example_data/example_routines/amtrak_one_way_train_search_routine.json --parameters-path example_data/example_routines/amtrak_one_way_train_search_input.json
@@ -11,10 +13,13 @@ Examples:
 """
 
 import argparse
+import contextlib
 import json
 import os
 
+from bluebox.cdp.replay_server import ReplayServer
 from bluebox.data_models.routine.execution import RoutineExecutionResult
+from bluebox.data_models.routine.execution_options import RoutineExecutionOptions
 from bluebox.data_models.routine.routine import Routine
 from bluebox.utils.data_utils import save_data_to_file, write_json_file
 from bluebox.utils.logger import get_logger
@@ -33,10 +38,12 @@ def save_result(
     Args:
         result: The routine execution result.
         output_path: Path to save the full RoutineExecutionResult as JSON.
-        download_dir: Directory to save data file when result.filename is present.
+        download_dir: Directory to save data file when result.filename is present (and was not streamed).
     """
-    # Save data to filename if present
-    if result.filename:
+    # Save data to filename if present (streamed downloads are already on disk)
+    if result.file_path:
+        logger.info(f"Download saved to: {result.file_path} ({result.size_bytes} bytes)")
+    elif result.filename:
         if download_dir and not os.path.isabs(result.filename):
             file_path = os.path.join(download_dir, result.filename)
         else:
@@ -58,6 +65,9 @@ def main(
     output: str | None = None,
     download_dir: str | None = None,
     keep_open: bool = False,
+    replay_capture: str | None = None,
+    replay_latency: float = 0.0,
+    compress_transfers: bool = False,
 ) -> None:
     """Execute a routine with given parameters."""
     # Parse CLI arguments if not called programmatically
@@ -67,8 +77,21 @@ def main(
         parser.add_argument("--parameters-path", type=str)
         parser.add_argument("--parameters-dict", type=str)
         parser.add_argument("--output", type=str, help="Save full RoutineExecutionResult as JSON")
-        parser.add_argument("--download-dir", type=str, help="Directory for downloaded files")
-        parser.add_argument("--keep-open", action="store_true", help="Keep the browser tab open after execution (default: False)")
+        parser.add_argument(
+            "--download-dir", type=str, help="Directory downloads are streamed to (default: current directory)",
+        )
+        parser.add_argument(
+            "--keep-open", action="store_true", help="Keep the browser tab open after execution (default: False)",
+        )
+        parser.add_argument(
+            "--replay-capture", type=str, help="Serve responses from this network capture instead of the live site",
+        )
+        parser.add_argument(
+            "--replay-latency", type=float, default=0.0, help="Latency (seconds) added to replayed responses",
+        )
+        parser.add_argument(
+            "--compress-transfers", action="store_true", help="Gzip large results in the browser before transferring them",
+        )
         args = parser.parse_args()
         routine_path = args.routine_path
         parameters_path = args.parameters_path
@@ -76,6 +99,9 @@ def main(
         output = args.output
         download_dir = args.download_dir
         keep_open = args.keep_open
+        replay_capture = args.replay_capture
+        replay_latency = args.replay_latency
+        compress_transfers = args.compress_transfers
     
     # Validate parameters
     if parameters_path and parameters_dict:
@@ -95,11 +121,22 @@ def main(
         routine = Routine(**json.load(f))
     
     try:
-        result = routine.execute(
-            parameters_dict=params,
-            timeout=60.0,
-            close_tab_when_done=not keep_open,
-        )
+        with contextlib.ExitStack() as stack:
+            replay_server = None
+            if replay_capture:
+                replay_server = stack.enter_context(ReplayServer(replay_capture, latency_seconds=replay_latency))
+            result = routine.execute(
+                parameters_dict=params,
+                options=RoutineExecutionOptions(
+                    timeout=60.0,
+                    close_tab_when_done=not keep_open,
+                    url_rewriter=replay_server.rewrite_url if replay_server else None,
+                    compress_transfers=compress_transfers,
+                    download_target=download_dir or os.getcwd(),
+                ),
+            )
+            if replay_server and replay_server.stats.unmatched:
+                logger.warning("Requests without a captured response: %s", replay_server.stats.unmatched)
         logger.info(f"Result: {result}")
         save_result(result, output, download_dir)
     except Exception as e:
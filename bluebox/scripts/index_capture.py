@@ -0,0 +1,65 @@
+"""
+bluebox/scripts/index_capture.py
+
+Build sidecar byte-offset indexes for existing CDP captures.
+
+Captures written by FileEventWriter are indexed as they are written; use this for captures that
+predate indexing or whose index is incomplete (e.g. the monitor was killed between flushes).
+
+Usage:
+    bluebox-index-capture --captures-dir ./cdp_captures
+    bluebox-index-capture --jsonl-path ./cdp_captures/network/events.jsonl
+"""
+
+import argparse
+from pathlib import Path
+
+from bluebox.utils.jsonl_utils import INDEX_SUFFIX, build_jsonl_index, jsonl_exists, list_jsonl_segments
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def find_capture_files(captures_dir: str | Path) -> list[Path]:
+    """
+    Find the base path of every JSONL capture under a directory (one per capture, not per segment).
+    Args:
+        captures_dir: Capture output directory (e.g. ./cdp_captures).
+    Returns:
+        Sorted base capture paths, e.g. [.../network/events.jsonl, .../storage/events.jsonl].
+    """
+    base_paths: set[Path] = set()
+    for candidate in Path(captures_dir).rglob("*.jsonl*"):
+        name = candidate.name.split(".jsonl")[0]
+        stem = name.split(".")[0]
+        if name.endswith(INDEX_SUFFIX) or not stem:
+            continue
+        base_path = candidate.with_name(f"{stem}.jsonl")
+        if candidate in list_jsonl_segments(base_path):
+            base_paths.add(base_path)
+    return sorted(base_paths)
+
+
+def main() -> None:
+    """Build indexes for the given capture file or every capture under a directory."""
+    parser = argparse.ArgumentParser(description="Build sidecar indexes for CDP capture JSONL files")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--captures-dir", type=str, help="Index every capture under this directory")
+    group.add_argument("--jsonl-path", type=str, help="Index a single capture file (base path, e.g. events.jsonl)")
+    args = parser.parse_args()
+
+    if args.jsonl_path:
+        if not jsonl_exists(args.jsonl_path):
+            raise ValueError(f"JSONL file does not exist: {args.jsonl_path}")
+        paths = [Path(args.jsonl_path)]
+    else:
+        paths = find_capture_files(args.captures_dir)
+
+    if not paths:
+        logger.warning("No capture JSONL files found")
+    for path in paths:
+        build_jsonl_index(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,13 @@ from .client import Bluebox
 from .monitor import BrowserMonitor
 from .discovery import RoutineDiscovery
 from .execution import RoutineExecutor
+from .sharded_execution import ShardedRoutineExecutor
 
 __all__ = [
     "Bluebox",
     "BrowserMonitor",
     "RoutineDiscovery",
     "RoutineExecutor",
+    "ShardedRoutineExecutor",
 ]
 
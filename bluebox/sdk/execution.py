@@ -6,13 +6,29 @@ Routine execution SDK wrapper.
 Contains:
 - RoutineExecutor: High-level interface for running routines
 - execute(): Run routine with parameters, return RoutineExecutionResult
-- Handles: CDP connection setup, parameter validation, result extraction
+- execute_batch(): Run routine for many parameter sets in one page context
+- Handles: CDP connection setup, parameter validation, result extraction, HTTP fast path, per-host rate limiting,
+  execution history and adaptive navigation waits
 """
 
-from typing import Any
+from pathlib import Path
+from typing import IO, Any, Callable
 
+from bluebox.cdp.tab_pool import TabPool
 from bluebox.data_models.routine.execution import RoutineExecutionResult
+from bluebox.data_models.routine.execution_history import AdaptiveWaitPolicy, ExecutionHistoryStore
+from bluebox.data_models.routine.execution_options import RoutineExecutionOptions
+from bluebox.data_models.routine.http_fast_path import HttpFastPath, check_http_eligibility
+from bluebox.data_models.routine.operation import DEFAULT_BATCH_CONCURRENCY
+from bluebox.data_models.routine.plan import RoutinePlan
+from bluebox.data_models.routine.rate_limiter import HostRateLimiter, RequestOutcome, routine_host, routine_outcome
+from bluebox.data_models.routine.result_cache import RoutineResultCache
 from bluebox.data_models.routine.routine import Routine
+from bluebox.data_models.routine.session_state import SessionStateStore
+from bluebox.utils.exceptions import HttpFastPathError
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
 
 
 class RoutineExecutor:
@@ -30,8 +46,41 @@ class RoutineExecutor:
     def __init__(
         self,
         remote_debugging_address: str = "http://127.0.0.1:9222",
+        result_cache: RoutineResultCache | None = None,
+        tab_pool: TabPool | None = None,
+        http_fast_path: HttpFastPath | None = None,
+        rate_limiter: HostRateLimiter | None = None,
+        session_state: SessionStateStore | None = None,
+        execution_history: ExecutionHistoryStore | None = None,
+        wait_policy: AdaptiveWaitPolicy | None = None,
     ):
+        """
+        Args:
+            remote_debugging_address: Chrome debugging server address.
+            result_cache: Opt-in cache of results for repeated (routine, parameters) executions
+                (bypassed by executions with download_target, url_rewriter or trace).
+            tab_pool: Keep tabs between runs and reuse the ones already on a routine's origin
+                (must belong to the same browser as remote_debugging_address).
+            http_fast_path: Run fetch-only routines over HTTP with cookies bootstrapped once from the
+                browser, falling back to the browser when that fails (see check_http_eligibility).
+            rate_limiter: Per-host concurrency/rate limits learned from response statuses, with
+                throttled executions retried; share one instance between executors hitting the same hosts.
+            session_state: Opt-in store of cookies and web storage restored into later runs on the same origins.
+            execution_history: Record every execution's per-operation timings and outcomes (defaults to
+                wait_policy's history when a wait policy is given).
+            wait_policy: Shrink navigation waits toward the readiness times recorded for their domain,
+                backing off after failures.
+        """
         self.remote_debugging_address = remote_debugging_address
+        self.result_cache = result_cache
+        self.tab_pool = tab_pool
+        self.http_fast_path = http_fast_path
+        self.rate_limiter = rate_limiter
+        self.session_state = session_state
+        self.wait_policy = wait_policy
+        if execution_history is None and wait_policy is not None:
+            execution_history = wait_policy.history
+        self.execution_history = execution_history
 
     def execute(
         self,
@@ -40,6 +89,13 @@ class RoutineExecutor:
         timeout: float = 180.0,
         close_tab_when_done: bool = True,
         tab_id: str | None = None,
+        url_rewriter: Callable[[str], str] | None = None,
+        compress_transfers: bool = False,
+        download_target: str | Path | IO[bytes] | None = None,
+        plan: RoutinePlan | None = None,
+        parallel: bool = False,
+        trace: bool = False,
+        preconnect: bool = False,
     ) -> RoutineExecutionResult:
         """
         Execute a routine.
@@ -50,14 +106,159 @@ class RoutineExecutor:
             timeout: Operation timeout in seconds.
             close_tab_when_done: Whether to close the tab when finished.
             tab_id: If provided, attach to this existing tab. If None, create a new tab.
+            url_rewriter: Optional function applied to every navigate/fetch/download URL.
+            compress_transfers: Gzip large return/return_html/download values in page before transferring them.
+            download_target: Stream downloads to this directory or binary file object instead of returning base64.
+            plan: Plan from routine.compile(), reused across executions of the same routine.
+            parallel: Opt-in: run independent fetch operations concurrently in page.
+            trace: Record per-operation spans and CDP/byte counters in the operation metadata.
+            preconnect: Opt-in warm-up of connections to every origin the routine uses while its first page loads.
 
         Returns:
             RoutineExecutionResult with execution status and data.
         """
-        return routine.execute(
-            parameters_dict=parameters,
+        options = RoutineExecutionOptions(
             remote_debugging_address=self.remote_debugging_address,
             timeout=timeout,
             close_tab_when_done=close_tab_when_done,
             tab_id=tab_id,
+            tab_pool=self.tab_pool,
+            url_rewriter=url_rewriter,
+            compress_transfers=compress_transfers,
+            download_target=download_target,
+            parallel=parallel,
+            trace=trace,
+            preconnect=preconnect,
+            session_state=self.session_state,
+            wait_policy=self.wait_policy,
         )
+        use_http = self.http_fast_path is not None and tab_id is None and not options.bypasses_result_cache
+
+        def run() -> RoutineExecutionResult:
+            result = self._execute_over_http(routine, parameters, plan, timeout) if use_http else None
+            if result is None:
+                result = routine.execute(parameters_dict=parameters, options=options, plan=plan)
+            if self.execution_history is not None:
+                self._record_history(routine, result)
+            return result
+
+        execute = run
+        if self.rate_limiter is not None:
+            host = routine_host(routine, parameters, plan, url_rewriter)
+
+            def execute() -> RoutineExecutionResult:
+                return self.rate_limiter.call_with_retries(host, run, routine_outcome)
+
+        # same bypass as Routine.execute: these runs do not share cache entries with plain ones
+        if self.result_cache is not None and not options.bypasses_result_cache:
+            return self.result_cache.get_or_execute(routine, parameters, execute)
+        return execute()
+
+    def _execute_over_http(
+        self,
+        routine: Routine,
+        parameters: dict[str, Any],
+        plan: RoutinePlan | None,
+        timeout: float,
+    ) -> RoutineExecutionResult | None:
+        """Run an eligible routine on the HTTP fast path; None if it is not eligible or has to fall back."""
+        if not check_http_eligibility(routine).eligible:
+            return None
+        origin = None
+        try:
+            origin = self.http_fast_path.ensure_bootstrapped(
+                routine, parameters, plan, self.remote_debugging_address, timeout,
+            )
+            return self.http_fast_path.execute(routine, parameters, plan=plan, timeout=timeout)
+        except HttpFastPathError as e:
+            logger.warning("HTTP fast path failed for routine '%s', using the browser: %s", routine.name, e)
+            self.http_fast_path.invalidate(origin)
+            return None
+
+    def execute_batch(
+        self,
+        routine: Routine,
+        parameter_sets: list[dict[str, Any]],
+        timeout: float = 180.0,
+        close_tab_when_done: bool = True,
+        tab_id: str | None = None,
+        url_rewriter: Callable[[str], str] | None = None,
+        compress_transfers: bool = False,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        plan: RoutinePlan | None = None,
+        trace: bool = False,
+        preconnect: bool = False,
+    ) -> list[RoutineExecutionResult]:
+        """
+        Execute a routine for many parameter sets in one page context (see Routine.execute_batch).
+
+        Args:
+            routine: The routine to execute; its last fetch is fanned out across the parameter sets.
+            parameter_sets: Parameters for each run.
+            timeout: Operation timeout in seconds.
+            close_tab_when_done: Whether to close the tab when finished.
+            tab_id: If provided, attach to this existing tab. If None, create a new tab.
+            url_rewriter: Optional function applied to every navigate/fetch/download URL.
+            compress_transfers: Gzip the batch results in page before transferring them.
+            concurrency: Maximum fetches in flight at once (capped by the rate limiter's limit for the host).
+            plan: Plan from routine.compile(), reused across executions of the same routine.
+            trace: Record per-operation spans and CDP/byte counters in the operation metadata.
+            preconnect: Opt-in warm-up of connections to every origin the routine uses while its first page loads.
+
+        Returns:
+            One RoutineExecutionResult per parameter set, in order.
+        """
+        host = None
+        pacing = None
+        if self.rate_limiter is not None and parameter_sets:
+            host = routine_host(routine, parameter_sets[0], plan, url_rewriter)
+            self.rate_limiter.wait_until_ready(host)
+            limit, pacing = self.rate_limiter.batch_pacing(host)
+            concurrency = min(concurrency, limit)
+
+        options = RoutineExecutionOptions(
+            remote_debugging_address=self.remote_debugging_address,
+            timeout=timeout,
+            close_tab_when_done=close_tab_when_done,
+            tab_id=tab_id,
+            tab_pool=self.tab_pool,
+            url_rewriter=url_rewriter,
+            compress_transfers=compress_transfers,
+            trace=trace,
+            preconnect=preconnect,
+            session_state=self.session_state,
+            wait_policy=self.wait_policy,
+        )
+        results = routine.execute_batch(
+            parameter_sets=parameter_sets,
+            options=options,
+            plan=plan,
+            concurrency=concurrency,
+            pacing=pacing,
+        )
+        if self.rate_limiter is not None and results:
+            self._record_batch_outcomes(host, results[0])
+        if self.execution_history is not None and results:
+            self._record_history(routine, results[0])
+        return results
+
+    def _record_batch_outcomes(self, host: str | None, result: RoutineExecutionResult) -> None:
+        """
+        Feed the statuses of a batch fetch (retried and final) to the rate limiter.
+
+        Retry-After is not recorded: the page already waited it out before retrying.
+        """
+        batch = result.operations_metadata[-1].details.get("batch") if result.operations_metadata else None
+        if not batch:
+            return
+        for status in batch.get("throttled", []):
+            self.rate_limiter.record(host, RequestOutcome(status=status))
+        for status in batch.get("statuses", []):
+            self.rate_limiter.record(host, RequestOutcome(status=status, failed=status is None))
+
+    def _record_history(self, routine: Routine, result: RoutineExecutionResult) -> None:
+        """Add an execution to the history (a failing history store never fails the execution)."""
+        try:
+            self.execution_history.record(routine.name, result)
+        except Exception as e:
+            logger.warning("Failed to record execution of routine '%s': %s", routine.name, e)
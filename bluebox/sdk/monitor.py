@@ -7,7 +7,7 @@ Contains:
 - BrowserMonitor: Wraps AsyncCDPSession for easy browser capture
 - start(): Begin capturing network, storage, interactions
 - stop(): End capture, save data to output directory
-- Outputs: network/events.jsonl, storage/events.jsonl, etc.
+- Outputs: network/events.jsonl, storage/events.jsonl, etc. (optionally also a SQLite capture.db)
 """
 
 import asyncio
@@ -18,6 +18,7 @@ from datetime import datetime, timezone
 import requests
 
 from bluebox.cdp.async_cdp_session import AsyncCDPSession
+from bluebox.cdp.capture_db import CaptureDBEventWriter
 from bluebox.cdp.file_event_writer import FileEventWriter
 from bluebox.cdp.connection import cdp_new_tab, dispose_context
 from bluebox.utils.exceptions import BrowserConnectionError
@@ -46,6 +47,7 @@ class BrowserMonitor:
         incognito: bool = True,
         create_tab: bool = True,
         event_callback_fn: Callable[[str, dict], Awaitable[None]] | None = None,
+        capture_db_path: str | None = None,
     ):
         self.remote_debugging_address = remote_debugging_address
         self.output_dir = output_dir
@@ -53,8 +55,12 @@ class BrowserMonitor:
         self.incognito = incognito
         self.create_tab = create_tab
         self.event_callback_fn = event_callback_fn
+        # when set, events are also written to a SQLite CaptureDB at this path
+        self.capture_db_path = capture_db_path
 
         self.session: AsyncCDPSession | None = None
+        self.writer: FileEventWriter | None = None
+        self.db_writer: CaptureDBEventWriter | None = None
         self.context_id: str | None = None
         self.created_tab = False
         self.start_time: float | None = None
@@ -73,14 +79,20 @@ class BrowserMonitor:
 
         # Set up file writer (creates output directory structure)
         writer = FileEventWriter.create_from_output_dir(self.output_dir)
+        self.writer = writer
+        db_writer = CaptureDBEventWriter(self.capture_db_path) if self.capture_db_path else None
+        self.db_writer = db_writer
 
-        # If caller provided a custom callback, wrap it to also write to files
-        if self.event_callback_fn:
+        # If caller provided a custom callback or a capture database, wrap to also write to files
+        if self.event_callback_fn or db_writer:
             original_callback = self.event_callback_fn
 
             async def combined_callback(category: str, event: Any) -> None:
                 await writer.write_event(category, event)
-                await original_callback(category, event)
+                if db_writer:
+                    await db_writer.write_event(category, event)
+                if original_callback:
+                    await original_callback(category, event)
 
             callback = combined_callback
         else:
@@ -162,18 +174,28 @@ class BrowserMonitor:
             return False
 
     async def _finalize_session(self) -> None:
-        """Finalize session: consolidate data files."""
+        """Finalize session: consolidate data files and flush buffered events to disk."""
         if self._finalized:
             return
         self._finalized = True
 
-        if not self.session:
-            return
+        if self.session:
+            try:
+                await self.session.finalize()
+            except Exception as e:
+                logger.warning(f"Could not finalize session: {e}")
 
-        try:
-            await self.session.finalize()
-        except Exception as e:
-            logger.warning(f"Could not finalize session: {e}")
+        # close after finalize so the final cookie/window property events are flushed too
+        if self.writer:
+            try:
+                await asyncio.to_thread(self.writer.close)
+            except Exception as e:
+                logger.warning(f"Could not flush event files: {e}")
+        if self.db_writer:
+            try:
+                await asyncio.to_thread(self.db_writer.close)
+            except Exception as e:
+                logger.warning(f"Could not flush capture database: {e}")
 
     def stop(self) -> dict:
         """Stop monitoring and return summary. Must be called from within an async context."""
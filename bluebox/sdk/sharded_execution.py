@@ -0,0 +1,214 @@
+"""
+bluebox/sdk/sharded_execution.py
+
+Routine execution spread across several Chrome instances.
+
+Contains:
+- is_idempotent(): Whether re-running a routine after a browser failure is safe
+- browser_failure(): The browser-side error of a failed execution, if that is why it failed
+- ShardedRoutineExecutor: RoutineExecutor per browser, placed by a health-checked BrowserPool
+"""
+
+from typing import Any, Callable, TypeVar
+
+from bluebox.cdp.browser_pool import BrowserPool
+from bluebox.cdp.tab_pool import TabPool
+from bluebox.data_models.routine.endpoint import HTTPMethod
+from bluebox.data_models.routine.execution import RoutineExecutionResult
+from bluebox.data_models.routine.operation import (
+    RoutineDownloadOperation,
+    RoutineFetchOperation,
+    RoutineOperationTypes,
+)
+from bluebox.data_models.routine.routine import Routine
+from bluebox.sdk.execution import RoutineExecutor
+from bluebox.utils.exceptions import BrowserConnectionError
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+_T = TypeVar("_T")
+
+# Attempts per execution (the first placement plus retries on other browsers)
+DEFAULT_MAX_ATTEMPTS = 2
+
+# Errors Routine.execute reports when it could not set up a tab: nothing ran, so any routine may retry
+_TAB_SETUP_ERRORS = ("Failed to create tab", "Failed to attach to tab")
+
+# Errors Routine.execute reports when the CDP session itself failed (operation errors are reported per operation)
+_SESSION_ERRORS = ("Routine execution failed",)
+
+# Operations that only read (HTTP methods of fetches/downloads are checked separately)
+_READ_ONLY_OPERATION_TYPES = frozenset({
+    RoutineOperationTypes.NAVIGATE,
+    RoutineOperationTypes.SLEEP,
+    RoutineOperationTypes.FETCH,
+    RoutineOperationTypes.RETURN,
+    RoutineOperationTypes.GET_COOKIES,
+    RoutineOperationTypes.DOWNLOAD,
+    RoutineOperationTypes.WAIT_FOR_URL,
+    RoutineOperationTypes.SCROLL,
+    RoutineOperationTypes.RETURN_HTML,
+})
+
+_SAFE_METHODS = frozenset({HTTPMethod.GET, HTTPMethod.HEAD, HTTPMethod.OPTIONS})
+
+
+def is_idempotent(routine: Routine) -> bool:
+    """
+    Whether running a routine twice has the same effect as running it once.
+
+    True when it only navigates, waits, scrolls, reads, and fetches/downloads with GET, HEAD or
+    OPTIONS. Clicks, typing, key presses and JS evaluation may submit something, so they are not.
+    """
+    for operation in routine.operations:
+        if operation.type not in _READ_ONLY_OPERATION_TYPES:
+            return False
+        if isinstance(operation, (RoutineFetchOperation, RoutineDownloadOperation)):
+            if operation.endpoint.method not in _SAFE_METHODS:
+                return False
+    return True
+
+
+def browser_failure(result: RoutineExecutionResult) -> str | None:
+    """The error of a result that failed because of its browser (tab setup or CDP session), else None."""
+    if result.ok or not result.error:
+        return None
+    if result.error.startswith(_TAB_SETUP_ERRORS + _SESSION_ERRORS):
+        return result.error
+    return None
+
+
+class ShardedRoutineExecutor:
+    """
+    High-level interface for executing routines on a pool of browsers.
+
+    Each execution is placed on the healthy browser with the least load (see BrowserPool) and run
+    by that browser's RoutineExecutor. When it fails because of the browser, the failure counts
+    toward draining that browser, and the execution is retried on another one if nothing ran yet
+    (tab setup failed) or the routine is idempotent.
+
+    Example:
+        >>> with BrowserPool(["http://127.0.0.1:9222", "http://127.0.0.1:9223"]) as browsers:
+        ...     executor = ShardedRoutineExecutor(browsers)
+        ...     result = executor.execute(routine=routine, parameters={"origin": "NYC"})
+    """
+
+    def __init__(
+        self,
+        browser_pool: BrowserPool,
+        executor_factory: Callable[[str], RoutineExecutor] | None = None,
+        pool_tabs: bool = False,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        acquire_timeout_seconds: float | None = None,
+        **executor_kwargs: Any,
+    ) -> None:
+        """
+        Args:
+            browser_pool: Browsers to place executions on (start() it for background health checks).
+            executor_factory: Builds the RoutineExecutor of a browser from its address (default:
+                RoutineExecutor with executor_kwargs and, if pool_tabs, a TabPool of its own).
+            pool_tabs: Give each browser's executor a TabPool (tabs belong to one browser).
+            max_attempts: Attempts per execution, each on a different browser.
+            acquire_timeout_seconds: Seconds to wait for a healthy browser (None: fail at once).
+            executor_kwargs: Passed to every RoutineExecutor (e.g. result_cache, rate_limiter,
+                session_state, wait_policy; shared between browsers).
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.browser_pool = browser_pool
+        self.max_attempts = max_attempts
+        self.acquire_timeout_seconds = acquire_timeout_seconds
+        if executor_factory is None:
+            def executor_factory(address: str) -> RoutineExecutor:
+                tab_pool = TabPool(remote_debugging_address=address) if pool_tabs else None
+                return RoutineExecutor(remote_debugging_address=address, tab_pool=tab_pool, **executor_kwargs)
+        self._executors = {address: executor_factory(address) for address in browser_pool.addresses}
+
+    def executor(self, address: str) -> RoutineExecutor:
+        """The RoutineExecutor of one browser."""
+        return self._executors[address]
+
+    def execute(self, routine: Routine, parameters: dict[str, Any], **execute_kwargs: Any) -> RoutineExecutionResult:
+        """
+        Execute a routine on the least loaded healthy browser.
+
+        Args:
+            routine: The routine to execute.
+            parameters: Parameters for URL/header/body interpolation.
+            execute_kwargs: Passed to RoutineExecutor.execute (tab_id is not supported: it names a
+                tab of one browser).
+
+        Returns:
+            RoutineExecutionResult of the last attempt.
+        """
+        return self._place(
+            routine,
+            lambda executor: executor.execute(routine, parameters, **execute_kwargs),
+            on_error=lambda error: RoutineExecutionResult(ok=False, error=error),
+            failure=browser_failure,
+        )
+
+    def execute_batch(
+        self,
+        routine: Routine,
+        parameter_sets: list[dict[str, Any]],
+        **execute_kwargs: Any,
+    ) -> list[RoutineExecutionResult]:
+        """
+        Execute a routine for many parameter sets in one page context, on the least loaded healthy browser.
+
+        Args:
+            routine: The routine to execute (see RoutineExecutor.execute_batch).
+            parameter_sets: Parameters for each run.
+            execute_kwargs: Passed to RoutineExecutor.execute_batch (tab_id is not supported).
+
+        Returns:
+            One RoutineExecutionResult per parameter set, from the last attempt.
+        """
+        if not parameter_sets:
+            return []
+        return self._place(
+            routine,
+            lambda executor: executor.execute_batch(routine, parameter_sets, **execute_kwargs),
+            on_error=lambda error: [RoutineExecutionResult(ok=False, error=error) for _ in parameter_sets],
+            # a browser failure fails every set alike
+            failure=lambda results: browser_failure(results[0]) if results else None,
+        )
+
+    def _place(
+        self,
+        routine: Routine,
+        run: Callable[[RoutineExecutor], _T],
+        on_error: Callable[[str], _T],
+        failure: Callable[[_T], str | None],
+    ) -> _T:
+        """Run on a browser from the pool, retrying browser failures elsewhere when that is safe."""
+        tried: list[str] = []
+        result: _T | None = None
+        idempotent = is_idempotent(routine)
+        while len(tried) < self.max_attempts:
+            try:
+                address = self.browser_pool.acquire(exclude=tried, timeout=self.acquire_timeout_seconds)
+            except BrowserConnectionError as e:
+                return result if result is not None else on_error(str(e))
+            tried.append(address)
+            error = None
+            try:
+                result = run(self._executors[address])
+                error = failure(result)
+            except Exception as e:
+                error = f"Routine execution failed: {e}"
+                result = on_error(error)
+            finally:
+                self.browser_pool.release(address, ok=error is None, error=error)
+
+            if error is None:
+                return result
+            if not (idempotent or error.startswith(_TAB_SETUP_ERRORS)):
+                logger.warning(
+                    "Routine '%s' failed on %s and is not idempotent, not retrying: %s", routine.name, address, error,
+                )
+                return result
+            logger.warning("Routine '%s' failed on %s: %s", routine.name, address, error)
+        return result
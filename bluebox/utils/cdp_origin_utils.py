@@ -0,0 +1,179 @@
+"""
+bluebox/utils/cdp_origin_utils.py
+
+Same-origin bootstrap documents for synchronous CDP sessions (routine execution).
+
+Contains:
+- OriginBootstrapStrategy: How a blank tab gets a document on a fetch's origin
+- OriginBootstrapResult: What a bootstrap did (stored in operation metadata)
+- bootstrap_origin(): Load a document on an origin with the chosen strategy
+"""
+
+import base64
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from enum import StrEnum
+
+from bluebox.utils.cdp_wait_utils import wait_for_page_load
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+# Upper bound on a bootstrap (the document only has to commit, except for the homepage)
+DEFAULT_BOOTSTRAP_TIMEOUT_SECONDS = 3.0
+
+# Path loaded by the lightweight strategy (small, same-origin, served by nearly every site)
+LIGHTWEIGHT_BOOTSTRAP_PATH = "/robots.txt"
+
+# Document served to the synthetic strategy's navigation instead of the network response
+_SYNTHETIC_DOCUMENT = b"<!doctype html><html><head><title></title></head><body></body></html>"
+
+
+class OriginBootstrapStrategy(StrEnum):
+    """
+    How a fetch from a blank tab gets a same-origin document (to avoid CORS).
+    """
+    HOMEPAGE = "homepage"        # load the origin's homepage (also picks up cookies it sets; the default)
+    LIGHTWEIGHT = "lightweight"  # load /robots.txt from the origin
+    SYNTHETIC = "synthetic"      # navigate to the origin's root, answered with an empty document via Fetch (no network)
+
+
+@dataclass
+class OriginBootstrapResult:
+    """Outcome of bootstrap_origin (stored in operation metadata)."""
+    strategy: str
+    url: str
+    committed: bool = False
+    fell_back: bool = False
+    page_load: dict = field(default_factory=dict)
+    waited_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Plain dict for operation metadata."""
+        return asdict(self)
+
+
+def bootstrap_origin(
+    send_cmd: Callable[..., int],
+    recv_until: Callable[[Callable[[dict], bool], float], dict],
+    session_id: str | None,
+    origin_url: str,
+    strategy: OriginBootstrapStrategy = OriginBootstrapStrategy.HOMEPAGE,
+    timeout: float = DEFAULT_BOOTSTRAP_TIMEOUT_SECONDS,
+) -> OriginBootstrapResult:
+    """
+    Load a document on origin_url's origin, as cheaply as the strategy allows.
+
+    HOMEPAGE (the default) sets the session/anti-bot cookies the homepage hands out, which later
+    credentialed fetches may need; the cheaper strategies skip them and are opt-in per routine.
+    SYNTHETIC intercepts the navigation with the Fetch domain and fulfills it with an empty HTML
+    document, then waits for the navigation to commit; it falls back to HOMEPAGE if the request
+    is not intercepted in time. LIGHTWEIGHT waits for the load event of /robots.txt (any status
+    gives a same-origin document). HOMEPAGE waits for load and network idle, up to `timeout`.
+
+    Args:
+        send_cmd: Context send_cmd(method, params, session_id=...).
+        recv_until: Context recv_until(predicate, deadline); raises TimeoutError at the deadline.
+        session_id: Tab session.
+        origin_url: scheme://host[:port] of the origin (already rewritten, if URLs are rewritten).
+        strategy: Bootstrap strategy.
+        timeout: Maximum seconds to wait.
+    Returns:
+        OriginBootstrapResult describing what was loaded.
+    """
+    start = time.monotonic()
+    origin_url = origin_url.rstrip("/")
+    if strategy == OriginBootstrapStrategy.SYNTHETIC:
+        result = _bootstrap_synthetic(send_cmd, recv_until, session_id, f"{origin_url}/", timeout)
+        if not result.committed:
+            logger.info("Synthetic bootstrap of %s was not intercepted, loading the homepage", origin_url)
+            fallback = _bootstrap_by_navigation(send_cmd, recv_until, session_id, origin_url, timeout, idle=True)
+            fallback.strategy = result.strategy
+            fallback.fell_back = True
+            result = fallback
+    elif strategy == OriginBootstrapStrategy.LIGHTWEIGHT:
+        result = _bootstrap_by_navigation(
+            send_cmd, recv_until, session_id, f"{origin_url}{LIGHTWEIGHT_BOOTSTRAP_PATH}", timeout, idle=False,
+        )
+    else:
+        result = _bootstrap_by_navigation(send_cmd, recv_until, session_id, origin_url, timeout, idle=True)
+    result.waited_seconds = time.monotonic() - start
+    return result
+
+
+def _bootstrap_by_navigation(
+    send_cmd: Callable[..., int],
+    recv_until: Callable[[Callable[[dict], bool], float], dict],
+    session_id: str | None,
+    url: str,
+    timeout: float,
+    idle: bool,
+) -> OriginBootstrapResult:
+    """Navigate to url and wait for its load event (and network idle if `idle`)."""
+    navigate_id = send_cmd("Page.navigate", {"url": url}, session_id=session_id)
+    page_load = wait_for_page_load(
+        recv_until, session_id, navigate_id, timeout=timeout, **({} if idle else {"network_idle_seconds": 0}),
+    )
+    return OriginBootstrapResult(
+        strategy=OriginBootstrapStrategy.HOMEPAGE if idle else OriginBootstrapStrategy.LIGHTWEIGHT,
+        url=url,
+        committed=page_load.loaded,
+        page_load=page_load.to_dict(),
+    )
+
+
+def _bootstrap_synthetic(
+    send_cmd: Callable[..., int],
+    recv_until: Callable[[Callable[[dict], bool], float], dict],
+    session_id: str | None,
+    url: str,
+    timeout: float,
+) -> OriginBootstrapResult:
+    """Navigate to url with Fetch interception and fulfill it with an empty document."""
+    result = OriginBootstrapResult(strategy=OriginBootstrapStrategy.SYNTHETIC, url=url)
+    deadline = time.time() + timeout
+    seen: dict[str, dict] = {}
+
+    def in_session(msg: dict) -> bool:
+        return session_id is None or msg.get("sessionId") == session_id
+
+    enable_id = send_cmd(
+        "Fetch.enable", {"patterns": [{"urlPattern": url, "requestStage": "Request"}]}, session_id=session_id,
+    )
+    try:
+        recv_until(lambda m: m.get("id") == enable_id, deadline)
+        navigate_id = send_cmd("Page.navigate", {"url": url}, session_id=session_id)
+
+        # The navigation reply only arrives once the (fulfilled) response commits
+        def observe(msg: dict) -> bool:
+            if msg.get("id") == navigate_id:
+                seen["navigate"] = msg
+                return True
+            if msg.get("method") == "Fetch.requestPaused" and in_session(msg):
+                seen["paused"] = msg["params"]
+                return True
+            return False
+
+        while "paused" not in seen and "navigate" not in seen:
+            recv_until(observe, deadline)
+        if "paused" in seen:
+            send_cmd(
+                "Fetch.fulfillRequest",
+                {
+                    "requestId": seen["paused"]["requestId"],
+                    "responseCode": 200,
+                    "responseHeaders": [{"name": "Content-Type", "value": "text/html; charset=utf-8"}],
+                    "body": base64.b64encode(_SYNTHETIC_DOCUMENT).decode("ascii"),
+                },
+                session_id=session_id,
+            )
+            while "navigate" not in seen:
+                recv_until(observe, deadline)
+        reply = seen["navigate"]
+        result.committed = "paused" in seen and "error" not in reply and not (reply.get("result") or {}).get("errorText")
+    except TimeoutError:
+        pass
+    finally:
+        send_cmd("Fetch.disable", session_id=session_id)
+    return result
@@ -0,0 +1,282 @@
+"""
+bluebox/utils/cdp_transfer_utils.py
+
+Transfer of large values (strings, downloaded files) from the page to Python over a synchronous CDP session.
+
+Contains:
+- TransferEncoding: How a staged value is encoded in the page
+- StagedTransfer: A value staged in window.__blueboxTransfers, ready to be read in chunks
+- TransferStats: Throughput counters for a transfer (stored in operation metadata)
+- PageTransferReader: Stages values and reads them back with adaptive, pipelined chunk requests
+
+A value is staged once in the page (optionally gzip-compressed with CompressionStream and base64-encoded),
+then read with Runtime.evaluate substring calls. Several chunk requests are kept in flight, the chunk size
+adapts to the measured round-trip time, and chunks are assembled with a single join (or streamed to the caller).
+"""
+
+import base64
+import time
+import uuid
+import zlib
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from enum import StrEnum
+from typing import IO, Any
+
+from bluebox.utils.js_utils import generate_get_transfer_chunk_js, generate_release_transfer_js
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+# Chunk size bounds (characters of the staged string); kept multiples of 4 so base64 chunks decode independently
+DEFAULT_MIN_CHUNK_CHARS = 256 * 1024
+DEFAULT_MAX_CHUNK_CHARS = 8 * 1024 * 1024
+
+# Chunk requests kept in flight at once
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# Round-trip time per chunk the adaptive sizing aims for
+DEFAULT_TARGET_CHUNK_SECONDS = 0.1
+
+# Values smaller than this are never compressed (compression costs more than it saves)
+DEFAULT_COMPRESS_MIN_SIZE = 64 * 1024
+
+
+class TransferEncoding(StrEnum):
+    """Encoding of a value staged in the page."""
+    TEXT = "text"
+    BASE64 = "base64"
+    GZIP_BASE64 = "gzip_base64"
+
+
+@dataclass
+class StagedTransfer:
+    """A value staged in the page, as reported by the staging script."""
+    transfer_id: str
+    length: int
+    encoding: TransferEncoding
+    payload: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "StagedTransfer":
+        """Build from the object returned by a staging script (transferId, transferLength, transferEncoding)."""
+        return cls(
+            transfer_id=payload.get("transferId") or "",
+            length=int(payload.get("transferLength") or 0),
+            encoding=TransferEncoding(payload.get("transferEncoding") or TransferEncoding.TEXT),
+            payload=payload,
+        )
+
+
+@dataclass
+class TransferStats:
+    """Counters for one transfer."""
+    encoding: str = TransferEncoding.TEXT
+    staged_chars: int = 0
+    chunks: int = 0
+    max_chunk_chars: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Plain dict for operation metadata."""
+        return asdict(self)
+
+
+def new_transfer_id() -> str:
+    """Unique key for window.__blueboxTransfers."""
+    return uuid.uuid4().hex
+
+
+class PageTransferReader:
+    """
+    Reads staged page values over a synchronous CDP session.
+
+    Usage:
+        reader = PageTransferReader(ctx.send_cmd, ctx.recv_until, ctx.session_id, ctx.timeout)
+        staged = reader.stage(generate_stage_transfer_js("document.documentElement.outerHTML", new_transfer_id()))
+        html = reader.read_text(staged)  # or reader.write_to(staged, file) to stream to disk
+    """
+
+    def __init__(
+        self,
+        send_cmd: Callable[..., int],
+        recv_until: Callable[[Callable[[dict], bool], float], dict],
+        session_id: str | None,
+        timeout: float,
+        min_chunk_chars: int = DEFAULT_MIN_CHUNK_CHARS,
+        max_chunk_chars: int = DEFAULT_MAX_CHUNK_CHARS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        target_chunk_seconds: float = DEFAULT_TARGET_CHUNK_SECONDS,
+    ) -> None:
+        """
+        Args:
+            send_cmd: Context send_cmd(method, params, session_id=...) returning the message id.
+            recv_until: Context recv_until(predicate, deadline).
+            session_id: Session to evaluate in.
+            timeout: Seconds to wait for each CDP reply.
+            min_chunk_chars: Initial (and smallest) chunk size.
+            max_chunk_chars: Largest chunk size.
+            max_in_flight: Chunk requests kept in flight at once.
+            target_chunk_seconds: Chunk round-trip time the adaptive sizing aims for.
+        """
+        if min_chunk_chars < 4 or max_chunk_chars < min_chunk_chars:
+            raise ValueError("chunk sizes must satisfy 4 <= min_chunk_chars <= max_chunk_chars")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.send_cmd = send_cmd
+        self.recv_until = recv_until
+        self.session_id = session_id
+        self.timeout = timeout
+        self.min_chunk_chars = min_chunk_chars - min_chunk_chars % 4
+        self.max_chunk_chars = max_chunk_chars - max_chunk_chars % 4
+        self.max_in_flight = max_in_flight
+        self.target_chunk_seconds = target_chunk_seconds
+        self.stats = TransferStats()
+
+    # Evaluation ___________________________________________________________________________________________________________
+
+    def _send_evaluate(self, expression: str, await_promise: bool = False, timeout_ms: int | None = None) -> int:
+        params: dict[str, Any] = {"expression": expression, "returnByValue": True}
+        if await_promise:
+            params["awaitPromise"] = True
+        if timeout_ms is not None:
+            params["timeout"] = timeout_ms
+        return self.send_cmd("Runtime.evaluate", params, session_id=self.session_id)
+
+    @staticmethod
+    def _reply_value(reply: dict, what: str) -> Any:
+        """Extract the evaluated value from a Runtime.evaluate reply, raising on CDP errors and exceptions."""
+        if "error" in reply:
+            raise RuntimeError(f"Failed to {what}: {reply['error']}")
+        result = reply.get("result") or {}
+        if result.get("exceptionDetails"):
+            details = result["exceptionDetails"]
+            description = (details.get("exception") or {}).get("description") or details.get("text")
+            raise RuntimeError(f"Failed to {what}: {description}")
+        return (result.get("result") or {}).get("value")
+
+    def stage(self, expression: str, timeout_ms: int | None = None) -> StagedTransfer:
+        """
+        Run a staging script (see js_utils.generate_stage_transfer_js / generate_download_js).
+
+        Args:
+            expression: Script resolving to {transferId, transferLength, transferEncoding, ...}.
+            timeout_ms: Optional evaluation timeout passed to Runtime.evaluate.
+        Returns:
+            The staged transfer; payload holds everything the script returned.
+        """
+        eval_id = self._send_evaluate(expression, await_promise=True, timeout_ms=timeout_ms)
+        reply = self.recv_until(lambda m: m.get("id") == eval_id, time.time() + self.timeout)
+        payload = self._reply_value(reply, "stage value")
+        if not isinstance(payload, dict):
+            raise RuntimeError(f"Staging script returned {type(payload).__name__}, expected an object")
+        staged = StagedTransfer.from_payload(payload)
+        self.stats = TransferStats(encoding=staged.encoding, staged_chars=staged.length)
+        return staged
+
+    def release(self, staged: StagedTransfer) -> None:
+        """Drop the staged value from the page (fire-and-forget)."""
+        if staged.transfer_id:
+            self._send_evaluate(generate_release_transfer_js(staged.transfer_id))
+
+    # Reading ______________________________________________________________________________________________________________
+
+    def _next_chunk_chars(self, chunk_chars: int, elapsed: float) -> int:
+        """Grow the chunk size while round trips are fast, shrink it when they are slow."""
+        if elapsed < self.target_chunk_seconds:
+            chunk_chars *= 2
+        elif elapsed > 4 * self.target_chunk_seconds:
+            chunk_chars //= 2
+        chunk_chars -= chunk_chars % 4
+        return max(self.min_chunk_chars, min(self.max_chunk_chars, chunk_chars))
+
+    def iter_chunks(self, staged: StagedTransfer) -> Iterator[str]:
+        """
+        Yield the staged string in order, keeping up to max_in_flight chunk requests outstanding.
+        The staged value is released when the iteration finishes (or is abandoned).
+        """
+        start = time.monotonic()
+        chunk_chars = self.min_chunk_chars
+        next_offset = next_index = yield_index = 0
+        pending: dict[int, tuple[int, int, float]] = {}  # message id -> (chunk index, offset, sent at)
+        ready: dict[int, str] = {}
+        try:
+            while True:
+                while next_offset < staged.length and len(pending) < self.max_in_flight:
+                    end = min(next_offset + chunk_chars, staged.length)
+                    msg_id = self._send_evaluate(generate_get_transfer_chunk_js(staged.transfer_id, next_offset, end))
+                    pending[msg_id] = (next_index, next_offset, time.monotonic())
+                    next_index += 1
+                    next_offset = end
+
+                while yield_index in ready:
+                    yield ready.pop(yield_index)
+                    yield_index += 1
+                if not pending:
+                    break
+
+                reply = self.recv_until(lambda m: m.get("id") in pending, time.time() + self.timeout)
+                index, offset, sent_at = pending.pop(reply["id"])
+                chunk = self._reply_value(reply, f"retrieve chunk at offset {offset}")
+                if not isinstance(chunk, str):
+                    raise RuntimeError(f"Staged value {staged.transfer_id} is no longer available in the page")
+                ready[index] = chunk
+
+                self.stats.chunks += 1
+                self.stats.max_chunk_chars = max(self.stats.max_chunk_chars, len(chunk))
+                chunk_chars = self._next_chunk_chars(chunk_chars, time.monotonic() - sent_at)
+        finally:
+            self.stats.seconds = time.monotonic() - start
+            self.release(staged)
+
+    def iter_bytes(self, staged: StagedTransfer) -> Iterator[bytes]:
+        """Yield the decoded value (base64 decoded, gunzipped; text is UTF-8 encoded) as it arrives."""
+        if staged.encoding == TransferEncoding.TEXT:
+            for chunk in self.iter_chunks(staged):
+                yield chunk.encode("utf-8")
+        elif staged.encoding == TransferEncoding.BASE64:
+            for chunk in self.iter_chunks(staged):
+                yield base64.b64decode(chunk)
+        else:
+            decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)  # gzip container
+            for chunk in self.iter_chunks(staged):
+                data = decompressor.decompress(base64.b64decode(chunk))
+                if data:
+                    yield data
+            tail = decompressor.flush()
+            if tail:
+                yield tail
+            if not decompressor.eof:
+                raise RuntimeError(f"Compressed transfer {staged.transfer_id} ended early")
+
+    def read_text(self, staged: StagedTransfer) -> str:
+        """Read a staged string value."""
+        if staged.encoding == TransferEncoding.TEXT:
+            return "".join(self.iter_chunks(staged))
+        return b"".join(self.iter_bytes(staged)).decode("utf-8")
+
+    def read_bytes(self, staged: StagedTransfer) -> bytes:
+        """Read a staged value as bytes."""
+        return b"".join(self.iter_bytes(staged))
+
+    def write_to(self, staged: StagedTransfer, file: IO[bytes]) -> int:
+        """
+        Stream a staged value into a binary file object without holding it in memory.
+
+        Args:
+            staged: The staged value.
+            file: Writable binary file object.
+        Returns:
+            Number of bytes written.
+        """
+        written = 0
+        for data in self.iter_bytes(staged):
+            file.write(data)
+            written += len(data)
+        return written
+
+    def read_base64(self, staged: StagedTransfer) -> str:
+        """Read a staged binary value as a base64 string (re-encoding only if it was compressed)."""
+        if staged.encoding == TransferEncoding.BASE64:
+            return "".join(self.iter_chunks(staged))
+        return base64.b64encode(self.read_bytes(staged)).decode("ascii")
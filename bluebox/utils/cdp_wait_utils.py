@@ -0,0 +1,259 @@
+"""
+bluebox/utils/cdp_wait_utils.py
+
+Event-driven waits for synchronous CDP sessions (routine execution).
+
+Contains:
+- NetworkIdleTracker: Tracks in-flight requests from Network.* events
+- PageLoadResult: What a page load wait observed
+- wait_for_page_load(): Wait for a navigation to load and the network to go idle, up to a bound
+- UrlWaitResult: What a URL wait observed
+- wait_for_url(): Wait for the main frame's URL to match a regex, from navigation events
+"""
+
+import re
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+# Quiet period (no in-flight requests) after which the network counts as idle
+DEFAULT_NETWORK_IDLE_SECONDS = 0.5
+
+# How often the idle condition is re-checked while no CDP messages arrive
+_POLL_INTERVAL_SECONDS = 0.05
+
+# Long-lived request types that never finish and must not block network idle
+_IGNORED_REQUEST_TYPES = frozenset({"EventSource", "WebSocket"})
+
+
+@dataclass
+class NetworkIdleTracker:
+    """Tracks in-flight network requests seen on a session's Network.* events."""
+    inflight: set[str] = field(default_factory=set)
+    last_activity: float = field(default_factory=time.monotonic)
+
+    def observe(self, method: str | None, params: dict) -> None:
+        """Update state from a CDP event."""
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            if params.get("type") not in _IGNORED_REQUEST_TYPES:
+                self.inflight.add(request_id)
+                self.last_activity = time.monotonic()
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            if request_id in self.inflight:
+                self.inflight.discard(request_id)
+                self.last_activity = time.monotonic()
+
+    def is_idle(self, idle_seconds: float) -> bool:
+        """No request in flight for at least idle_seconds."""
+        return not self.inflight and time.monotonic() - self.last_activity >= idle_seconds
+
+
+@dataclass
+class PageLoadResult:
+    """Outcome of wait_for_page_load (stored in operation metadata)."""
+    loaded: bool = False
+    network_idle: bool = False
+    same_document: bool = False
+    timed_out: bool = False
+    error: str | None = None
+    waited_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Plain dict for operation metadata."""
+        return asdict(self)
+
+
+def wait_for_page_load(
+    recv_until: Callable[[Callable[[dict], bool], float], dict],
+    session_id: str | None,
+    command_id: int,
+    timeout: float,
+    network_idle_seconds: float = DEFAULT_NETWORK_IDLE_SECONDS,
+) -> PageLoadResult:
+    """
+    Wait for the navigation started by a Page.navigate command to settle.
+
+    The page counts as loaded on the `load` lifecycle event of the new document (matched by
+    loaderId), `Page.loadEventFired` after the navigation reply, or `Page.navigatedWithinDocument`
+    for same-document navigations. After that, waits until no request has been in flight for
+    network_idle_seconds. Returns early on navigation errors; `timeout` is an upper bound.
+    Requires Page and Network domains enabled (and Page.setLifecycleEventsEnabled for lifecycle events).
+
+    Args:
+        recv_until: Context recv_until(predicate, deadline); raises TimeoutError at the deadline.
+        session_id: Session whose events to observe (None accepts all).
+        command_id: Message id of the Page.navigate command.
+        timeout: Maximum seconds to wait.
+        network_idle_seconds: Required quiet period after load (0 disables the network idle check).
+    Returns:
+        PageLoadResult describing what was observed.
+    """
+    start = time.monotonic()
+    deadline = time.time() + timeout
+    tracker = NetworkIdleTracker()
+    result = PageLoadResult()
+    navigation: dict = {}
+
+    def is_settled() -> bool:
+        if result.error:
+            return True
+        if not result.loaded:
+            return False
+        result.network_idle = network_idle_seconds <= 0 or tracker.is_idle(network_idle_seconds)
+        return result.network_idle
+
+    def observe(msg: dict) -> bool:
+        if msg.get("id") == command_id:
+            reply = msg.get("result") or {}
+            navigation.update(reply)
+            if "error" in msg:
+                result.error = str(msg["error"].get("message", msg["error"]))
+            elif reply.get("errorText"):
+                result.error = reply["errorText"]
+            elif not reply.get("loaderId"):
+                # same-document navigation (e.g. fragment change): no new document to load
+                result.same_document = result.loaded = True
+            return is_settled()
+
+        if session_id is not None and msg.get("sessionId") != session_id:
+            return False
+
+        method = msg.get("method")
+        params = msg.get("params") or {}
+        tracker.observe(method, params)
+
+        if method == "Page.lifecycleEvent":
+            if params.get("name") == "load" and navigation.get("loaderId") == params.get("loaderId"):
+                result.loaded = True
+        elif method == "Page.loadEventFired":
+            # ignore load events of the previous document still queued before the reply
+            if navigation:
+                result.loaded = True
+        elif method == "Page.navigatedWithinDocument":
+            if not navigation or navigation.get("frameId") == params.get("frameId"):
+                result.same_document = result.loaded = True
+        return is_settled()
+
+    while True:
+        now = time.time()
+        if now >= deadline:
+            result.timed_out = True
+            break
+        try:
+            recv_until(observe, min(deadline, now + _POLL_INTERVAL_SECONDS))
+            break
+        except TimeoutError:
+            # no message in this slice; the network may have gone idle in the meantime
+            if is_settled():
+                break
+
+    result.waited_seconds = time.monotonic() - start
+    if result.timed_out:
+        logger.info(
+            "Page load wait hit its %.1fs bound (loaded=%s, in-flight requests=%d)",
+            timeout, result.loaded, len(tracker.inflight),
+        )
+    return result
+
+
+@dataclass
+class UrlWaitResult:
+    """Outcome of wait_for_url (stored in operation metadata)."""
+    matched: bool = False
+    url: str | None = None
+    source: str | None = None
+    navigations: int = 0
+    waited_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Plain dict for operation metadata."""
+        return asdict(self)
+
+
+def wait_for_url(
+    send_cmd: Callable[..., int],
+    recv_until: Callable[[Callable[[dict], bool], float], dict],
+    session_id: str | None,
+    pattern: re.Pattern,
+    timeout: float,
+) -> UrlWaitResult:
+    """
+    Wait for the main frame's URL to match a regex (re.search), without polling.
+
+    Reads the current URL once (Runtime.evaluate, pipelined with Page.getFrameTree to learn the
+    main frame), then matches the URLs of main-frame Page.frameNavigated and
+    Page.navigatedWithinDocument events as they arrive. Requires the Page domain enabled.
+
+    Args:
+        send_cmd: Context send_cmd(method, params, session_id=...).
+        recv_until: Context recv_until(predicate, deadline); raises TimeoutError at the deadline.
+        session_id: Session whose events to observe (None accepts all).
+        pattern: Compiled URL regex.
+        timeout: Maximum seconds to wait.
+    Returns:
+        UrlWaitResult with the matching URL (or the last URL seen, if none matched in time).
+    """
+    start = time.monotonic()
+    deadline = time.time() + timeout
+    result = UrlWaitResult()
+    main_frame: dict = {}
+    same_document: list[tuple[str | None, str]] = []  # (frameId, url) seen before the main frame was known
+
+    def see(url: str | None, source: str) -> bool:
+        if url is None:
+            return False
+        result.url = url
+        if pattern.search(url):
+            result.matched = True
+            result.source = source
+        return result.matched
+
+    eval_id = send_cmd(
+        "Runtime.evaluate", {"expression": "window.location.href", "returnByValue": True}, session_id=session_id,
+    )
+    tree_id = send_cmd("Page.getFrameTree", session_id=session_id)
+
+    def observe(msg: dict) -> bool:
+        if msg.get("id") == eval_id:
+            if "error" in msg:
+                raise RuntimeError(f"Failed to read the current URL: {msg['error']}")
+            return see(((msg.get("result") or {}).get("result") or {}).get("value"), "initial")
+        if msg.get("id") == tree_id:
+            main_frame["id"] = (((msg.get("result") or {}).get("frameTree") or {}).get("frame") or {}).get("id")
+            pending = [url for frame_id, url in same_document if frame_id == main_frame["id"]]
+            same_document.clear()
+            result.navigations += len(pending)
+            return any(see(url, "Page.navigatedWithinDocument") for url in pending)
+
+        if session_id is not None and msg.get("sessionId") != session_id:
+            return False
+        method = msg.get("method")
+        params = msg.get("params") or {}
+        if method == "Page.frameNavigated":
+            frame = params.get("frame") or {}
+            if frame.get("parentId"):
+                return False
+            main_frame["id"] = frame.get("id")
+            result.navigations += 1
+            return see(frame.get("url", "") + frame.get("urlFragment", ""), method)
+        if method == "Page.navigatedWithinDocument":
+            if "id" not in main_frame:
+                same_document.append((params.get("frameId"), params.get("url")))
+                return False
+            if params.get("frameId") != main_frame["id"]:
+                return False
+            result.navigations += 1
+            return see(params.get("url"), method)
+        return False
+
+    try:
+        recv_until(observe, deadline)
+    except TimeoutError:
+        pass
+    result.waited_seconds = time.monotonic() - start
+    return result
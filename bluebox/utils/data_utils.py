@@ -5,13 +5,16 @@ Data loading, writing, and transformation utilities.
 
 Contains:
 - write_json_file(), write_jsonl(): Save data to files
+- parse_string_result(): Parse a routine's string result as JSON or a Python literal
 - get_text_from_html(): Extract text from HTML
 - resolve_dotted_path(): Access nested dict values by dot notation
 - apply_params(): Substitute {{placeholders}} in text
+- ParamTemplate, compile_params_template(): Pre-tokenized placeholder templates
 - assert_balanced_js_delimiters(): Validate JS code structure
 - sanitize_filename(): Clean filenames for filesystem
 """
 
+import ast
 import base64
 import copy
 import datetime
@@ -21,7 +24,9 @@ import os
 import re
 import time
 from collections import defaultdict
+from dataclasses import dataclass
 from decimal import Decimal
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 from urllib.parse import urlparse
@@ -173,6 +178,20 @@ def save_data_to_file(
         logger.info(f"Saved data to: {file_path}")
 
 
+def parse_string_result(value: str) -> object:
+    """Parse a string result as JSON, then as a Python dict/list literal; keep the string if both fail."""
+    try:
+        return json.loads(value)
+    except Exception:
+        try:
+            result_literal = ast.literal_eval(value)
+            if isinstance(result_literal, (dict, list)):
+                return result_literal
+        except Exception:
+            pass
+    return value
+
+
 def get_set_cookie_values(headers: dict) -> list:
     """
     Extract Set-Cookie values from headers.
@@ -293,6 +312,65 @@ def resolve_dotted_path(
         return None
 
 
+# Quoted parameter placeholders: \"{{name}}\" (inside a JSON string) or "{{name}}"
+_PARAM_PLACEHOLDER_PATTERN = re.compile(r'\\"\{\{\s*([^{}]*?)\s*\}\}\\"|"\{\{\s*([^{}]*?)\s*\}\}"')
+
+
+@dataclass(frozen=True)
+class ParamTemplate:
+    """
+    Text pre-split into static fragments and quoted placeholder slots.
+
+    fragments has one more entry than slots: render() emits fragments[0], slot 0, fragments[1], ...
+    Each slot is (parameter name, original placeholder text); placeholders whose name is not
+    in the parameters (e.g. {{sessionStorage:...}}) render as their original text.
+    """
+    fragments: tuple[str, ...]
+    slots: tuple[tuple[str, str], ...]
+
+    @property
+    def is_static(self) -> bool:
+        """Whether the template has no placeholder slots."""
+        return not self.slots
+
+    def render(self, parameters_dict: dict | None) -> str:
+        """Fill the slots from parameters_dict in a single pass (same substitution rules as apply_params)."""
+        if not self.slots:
+            return self.fragments[0]
+        parameters_dict = parameters_dict or {}
+        parts = [self.fragments[0]]
+        for (name, original), fragment in zip(self.slots, self.fragments[1:]):
+            if name in parameters_dict:
+                value = parameters_dict[name]
+                parts.append(value if isinstance(value, str) else json.dumps(value))
+            else:
+                parts.append(original)
+            parts.append(fragment)
+        return "".join(parts)
+
+
+@lru_cache(maxsize=4096)
+def compile_params_template(text: str) -> ParamTemplate:
+    """
+    Tokenize text into a ParamTemplate (cached per text).
+
+    Args:
+        text: Text containing quoted parameter placeholders.
+
+    Returns:
+        ParamTemplate: The pre-tokenized template.
+    """
+    fragments: list[str] = []
+    slots: list[tuple[str, str]] = []
+    position = 0
+    for match in _PARAM_PLACEHOLDER_PATTERN.finditer(text):
+        fragments.append(text[position:match.start()])
+        slots.append((match.group(1) if match.group(1) is not None else match.group(2), match.group(0)))
+        position = match.end()
+    fragments.append(text[position:])
+    return ParamTemplate(fragments=tuple(fragments), slots=tuple(slots))
+
+
 def apply_params(text: str, parameters_dict: dict | None) -> str:
     """
     Replace parameter placeholders in text with actual values.
@@ -305,6 +383,9 @@ def apply_params(text: str, parameters_dict: dict | None) -> str:
     - For non-string values in quoted placeholders: use json.dumps(value)
     - All placeholders must be quoted: "{{param}}" or \"{{param}}\"
 
+    The text is tokenized once (see compile_params_template) and cached, so repeated
+    calls with the same text only pay for a single linear render.
+
     Args:
         text: Text containing parameter placeholders.
         parameters_dict: Dictionary of parameter values.
@@ -312,33 +393,13 @@ def apply_params(text: str, parameters_dict: dict | None) -> str:
     Returns:
         str: Text with parameters replaced.
     """
-    
-    logger.info(f"Applying params to text: {text} with parameters_dict: {parameters_dict}")
-    
     if not text or not parameters_dict:
         return text
 
-    for key, value in parameters_dict.items():
-        # Compute replacement based on value type (following test.py pattern)
-        if isinstance(value, str):
-            literal = value  # For strings, insert raw string (no quotes)
-        else:
-            literal = json.dumps(value)  # For numbers/bools/null, use JSON encoding
-        
-        escaped_key = re.escape(key)
-        
-        # Pattern 1: Simple quoted placeholder "{{key}}" in JSON string
-        # Matches: "{{key}}" (when the JSON value itself is the string "{{key}}")
-        simple_quoted = '"' + r'\{\{' + r'\s*' + escaped_key + r'\s*' + r'\}\}' + '"'
-        text = re.sub(simple_quoted, literal, text)
-        
-        # Pattern 2: Escaped quote variant \"{{key}}\"
-        # In JSON string this appears as: \\"{{key}}\\" 
-        double_escaped = r'\\"' + r'\{\{' + r'\s*' + escaped_key + r'\s*' + r'\}\}' + r'\\"'
-        text = re.sub(double_escaped, literal, text)
-    
-    logger.info(f"Applied params to text: {text}")
-    return text
+    result = compile_params_template(text).render(parameters_dict)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Applied params %s to text: %s -> %s", list(parameters_dict), text, result)
+    return result
 
 
 def extract_base_url_from_url(url: str) -> str | None:
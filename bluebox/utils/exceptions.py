@@ -8,6 +8,7 @@ Contains:
 - BrowserConnectionError, ChromiumConnectionError: CDP connection failures
 - NavigationError, NavigationBlockedError: Page navigation failures
 - RoutineExecutionError: Routine run failures
+- HttpFastPathError: Browserless routine run abandoned (caller falls back to the browser)
 - HTTPClientError, HTTPServerError: HTTP request failures
 """
 
@@ -79,6 +80,12 @@ class RoutineExecutionError(Exception):
     """
 
 
+class HttpFastPathError(RoutineExecutionError):
+    """
+    Exception raised when a routine cannot run (or keep running) over plain HTTP and needs the browser.
+    """
+
+
 class BlueboxError(Exception):
     """
     Base exception for all Bluebox errors.
@@ -0,0 +1,96 @@
+"""
+bluebox/utils/file_store_utils.py
+
+Pieces shared by the opt-in stores that keep entries in memory and, optionally, on disk
+(RoutineResultCache, SessionStateStore).
+
+Contains:
+- StoreStats: Base of the stores' counter dataclasses
+- JsonFileTier: One JSON file per key in a directory, written atomically
+"""
+
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TypeVar
+
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class StoreStats:
+    """Base of a store's counters (subclasses declare the int fields)."""
+
+    def to_dict(self) -> dict:
+        """Plain dict for logging/metrics."""
+        return asdict(self)
+
+
+class JsonFileTier:
+    """
+    On-disk tier of a store: one `<key>.json` file per entry.
+
+    Writes go to a per-process/thread temporary file that replaces the entry atomically, so
+    concurrent writers (threads or processes sharing the directory) never leave a partial file.
+    Unreadable or unparsable files are logged and treated as missing. Not locked: callers
+    serialize access to a key themselves.
+    """
+
+    def __init__(self, directory: str | Path, description: str = "entry", private: bool = False) -> None:
+        """
+        Args:
+            directory: Directory holding the files (created if needed).
+            description: What an entry is, for log messages (e.g. "cache entry").
+            private: Create files with mode 0600 (for entries holding credentials).
+        """
+        self.directory = Path(directory)
+        self.description = description
+        self.private = private
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        """File of a key."""
+        return self.directory / f"{key}.json"
+
+    def read(self, key: str, parse: Callable[[str], _T]) -> _T | None:
+        """Parsed contents of a key's file, or None if it is missing or cannot be read/parsed."""
+        path = self.path(key)
+        try:
+            return parse(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable %s %s: %s", self.description, path, e)
+            return None
+
+    def write(self, key: str, text: str) -> None:
+        """Replace a key's file with text (failures are logged, not raised)."""
+        path = self.path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600 if self.private else 0o666)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Failed to write %s %s: %s", self.description, path, e)
+            tmp_path.unlink(missing_ok=True)
+
+    def delete(self, key: str) -> bool:
+        """Remove a key's file; returns whether it existed."""
+        try:
+            self.path(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def clear(self) -> None:
+        """Remove every entry file."""
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
@@ -4,17 +4,24 @@ bluebox/utils/js_utils.py
 JavaScript code generation for CDP browser operations.
 
 Contains:
+- generate_runtime_library_js(): Helper library installed once per document (window.__blueboxRuntime)
 - generate_fetch_js(): Fetch API call with placeholder resolution
-- generate_download_js(): Binary file download as base64
+- generate_fetch_batch_js(): Many fetches of one endpoint with a concurrency limit, results staged
+- generate_download_js(): Binary file download, staged for chunked retrieval
 - generate_click_js(): Element click with visibility handling
 - generate_type_js(): Input text typing with clear option
 - generate_scroll_element_js(), generate_scroll_window_js(): Scrolling
-- generate_wait_for_url_js(): URL regex matching
 - generate_js_evaluate_wrapper_js(): Custom JS execution wrapper
+- generate_stage_transfer_js(), generate_get_transfer_chunk_js(), generate_release_transfer_js(): Chunked transfers
+- generate_tab_hygiene_js(): Clear routine-scoped sessionStorage keys before a tab is reused
+- generate_preconnect_js(): Preconnect hints for the origins a routine will use
+- generate_storage_snapshot_js(), generate_storage_restore_js(): Session state (web storage) capture and restore
 - _get_placeholder_resolution_js_helpers(): sessionStorage/localStorage/cookie access
 """
 
 import json
+from collections.abc import Iterable
+from functools import cache
 
 
 def _get_body_resolution_js() -> list[str]:
@@ -209,56 +216,45 @@ def _get_placeholder_resolution_js_helpers() -> list[str]:
     ]
 
 
-def _get_fetch_setup_js(
-    url: str,
-    headers: dict,
-    body_js_literal: str,
-    endpoint_method: str,
-    endpoint_credentials: str,
-) -> list[str]:
-    """Generate common JavaScript setup code for fetch-based operations.
+# Global the routine JS helper library is installed under, and its version (bump on changes)
+RUNTIME_GLOBAL = "__blueboxRuntime"
+RUNTIME_VERSION = 4
 
-    This shared helper generates the common setup code used by both fetch and download
-    operations: variable declarations, placeholder resolution helpers, URL/header/body
-    resolution, fetch options, and request metadata.
+# Key in the value of a runtime call when the library is not installed in the current document
+RUNTIME_MISSING_KEY = "__bbRuntimeMissing"
 
-    Args:
-        url: The URL to fetch.
-        headers: Dictionary of HTTP headers.
-        body_js_literal: JavaScript literal for the request body.
-        endpoint_method: HTTP method (GET, POST, etc.).
-        endpoint_credentials: Credentials mode (same-origin, include, omit).
+
+def _indent_js(lines: list[str], spaces: int) -> list[str]:
+    """Indent JavaScript code lines (blank lines stay blank)."""
+    return [(" " * spaces + line) if line.strip() else "" for line in lines]
+
+
+def _get_request_setup_js() -> list[str]:
+    """Generate JavaScript that resolves a request's URL, headers and body from call arguments.
+
+    Runs inside prepareRequest(args) of the runtime library, where args holds url, headers,
+    body (already parsed), method and credentials.
 
     Returns:
-        List of JavaScript code lines for the fetch setup.
+        List of JavaScript code lines.
     """
-    hdrs_json = json.dumps(
-        {str(k): (str(v) if not isinstance(v, str) else v) for k, v in headers.items()}
-    )
-
     return [
-        "(async () => {",
-        "  const sleep = ms => new Promise(r => setTimeout(r, ms));",
-        "  await sleep(100);",
-        f"  const url = {json.dumps(url)};",
-        f"  const rawHeaders = {hdrs_json};",
-        f"  const BODY_LITERAL = {body_js_literal};",
-        "",
-        *_get_placeholder_resolution_js_helpers(),
+        "  const { resolvedValues, resolvePlaceholders, deepResolve } = createResolver();",
+        "  const BODY_LITERAL = (args.body === undefined) ? null : args.body;",
         "",
         "  // Resolve headers",
         "  const headers = {};",
-        "  for (const [k, v] of Object.entries(rawHeaders || {})) {",
+        "  for (const [k, v] of Object.entries(args.headers || {})) {",
         "    headers[k] = (typeof v === 'string') ? resolvePlaceholders(v) : v;",
         "  }",
         "",
         "  // Resolve URL placeholders",
-        "  const resolvedUrl = resolvePlaceholders(url);",
+        "  const resolvedUrl = resolvePlaceholders(args.url);",
         "",
         "  const opts = {",
-        f"    method: {json.dumps(endpoint_method)},",
+        "    method: args.method,",
         "    headers,",
-        f"    credentials: {json.dumps(endpoint_credentials)}",
+        "    credentials: args.credentials",
         "  };",
         "",
         *_get_body_resolution_js(),
@@ -266,45 +262,56 @@ def _get_fetch_setup_js(
         "  // Build request metadata for debugging",
         "  const requestMeta = {",
         "    url: resolvedUrl,",
-        f"    method: {json.dumps(endpoint_method)},",
+        "    method: args.method,",
         "    headers: headers,",
         "    body: opts.body || null,",
         "  };",
+        "  return { resolvedValues, resolvedUrl, opts, requestMeta };",
     ]
 
 
-def generate_fetch_js(
-    fetch_url: str,
-    headers: dict,
-    body_js_literal: str,
-    endpoint_method: str,
-    endpoint_credentials: str,
-    session_storage_key: str | None = None,
-) -> str:
-    """Generate JavaScript code for fetch operation.
+def _get_fetch_timing_js() -> list[str]:
+    """Generate the runtime library's fetchTiming(url, t0, tHeaders, tBody) helper.
 
-    Args:
-        fetch_url: The URL to fetch.
-        headers: Dictionary of HTTP headers.
-        body_js_literal: JavaScript literal for the request body.
-        endpoint_method: HTTP method (GET, POST, etc.).
-        endpoint_credentials: Credentials mode (same-origin, include, omit).
-        session_storage_key: Optional key to store result in session storage.
+    Returns the in-page timing of a fetch (headers/body phases in ms, from performance.now()) plus
+    the Resource Timing breakdown when the browser exposes one for the URL (cross-origin entries
+    without Timing-Allow-Origin report zeros).
 
     Returns:
-        JavaScript code string that performs the fetch operation.
+        List of JavaScript code lines.
     """
-    js_lines = [
-        *_get_fetch_setup_js(
-            url=fetch_url,
-            headers=headers,
-            body_js_literal=body_js_literal,
-            endpoint_method=endpoint_method,
-            endpoint_credentials=endpoint_credentials,
-        ),
-        "",
+    return [
+        "function fetchTiming(url, t0, tHeaders, tBody) {",
+        "  const timing = { totalMs: tBody - t0, headersMs: tHeaders - t0, bodyMs: tBody - tHeaders };",
         "  try {",
+        "    const entries = performance.getEntriesByName(new URL(url, location.href).href, 'resource');",
+        "    const e = entries[entries.length - 1];",
+        "    if (e) {",
+        "      timing.dnsMs = e.domainLookupEnd - e.domainLookupStart;",
+        "      timing.connectMs = e.connectEnd - e.connectStart;",
+        "      timing.ttfbMs = e.responseStart - e.requestStart;",
+        "      timing.transferSize = e.transferSize;",
+        "      timing.encodedBodySize = e.encodedBodySize;",
+        "    }",
+        "  } catch(e) {}",
+        "  return timing;",
+        "}",
+    ]
+
+
+def _get_runtime_fetch_js() -> list[str]:
+    """Generate the runtime library's runFetch(args) function, exposed as fetch (fetch operation).
+
+    Returns:
+        List of JavaScript code lines.
+    """
+    return [
+        "async function runFetch(args) {",
+        "  const { resolvedValues, resolvedUrl, opts, requestMeta } = prepareRequest(args);",
+        "  try {",
+        "    const t0 = performance.now();",
         "    const resp = await fetch(resolvedUrl, opts);",
+        "    const tHeaders = performance.now();",
         "    const status = resp.status;",
         "    const statusText = resp.statusText;",
         "    const responseHeaders = {};",
@@ -316,52 +323,34 @@ def generate_fetch_js(
         "      status: status,",
         "      statusText: statusText,",
         "      headers: responseHeaders,",
+        "      timing: fetchTiming(resolvedUrl, t0, tHeaders, performance.now()),",
         "    };",
         "",
-        f"    if ({'true' if session_storage_key else 'false'}) {{ try {{ window.sessionStorage.setItem({json.dumps(session_storage_key) if session_storage_key else 'null'}, val); }} catch(e) {{ return {{ __err: 'SessionStorage Error: ' + String(e), resolvedValues }}; }} }}",
+        "    if (args.sessionStorageKey) {",
+        "      try { window.sessionStorage.setItem(args.sessionStorageKey, val); }",
+        "      catch(e) { return { __err: 'SessionStorage Error: ' + String(e), resolvedValues }; }",
+        "    }",
         "    return {status, value: 'success', resolvedValues, request: requestMeta, response: responseMeta};",
         "  } catch(e) {",
         "    return { __err: 'fetch failed: ' + String(e), resolvedValues, request: requestMeta };",
         "  }",
-        "})()",
+        "}",
     ]
 
-    return "\n".join(js_lines)
 
-
-def generate_download_js(
-    download_url: str,
-    headers: dict,
-    body_js_literal: str,
-    endpoint_method: str,
-    endpoint_credentials: str,
-    filename: str,
-) -> str:
-    """Generate JavaScript code for downloading a file as base64.
-
-    Args:
-        download_url: The URL to download from.
-        headers: Dictionary of headers.
-        body_js_literal: JavaScript literal for the request body.
-        endpoint_method: HTTP method (GET, POST, etc.).
-        endpoint_credentials: Credentials mode (same-origin, include, omit).
-        filename: Filename for the downloaded file.
+def _get_runtime_download_js() -> list[str]:
+    """Generate the runtime library's runDownload(args) function, exposed as download (download operation).
 
     Returns:
-        JavaScript code that fetches the URL, converts response to base64,
-        stores in window.__downloadData, and returns metadata for chunked retrieval.
+        List of JavaScript code lines.
     """
-    js_lines = [
-        *_get_fetch_setup_js(
-            url=download_url,
-            headers=headers,
-            body_js_literal=body_js_literal,
-            endpoint_method=endpoint_method,
-            endpoint_credentials=endpoint_credentials,
-        ),
-        "",
+    return [
+        "async function runDownload(args) {",
+        "  const { resolvedUrl, opts, requestMeta } = prepareRequest(args);",
         "  try {",
+        "    const t0 = performance.now();",
         "    const resp = await fetch(resolvedUrl, opts);",
+        "    const tHeaders = performance.now();",
         "    const status = resp.status;",
         "    const statusText = resp.statusText;",
         "    const responseHeaders = {};",
@@ -369,52 +358,387 @@ def generate_download_js(
         "",
         "    if (!resp.ok) {",
         "      const responseMeta = { status, statusText, headers: responseHeaders };",
-        "      return { __err: 'Download failed with status ' + resp.status, request: requestMeta, response: responseMeta };",
+        "      return {",
+        "        __err: 'Download failed with status ' + resp.status, request: requestMeta, response: responseMeta",
+        "      };",
         "    }",
         "",
         "    const contentType = resp.headers.get('content-type') || 'application/octet-stream';",
         "    const buffer = await resp.arrayBuffer();",
+        "    const timing = fetchTiming(resolvedUrl, t0, tHeaders, performance.now());",
         "",
-        "    // Convert to base64 using Blob + FileReader",
-        "    const blob = new Blob([buffer]);",
-        "    const base64Data = await new Promise((resolve, reject) => {",
-        "      const reader = new FileReader();",
-        "      reader.onload = () => {",
-        "        const dataUrl = reader.result;",
-        "        resolve(dataUrl.split(',')[1]);",
-        "      };",
-        "      reader.onerror = () => reject(reader.error);",
-        "      reader.readAsDataURL(blob);",
-        "    });",
-        "",
-        "    // Store base64 data in window for chunked retrieval",
-        "    window.__downloadData = base64Data;",
+        "    // Stage base64 data in window for chunked retrieval",
+        "    const staged = await __bbStage(args.transferId, buffer, true, args.compress, args.compressMinBytes);",
         "",
         "    // Build response metadata for debugging",
         "    const responseMeta = {",
         "      status: status,",
         "      statusText: statusText,",
         "      headers: responseHeaders,",
+        "      timing: timing,",
         "    };",
         "",
         "    return {",
         "      ok: true,",
         "      contentType: contentType,",
-        f"      filename: {json.dumps(filename)},",
+        "      filename: args.filename,",
         "      size: buffer.byteLength,",
-        "      base64Length: base64Data.length,",
+        "      ...staged,",
         "      request: requestMeta,",
         "      response: responseMeta",
         "    };",
         "  } catch(e) {",
         "    return { __err: 'Download failed: ' + String(e), request: requestMeta };",
         "  }",
-        "})()",
+        "}",
     ]
 
+
+def _get_runtime_fetch_batch_js() -> list[str]:
+    """Generate the runtime library's runFetchBatch(args) function, exposed as fetchBatch (batch fetch fan-out).
+
+    Runs args.requests with at most args.concurrency fetches in flight and stages the JSON array
+    of per-request results ({status, value, resolvedValues, attempts} or {error, resolvedValues})
+    for chunked retrieval. Request starts are spaced by args.minIntervalMs; responses with a status
+    in args.retryStatuses pause every worker (Retry-After, or full-jitter exponential backoff) and
+    are retried up to args.maxRetries times.
+
+    Returns:
+        List of JavaScript code lines.
+    """
+    return [
+        "async function runFetchBatch(args) {",
+        "  const results = new Array(args.requests.length);",
+        "  const retryStatuses = args.retryStatuses || [];",
+        "  const maxRetries = args.maxRetries || 0;",
+        "  const sleep = (ms) => new Promise(r => setTimeout(r, ms));",
+        "  let next = 0, nextStart = 0, pausedUntil = 0, retryAfterMs = 0;",
+        "  const throttled = [];",
+        "",
+        "  // Wait out pauses, then take the next start slot (minIntervalMs apart)",
+        "  async function pace() {",
+        "    while (performance.now() < pausedUntil) await sleep(pausedUntil - performance.now());",
+        "    const now = performance.now();",
+        "    const start = Math.max(now, nextStart);",
+        "    nextStart = start + (args.minIntervalMs || 0);",
+        "    if (start > now) await sleep(start - now);",
+        "  }",
+        "  function retryAfter(resp) {",
+        "    const v = resp.headers.get('retry-after');",
+        "    if (!v) return 0;",
+        "    if (/^\\d+$/.test(v.trim())) return Number(v) * 1000;",
+        "    const at = Date.parse(v);",
+        "    return isNaN(at) ? 0 : Math.max(0, at - Date.now());",
+        "  }",
+        "",
+        "  async function worker() {",
+        "    while (next < args.requests.length) {",
+        "      const i = next++;",
+        "      const r = args.requests[i];",
+        "      let prepared = null;",
+        "      for (let attempt = 0; ; attempt++) {",
+        "        await pace();",
+        "        try {",
+        "          prepared = prepareRequest({",
+        "            url: r.url, headers: r.headers, body: r.body, method: args.method, credentials: args.credentials",
+        "          });",
+        "          const resp = await fetch(prepared.resolvedUrl, prepared.opts);",
+        "          if (retryStatuses.includes(resp.status) && attempt < maxRetries) {",
+        "            try { if (resp.body) resp.body.cancel(); } catch(e) {}",
+        "            const waitMs = retryAfter(resp);",
+        "            const backoffMs = Math.random() * Math.min(args.backoffMaxMs, args.backoffBaseMs * 2 ** attempt);",
+        "            retryAfterMs = Math.max(retryAfterMs, waitMs);",
+        "            pausedUntil = Math.max(pausedUntil, performance.now() + Math.max(waitMs, backoffMs));",
+        "            throttled.push(resp.status);",
+        "            continue;",
+        "          }",
+        "          const value = await resp.text();",
+        "          results[i] = {",
+        "            status: resp.status, value, resolvedValues: prepared.resolvedValues, attempts: attempt + 1",
+        "          };",
+        "        } catch(e) {",
+        "          results[i] = {",
+        "            error: 'fetch failed: ' + String(e), resolvedValues: prepared ? prepared.resolvedValues : {}",
+        "          };",
+        "        }",
+        "        break;",
+        "      }",
+        "    }",
+        "  }",
+        "  const workers = [];",
+        "  const poolSize = Math.max(1, Math.min(args.concurrency, args.requests.length));",
+        "  for (let w = 0; w < poolSize; w++) workers.push(worker());",
+        "  await Promise.all(workers);",
+        "",
+        "  const staged = await __bbStage(",
+        "    args.transferId, JSON.stringify(results), false, args.compress, args.compressMinBytes",
+        "  );",
+        "  return {",
+        "    count: results.length,",
+        "    failed: results.filter(r => r.error).length,",
+        "    statuses: results.map(r => (r.status === undefined ? null : r.status)),",
+        "    throttled,",
+        "    retryAfterMs,",
+        "    ...staged",
+        "  };",
+        "}",
+    ]
+
+
+@cache
+def generate_runtime_library_js() -> str:
+    """Generate the routine JS helper library, installed once per document.
+
+    Defines window.__blueboxRuntime with fetch(args), download(args) and fetchBatch(args), sharing the placeholder
+    resolution helpers. Installed with Page.addScriptToEvaluateOnNewDocument (and evaluated directly
+    when a document predates the installation); operations then evaluate short calls built by
+    generate_fetch_js()/generate_download_js(). Re-evaluating it is a no-op.
+
+    Returns:
+        JavaScript source (an IIFE evaluating to true).
+    """
+    js_lines = [
+        "(() => {",
+        f"  if (window.{RUNTIME_GLOBAL} && window.{RUNTIME_GLOBAL}.version === {RUNTIME_VERSION}) return true;",
+        "",
+        "  function createResolver() {",
+        *_indent_js(_get_placeholder_resolution_js_helpers(), 2),
+        "    return { resolvedValues, resolvePlaceholders, deepResolve };",
+        "  }",
+        "",
+        "  function prepareRequest(args) {",
+        *_indent_js(_get_request_setup_js(), 2),
+        "  }",
+        "",
+        *_get_transfer_staging_js_helpers(),
+        "",
+        *_indent_js(_get_fetch_timing_js(), 2),
+        "",
+        *_indent_js(_get_runtime_fetch_js(), 2),
+        "",
+        *_indent_js(_get_runtime_download_js(), 2),
+        "",
+        *_indent_js(_get_runtime_fetch_batch_js(), 2),
+        "",
+        f"  window.{RUNTIME_GLOBAL} = {{",
+        f"    version: {RUNTIME_VERSION}, fetch: runFetch, download: runDownload, fetchBatch: runFetchBatch",
+        "  };",
+        "  return true;",
+        "})()",
+    ]
     return "\n".join(js_lines)
 
 
+def _generate_runtime_call_js(function: str, args_js: str) -> str:
+    """Generate a call into the runtime library (a marker object if it is not installed).
+
+    Args:
+        function: Runtime function name.
+        args_js: JavaScript object literal with the arguments.
+
+    Returns:
+        JavaScript expression.
+    """
+    runtime = f"window.{RUNTIME_GLOBAL}"
+    return (
+        f"(({runtime} && {runtime}.version === {RUNTIME_VERSION}) "
+        f"? {runtime}.{function}({args_js}) : {{ {RUNTIME_MISSING_KEY}: true }})"
+    )
+
+
+def _headers_json(headers: dict) -> str:
+    """Headers as a JSON object literal with string values."""
+    return json.dumps({str(k): (str(v) if not isinstance(v, str) else v) for k, v in headers.items()})
+
+
+def _request_args_js(
+    url: str,
+    headers: dict,
+    body_js_literal: str,
+    endpoint_method: str,
+    endpoint_credentials: str,
+) -> list[str]:
+    """Generate the request fields of a runtime call's argument object."""
+    return [
+        f"url: {json.dumps(url)}",
+        f"headers: {_headers_json(headers)}",
+        f"body: {body_js_literal}",
+        f"method: {json.dumps(str(endpoint_method))}",
+        f"credentials: {json.dumps(str(endpoint_credentials))}",
+    ]
+
+
+def generate_fetch_js(
+    fetch_url: str,
+    headers: dict,
+    body_js_literal: str,
+    endpoint_method: str,
+    endpoint_credentials: str,
+    session_storage_key: str | None = None,
+) -> str:
+    """Generate JavaScript code for fetch operation.
+
+    The fetch itself runs in the runtime library (see generate_runtime_library_js());
+    the expression only carries the call arguments.
+
+    Args:
+        fetch_url: The URL to fetch.
+        headers: Dictionary of HTTP headers.
+        body_js_literal: JavaScript literal for the request body.
+        endpoint_method: HTTP method (GET, POST, etc.).
+        endpoint_credentials: Credentials mode (same-origin, include, omit).
+        session_storage_key: Optional key to store result in session storage.
+
+    Returns:
+        JavaScript expression that performs the fetch operation.
+    """
+    args = [
+        *_request_args_js(fetch_url, headers, body_js_literal, endpoint_method, endpoint_credentials),
+        f"sessionStorageKey: {json.dumps(session_storage_key)}",
+    ]
+    return _generate_runtime_call_js("fetch", "{" + ", ".join(args) + "}")
+
+
+def generate_fetch_batch_js(
+    requests: list[tuple[str, dict, str]],
+    endpoint_method: str,
+    endpoint_credentials: str,
+    transfer_id: str,
+    concurrency: int,
+    compress: bool = False,
+    compress_min_chars: int = 0,
+    min_interval_seconds: float = 0.0,
+    max_retries: int = 0,
+    retry_statuses: Iterable[int] = (),
+    backoff_base_seconds: float = 0.5,
+    backoff_max_seconds: float = 30.0,
+) -> str:
+    """Generate JavaScript that runs many fetches of one endpoint from a single evaluation.
+
+    The fetches run in the runtime library (see generate_runtime_library_js()) with at most
+    `concurrency` in flight; per-request results are staged as one JSON array for chunked retrieval.
+    Throttled responses (retry_statuses) pause all requests and are retried in page.
+
+    Args:
+        requests: (URL, headers, body JS literal) per request, already interpolated.
+        endpoint_method: HTTP method (GET, POST, etc.).
+        endpoint_credentials: Credentials mode (same-origin, include, omit).
+        transfer_id: Key to stage the results under in window.__blueboxTransfers.
+        concurrency: Maximum fetches in flight at once.
+        compress: Gzip the staged results in page (CompressionStream) before base64 encoding.
+        compress_min_chars: Results shorter than this are not compressed.
+        min_interval_seconds: Minimum time between two request starts.
+        max_retries: Retries of a request answered with one of retry_statuses.
+        retry_statuses: Statuses that pause the batch and are retried.
+        backoff_base_seconds: Backoff before a request's first retry (doubling, fully jittered),
+            unless Retry-After asks for longer.
+        backoff_max_seconds: Backoff cap.
+
+    Returns:
+        JavaScript expression resolving to {count, failed, statuses, throttled, retryAfterMs,
+        transferId, transferLength, transferEncoding}.
+    """
+    request_literals = []
+    for url, headers, body_js_literal in requests:
+        request_literals.append(
+            f"{{url: {json.dumps(url)}, headers: {_headers_json(headers)}, body: {body_js_literal}}}"
+        )
+    args = [
+        f"requests: [{', '.join(request_literals)}]",
+        f"method: {json.dumps(str(endpoint_method))}",
+        f"credentials: {json.dumps(str(endpoint_credentials))}",
+        f"concurrency: {int(concurrency)}",
+        f"transferId: {json.dumps(transfer_id)}",
+        f"compress: {json.dumps(compress)}",
+        f"compressMinBytes: {int(compress_min_chars)}",
+        f"minIntervalMs: {json.dumps(min_interval_seconds * 1000)}",
+        f"maxRetries: {int(max_retries)}",
+        f"retryStatuses: {json.dumps(sorted(retry_statuses))}",
+        f"backoffBaseMs: {json.dumps(backoff_base_seconds * 1000)}",
+        f"backoffMaxMs: {json.dumps(backoff_max_seconds * 1000)}",
+    ]
+    return _generate_runtime_call_js("fetchBatch", "{" + ", ".join(args) + "}")
+
+
+def _get_transfer_staging_js_helpers() -> list[str]:
+    """Generate JavaScript helpers that stage a value in window.__blueboxTransfers.
+
+    __bbStage(transferId, data, isBinary, compress, compressMinSize) stores a string (text as-is,
+    ArrayBuffers as base64, either gzipped + base64 when compress is set and CompressionStream exists)
+    and resolves to {transferId, transferLength, transferEncoding}.
+
+    Returns:
+        List of JavaScript code lines (to be placed inside an async function).
+    """
+    return [
+        "  const __bbToBase64 = (data) => new Promise((resolve, reject) => {",
+        "    const reader = new FileReader();",
+        "    reader.onload = () => resolve(reader.result.slice(reader.result.indexOf(',') + 1));",
+        "    reader.onerror = () => reject(reader.error);",
+        "    reader.readAsDataURL(new Blob([data]));",
+        "  });",
+        "  const __bbStage = async (transferId, data, isBinary, compress, compressMinSize) => {",
+        "    const size = isBinary ? data.byteLength : data.length;",
+        "    let staged = data;",
+        "    let encoding = 'text';",
+        "    if (compress && typeof CompressionStream !== 'undefined' && size >= compressMinSize) {",
+        "      const bytes = isBinary ? data : new TextEncoder().encode(data);",
+        "      const gzipped = await new Response(",
+        "        new Blob([bytes]).stream().pipeThrough(new CompressionStream('gzip'))",
+        "      ).arrayBuffer();",
+        "      staged = await __bbToBase64(gzipped);",
+        "      encoding = 'gzip_base64';",
+        "    } else if (isBinary) {",
+        "      staged = await __bbToBase64(data);",
+        "      encoding = 'base64';",
+        "    }",
+        "    (window.__blueboxTransfers = window.__blueboxTransfers || {})[transferId] = staged;",
+        "    return { transferId, transferLength: staged.length, transferEncoding: encoding };",
+        "  };",
+    ]
+
+
+def generate_download_js(
+    download_url: str,
+    headers: dict,
+    body_js_literal: str,
+    endpoint_method: str,
+    endpoint_credentials: str,
+    filename: str,
+    transfer_id: str,
+    compress: bool = False,
+    compress_min_bytes: int = 0,
+) -> str:
+    """Generate JavaScript code for downloading a file and staging it for chunked retrieval.
+
+    The download runs in the runtime library (see generate_runtime_library_js());
+    the expression only carries the call arguments.
+
+    Args:
+        download_url: The URL to download from.
+        headers: Dictionary of headers.
+        body_js_literal: JavaScript literal for the request body.
+        endpoint_method: HTTP method (GET, POST, etc.).
+        endpoint_credentials: Credentials mode (same-origin, include, omit).
+        filename: Filename for the downloaded file.
+        transfer_id: Key to stage the file under in window.__blueboxTransfers.
+        compress: Gzip the file in page (CompressionStream) before base64 encoding.
+        compress_min_bytes: Files smaller than this are not compressed.
+
+    Returns:
+        JavaScript expression that fetches the URL, stages the (optionally gzipped) base64 body
+        in window.__blueboxTransfers, and returns metadata for chunked retrieval.
+    """
+    args = [
+        *_request_args_js(download_url, headers, body_js_literal, endpoint_method, endpoint_credentials),
+        f"filename: {json.dumps(filename)}",
+        f"transferId: {json.dumps(transfer_id)}",
+        f"compress: {json.dumps(compress)}",
+        f"compressMinBytes: {int(compress_min_bytes)}",
+    ]
+    return _generate_runtime_call_js("download", "{" + ", ".join(args) + "}")
+
+
 def _get_element_profile_js() -> str:
     """Generate JavaScript helper function to extract element profile.
 
@@ -567,6 +891,42 @@ def generate_type_js(selector: str, clear: bool) -> str:
 """
 
 
+def _get_scroll_settle_js(target_js: str, position_js: str, behavior: str) -> str:
+    """Generate the tail of a scroll script: returns at once, or (smooth scrolling) a promise for the scroll end.
+
+    The promise resolves on `scrollend`, once the position is unchanged for 3 consecutive checks,
+    or after 2 seconds, whichever comes first (timers, not requestAnimationFrame, so hidden tabs settle too).
+
+    Args:
+        target_js: JS expression for the scrolled target (element or window).
+        position_js: JS expression evaluating to the current scroll position as a string.
+        behavior: Scroll behavior ('auto' or 'smooth').
+
+    Returns:
+        JavaScript statements ending in a return.
+    """
+    if behavior != "smooth":
+        return "    return { success: true };"
+    return f"""    return new Promise((resolve) => {{
+        const done = () => resolve({{ success: true }});
+        {target_js}.addEventListener('scrollend', done, {{ once: true }});
+        let last = null;
+        let stableChecks = 0;
+        const check = () => {{
+            const position = {position_js};
+            if (position === last) {{
+                if (++stableChecks >= 3) return done();
+            }} else {{
+                stableChecks = 0;
+                last = position;
+            }}
+            setTimeout(check, 50);
+        }};
+        setTimeout(check, 50);
+        setTimeout(done, 2000);
+    }});"""
+
+
 def generate_scroll_element_js(selector: str, delta_x: int, delta_y: int, behavior: str) -> str:
     """Generate JavaScript to scroll a specific element.
 
@@ -599,7 +959,7 @@ def generate_scroll_element_js(selector: str, delta_x: int, delta_y: int, behavi
         }});
     }}
 
-    return {{ success: true }};
+{_get_scroll_settle_js("element", "element.scrollLeft + ',' + element.scrollTop", behavior)}
 }})()
 """
 
@@ -646,31 +1006,7 @@ def generate_scroll_window_js(
         }});
     }}
 
-    return {{ success: true }};
-}})()
-"""
-
-
-def generate_wait_for_url_js(url_regex: str) -> str:
-    """Generate JavaScript to check if current URL matches a regex.
-
-    Args:
-        url_regex: Regular expression pattern to match.
-
-    Returns:
-        JavaScript code that checks URL match.
-    """
-    return f"""
-(function() {{
-    const urlRegex = new RegExp({json.dumps(url_regex)});
-    const currentUrl = window.location.href;
-    const matches = urlRegex.test(currentUrl);
-
-    return {{
-        matches: matches,
-        currentUrl: currentUrl,
-        pattern: {json.dumps(url_regex)}
-    }};
+{_get_scroll_settle_js("window", "window.scrollX + ',' + window.scrollY", behavior)}
 }})()
 """
 
@@ -697,48 +1033,78 @@ def generate_store_in_session_storage_js(key: str, value_json: str) -> str:
 """
 
 
-def generate_get_session_storage_length_js(key: str) -> str:
-    """Generate JavaScript to get length of a session storage value.
+def generate_stage_transfer_js(
+    value_js: str,
+    transfer_id: str,
+    compress: bool = False,
+    compress_min_chars: int = 0,
+) -> str:
+    """Generate JavaScript that stages a string value for chunked retrieval.
 
     Args:
-        key: Session storage key.
+        value_js: JavaScript expression for the value (may be a Promise); null/undefined stage nothing.
+        transfer_id: Key to stage the value under in window.__blueboxTransfers.
+        compress: Gzip the value in page (CompressionStream) before base64 encoding.
+        compress_min_chars: Values shorter than this are not compressed.
 
     Returns:
-        JavaScript expression that returns the length.
+        JavaScript code resolving to {transferId, transferLength, transferEncoding, isNull}.
     """
-    return f"window.sessionStorage.getItem({json.dumps(key)})?.length || 0"
+    js_lines = [
+        "(async () => {",
+        *_get_transfer_staging_js_helpers(),
+        f"  const value = await ({value_js});",
+        "  if (value === null || value === undefined) {",
+        "    return {",
+        f"      transferId: {json.dumps(transfer_id)}, transferLength: 0, transferEncoding: 'text', isNull: true",
+        "    };",
+        "  }",
+        "  const staged = await __bbStage(",
+        f"    {json.dumps(transfer_id)}, String(value), false, {json.dumps(compress)}, {int(compress_min_chars)}",
+        "  );",
+        "  return { ...staged, isNull: false };",
+        "})()",
+    ]
+    return "\n".join(js_lines)
+
 
+def generate_get_transfer_chunk_js(transfer_id: str, offset: int, end: int) -> str:
+    """Generate JavaScript to get a chunk of a staged value.
 
-def generate_get_session_storage_chunk_js(key: str, offset: int, end: int) -> str:
-    """Generate JavaScript to get a chunk of a session storage value.
+    A chunk boundary never splits a UTF-16 surrogate pair: a chunk ending on a high surrogate
+    takes the following low surrogate, and the next chunk skips it, so adjacent chunks still
+    concatenate to the original string.
 
     Args:
-        key: Session storage key.
+        transfer_id: Key of the staged value in window.__blueboxTransfers.
         offset: Start offset.
         end: End offset.
 
     Returns:
-        JavaScript code that returns the substring.
+        JavaScript code that returns the substring (null if the value is gone).
     """
     return f"""
 (function() {{
-    const val = window.sessionStorage.getItem({json.dumps(key)});
-    return val.substring({offset}, {end});
+    const s = (window.__blueboxTransfers || {{}})[{json.dumps(transfer_id)}];
+    if (typeof s !== 'string') return null;
+    const isHigh = (i) => {{ const c = s.charCodeAt(i); return c >= 0xD800 && c <= 0xDBFF; }};
+    const start = ({offset} > 0 && isHigh({offset} - 1)) ? {offset} + 1 : {offset};
+    const end = ({end} < s.length && isHigh({end} - 1)) ? {end} + 1 : {end};
+    return s.substring(start, end);
 }})()
 """
 
 
-def generate_get_download_chunk_js(offset: int, end: int) -> str:
-    """Generate JavaScript to get a chunk of download data.
+def generate_release_transfer_js(transfer_id: str) -> str:
+    """Generate JavaScript to drop a staged value.
 
     Args:
-        offset: Start offset.
-        end: End offset.
+        transfer_id: Key of the staged value in window.__blueboxTransfers.
 
     Returns:
-        JavaScript expression that returns the substring.
+        JavaScript expression that deletes the value.
     """
-    return f"window.__downloadData.substring({offset}, {end})"
+    return f"delete (window.__blueboxTransfers || {{}})[{json.dumps(transfer_id)}]"
 
 
 def generate_get_html_js(selector: str | None = None) -> str:
@@ -838,3 +1204,124 @@ def generate_js_evaluate_wrapper_js(
 }})()"""
 
 
+def generate_tab_hygiene_js(session_storage_keys: list[str]) -> str:
+    """Generate JavaScript that clears routine-scoped state before a tab is reused.
+
+    Removes the given sessionStorage keys and any staged transfers, and reports where the tab is.
+
+    Args:
+        session_storage_keys: sessionStorage keys written by the routine.
+
+    Returns:
+        JavaScript code resolving to location.href.
+    """
+    js_lines = [
+        "(() => {",
+        f"  for (const key of {json.dumps(sorted(set(session_storage_keys)))}) {{",
+        "    try { window.sessionStorage.removeItem(key); } catch (e) {}",
+        "  }",
+        "  delete window.__blueboxTransfers;",
+        "  return window.location.href;",
+        "})()",
+    ]
+    return "\n".join(js_lines)
+
+
+def generate_preconnect_js(origins: dict[str, bool]) -> str:
+    """Generate JavaScript that adds <link rel="preconnect"> hints for the given origins.
+
+    Suitable for Page.addScriptToEvaluateOnNewDocument: if the document has no element to attach
+    to yet, the hints are added as soon as the parser creates one. Origins equal to the document's
+    own are skipped.
+
+    Args:
+        origins: Origin -> whether its requests are sent with credentials (cookies). Credentialed
+            and anonymous (CORS without credentials) requests use separate connections.
+
+    Returns:
+        JavaScript code.
+    """
+    js_lines = [
+        "(() => {",
+        f"  const origins = {json.dumps(origins)};",
+        "  const add = () => {",
+        "    const root = document.head || document.documentElement;",
+        "    if (!root) return false;",
+        "    for (const [origin, credentialed] of Object.entries(origins)) {",
+        "      if (origin === window.location.origin) continue;",
+        "      const link = document.createElement('link');",
+        "      link.rel = 'preconnect';",
+        "      link.href = origin;",
+        "      if (!credentialed) link.crossOrigin = 'anonymous';",
+        "      root.appendChild(link);",
+        "    }",
+        "    return true;",
+        "  };",
+        "  if (!add()) {",
+        "    const observer = new MutationObserver(() => { if (add()) observer.disconnect(); });",
+        "    observer.observe(document, { childList: true, subtree: true });",
+        "  }",
+        "})()",
+    ]
+    return "\n".join(js_lines)
+
+
+def generate_storage_snapshot_js(excluded_session_storage_keys: list[str]) -> str:
+    """Generate JavaScript that reads the current document's localStorage and sessionStorage.
+
+    Args:
+        excluded_session_storage_keys: sessionStorage keys to leave out (the routine's own results).
+
+    Returns:
+        JavaScript expression resolving to {origin, localStorage, sessionStorage} (string values).
+    """
+    js_lines = [
+        "(() => {",
+        f"  const excluded = new Set({json.dumps(sorted(set(excluded_session_storage_keys)))});",
+        "  const read = (storage, skip) => {",
+        "    const items = {};",
+        "    try {",
+        "      for (let i = 0; i < storage.length; i++) {",
+        "        const key = storage.key(i);",
+        "        if (!skip.has(key)) items[key] = storage.getItem(key);",
+        "      }",
+        "    } catch (e) {}",
+        "    return items;",
+        "  };",
+        "  return {",
+        "    origin: window.location.origin,",
+        "    localStorage: read(window.localStorage, new Set()),",
+        "    sessionStorage: read(window.sessionStorage, excluded),",
+        "  };",
+        "})()",
+    ]
+    return "\n".join(js_lines)
+
+
+def generate_storage_restore_js(storage_by_origin: dict[str, dict[str, dict[str, str]]]) -> str:
+    """Generate JavaScript that restores web storage snapshots in documents of their origin.
+
+    Suitable for Page.addScriptToEvaluateOnNewDocument. Keys the page already holds are kept, so
+    later documents never overwrite newer values with the snapshot.
+
+    Args:
+        storage_by_origin: Origin -> {"localStorage": {...}, "sessionStorage": {...}}.
+
+    Returns:
+        JavaScript code.
+    """
+    js_lines = [
+        "(() => {",
+        f"  const snapshot = {json.dumps(storage_by_origin)}[window.location.origin];",
+        "  if (!snapshot) return;",
+        "  for (const [name, items] of Object.entries(snapshot)) {",
+        "    try {",
+        "      const storage = window[name];",
+        "      for (const [key, value] of Object.entries(items || {})) {",
+        "        if (storage.getItem(key) === null) storage.setItem(key, value);",
+        "      }",
+        "    } catch (e) {}",
+        "  }",
+        "})()",
+    ]
+    return "\n".join(js_lines)
@@ -0,0 +1,483 @@
+"""
+bluebox/utils/jsonl_utils.py
+
+Segmented (size-rotated, optionally compressed) JSONL capture files.
+
+A capture file such as `network/events.jsonl` may be split into numbered segments:
+
+    events.000001.jsonl.gz   <- closed, compressed segments (oldest first)
+    events.000002.jsonl.zst
+    events.000003.jsonl      <- closed segment not compressed (yet)
+    events.jsonl             <- active segment (newest)
+
+Readers address the capture by its base path and iterate across all segments transparently.
+
+A sidecar index (`events.index.jsonl`) records where each record lives (segment, byte offset,
+length) plus a few routing fields, so consumers can filter records and seek straight to the ones
+they need instead of parsing the whole capture.
+
+Contains:
+- SegmentCompression: Compression codec for closed segments
+- is_zstd_available(), default_segment_compression(): Codec selection
+- get_segment_path(), list_jsonl_segments(), jsonl_exists(), next_segment_index(): Segment discovery
+- open_jsonl_segment(), iter_jsonl_lines(): Transparent reading across segments
+- compress_jsonl_segment(): Compress a closed segment in place
+- JsonlIndexEntry: One record's location and routing metadata
+- get_index_path(), load_jsonl_index(), build_jsonl_index(): Sidecar index I/O
+- IndexedJsonlReader: Seek/mmap to indexed records, keeping segment maps open between reads
+- read_indexed_lines(), read_indexed_line(): One-shot indexed reads
+"""
+
+import gzip
+import io
+import json
+import mmap
+import os
+import re
+import shutil
+from dataclasses import asdict, dataclass
+from enum import StrEnum
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, TextIO
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional; gzip from the stdlib is always available
+    zstandard = None
+
+from bluebox.utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+SEGMENT_INDEX_WIDTH = 6
+INDEX_SUFFIX = ".index"
+_READ_CHUNK_BYTES = 1024 * 1024
+
+
+class SegmentCompression(StrEnum):
+    """Compression codec applied to closed capture segments."""
+    NONE = "none"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+    @property
+    def extension(self) -> str:
+        """File extension appended to the segment's .jsonl name."""
+        return {
+            SegmentCompression.NONE: "",
+            SegmentCompression.GZIP: ".gz",
+            SegmentCompression.ZSTD: ".zst",
+        }[self]
+
+
+def is_zstd_available() -> bool:
+    """Whether the optional `zstandard` package is importable."""
+    return zstandard is not None
+
+
+def default_segment_compression() -> SegmentCompression:
+    """zstd when the `zstandard` package is installed, gzip otherwise."""
+    return SegmentCompression.ZSTD if is_zstd_available() else SegmentCompression.GZIP
+
+
+def get_segment_path(
+    path: str | Path,
+    index: int,
+    compression: SegmentCompression = SegmentCompression.NONE,
+) -> Path:
+    """
+    Build the path of a numbered segment of a capture file.
+    Args:
+        path: Base capture path (e.g. network/events.jsonl).
+        index: 1-based segment number.
+        compression: Codec whose extension is appended.
+    Returns:
+        Segment path, e.g. network/events.000001.jsonl.gz.
+    """
+    path = Path(path)
+    return path.with_name(f"{path.stem}.{index:0{SEGMENT_INDEX_WIDTH}d}{path.suffix}{compression.extension}")
+
+
+def _segment_pattern(path: Path) -> re.Pattern[str]:
+    return re.compile(
+        rf"^{re.escape(path.stem)}\.(\d{{{SEGMENT_INDEX_WIDTH}}}){re.escape(path.suffix)}(\.gz|\.zst)?$"
+    )
+
+
+def list_rotated_segments(path: str | Path) -> dict[int, Path]:
+    """
+    Find the closed (rotated) segments of a capture file.
+    When a segment exists both raw and compressed (compression in progress), the compressed file wins.
+    Args:
+        path: Base capture path.
+    Returns:
+        Mapping of segment number to segment path, sorted by segment number.
+    """
+    path = Path(path)
+    if not path.parent.is_dir():
+        return {}
+    pattern = _segment_pattern(path)
+    segments: dict[int, Path] = {}
+    for candidate in path.parent.iterdir():
+        match = pattern.match(candidate.name)
+        if not match:
+            continue
+        index = int(match.group(1))
+        if index not in segments or match.group(2):
+            segments[index] = candidate
+    return dict(sorted(segments.items()))
+
+
+def list_jsonl_segments(path: str | Path) -> list[Path]:
+    """
+    List every segment of a capture file in write order (rotated segments, then the active file).
+    Args:
+        path: Base capture path.
+    Returns:
+        Existing segment paths, oldest first. Empty if nothing was captured.
+    """
+    path = Path(path)
+    segments = list(list_rotated_segments(path).values())
+    if path.exists():
+        segments.append(path)
+    return segments
+
+
+def jsonl_exists(path: str | Path) -> bool:
+    """Whether a capture file exists in any form (active file or rotated segments)."""
+    return bool(list_jsonl_segments(path))
+
+
+def next_segment_index(path: str | Path) -> int:
+    """Number the active file of a capture will get when it is rotated."""
+    return max(list_rotated_segments(path), default=0) + 1
+
+
+def open_jsonl_segment(path: str | Path) -> TextIO:
+    """
+    Open a single segment for text reading, decompressing by file extension.
+    Args:
+        path: Segment path (.jsonl, .jsonl.gz or .jsonl.zst).
+    Returns:
+        Text stream; caller is responsible for closing it.
+    Raises:
+        RuntimeError: If the segment is zstd-compressed and `zstandard` is not installed.
+    """
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, mode="rt", encoding="utf-8")
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path} requires the 'zstandard' package")
+        raw = open(path, mode="rb")  # pylint: disable=consider-using-with
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True), encoding="utf-8")
+    return open(path, mode="r", encoding="utf-8")  # pylint: disable=consider-using-with
+
+
+def _open_segment_bytes(path: Path) -> BinaryIO:
+    """Open a single segment for binary reading, decompressing by file extension."""
+    if path.suffix == ".gz":
+        return gzip.open(path, mode="rb")  # type: ignore[return-value]
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path} requires the 'zstandard' package")
+        raw = open(path, mode="rb")  # pylint: disable=consider-using-with
+        # buffered so callers can iterate lines
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+    return open(path, mode="rb")  # pylint: disable=consider-using-with
+
+
+def iter_jsonl_lines(path: str | Path) -> Iterator[str]:
+    """
+    Iterate over the raw lines of a capture file across all of its segments.
+    Args:
+        path: Base capture path.
+    Yields:
+        Lines (including trailing newline) in write order.
+    """
+    for segment in list_jsonl_segments(path):
+        with open_jsonl_segment(segment) as f:
+            yield from f
+
+
+def compress_jsonl_segment(path: str | Path, compression: SegmentCompression) -> Path:
+    """
+    Compress a closed segment and remove the raw file.
+    Writes to a temporary file first so readers never observe a partial archive.
+    Args:
+        path: Raw segment path (.jsonl).
+        compression: Codec to use. NONE leaves the segment untouched.
+    Returns:
+        Path of the resulting segment.
+    """
+    path = Path(path)
+    if compression == SegmentCompression.NONE:
+        return path
+    if compression == SegmentCompression.ZSTD and zstandard is None:
+        raise RuntimeError("zstd compression requires the 'zstandard' package")
+
+    target = path.with_name(path.name + compression.extension)
+    tmp_target = target.with_name(target.name + ".tmp")
+    with open(path, mode="rb") as src:
+        if compression == SegmentCompression.GZIP:
+            with gzip.open(tmp_target, mode="wb") as dst:
+                shutil.copyfileobj(src, dst)
+        else:
+            with open(tmp_target, mode="wb") as raw_dst:
+                with zstandard.ZstdCompressor().stream_writer(raw_dst) as dst:
+                    shutil.copyfileobj(src, dst)
+    os.replace(tmp_target, target)
+    path.unlink()
+    return target
+
+
+# Sidecar index _______________________________________________________________________________________________________
+
+@dataclass(frozen=True)
+class JsonlIndexEntry:
+    """
+    Location of one record of a capture, plus fields consumers commonly filter on.
+    Offsets are byte offsets into the uncompressed segment.
+    """
+    segment: int  # segment number; the active file is numbered next_segment_index()
+    offset: int
+    length: int  # bytes, including the trailing newline
+    request_id: str | None = None
+    url: str | None = None
+    timestamp: float | None = None
+    mime_type: str | None = None
+    status: int | None = None
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any], segment: int, offset: int, length: int) -> "JsonlIndexEntry":
+        """Build an entry from a decoded record; routing fields missing from the record are None."""
+        return cls(
+            segment=segment,
+            offset=offset,
+            length=length,
+            request_id=record.get("request_id"),
+            url=record.get("url"),
+            timestamp=record.get("timestamp"),
+            mime_type=record.get("mime_type"),
+            status=record.get("status"),
+        )
+
+    def to_json_line(self) -> bytes:
+        """Serialize as one compact JSONL line."""
+        return (json.dumps(asdict(self), ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def get_index_path(path: str | Path) -> Path:
+    """Sidecar index path of a capture file (events.jsonl -> events.index.jsonl)."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}{INDEX_SUFFIX}{path.suffix}")
+
+
+def _resolve_segment(path: Path, segment: int, rotated: dict[int, Path], active_index: int) -> Path | None:
+    if segment in rotated:
+        return rotated[segment]
+    if segment == active_index and path.exists():
+        return path
+    return None
+
+
+def _is_index_complete(path: Path, entries: list[JsonlIndexEntry]) -> bool:
+    """
+    Check that the index covers every byte of every segment.
+    Offsets must chain from 0 within each segment; uncompressed segments must end where the last record ends.
+    """
+    rotated = list_rotated_segments(path)
+    active_index = max(rotated, default=0) + 1  # same as next_segment_index(), without rescanning
+    ends: dict[int, int] = {}
+    for entry in sorted(entries, key=lambda e: (e.segment, e.offset)):
+        if entry.offset != ends.get(entry.segment, 0):
+            return False
+        ends[entry.segment] = entry.offset + entry.length
+
+    for segment, segment_path in rotated.items():
+        if segment not in ends:
+            return False
+        if segment_path.suffix == path.suffix and segment_path.stat().st_size != ends[segment]:
+            return False
+    if path.exists() and path.stat().st_size != ends.get(active_index, 0):
+        return False
+    return set(ends) <= set(rotated) | {active_index}
+
+
+def load_jsonl_index(path: str | Path) -> list[JsonlIndexEntry] | None:
+    """
+    Load the sidecar index of a capture.
+    Args:
+        path: Base capture path.
+    Returns:
+        Entries in write order, or None if there is no index or it does not cover the capture
+        (e.g. the writer crashed between flushes, or the capture predates indexing).
+    """
+    path = Path(path)
+    index_path = get_index_path(path)
+    if not index_path.exists():
+        return None
+
+    entries: list[JsonlIndexEntry] = []
+    try:
+        with open(index_path, mode="r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(JsonlIndexEntry(**json.loads(line)))
+    except (json.JSONDecodeError, TypeError) as e:
+        logger.warning("Ignoring unreadable index %s: %s", index_path, e)
+        return None
+
+    if not _is_index_complete(path, entries):
+        logger.info("Index %s does not cover %s; falling back to a full scan", index_path.name, path)
+        return None
+    return entries
+
+
+def build_jsonl_index(path: str | Path) -> int:
+    """
+    Build (or rebuild) the sidecar index of an existing capture by scanning all of its segments.
+    Args:
+        path: Base capture path.
+    Returns:
+        Number of indexed records.
+    """
+    path = Path(path)
+    rotated = list_rotated_segments(path)
+    numbered = list(rotated.items())
+    if path.exists():
+        numbered.append((max(rotated, default=0) + 1, path))
+
+    index_path = get_index_path(path)
+    tmp_index_path = index_path.with_name(index_path.name + ".tmp")
+    count = 0
+    with open(tmp_index_path, mode="wb") as out:
+        for segment, segment_path in numbered:
+            offset = 0
+            with _open_segment_bytes(segment_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        record = None
+                    if not isinstance(record, dict):
+                        record = {}
+                    out.write(JsonlIndexEntry.from_record(record, segment, offset, len(line)).to_json_line())
+                    offset += len(line)
+                    count += 1
+    os.replace(tmp_index_path, index_path)
+    logger.info("Indexed %d records of %s", count, path)
+    return count
+
+
+def _skip_bytes(stream: BinaryIO, count: int) -> None:
+    while count > 0:
+        chunk = stream.read(min(count, _READ_CHUNK_BYTES))
+        if not chunk:
+            raise EOFError("Segment ended before the indexed offset")
+        count -= len(chunk)
+
+
+class IndexedJsonlReader:
+    """
+    Random access to the indexed records of a capture, for consumers that read records one batch
+    (or one record) at a time.
+
+    Segments are listed once, and uncompressed segments stay memory-mapped until close(), so
+    repeated reads only slice the maps. Compressed segments are decompressed once per batch,
+    skipping the bytes between requested records.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Args:
+            path: Base capture path.
+        """
+        self.path = Path(path)
+        self._rotated = list_rotated_segments(self.path)
+        self._active_index = max(self._rotated, default=0) + 1
+        self._maps: dict[int, mmap.mmap] = {}
+
+    def __enter__(self) -> "IndexedJsonlReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap all segments."""
+        for mm in self._maps.values():
+            mm.close()
+        self._maps.clear()
+
+    def read_lines(self, entries: Iterable[JsonlIndexEntry]) -> Iterator[tuple[JsonlIndexEntry, bytes]]:
+        """
+        Read the given records.
+        Args:
+            entries: Index entries to read (e.g. a filtered subset of load_jsonl_index()).
+        Yields:
+            (entry, raw line bytes) ordered by segment and offset.
+        """
+        by_segment: dict[int, list[JsonlIndexEntry]] = {}
+        for entry in entries:
+            by_segment.setdefault(entry.segment, []).append(entry)
+
+        for segment in sorted(by_segment):
+            segment_entries = sorted(by_segment[segment], key=lambda e: e.offset)
+            segment_path = _resolve_segment(self.path, segment, self._rotated, self._active_index)
+            if segment_path is None:
+                raise FileNotFoundError(f"Segment {segment} of {self.path} not found")
+
+            if segment_path.suffix == self.path.suffix:
+                mm = self._segment_map(segment, segment_path, end=segment_entries[-1].offset + segment_entries[-1].length)
+                for entry in segment_entries:
+                    yield entry, mm[entry.offset:entry.offset + entry.length]
+            else:
+                with _open_segment_bytes(segment_path) as f:
+                    position = 0
+                    for entry in segment_entries:
+                        _skip_bytes(f, entry.offset - position)
+                        yield entry, f.read(entry.length)
+                        position = entry.offset + entry.length
+
+    def read_line(self, entry: JsonlIndexEntry) -> bytes:
+        """Read a single indexed record."""
+        for _, line in self.read_lines([entry]):
+            return line
+        raise FileNotFoundError(f"Record at segment {entry.segment} offset {entry.offset} of {self.path} not found")
+
+    def _segment_map(self, segment: int, segment_path: Path, end: int) -> mmap.mmap:
+        """Map of an uncompressed segment, remapped if the (active) segment grew past the cached map."""
+        mm = self._maps.get(segment)
+        if mm is not None and len(mm) >= end:
+            return mm
+        if mm is not None:
+            mm.close()
+        with open(segment_path, mode="rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[segment] = mm
+        return mm
+
+
+def read_indexed_lines(
+    path: str | Path,
+    entries: Iterable[JsonlIndexEntry],
+) -> Iterator[tuple[JsonlIndexEntry, bytes]]:
+    """
+    Read only the given records of a capture (one-shot IndexedJsonlReader).
+    Uncompressed segments are memory-mapped and sliced; compressed segments are decompressed once,
+    skipping the bytes between requested records.
+    Args:
+        path: Base capture path.
+        entries: Index entries to read (e.g. a filtered subset of load_jsonl_index()).
+    Yields:
+        (entry, raw line bytes) ordered by segment and offset.
+    """
+    with IndexedJsonlReader(path) as reader:
+        yield from reader.read_lines(entries)
+
+
+def read_indexed_line(path: str | Path, entry: JsonlIndexEntry) -> bytes:
+    """Read a single indexed record of a capture."""
+    with IndexedJsonlReader(path) as reader:
+        return reader.read_line(entry)
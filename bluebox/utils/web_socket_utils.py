@@ -15,7 +15,7 @@ import time
 from collections.abc import Callable
 from json import JSONDecodeError
 
-from websocket import WebSocket
+from websocket import WebSocket, WebSocketTimeoutException
 
 # Global counter for WS message IDs - guaranteed unique per process
 _msg_id_counter = itertools.count(1)
@@ -58,14 +58,23 @@ def recv_json(ws: WebSocket, deadline: float) -> dict:
     Raises:
         TimeoutError: If deadline is exceeded before receiving a valid JSON message.
     """
-    while time.time() < deadline:
-        raw = ws.recv()
-        if not raw:
-            continue
-        try:
-            return json.loads(raw)
-        except JSONDecodeError:
-            continue
+    previous_timeout = ws.gettimeout()
+    try:
+        while (remaining := deadline - time.time()) > 0:
+            # bound the blocking read by the deadline (the socket's own timeout may be longer or unset)
+            ws.settimeout(remaining)
+            try:
+                raw = ws.recv()
+            except WebSocketTimeoutException:
+                break
+            if not raw:
+                continue
+            try:
+                return json.loads(raw)
+            except JSONDecodeError:
+                continue
+    finally:
+        ws.settimeout(previous_timeout)
     raise TimeoutError("Timed out waiting for a JSON CDP message")
 
 
@@ -0,0 +1,200 @@
+"""
+tests/unit/cdp/test_browser_pool.py
+
+Tests for health-checked browser pools and sharded routine execution.
+"""
+
+import json
+
+import pytest
+
+from bluebox.cdp.browser_pool import BrowserHealth, BrowserPool
+from bluebox.data_models.routine.endpoint import Endpoint
+from bluebox.data_models.routine.execution import RoutineExecutionResult
+from bluebox.data_models.routine.operation import (
+    RoutineClickOperation,
+    RoutineFetchOperation,
+    RoutineNavigateOperation,
+    RoutineReturnOperation,
+)
+from bluebox.data_models.routine.routine import Routine
+from bluebox.sdk.sharded_execution import ShardedRoutineExecutor, browser_failure, is_idempotent
+from bluebox.utils.exceptions import BrowserConnectionError
+
+A, B = "http://127.0.0.1:9222", "http://127.0.0.1:9223"
+
+
+class FakeBrowser:
+    """Browser-level WebSocket answering Target.getTargets with `pages` page targets."""
+
+    def __init__(self, pages: int = 0) -> None:
+        self.pages = pages
+        self.down = False
+        self.connections = 0
+        self.replies: list[str] = []
+
+    def connect(self) -> "FakeBrowser":
+        if self.down:
+            raise ConnectionRefusedError("connection refused")
+        self.connections += 1
+        return self
+
+    def send(self, raw: str) -> None:
+        if self.down:
+            raise ConnectionResetError("connection reset")
+        msg = json.loads(raw)
+        targets = [{"targetId": str(i), "type": "page"} for i in range(self.pages)] + [{"type": "service_worker"}]
+        self.replies.append(json.dumps({"id": msg["id"], "result": {"targetInfos": targets}}))
+
+    def recv(self) -> str:
+        return self.replies.pop(0)
+
+    def close(self) -> None:
+        pass
+
+
+def _pool(browsers: dict[str, FakeBrowser], **kwargs) -> BrowserPool:
+    return BrowserPool(list(browsers), connect=lambda address, timeout: browsers[address].connect(), **kwargs)
+
+
+def _routine(*operations) -> Routine:
+    return Routine(
+        name="r",
+        description="d",
+        operations=[
+            *operations,
+            RoutineFetchOperation(endpoint=Endpoint(url="https://a.com/api", method="GET"), session_storage_key="x"),
+            RoutineReturnOperation(session_storage_key="x"),
+        ],
+    )
+
+
+class TestBrowserPool:
+    """Tests for BrowserPool."""
+
+    def test_places_on_least_loaded_browser(self) -> None:
+        browsers = {A: FakeBrowser(pages=4), B: FakeBrowser(pages=0)}
+        pool = _pool(browsers)
+        assert pool.check_all() == {A: True, B: True}
+        assert pool.check_all() == {A: True, B: True}
+        assert browsers[A].connections == 1  # persistent connection reused
+
+        endpoints = {endpoint.remote_debugging_address: endpoint for endpoint in pool.endpoints()}
+        assert endpoints[A].open_targets == 4 and endpoints[A].latency_seconds is not None
+
+        first = pool.acquire()
+        assert first == B
+        assert pool.acquire(exclude=[B]) == A
+        pool.release(A)
+        pool.release(B)
+        assert all(endpoint.in_flight == 0 for endpoint in pool.endpoints())
+
+    def test_drains_failing_browser_until_it_recovers(self) -> None:
+        browsers = {A: FakeBrowser(), B: FakeBrowser()}
+        pool = _pool(browsers, failure_threshold=2)
+        browsers[A].down = True
+        pool.check(A)
+        assert pool.endpoints()[0].health == BrowserHealth.HEALTHY
+        pool.check(A)
+        assert pool.endpoints()[0].health == BrowserHealth.UNHEALTHY
+        assert "health check failed" in pool.endpoints()[0].last_error
+        assert {pool.acquire() for _ in range(3)} == {B}
+
+        browsers[A].down = False
+        assert pool.check(A)
+        assert pool.endpoints()[0].health == BrowserHealth.HEALTHY
+
+    def test_execution_failures_and_manual_drain(self) -> None:
+        pool = _pool({A: FakeBrowser()}, failure_threshold=1)
+        pool.release(pool.acquire(), ok=False, error="Failed to create tab: boom")
+        with pytest.raises(BrowserConnectionError):
+            pool.acquire()
+        assert pool.check(A)
+
+        pool.drain(A)
+        assert pool.check(A)
+        assert pool.endpoints()[0].health == BrowserHealth.DRAINING
+        with pytest.raises(BrowserConnectionError):
+            pool.acquire(timeout=0.05)
+        pool.undrain(A)
+        assert pool.acquire() == A
+
+    def test_validation(self) -> None:
+        with pytest.raises(ValueError):
+            BrowserPool([])
+        with pytest.raises(ValueError):
+            BrowserPool([A], latency_alpha=0)
+
+
+class FakeExecutor:
+    """RoutineExecutor stand-in returning scripted results."""
+
+    def __init__(self, results: list[RoutineExecutionResult]) -> None:
+        self.results = results
+        self.calls = 0
+
+    def execute(self, routine: Routine, parameters: dict, **kwargs) -> RoutineExecutionResult:
+        self.calls += 1
+        return self.results.pop(0)
+
+    def execute_batch(self, routine: Routine, parameter_sets: list[dict], **kwargs) -> list[RoutineExecutionResult]:
+        result = self.execute(routine, {})
+        return [result for _ in parameter_sets]
+
+
+class TestShardedRoutineExecutor:
+    """Tests for ShardedRoutineExecutor."""
+
+    def test_idempotency(self) -> None:
+        assert is_idempotent(_routine(RoutineNavigateOperation(url="https://a.com")))
+        assert not is_idempotent(_routine(RoutineClickOperation(selector="#buy")))
+        post = Routine(
+            name="r",
+            description="d",
+            operations=[
+                RoutineFetchOperation(endpoint=Endpoint(url="https://a.com/api", method="POST"), session_storage_key="x"),
+                RoutineReturnOperation(session_storage_key="x"),
+            ],
+        )
+        assert not is_idempotent(post)
+        assert browser_failure(RoutineExecutionResult(ok=False, error="Routine execution failed: socket closed"))
+        assert browser_failure(RoutineExecutionResult(ok=False, error="Fetch failed")) is None
+
+    def test_retries_idempotent_routine_on_another_browser(self) -> None:
+        pool = _pool({A: FakeBrowser(), B: FakeBrowser(pages=9)})
+        executors = {
+            A: FakeExecutor([RoutineExecutionResult(ok=False, error="Routine execution failed: socket closed")]),
+            B: FakeExecutor([RoutineExecutionResult(ok=True, data={"v": 1})] * 2),
+        }
+        sharded = ShardedRoutineExecutor(pool, executor_factory=executors.__getitem__)
+        pool.check_all()
+
+        result = sharded.execute(_routine(), {})
+        assert result.ok and executors[A].calls == 1 and executors[B].calls == 1
+        endpoint_a = next(e for e in pool.endpoints() if e.remote_debugging_address == A)
+        assert endpoint_a.failures == 1 and endpoint_a.in_flight == 0
+
+        assert [r.ok for r in sharded.execute_batch(_routine(), [{}, {}])] == [True, True]
+
+    def test_does_not_retry_non_idempotent_routine(self) -> None:
+        pool = _pool({A: FakeBrowser(), B: FakeBrowser(pages=9)})
+        session_error = RoutineExecutionResult(ok=False, error="Routine execution failed: socket closed")
+        tab_error = RoutineExecutionResult(ok=False, error="Failed to create tab: refused")
+        executors = {A: FakeExecutor([session_error, tab_error]), B: FakeExecutor([RoutineExecutionResult(ok=True)])}
+        sharded = ShardedRoutineExecutor(pool, executor_factory=executors.__getitem__, max_attempts=3)
+        routine = _routine(RoutineClickOperation(selector="#buy"))
+
+        assert sharded.execute(routine, {}).error.startswith("Routine execution failed")
+        assert executors[B].calls == 0
+        # nothing ran when the tab could not be created, so even this routine moves on
+        assert sharded.execute(routine, {}).ok
+        assert executors[B].calls == 1
+
+    def test_no_healthy_browser(self) -> None:
+        browsers = {A: FakeBrowser()}
+        browsers[A].down = True
+        pool = _pool(browsers, failure_threshold=1)
+        pool.check_all()
+        sharded = ShardedRoutineExecutor(pool, executor_factory=lambda address: FakeExecutor([]))
+        result = sharded.execute(_routine(), {})
+        assert not result.ok and "No healthy browser" in result.error
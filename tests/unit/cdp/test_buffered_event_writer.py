@@ -0,0 +1,61 @@
+"""
+tests/unit/cdp/test_buffered_event_writer.py
+
+Tests for the buffering base shared by the CDP event writers.
+"""
+
+import threading
+
+import pytest
+
+from bluebox.cdp.buffered_event_writer import BufferedEventWriter
+
+
+class _ListWriter(BufferedEventWriter):
+    """Drains into a list; `drained` is set after every drain."""
+
+    def __init__(self, flush_threshold: int = 100, flush_interval_seconds: float = 60.0) -> None:
+        super().__init__(flush_interval_seconds, flush_threshold, thread_name="ListWriter")
+        self.written: list[tuple[str, list[int]]] = []
+        self.drained = threading.Event()
+
+    def _drain(self, key: str, items: list[int]) -> None:
+        if key == "broken":
+            raise OSError("sink unavailable")
+        self.written.append((key, items))
+        self.drained.set()
+
+
+class TestBufferedEventWriter:
+    """Tests for BufferedEventWriter."""
+
+    def test_close_drains_in_order(self) -> None:
+        writer = _ListWriter()
+        for i in range(3):
+            writer._enqueue("a", i)
+        writer._enqueue("b", 9)
+        assert writer.written == []
+
+        writer.close()
+        assert writer.written == [("a", [0, 1, 2]), ("b", [9])]
+        assert writer._writer_thread is None
+
+    def test_threshold_wakes_writer_thread(self) -> None:
+        writer = _ListWriter(flush_threshold=10)
+        writer._enqueue("a", 1, size=4)
+        writer._enqueue("a", 2, size=6)
+        assert writer.drained.wait(timeout=5)
+        assert writer.written == [("a", [1, 2])]
+        writer.close()
+
+    def test_failed_drain_does_not_stop_other_keys(self) -> None:
+        writer = _ListWriter()
+        writer._enqueue("broken", 1)
+        writer._enqueue("a", 2)
+        writer.flush()
+        assert writer.written == [("a", [2])]
+        writer.close()
+
+    def test_rejects_non_positive_interval(self) -> None:
+        with pytest.raises(ValueError, match="flush_interval_seconds"):
+            _ListWriter(flush_interval_seconds=0)
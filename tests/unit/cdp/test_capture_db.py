@@ -0,0 +1,167 @@
+"""
+tests/unit/cdp/test_capture_db.py
+
+Tests for CaptureDB and CaptureDBEventWriter.
+"""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from bluebox.cdp.capture_db import CaptureDB, CaptureDBEventWriter
+from bluebox.utils.jsonl_utils import SegmentCompression, compress_jsonl_segment, get_segment_path
+
+
+def _transaction(request_id: str, body: str, mime_type: str = "application/json", **extra) -> dict:
+    return {
+        "request_id": request_id,
+        "url": f"https://example.com/api/{request_id}",
+        "method": "GET",
+        "status": 200,
+        "mime_type": mime_type,
+        "timestamp": 1.5,
+        "request_headers": {"accept": "*/*"},
+        "response_body": body,
+        **extra,
+    }
+
+
+def _write_jsonl(path: Path, records: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+
+
+class TestCaptureDB:
+    """Tests for CaptureDB schema, inserts and queries."""
+
+    def test_transaction_roundtrip(self) -> None:
+        db = CaptureDB(":memory:")
+        record = _transaction("r1", '{"token": "abc"}', post_data="x=1")
+        db.insert_events("AsyncNetworkMonitor", [record])
+
+        row = db.query("SELECT * FROM transactions")[0]
+        assert row["host"] == "example.com"
+        assert row["path"] == "/api/r1"
+        assert row["has_post_data"] == 1
+        assert row["is_javascript"] == 0
+        assert row["transaction_id"] == "1.5_https___example.com_api_r1"
+        assert CaptureDB.transaction_from_row(row) == record
+
+    def test_javascript_flag_follows_event_routing(self) -> None:
+        db = CaptureDB(":memory:")
+        db.insert_events("AsyncNetworkMonitor", [
+            _transaction("js", "var a;", mime_type="application/javascript"),
+            _transaction("js-header", "var b;", mime_type="", response_headers={"content-type": "text/javascript"}),
+        ])
+        assert [row[0] for row in db.query("SELECT is_javascript FROM transactions ORDER BY id")] == [1, 1]
+
+    def test_other_categories(self) -> None:
+        db = CaptureDB(":memory:")
+        db.insert_events("AsyncStorageMonitor", [{"type": "localStorageItemAdded", "origin": "https://a.com"}])
+        db.insert_events("AsyncWindowPropertyMonitor", [{"url": "https://a.com", "changes": []}])
+        db.insert_events("AsyncInteractionMonitor", [{"type": "click", "url": "https://a.com"}])
+        assert db.insert_events("AsyncDOMMonitor", [{"type": "snapshot"}]) == 0
+
+        assert db.count("storage_events") == 1
+        assert db.count("window_properties") == 1
+        assert db.count("interactions") == 1
+        with pytest.raises(ValueError, match="Unknown capture table"):
+            db.count("dom")
+
+    @pytest.mark.parametrize("enable_fts", [True, False])
+    def test_body_match_clause(self, enable_fts: bool) -> None:
+        db = CaptureDB(":memory:", enable_fts=enable_fts)
+        db.insert_events("AsyncNetworkMonitor", [
+            _transaction("r1", '{"Token": "secret"}'),
+            _transaction("r2", '{"other": 1}'),
+        ])
+        assert db.has_fts is enable_fts
+
+        def matching(value: str, case_sensitive: bool) -> list[str]:
+            clause, params = db.body_match_clause(value, case_sensitive)
+            rows = db.query(f"SELECT request_id, response_body FROM transactions WHERE {clause}", params)
+            # case-insensitive matches are candidates; callers re-check them
+            return [
+                row["request_id"] for row in rows
+                if (value in row["response_body"] if case_sensitive else value.lower() in row["response_body"].lower())
+            ]
+
+        assert matching("Token", True) == ["r1"]
+        assert matching("token", True) == []
+        assert matching("TOKEN", False) == ["r1"]
+        assert matching('"', True) == ["r1", "r2"]
+
+    def test_fts_index_built_for_existing_rows(self, tmp_path: Path) -> None:
+        db_path = tmp_path / "capture.db"
+        with CaptureDB(db_path, enable_fts=False) as db:
+            db.insert_events("AsyncNetworkMonitor", [_transaction("r1", "needle in body")])
+
+        with CaptureDB(db_path) as db:
+            rows = db.query("SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH ?", ['"needle"'])
+            assert len(rows) == 1
+
+    def test_from_capture_dir_reads_rotated_segments(self, tmp_path: Path) -> None:
+        network_path = tmp_path / "network" / "events.jsonl"
+        _write_jsonl(get_segment_path(network_path, 1), [_transaction("r1", "a")])
+        compress_jsonl_segment(get_segment_path(network_path, 1), SegmentCompression.GZIP)
+        _write_jsonl(network_path, [_transaction("r2", "b")])
+        _write_jsonl(tmp_path / "network" / "javascript_events.jsonl", [
+            _transaction("js", "var a;", mime_type="application/javascript"),
+        ])
+        _write_jsonl(tmp_path / "storage" / "events.jsonl", [{"type": "cookieChange"}])
+
+        with CaptureDB.from_capture_dir(tmp_path) as db:
+            assert (tmp_path / "capture.db").exists()
+            assert [r[0] for r in db.query("SELECT request_id FROM transactions ORDER BY id")] == ["r1", "r2", "js"]
+            assert db.count("storage_events") == 1
+            assert db.count("window_properties") == 0
+
+    def test_iter_query_batches(self) -> None:
+        db = CaptureDB(":memory:")
+        db.insert_events("AsyncNetworkMonitor", [_transaction(f"r{i}", "x") for i in range(7)])
+        rows = list(db.iter_query("SELECT request_id FROM transactions ORDER BY id", batch_size=3))
+        assert [row[0] for row in rows] == [f"r{i}" for i in range(7)]
+
+
+class TestCaptureDBEventWriter:
+    """Tests for the background-thread CaptureDB writer."""
+
+    @pytest.mark.asyncio
+    async def test_events_inserted_on_close(self, tmp_path: Path) -> None:
+        writer = CaptureDBEventWriter(tmp_path / "capture.db", flush_interval_seconds=60)
+        await writer.write_event("AsyncNetworkMonitor", _transaction("r1", "body"))
+        await writer.write_event("AsyncStorageMonitor", {"type": "cookieChange"})
+        await writer.write_event("AsyncDOMMonitor", {"type": "snapshot"})
+        writer.close()
+        writer.close()  # idempotent
+
+        with CaptureDB(tmp_path / "capture.db") as db:
+            assert db.count("transactions") == 1
+            assert db.count("storage_events") == 1
+
+    @pytest.mark.asyncio
+    async def test_threshold_triggers_background_insert(self, tmp_path: Path) -> None:
+        writer = CaptureDBEventWriter(tmp_path / "capture.db", flush_interval_seconds=60, flush_threshold_events=2)
+        await writer.write_event("AsyncNetworkMonitor", _transaction("r1", "a"))
+        await writer.write_event("AsyncNetworkMonitor", _transaction("r2", "b"))
+
+        deadline = time.monotonic() + 5
+        while writer.db.count("transactions") < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert writer.db.count("transactions") == 2
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_write_after_close_is_dropped(self, tmp_path: Path) -> None:
+        writer = CaptureDBEventWriter(tmp_path / "capture.db")
+        writer.close()
+        await writer.write_event("AsyncNetworkMonitor", _transaction("r1", "a"))
+        assert writer._buffers == {}
+
+    def test_invalid_args(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="flush_interval_seconds"):
+            CaptureDBEventWriter(tmp_path / "capture.db", flush_interval_seconds=0)
+        with pytest.raises(ValueError, match="flush_threshold_events"):
+            CaptureDBEventWriter(tmp_path / "capture.db", flush_threshold_events=0)
@@ -4,12 +4,22 @@ tests/unit/cdp/test_file_event_writer.py
 Tests for FileEventWriter.
 """
 
+import asyncio
 import json
+import time
 import pytest
 from pathlib import Path
 from unittest.mock import MagicMock
 
-from bluebox.cdp.file_event_writer import FileEventWriter
+from bluebox.cdp.file_event_writer import FileEventWriter, FsyncPolicy
+from bluebox.utils.jsonl_utils import (
+    SegmentCompression,
+    get_index_path,
+    iter_jsonl_lines,
+    list_jsonl_segments,
+    load_jsonl_index,
+    read_indexed_lines,
+)
 
 
 class TestFileEventWriterInit:
@@ -58,6 +68,7 @@ class TestFileEventWriterWriteEvent:
         writer = FileEventWriter(paths=paths)
 
         await writer.write_event("AsyncNetworkMonitor", {"url": "https://example.com"})
+        writer.close()
 
         assert network_path.exists()
         content = network_path.read_text()
@@ -77,6 +88,7 @@ class TestFileEventWriterWriteEvent:
         writer = FileEventWriter(paths=paths)
 
         await writer.write_event("AsyncStorageMonitor", {"type": "cookieChange"})
+        writer.close()
 
         assert storage_path.exists()
         content = storage_path.read_text()
@@ -96,6 +108,7 @@ class TestFileEventWriterWriteEvent:
         writer = FileEventWriter(paths=paths)
 
         await writer.write_event("AsyncWindowPropertyMonitor", {"changes": []})
+        writer.close()
 
         assert window_path.exists()
         content = window_path.read_text()
@@ -115,6 +128,7 @@ class TestFileEventWriterWriteEvent:
         writer = FileEventWriter(paths=paths)
 
         await writer.write_event("AsyncInteractionMonitor", {"type": "click"})
+        writer.close()
 
         assert interaction_path.exists()
         content = interaction_path.read_text()
@@ -133,6 +147,7 @@ class TestFileEventWriterWriteEvent:
         writer = FileEventWriter(paths=paths)
 
         await writer.write_event("UnknownMonitor", {"data": "test"})
+        writer.close()
 
         # none of the files should be created (except directories)
         assert not (tmp_path / "network" / "events.jsonl").exists()
@@ -157,6 +172,7 @@ class TestFileEventWriterWriteEvent:
         mock_model.model_dump.return_value = {"field": "value", "nested": {"a": 1}}
 
         await writer.write_event("AsyncNetworkMonitor", mock_model)
+        writer.close()
 
         mock_model.model_dump.assert_called_once()
         assert network_path.exists()
@@ -180,6 +196,7 @@ class TestFileEventWriterWriteEvent:
         await writer.write_event("AsyncNetworkMonitor", {"id": 1})
         await writer.write_event("AsyncNetworkMonitor", {"id": 2})
         await writer.write_event("AsyncNetworkMonitor", {"id": 3})
+        writer.close()
 
         lines = network_path.read_text().strip().split("\n")
         assert len(lines) == 3
@@ -188,6 +205,244 @@ class TestFileEventWriterWriteEvent:
         assert json.loads(lines[2])["id"] == 3
 
 
+class TestFileEventWriterBuffering:
+    """
+    Tests for FileEventWriter buffering, background flushing and close.
+    """
+
+    @staticmethod
+    def _make_writer(tmp_path: Path, **kwargs) -> FileEventWriter:
+        paths = {
+            "network_events_path": str(tmp_path / "network" / "events.jsonl"),
+            "storage_events_path": str(tmp_path / "storage" / "events.jsonl"),
+            "window_properties_path": str(tmp_path / "window" / "events.jsonl"),
+            "interaction_events_path": str(tmp_path / "interaction" / "events.jsonl"),
+        }
+        return FileEventWriter(paths=paths, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_events_buffered_until_flush(self, tmp_path: Path) -> None:
+        """Events stay in memory until a flush is triggered."""
+        writer = self._make_writer(tmp_path, flush_interval_seconds=60)
+        network_path = tmp_path / "network" / "events.jsonl"
+
+        await writer.write_event("AsyncNetworkMonitor", {"id": 1})
+        assert not network_path.exists()
+
+        writer.flush()
+        assert json.loads(network_path.read_text().strip())["id"] == 1
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_size_threshold_triggers_background_flush(self, tmp_path: Path) -> None:
+        """Exceeding flush_threshold_bytes wakes the writer thread."""
+        writer = self._make_writer(tmp_path, flush_interval_seconds=60, flush_threshold_bytes=10)
+        network_path = tmp_path / "network" / "events.jsonl"
+
+        await writer.write_event("AsyncNetworkMonitor", {"payload": "x" * 50})
+
+        deadline = time.monotonic() + 5
+        while not network_path.exists() and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        assert "x" * 50 in network_path.read_text()
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_interval_triggers_background_flush(self, tmp_path: Path) -> None:
+        """Buffered events are flushed after flush_interval_seconds."""
+        writer = self._make_writer(tmp_path, flush_interval_seconds=0.05)
+        storage_path = tmp_path / "storage" / "events.jsonl"
+
+        await writer.write_event("AsyncStorageMonitor", {"type": "cookieChange"})
+
+        deadline = time.monotonic() + 5
+        while not storage_path.exists() and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        assert json.loads(storage_path.read_text().strip())["type"] == "cookieChange"
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_handle_kept_open_across_flushes(self, tmp_path: Path) -> None:
+        """One handle per file is reused across flushes and released on close."""
+        writer = self._make_writer(tmp_path, flush_interval_seconds=60)
+
+        await writer.write_event("AsyncNetworkMonitor", {"id": 1})
+        writer.flush()
+        handle = writer._handles[tmp_path / "network" / "events.jsonl"]
+        await writer.write_event("AsyncNetworkMonitor", {"id": 2})
+        writer.flush()
+
+        assert writer._handles[tmp_path / "network" / "events.jsonl"] is handle
+        writer.close()
+        assert handle.closed
+        assert writer._handles == {}
+
+    @pytest.mark.asyncio
+    async def test_close_is_idempotent_and_writer_reusable(self, tmp_path: Path) -> None:
+        """close() can be called twice, and writes after close still reach disk."""
+        writer = self._make_writer(tmp_path)
+        network_path = tmp_path / "network" / "events.jsonl"
+
+        await writer.write_event("AsyncNetworkMonitor", {"id": 1})
+        writer.close()
+        writer.close()
+        await writer.write_event("AsyncNetworkMonitor", {"id": 2})
+        writer.close()
+
+        lines = network_path.read_text().strip().split("\n")
+        assert [json.loads(line)["id"] for line in lines] == [1, 2]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "policy, expected_fsyncs",
+        [
+            (FsyncPolicy.NEVER, 0),
+            (FsyncPolicy.ON_CLOSE, 1),
+            (FsyncPolicy.ON_FLUSH, 3),  # two flushes + close
+        ],
+    )
+    async def test_fsync_policy(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        policy: FsyncPolicy,
+        expected_fsyncs: int,
+    ) -> None:
+        """fsync is called according to the configured policy."""
+        fsync_calls: list[int] = []
+        monkeypatch.setattr("bluebox.cdp.file_event_writer.os.fsync", fsync_calls.append)
+        writer = self._make_writer(tmp_path, flush_interval_seconds=60, fsync_policy=policy, write_index=False)
+
+        await writer.write_event("AsyncNetworkMonitor", {"id": 1})
+        writer.flush()
+        await writer.write_event("AsyncNetworkMonitor", {"id": 2})
+        writer.close()
+
+        assert len(fsync_calls) == expected_fsyncs
+
+    def test_invalid_thresholds_raise(self, tmp_path: Path) -> None:
+        """Non-positive flush settings are rejected."""
+        with pytest.raises(ValueError):
+            self._make_writer(tmp_path, flush_interval_seconds=0)
+        with pytest.raises(ValueError):
+            self._make_writer(tmp_path, flush_threshold_bytes=0)
+
+
+class TestFileEventWriterRotation:
+    """
+    Tests for FileEventWriter segment rotation and compression.
+    """
+
+    @staticmethod
+    def _make_writer(tmp_path: Path, **kwargs) -> FileEventWriter:
+        paths = {
+            "network_events_path": str(tmp_path / "network" / "events.jsonl"),
+            "storage_events_path": str(tmp_path / "storage" / "events.jsonl"),
+            "window_properties_path": str(tmp_path / "window" / "events.jsonl"),
+            "interaction_events_path": str(tmp_path / "interaction" / "events.jsonl"),
+        }
+        return FileEventWriter(paths=paths, flush_interval_seconds=60, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_rotates_and_compresses_segments(self, tmp_path: Path) -> None:
+        """Files are rotated at max_segment_bytes and closed segments are gzipped."""
+        writer = self._make_writer(
+            tmp_path, max_segment_bytes=100, segment_compression=SegmentCompression.GZIP,
+        )
+        network_path = tmp_path / "network" / "events.jsonl"
+
+        for i in range(10):
+            await writer.write_event("AsyncNetworkMonitor", {"id": i, "pad": "x" * 20})
+        writer.close()
+
+        segments = list_jsonl_segments(network_path)
+        assert len(segments) > 2
+        assert all(seg.suffix == ".gz" for seg in segments[:-1])
+        assert segments[-1] == network_path
+        assert [json.loads(line)["id"] for line in iter_jsonl_lines(network_path)] == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_segments_respect_max_size(self, tmp_path: Path) -> None:
+        """Each uncompressed segment holds at most max_segment_bytes (unless a single line is larger)."""
+        writer = self._make_writer(
+            tmp_path, max_segment_bytes=100, segment_compression=SegmentCompression.NONE,
+        )
+        network_path = tmp_path / "network" / "events.jsonl"
+
+        for i in range(10):
+            await writer.write_event("AsyncNetworkMonitor", {"id": i, "pad": "x" * 20})
+            writer.flush()
+        writer.close()
+
+        for segment in list_jsonl_segments(network_path):
+            assert segment.stat().st_size <= 100
+
+    @pytest.mark.asyncio
+    async def test_rotation_continues_numbering(self, tmp_path: Path) -> None:
+        """A new writer appends after existing segments instead of overwriting them."""
+        network_path = tmp_path / "network" / "events.jsonl"
+        for _ in range(2):
+            writer = self._make_writer(
+                tmp_path, max_segment_bytes=50, segment_compression=SegmentCompression.NONE,
+            )
+            for i in range(3):
+                await writer.write_event("AsyncNetworkMonitor", {"id": i, "pad": "x" * 20})
+            writer.close()
+
+        assert len([json.loads(line) for line in iter_jsonl_lines(network_path)]) == 6
+
+    @pytest.mark.asyncio
+    async def test_no_rotation_when_disabled(self, tmp_path: Path) -> None:
+        """max_segment_bytes=None keeps a single file."""
+        writer = self._make_writer(tmp_path, max_segment_bytes=None)
+        network_path = tmp_path / "network" / "events.jsonl"
+
+        for i in range(10):
+            await writer.write_event("AsyncNetworkMonitor", {"id": i, "pad": "x" * 20})
+        writer.close()
+
+        assert list_jsonl_segments(network_path) == [network_path]
+
+    @pytest.mark.asyncio
+    async def test_writes_sidecar_index_across_rotations(self, tmp_path: Path) -> None:
+        """The index records every line's segment/offset/length and routing fields, and stays complete."""
+        writer = self._make_writer(
+            tmp_path, max_segment_bytes=200, segment_compression=SegmentCompression.GZIP,
+        )
+        network_path = tmp_path / "network" / "events.jsonl"
+
+        for i in range(10):
+            await writer.write_event("AsyncNetworkMonitor", {
+                "request_id": f"r{i}", "url": f"https://example.com/{i}", "timestamp": float(i),
+                "mime_type": "application/json", "status": 200, "pad": "x" * 30,
+            })
+            if i % 3 == 0:
+                writer.flush()
+        writer.close()
+
+        entries = load_jsonl_index(network_path)
+        assert entries is not None
+        assert [e.request_id for e in entries] == [f"r{i}" for i in range(10)]
+        assert len({e.segment for e in entries}) > 1
+        assert entries[4].url == "https://example.com/4"
+        assert entries[4].status == 200
+        lines = [json.loads(line) for _, line in read_indexed_lines(network_path, entries[5:7])]
+        assert [line["request_id"] for line in lines] == ["r5", "r6"]
+
+    @pytest.mark.asyncio
+    async def test_index_disabled(self, tmp_path: Path) -> None:
+        """write_index=False skips the sidecar file."""
+        writer = self._make_writer(tmp_path, write_index=False)
+        await writer.write_event("AsyncNetworkMonitor", {"request_id": "r1"})
+        writer.close()
+        assert not get_index_path(tmp_path / "network" / "events.jsonl").exists()
+
+    def test_invalid_max_segment_bytes_raises(self, tmp_path: Path) -> None:
+        """Non-positive max_segment_bytes is rejected."""
+        with pytest.raises(ValueError):
+            self._make_writer(tmp_path, max_segment_bytes=0)
+
+
 class TestFileEventWriterFactory:
     """
     Tests for FileEventWriter.create_from_output_dir factory method.
@@ -224,6 +479,20 @@ class TestFileEventWriterFactory:
         assert (output_dir / "window_properties").exists()
         assert (output_dir / "interaction").exists()
 
+    def test_create_from_output_dir_options(self, tmp_path: Path) -> None:
+        """Factory forwards its keyword-only options and rejects unknown ones."""
+        writer = FileEventWriter.create_from_output_dir(
+            tmp_path, flush_interval_seconds=0.5, max_segment_bytes=None, write_index=False,
+        )
+        assert writer.flush_interval_seconds == 0.5
+        assert writer.max_segment_bytes is None
+        assert not writer.write_index
+
+        with pytest.raises(TypeError):
+            FileEventWriter.create_from_output_dir(tmp_path, flush_interval=0.5)
+        with pytest.raises(TypeError):
+            FileEventWriter.create_from_output_dir(tmp_path, 0.5)
+
 
 class TestFileEventWriterCategoryMapping:
     """
@@ -0,0 +1,120 @@
+"""
+tests/unit/cdp/test_replay_server.py
+
+Tests for the offline capture ReplayServer.
+"""
+
+import json
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from bluebox.cdp.replay_server import ReplayServer, make_url_template
+
+
+def _event(url: str, body: str, method: str = "GET", post_data: str | None = None, **extra) -> dict:
+    return {
+        "request_id": url, "url": url, "method": method, "post_data": post_data, "status": 200,
+        "mime_type": "application/json",
+        "response_headers": {"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        "response_body": body, **extra,
+    }
+
+
+@pytest.fixture
+def capture_path(tmp_path: Path) -> Path:
+    events = [
+        _event("https://api.example.com/users/123?expand=1", '{"id": 123}'),
+        _event("https://api.example.com/search", '{"q": "a"}', method="POST", post_data='{"q": "a"}'),
+        _event("https://api.example.com/search", '{"q": "b"}', method="POST", post_data='{"q": "b"}'),
+        _event("https://api.example.com/poll", '{"n": 1}'),
+        _event("https://api.example.com/poll", '{"n": 2}'),
+        _event("https://api.example.com/file", "aGVsbG8=", response_body_base64=True, mime_type="text/plain"),
+    ]
+    path = tmp_path / "events.jsonl"
+    path.write_text("".join(json.dumps(e) + "\n" for e in events), encoding="utf-8")
+    return path
+
+
+def _request(url: str, method: str = "GET", body: bytes | None = None) -> tuple[int, dict, bytes]:
+    request = urllib.request.Request(url, data=body, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+class TestUrlHelpers:
+    """Tests for URL templates and rewriting."""
+
+    def test_make_url_template(self) -> None:
+        assert make_url_template("https://a.com/users/123/posts?page=2&sort=asc") == "https://a.com/users/{}/posts?page&sort"
+        assert (
+            make_url_template("https://a.com/o/3f2504e0-4f89-11d3-9a0c-0305e82c3301")
+            == "https://a.com/o/{}"
+        )
+        assert make_url_template("https://a.com/static/app") == "https://a.com/static/app"
+
+    def test_rewrite_roundtrip(self, capture_path: Path) -> None:
+        server = ReplayServer(capture_path, port=8765)
+        rewritten = server.rewrite_url("https://api.example.com/users/1?x=1")
+        assert rewritten == "http://127.0.0.1:8765/https/api.example.com/users/1?x=1"
+        assert ReplayServer.original_url(rewritten.removeprefix(server.base_url)) == "https://api.example.com/users/1?x=1"
+        assert server.rewrite_url("about:blank") == "about:blank"
+        assert ReplayServer.original_url("/favicon.ico") is None
+
+
+class TestReplayServer:
+    """Tests for request matching and serving."""
+
+    def test_match_precedence(self, capture_path: Path) -> None:
+        server = ReplayServer(capture_path)
+
+        # exact body match picks the right POST response
+        assert server.match("POST", "https://api.example.com/search", '{"q":"b"}').body == b'{"q": "b"}'
+        # template fallback for an unseen id
+        assert server.match("GET", "https://api.example.com/users/456?expand=0").body == b'{"id": 123}'
+        # repeated requests replay in capture order, cycling
+        bodies = [server.match("get", "https://api.example.com/poll").body for _ in range(3)]
+        assert bodies == [b'{"n": 1}', b'{"n": 2}', b'{"n": 1}']
+        assert server.match("GET", "https://other.com/") is None
+
+        assert server.stats.matched_exact == 4
+        assert server.stats.matched_template == 1
+        assert server.stats.unmatched == ["GET https://other.com/"]
+
+    def test_serves_over_http(self, capture_path: Path) -> None:
+        with ReplayServer(capture_path) as server:
+            status, headers, body = _request(server.rewrite_url("https://api.example.com/users/123?expand=1"))
+            assert status == 200
+            assert json.loads(body) == {"id": 123}
+            assert headers["Content-Type"] == "application/json"
+            assert "Content-Encoding" not in headers
+
+            status, _, body = _request(
+                server.rewrite_url("https://api.example.com/search"), method="POST", body=b'{"q": "a"}'
+            )
+            assert json.loads(body) == {"q": "a"}
+
+            status, _, body = _request(server.rewrite_url("https://api.example.com/file"))
+            assert body == b"hello"
+
+            status, _, _ = _request(server.rewrite_url("https://api.example.com/missing"))
+            assert status == 404
+        server.stop()  # idempotent
+
+    def test_latency_injection(self, capture_path: Path) -> None:
+        with ReplayServer(capture_path, latency_seconds=0.2) as server:
+            start = time.perf_counter()
+            _request(server.rewrite_url("https://api.example.com/poll"))
+            assert time.perf_counter() - start >= 0.2
+
+    def test_invalid_args(self, capture_path: Path, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="non-negative"):
+            ReplayServer(capture_path, latency_seconds=-1)
+        with pytest.raises(ValueError, match="does not exist"):
+            ReplayServer(tmp_path / "missing.jsonl")
@@ -0,0 +1,129 @@
+"""
+tests/unit/cdp/test_tab_pool.py
+
+Tests for session-affinity tab reuse.
+"""
+
+import pytest
+
+from bluebox.cdp.tab_pool import PooledTab, TabPool, url_origin
+from bluebox.data_models.routine.endpoint import Endpoint
+from bluebox.data_models.routine.operation import (
+    RoutineFetchOperation,
+    RoutineReturnOperation,
+    RoutineSleepOperation,
+)
+from bluebox.data_models.routine.parameter import Parameter
+from bluebox.data_models.routine.routine import Routine
+from bluebox.utils.js_utils import generate_tab_hygiene_js
+
+
+class FakeCloser:
+    """Records closed tabs instead of talking to Chrome."""
+
+    def __init__(self) -> None:
+        self.closed: list[str] = []
+
+    def __call__(self, address: str, target_id: str, browser_context_id: str | None) -> None:
+        self.closed.append(target_id)
+
+
+def _tab(target_id: str, url: str, incognito: bool = True) -> PooledTab:
+    return PooledTab(target_id=target_id, browser_context_id=None, incognito=incognito, current_url=url)
+
+
+class TestUrlOrigin:
+    """Tests for url_origin."""
+
+    @pytest.mark.parametrize(
+        "url, origin",
+        [
+            ("https://example.com/a?b=1", "https://example.com"),
+            ("http://localhost:8080/x", "http://localhost:8080"),
+            ("about:blank", None),
+            ("", None),
+            (None, None),
+        ],
+    )
+    def test_origin(self, url: str | None, origin: str | None) -> None:
+        assert url_origin(url) == origin
+
+
+class TestTabPool:
+    """Tests for TabPool."""
+
+    def test_acquire_matches_origin_and_profile(self) -> None:
+        closer = FakeCloser()
+        pool = TabPool(close_tab=closer)
+        pool.release(_tab("a", "https://a.com/page"))
+        pool.release(_tab("b", "https://b.com/"))
+        pool.release(_tab("a2", "https://a.com/other", incognito=False))
+
+        assert pool.acquire("https://a.com", incognito=False).target_id == "a2"
+        assert pool.acquire("https://a.com", incognito=True).target_id == "a"
+        assert pool.acquire("https://a.com", incognito=True) is None
+        assert pool.acquire(None, incognito=True) is None
+        assert len(pool) == 1
+        assert closer.closed == []
+
+    def test_capacity_evicts_least_recently_released(self) -> None:
+        closer = FakeCloser()
+        pool = TabPool(max_idle_tabs=2, close_tab=closer)
+        for target_id in ("t1", "t2", "t3"):
+            pool.release(_tab(target_id, f"https://{target_id}.com"))
+        assert closer.closed == ["t1"]
+        assert len(pool) == 2
+
+    def test_idle_ttl_and_close_all(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        now = [100.0]
+        monkeypatch.setattr("bluebox.cdp.tab_pool.time.monotonic", lambda: now[0])
+        closer = FakeCloser()
+        pool = TabPool(idle_ttl_seconds=10, close_tab=closer)
+        pool.release(_tab("old", "https://a.com"))
+        now[0] += 11
+        assert pool.acquire("https://a.com", incognito=True) is None
+        assert closer.closed == ["old"]
+
+        pool.release(_tab("new", "https://a.com"))
+        pool.close_all()
+        assert closer.closed == ["old", "new"]
+        assert len(pool) == 0
+
+    def test_release_counts_runs(self) -> None:
+        pool = TabPool(close_tab=FakeCloser())
+        tab = _tab("a", "https://a.com")
+        pool.release(tab)
+        assert pool.acquire("https://a.com", incognito=True).runs == 1
+
+
+class TestRoutineTabAffinity:
+    """Tests for the routine-side helpers of tab reuse."""
+
+    @staticmethod
+    def _routine() -> Routine:
+        return Routine(
+            name="affinity",
+            description="Fetch on a parameterized host",
+            parameters=[Parameter(name="host", description="Host")],
+            operations=[
+                RoutineSleepOperation(timeout_seconds=0),
+                RoutineFetchOperation(
+                    endpoint=Endpoint(url='https://"{{host}}"/api/items', method="GET"),
+                    session_storage_key="items",
+                ),
+                RoutineReturnOperation(session_storage_key="items"),
+            ],
+        )
+
+    def test_target_origin_uses_first_url_with_parameters_and_rewriter(self) -> None:
+        routine = self._routine()
+        plan = routine.compile()
+        assert routine.target_origin(plan, {"host": "shop.example.com"}, None) == "https://shop.example.com"
+        rewritten = routine.target_origin(plan, {"host": "shop.example.com"}, lambda url: "http://127.0.0.1:9000/x")
+        assert rewritten == "http://127.0.0.1:9000"
+
+    def test_hygiene_clears_routine_keys(self) -> None:
+        js = generate_tab_hygiene_js(self._routine()._session_storage_keys())
+        assert '["items"]' in js
+        assert "delete window.__blueboxTransfers;" in js
+        assert js.rstrip().endswith("})()")
@@ -0,0 +1,108 @@
+"""
+tests/unit/data_models/routine/test_execution_history.py
+
+Tests for the execution history store and adaptive navigation waits.
+"""
+
+import pytest
+
+from bluebox.data_models.routine.execution import OperationExecutionMetadata, RoutineExecutionResult
+from bluebox.data_models.routine.execution_history import AdaptiveWaitPolicy, ExecutionHistoryStore
+
+
+def _run(
+    ready_seconds: float | None,
+    bound: float = 3.0,
+    ok: bool = True,
+    url: str = "https://www.a.com/search",
+) -> RoutineExecutionResult:
+    """A navigate + fetch execution whose page was ready after ready_seconds (None: hit the bound)."""
+    page_load = {"loaded": True, "network_idle": ready_seconds is not None, "timed_out": ready_seconds is None}
+    page_load["waited_seconds"] = bound if ready_seconds is None else ready_seconds
+    return RoutineExecutionResult(
+        ok=ok,
+        operations_metadata=[
+            OperationExecutionMetadata(
+                type="navigate",
+                duration_seconds=page_load["waited_seconds"],
+                details={"url": url, "wait_bound_seconds": bound, "page_load": page_load},
+            ),
+            OperationExecutionMetadata(
+                type="fetch",
+                duration_seconds=0.2,
+                details={"response": {"status": 200 if ok else 500}},
+                error=None if ok else "HTTP 500",
+            ),
+        ],
+    )
+
+
+@pytest.fixture
+def history() -> ExecutionHistoryStore:
+    store = ExecutionHistoryStore(":memory:")
+    yield store
+    store.close()
+
+
+class TestExecutionHistoryStore:
+    """Tests for ExecutionHistoryStore."""
+
+    def test_record_operations(self, history: ExecutionHistoryStore) -> None:
+        history.record("search", _run(0.8))
+        rows = history.query(
+            "SELECT type, domain, wait_bound_seconds, ready_seconds, status FROM operations ORDER BY position"
+        )
+        assert [tuple(row) for row in rows] == [
+            ("navigate", "www.a.com", 3.0, 0.8, None),
+            ("fetch", "www.a.com", None, None, 200),
+        ]
+        history.record("search", _run(None, ok=False))
+        navigations = history.recent_navigations("WWW.A.COM")
+        assert [(row["ready_seconds"], row["timed_out"], row["ok"]) for row in navigations] == [(None, 1, 0), (0.8, 0, 1)]
+
+    def test_prune(self, tmp_path) -> None:
+        store = ExecutionHistoryStore(tmp_path / "history.db")
+        store.record("search", _run(0.5))
+        assert store.prune(older_than_seconds=3600) == 0
+        assert store.prune(older_than_seconds=-1) == 1
+        assert store.query("SELECT COUNT(*) AS n FROM operations")[0]["n"] == 0
+        store.close()
+
+
+class TestAdaptiveWaitPolicy:
+    """Tests for AdaptiveWaitPolicy."""
+
+    def test_keeps_configured_wait_until_enough_samples(self, history: ExecutionHistoryStore) -> None:
+        policy = AdaptiveWaitPolicy(history, min_samples=5)
+        for _ in range(4):
+            history.record("search", _run(0.4))
+        assert policy.wait_seconds("https://www.a.com/x", 3.0) == 3.0
+        assert policy.wait_seconds("https://www.a.com/x", 0) == 0
+
+    def test_shrinks_toward_p99(self, history: ExecutionHistoryStore) -> None:
+        policy = AdaptiveWaitPolicy(history, headroom=1.25, min_seconds=0.5)
+        for ready in (0.6, 0.7, 0.8, 0.9, 1.2):
+            history.record("search", _run(ready))
+        recommendation = policy.recommend("www.a.com", 3.0)
+        assert recommendation.samples == 5
+        assert recommendation.ready_percentile_seconds == 1.2
+        assert recommendation.seconds == pytest.approx(1.5)
+        assert policy.wait_seconds("https://other.com/", 3.0) == 3.0
+
+    def test_backs_off_on_failures(self, history: ExecutionHistoryStore) -> None:
+        policy = AdaptiveWaitPolicy(history, headroom=1.0, failure_backoff=2.0, max_scale=2.0)
+        for _ in range(5):
+            history.record("search", _run(0.5, bound=0.6))
+        assert policy.wait_seconds("https://www.a.com/", 3.0) == pytest.approx(0.5)
+
+        history.record("search", _run(None, bound=0.6, ok=False))
+        assert policy.wait_seconds("https://www.a.com/", 3.0) == pytest.approx(1.2)
+        history.record("search", _run(None, bound=1.2, ok=False))
+        history.record("search", _run(None, bound=2.4, ok=False))
+        assert policy.wait_seconds("https://www.a.com/", 3.0) == pytest.approx(6.0)  # capped at 2x configured
+
+    def test_validation(self, history: ExecutionHistoryStore) -> None:
+        with pytest.raises(ValueError):
+            AdaptiveWaitPolicy(history, percentile=120)
+        with pytest.raises(ValueError):
+            AdaptiveWaitPolicy(history, headroom=0.5)
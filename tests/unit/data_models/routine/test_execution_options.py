@@ -0,0 +1,36 @@
+"""
+tests/unit/data_models/routine/test_execution_options.py
+
+Tests for the routine execution options.
+"""
+
+import io
+
+import pytest
+
+from bluebox.cdp.tab_pool import TabPool, TabReusePolicy
+from bluebox.data_models.routine.execution_options import RoutineExecutionOptions
+
+
+class TestRoutineExecutionOptions:
+    """Tests for RoutineExecutionOptions."""
+
+    def test_defaults(self) -> None:
+        options = RoutineExecutionOptions()
+        assert options.remote_debugging_address == "http://127.0.0.1:9222"
+        assert options.parallel is False
+        assert options.bypasses_result_cache is False
+        assert options.resolved_tab_reuse() == TabReusePolicy.CLOSE
+
+    def test_tab_reuse_resolution(self) -> None:
+        assert RoutineExecutionOptions(close_tab_when_done=False).resolved_tab_reuse() == TabReusePolicy.KEEP
+        assert RoutineExecutionOptions(tab_pool=TabPool()).resolved_tab_reuse() == TabReusePolicy.POOL
+        options = RoutineExecutionOptions(tab_pool=TabPool(), tab_reuse=TabReusePolicy.CLOSE)
+        assert options.resolved_tab_reuse() == TabReusePolicy.CLOSE
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"url_rewriter": lambda url: url}, {"trace": True}, {"download_target": io.BytesIO()}],
+    )
+    def test_bypasses_result_cache(self, kwargs: dict) -> None:
+        assert RoutineExecutionOptions(**kwargs).bypasses_result_cache
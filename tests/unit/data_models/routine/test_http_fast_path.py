@@ -0,0 +1,177 @@
+"""
+tests/unit/data_models/routine/test_http_fast_path.py
+
+Tests for browserless execution of fetch-only routines.
+"""
+
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bluebox.data_models.routine.endpoint import Endpoint
+from bluebox.data_models.routine.execution import RoutineExecutionResult
+from bluebox.data_models.routine.http_fast_path import HttpFastPath, check_http_eligibility
+from bluebox.data_models.routine.operation import (
+    RoutineClickOperation,
+    RoutineFetchOperation,
+    RoutineGetCookiesOperation,
+    RoutineNavigateOperation,
+    RoutineReturnOperation,
+)
+from bluebox.data_models.routine.parameter import Parameter
+from bluebox.data_models.routine.routine import Routine
+from bluebox.sdk.execution import RoutineExecutor
+from bluebox.utils.exceptions import HttpFastPathError
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Token + items API that requires the session cookie."""
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: dict, headers: dict | None = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        if "sid=abc" not in self.headers.get("Cookie", ""):
+            self._send(403, {"error": "no session"})
+        elif self.path == "/token":
+            self._send(200, {"token": "t-1"}, {"Set-Cookie": "seen=1; Path=/"})
+        else:
+            self._send(404, {})
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self._send(200, {
+            "path": self.path,
+            "auth": self.headers.get("Authorization"),
+            "cookie": self.headers.get("Cookie"),
+            "body": body,
+        })
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _routine(base_url: str) -> Routine:
+    return Routine(
+        name="items",
+        description="Token then items",
+        parameters=[Parameter(name="query", description="Search query")],
+        operations=[
+            RoutineNavigateOperation(url=f"{base_url}/"),
+            RoutineFetchOperation(endpoint=Endpoint(url=f"{base_url}/token", method="GET"), session_storage_key="auth"),
+            RoutineFetchOperation(
+                endpoint=Endpoint(
+                    url=f"{base_url}/items",
+                    method="POST",
+                    headers={"Authorization": "Bearer {{sessionStorage:auth.token}}"},
+                    body={"q": "\"{{query}}\"", "sid": "\"{{cookie:sid}}\""},
+                ),
+                session_storage_key="items",
+            ),
+            RoutineReturnOperation(session_storage_key="items"),
+        ],
+    )
+
+
+def _fast_path() -> HttpFastPath:
+    fast_path = HttpFastPath()
+    fast_path.seed_cookies([{"name": "sid", "value": "abc", "domain": "127.0.0.1", "path": "/", "expires": -1}])
+    return fast_path
+
+
+class TestHttpEligibility:
+    """Tests for check_http_eligibility."""
+
+    def test_fetch_chain_is_eligible(self) -> None:
+        assert check_http_eligibility(_routine("https://a.com")).eligible
+
+    def test_browser_only_operations_and_sources(self) -> None:
+        click = Routine(
+            name="click", description="d",
+            operations=[
+                RoutineClickOperation(selector="#go"),
+                RoutineFetchOperation(endpoint=Endpoint(url="https://a.com/x", method="GET"), session_storage_key="x"),
+                RoutineReturnOperation(session_storage_key="x"),
+            ],
+        )
+        assert "needs a browser" in check_http_eligibility(click).reason
+
+        local = Routine(
+            name="local", description="d",
+            operations=[
+                RoutineFetchOperation(
+                    endpoint=Endpoint(url="https://a.com/x", method="GET", headers={"t": "\"{{localStorage:token}}\""}),
+                    session_storage_key="x",
+                ),
+                RoutineReturnOperation(session_storage_key="x"),
+            ],
+        )
+        assert "localStorage" in check_http_eligibility(local).reason
+
+    def test_storage_must_be_written_earlier(self) -> None:
+        routine = Routine(
+            name="page_storage", description="d",
+            operations=[
+                RoutineFetchOperation(
+                    endpoint=Endpoint(url="https://a.com/x?t={{sessionStorage:pageToken}}", method="GET"),
+                    session_storage_key="x",
+                ),
+                RoutineGetCookiesOperation(session_storage_key="cookies"),
+                RoutineReturnOperation(session_storage_key="cookies"),
+            ],
+        )
+        assert "pageToken" in check_http_eligibility(routine).reason
+
+
+class TestHttpFastPath:
+    """Tests for HttpFastPath against a local stand-in server."""
+
+    def test_runs_chain_with_storage_and_cookies(self, server_url: str) -> None:
+        result = _fast_path().execute(_routine(server_url), {"query": "shoes"})
+
+        assert result.ok and result.error is None
+        assert result.data["auth"] == "Bearer t-1"
+        assert result.data["body"] == {"q": "shoes", "sid": "abc"}
+        assert "seen=1" in result.data["cookie"]  # Set-Cookie from the first fetch was kept
+        assert result.placeholder_resolution["sessionStorage:auth.token"] == "t-1"
+        metadata = result.operations_metadata
+        assert [m.type for m in metadata] == ["navigate", "fetch", "fetch", "return"]
+        assert all(m.details["transport"] == "http" for m in metadata)
+        assert "skipped" in metadata[0].details
+        assert metadata[2].details["request"]["method"] == "POST"
+
+    def test_fallback_status_raises(self, server_url: str) -> None:
+        with pytest.raises(HttpFastPathError, match="403"):
+            HttpFastPath().execute(_routine(server_url), {"query": "shoes"})
+
+    def test_executor_falls_back_to_browser(self, server_url: str, monkeypatch: pytest.MonkeyPatch) -> None:
+        fast_path = HttpFastPath()  # no sid cookie: the stand-in answers 403
+        monkeypatch.setattr(fast_path, "bootstrap", lambda *args, **kwargs: None)
+        browser_result = RoutineExecutionResult(data="from browser")
+        monkeypatch.setattr(Routine, "execute", lambda self, **kwargs: browser_result)
+        invalidated: list[str | None] = []
+        monkeypatch.setattr(fast_path, "invalidate", invalidated.append)
+
+        executor = RoutineExecutor(http_fast_path=fast_path)
+        assert executor.execute(_routine(server_url), {"query": "shoes"}) is browser_result
+        assert invalidated == [server_url]
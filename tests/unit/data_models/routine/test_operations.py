@@ -4,11 +4,32 @@ tests/unit/test_operations.py
 Tests for routine operations, with comprehensive coverage of JS evaluation operation validation.
 """
 
+import base64
+import io
+import json
+import re
+import time
+from pathlib import Path
+
 import pytest
 from pydantic import ValidationError
 
-from bluebox.data_models.routine.operation import RoutineJsEvaluateOperation, RoutineOperationTypes
+from bluebox.data_models.routine.endpoint import Endpoint
+from bluebox.data_models.routine.execution import RoutineExecutionContext
+from bluebox.data_models.routine.operation import (
+    RoutineDownloadOperation,
+    RoutineFetchOperation,
+    RoutineJsEvaluateOperation,
+    RoutineNavigateOperation,
+    RoutineOperationTypes,
+    RoutinePressOperation,
+    RoutineReturnOperation,
+    RoutineTypeOperation,
+    RoutineWaitForUrlOperation,
+)
+from bluebox.data_models.ui_elements import TypingMode
 from bluebox.utils.data_utils import apply_params
+from bluebox.utils.js_utils import generate_runtime_library_js
 
 
 # TODO: Add validation for other operation types
@@ -715,3 +736,356 @@ class TestRoutineJsEvaluateOperationValidation:
         errors = exc_info.value.errors()
         assert any("uuid" in str(e.get("msg", "")) for e in errors)
 
+
+
+class TestUrlRewriting:
+    """Operations load URLs through RoutineExecutionContext.url_rewriter."""
+
+    def test_navigate_applies_url_rewriter(self) -> None:
+        sent: list[tuple] = []
+        context = RoutineExecutionContext(
+            session_id="s1",
+            send_cmd=lambda method, params=None, **kwargs: sent.append((method, params)),
+            recv_until=lambda predicate, deadline: {},
+            url_rewriter=lambda url: url.replace("https://example.com", "http://127.0.0.1:1/https/example.com"),
+        )
+        operation = RoutineNavigateOperation(url="https://example.com/page", sleep_after_navigation_seconds=0)
+
+        operation.execute(context)
+
+        assert sent == [("Page.navigate", {"url": "http://127.0.0.1:1/https/example.com/page"})]
+        assert context.current_url == "http://127.0.0.1:1/https/example.com/page"
+
+    def test_resolve_url_without_rewriter(self) -> None:
+        context = RoutineExecutionContext(session_id="s1", send_cmd=lambda *a, **k: None, recv_until=lambda *a: {})
+        assert context.resolve_url("https://example.com") == "https://example.com"
+
+    def test_navigate_waits_for_load_instead_of_sleeping(self) -> None:
+        messages = [
+            {"id": 1, "result": {"frameId": "F", "loaderId": "L"}},
+            {"method": "Page.lifecycleEvent", "params": {"name": "load", "loaderId": "L"}, "sessionId": "s1"},
+        ]
+
+        def recv_until(predicate, deadline):
+            while messages:
+                msg = messages.pop(0)
+                if predicate(msg):
+                    return msg
+            raise TimeoutError
+
+        context = RoutineExecutionContext(session_id="s1", send_cmd=lambda *a, **k: 1, recv_until=recv_until)
+        operation = RoutineNavigateOperation(url="https://example.com", sleep_after_navigation_seconds=10)
+
+        start = time.monotonic()
+        operation.execute(context)
+
+        assert time.monotonic() - start < 2
+        assert context.result.operations_metadata[0].details["page_load"]["loaded"] is True
+
+    def test_navigate_wait_tuner(self) -> None:
+        tuned: list[tuple[str, float]] = []
+        context = RoutineExecutionContext(
+            session_id="s1",
+            send_cmd=lambda *a, **k: 1,
+            recv_until=lambda predicate, deadline: {"id": 1, "result": {"frameId": "F"}},
+            wait_tuner=lambda url, seconds: tuned.append((url, seconds)) or 0.5,
+        )
+        RoutineNavigateOperation(url="https://example.com", sleep_after_navigation_seconds=10).execute(context)
+        RoutineNavigateOperation(url="https://example.com", sleep_after_navigation_seconds=0).execute(context)
+
+        assert tuned == [("https://example.com", 10)]
+        details = [metadata.details for metadata in context.result.operations_metadata]
+        assert [d["wait_bound_seconds"] for d in details] == [0.5, 0]
+        assert details[0]["url"] == "https://example.com"
+
+
+class TestWaitForUrl:
+    """RoutineWaitForUrlOperation waits on navigation events instead of polling."""
+
+    def _context(self, messages: list[dict]) -> RoutineExecutionContext:
+        sent: list[str] = []
+
+        def recv_until(predicate, deadline):
+            while messages:
+                msg = messages.pop(0)
+                if predicate(msg):
+                    return msg
+            raise TimeoutError
+
+        return RoutineExecutionContext(
+            session_id="s1",
+            send_cmd=lambda method, params=None, **kwargs: sent.append(method) or len(sent),
+            recv_until=recv_until,
+        )
+
+    def test_match_updates_current_url(self) -> None:
+        context = self._context([
+            {"id": 1, "result": {"result": {"value": "https://a.com/login"}}},
+            {"id": 2, "result": {"frameTree": {"frame": {"id": "MAIN"}}}},
+            {
+                "method": "Page.frameNavigated",
+                "sessionId": "s1",
+                "params": {"frame": {"id": "MAIN", "url": "https://a.com/home"}},
+            },
+        ])
+        RoutineWaitForUrlOperation(url_regex="/home$", timeout_ms=1000).execute(context)
+
+        metadata = context.result.operations_metadata[0]
+        assert metadata.error is None
+        assert metadata.details["url_wait"]["source"] == "Page.frameNavigated"
+        assert context.current_url == "https://a.com/home"
+
+    def test_timeout(self) -> None:
+        context = self._context([{"id": 1, "result": {"result": {"value": "https://a.com/login"}}}])
+        RoutineWaitForUrlOperation(url_regex="/home", timeout_ms=50).execute(context)
+
+        assert "Current URL: https://a.com/login" in context.result.operations_metadata[0].error
+
+    @pytest.mark.parametrize("url_regex", ["(", r"/items/(?<id>\d+)", "a[^]b", r"\u{1F600}"])
+    def test_rejects_invalid_and_javascript_only_regex_at_load(self, url_regex: str) -> None:
+        with pytest.raises(ValidationError, match="Invalid url_regex"):
+            RoutineWaitForUrlOperation(url_regex=url_regex)
+        assert RoutineWaitForUrlOperation(url_regex=r"/items/(?P<id>\d+)").url_regex
+
+
+class TestKeyboardInput:
+    """Type and press operations pipeline their Input commands instead of sleeping per key."""
+
+    @staticmethod
+    def _context() -> tuple[RoutineExecutionContext, list[tuple[str, dict]]]:
+        sent: list[tuple[str, dict]] = []
+        replies: dict[int, dict] = {}
+
+        def send_cmd(method, params=None, **kwargs) -> int:
+            sent.append((method, params))
+            msg_id = len(sent)
+            value = {"element": {"tag": "input"}} if method == "Runtime.evaluate" else None
+            replies[msg_id] = {"id": msg_id, "result": {"result": {"value": value}}}
+            return msg_id
+
+        def recv_until(predicate, deadline) -> dict:
+            # replies arrive in reverse order to exercise out-of-order acknowledgements
+            return next(reply for reply in reversed(replies.values()) if predicate(reply))
+
+        context = RoutineExecutionContext(session_id="s1", send_cmd=send_cmd, recv_until=recv_until)
+        return context, sent
+
+    def test_typing_modes(self) -> None:
+        expected = {
+            TypingMode.INSERT: [("Input.insertText", "hello")],
+            TypingMode.INSERT_THEN_KEY: [("Input.insertText", "hell"), ("keyDown", "o"), ("keyUp", "o")],
+            TypingMode.KEYS: [(t, c) for c in "hello" for t in ("keyDown", "keyUp")],
+        }
+        for mode, commands in expected.items():
+            context, sent = self._context()
+            start = time.monotonic()
+            RoutineTypeOperation(selector="#q", text="hello", typing_mode=mode, key_delay_ms=0).execute(context)
+
+            assert time.monotonic() - start < 0.05
+            assert [
+                ("Input.insertText", p["text"]) if m == "Input.insertText" else (p["type"], p["text"])
+                for m, p in sent[1:]
+            ] == commands
+            metadata = context.result.operations_metadata[0]
+            assert metadata.error is None and metadata.details["input_commands"] == len(commands)
+
+    def test_default_types_keys_with_pacing(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        context, sent = self._context()
+        sleeps: list[float] = []
+        monkeypatch.setattr(RoutineExecutionContext, "sleep", lambda self, seconds: sleeps.append(seconds))
+        RoutineTypeOperation(selector="#q", text="abc").execute(context)
+
+        assert [(p["type"], p["text"]) for _, p in sent[1:]] == [(t, c) for c in "abc" for t in ("keyDown", "keyUp")]
+        assert sleeps == [0.02, 0.02]
+
+    def test_type_reports_input_errors(self) -> None:
+        context, _ = self._context()
+        context.recv_until = lambda predicate, deadline: (
+            {"id": 2, "error": {"message": "boom"}} if predicate({"id": 2})
+            else {"id": 1, "result": {"result": {"value": {}}}}
+        )
+        RoutineTypeOperation(selector="#q", text="hi", typing_mode=TypingMode.INSERT).execute(context)
+        assert "boom" in context.result.operations_metadata[0].error
+
+    def test_press_waits_for_each_event(self) -> None:
+        context, sent = self._context()
+        RoutinePressOperation(key="enter").execute(context)
+        assert sent == [
+            ("Input.dispatchKeyEvent", {"type": "keyDown", "key": "Enter"}),
+            ("Input.dispatchKeyEvent", {"type": "keyUp", "key": "Enter"}),
+        ]
+
+
+class TestReturnOperationTransfer:
+    """RoutineReturnOperation reads the stored value through a staged, chunked transfer."""
+
+    @staticmethod
+    def _context(stored: str | None) -> tuple[RoutineExecutionContext, list[str]]:
+        sent: list[str] = []
+        replies: dict[int, dict] = {}
+
+        def send_cmd(method, params=None, **kwargs) -> int:
+            msg_id = len(sent) + 1
+            expression = params["expression"]
+            sent.append(expression)
+            if "sessionStorage.getItem" in expression:
+                payload = {"transferId": "t", "transferLength": len(stored or ""), "transferEncoding": "text"}
+                replies[msg_id] = {"id": msg_id, "result": {"result": {"value": payload}}}
+            elif "substring" in expression:
+                replies[msg_id] = {"id": msg_id, "result": {"result": {"value": stored}}}
+            return msg_id
+
+        def recv_until(predicate, deadline) -> dict:
+            return next(reply for reply in replies.values() if predicate(reply))
+
+        return RoutineExecutionContext(session_id="s1", send_cmd=send_cmd, recv_until=recv_until), sent
+
+    def test_json_value_parsed_and_released(self) -> None:
+        context, sent = self._context('{"a": [1, 2]}')
+        RoutineReturnOperation(session_storage_key="k").execute(context)
+
+        assert context.result.data == {"a": [1, 2]}
+        assert sent[-1].startswith("delete")
+        assert context.result.operations_metadata[0].details["transfer"]["chunks"] == 1
+
+    def test_missing_value_returns_none(self) -> None:
+        context, sent = self._context(None)
+        RoutineReturnOperation(session_storage_key="k").execute(context)
+
+        assert context.result.data is None
+        assert context.result.operations_metadata[0].error is None
+
+
+class TestDownloadStreaming:
+    """RoutineDownloadOperation streams to RoutineExecutionContext.download_target."""
+
+    DATA = bytes(range(256)) * 40
+
+    def _context(self, download_target, runtime_installed: bool = True) -> RoutineExecutionContext:
+        encoded = base64.b64encode(self.DATA).decode()
+        replies: dict[int, dict] = {}
+        self.evaluated: list[str] = []
+        installed = [runtime_installed]
+
+        def send_cmd(method, params=None, **kwargs) -> int:
+            msg_id = len(replies) + 1
+            expression = params["expression"]
+            self.evaluated.append(expression)
+            if expression == generate_runtime_library_js():
+                installed[0] = True
+                value = True
+            elif ".download({" in expression and not installed[0]:
+                value = {"__bbRuntimeMissing": True}
+            elif ".download({" in expression:
+                value = {
+                    "ok": True, "contentType": "application/pdf", "filename": "report.pdf", "size": len(self.DATA),
+                    "transferId": "d", "transferLength": len(encoded), "transferEncoding": "base64",
+                }
+            elif "substring" in expression:
+                value = encoded
+            else:
+                value = True
+            replies[msg_id] = {"id": msg_id, "result": {"result": {"value": value}}}
+            return msg_id
+
+        def recv_until(predicate, deadline) -> dict:
+            return next(reply for reply in replies.values() if predicate(reply))
+
+        return RoutineExecutionContext(
+            session_id="s1", send_cmd=send_cmd, recv_until=recv_until, download_target=download_target,
+        )
+
+    def _operation(self) -> RoutineDownloadOperation:
+        return RoutineDownloadOperation(
+            endpoint=Endpoint(url="https://example.com/r.pdf", method="GET"), filename="report.pdf",
+        )
+
+    def test_streams_to_directory(self, tmp_path: Path) -> None:
+        context = self._context(tmp_path / "downloads")
+        self._operation().execute(context)
+
+        file_path = tmp_path / "downloads" / "report.pdf"
+        assert context.result.operations_metadata[0].error is None
+        assert file_path.read_bytes() == self.DATA
+        assert not (tmp_path / "downloads" / "report.pdf.part").exists()
+        assert context.result.file_path == str(file_path)
+        assert context.result.size_bytes == len(self.DATA)
+        assert context.result.data is None
+        assert context.result.is_base64 is False
+        assert context.result.content_type == "application/pdf"
+
+    def test_streams_to_file_object(self) -> None:
+        buffer = io.BytesIO()
+        context = self._context(buffer)
+        self._operation().execute(context)
+
+        assert buffer.getvalue() == self.DATA
+        assert context.result.file_path is None
+        assert context.result.size_bytes == len(self.DATA)
+
+    def test_without_target_returns_base64(self) -> None:
+        context = self._context(None)
+        self._operation().execute(context)
+
+        assert base64.b64decode(context.result.data) == self.DATA
+        assert context.result.is_base64 is True
+        assert context.result.file_path is None
+
+    def test_installs_runtime_when_missing(self, tmp_path: Path) -> None:
+        context = self._context(tmp_path, runtime_installed=False)
+        self._operation().execute(context)
+
+        assert context.result.operations_metadata[0].error is None
+        assert (tmp_path / "report.pdf").read_bytes() == self.DATA
+        assert self.evaluated.count(generate_runtime_library_js()) == 1
+
+
+class TestFetchBatch:
+    """RoutineFetchOperation.execute_batch fans one fetch out over many parameter sets."""
+
+    def test_results_per_parameter_set(self) -> None:
+        evaluated: list[str] = []
+        replies: dict[int, dict] = {}
+        staged = json.dumps([
+            {"status": 200, "value": '{"id": 1}', "resolvedValues": {}},
+            {"error": "fetch failed: TypeError", "resolvedValues": {"sessionStorage:token": None}},
+        ])
+
+        def send_cmd(method, params=None, **kwargs) -> int:
+            msg_id = len(replies) + 1
+            expression = params["expression"]
+            evaluated.append(expression)
+            if ".fetchBatch({" in expression:
+                value = {
+                    "count": 2, "failed": 1, "transferId": "b", "transferLength": len(staged), "transferEncoding": "text",
+                }
+            elif "substring" in expression:
+                value = staged
+            else:
+                value = True
+            replies[msg_id] = {"id": msg_id, "result": {"result": {"value": value}}}
+            return msg_id
+
+        def recv_until(predicate, deadline) -> dict:
+            return next(reply for reply in replies.values() if predicate(reply))
+
+        context = RoutineExecutionContext(
+            session_id="s1", send_cmd=send_cmd, recv_until=recv_until, current_url="https://example.com",
+        )
+        operation = RoutineFetchOperation(
+            endpoint=Endpoint(url='https://example.com/users/"{{user_id}}"', method="GET"),
+            session_storage_key="user",
+        )
+        results = operation.execute_batch(context, [{"user_id": 1}, {"user_id": 2}], concurrency=2)
+
+        assert [r.ok for r in results] == [True, False]
+        assert results[0].result == '{"id": 1}'
+        assert results[1].error == "fetch failed: TypeError"
+        assert results[1].resolved_values == {"sessionStorage:token": None}
+        batch_js = next(e for e in evaluated if ".fetchBatch({" in e)
+        assert re.findall(r'url: "([^"]*)"', batch_js) == ["https://example.com/users/1", "https://example.com/users/2"]
+        metadata = context.result.operations_metadata
+        assert len(metadata) == 1 and metadata[0].error is None
+        assert metadata[0].details["batch"] == {
+            "size": 2, "concurrency": 2, "failed": 1, "statuses": [], "throttled": [], "retry_after_seconds": 0.0,
+        }
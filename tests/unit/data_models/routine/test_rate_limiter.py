@@ -0,0 +1,195 @@
+"""
+tests/unit/data_models/routine/test_rate_limiter.py
+
+Tests for per-host adaptive rate limiting.
+"""
+
+import random
+import time
+
+import pytest
+
+from bluebox.data_models.routine.endpoint import Endpoint
+from bluebox.data_models.routine.execution import OperationExecutionMetadata, RoutineExecutionResult
+from bluebox.data_models.routine.operation import (
+    RoutineFetchOperation,
+    RoutineNavigateOperation,
+    RoutineReturnOperation,
+)
+from bluebox.data_models.routine.parameter import Parameter
+from bluebox.data_models.routine.rate_limiter import (
+    HostRateLimiter,
+    RequestOutcome,
+    parse_retry_after,
+    routine_host,
+    routine_outcome,
+)
+from bluebox.data_models.routine.routine import Routine
+from bluebox.sdk.execution import RoutineExecutor
+
+
+class FakeTime:
+    """Clock and sleep sharing one fake timeline."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limiter(fake: FakeTime, **kwargs) -> HostRateLimiter:
+    return HostRateLimiter(clock=fake.clock, sleep=fake.sleep, rng=random.Random(0), **kwargs)
+
+
+def _result(*statuses: int, retry_after: str | None = None) -> RoutineExecutionResult:
+    return RoutineExecutionResult(
+        ok=True,
+        operations_metadata=[
+            OperationExecutionMetadata(
+                type="fetch",
+                duration_seconds=0.1,
+                details={"response": {"status": status, "headers": {"Retry-After": retry_after} if retry_after else {}}},
+            )
+            for status in statuses
+        ],
+    )
+
+
+class TestHostRateLimiter:
+    """Tests for AIMD limits, token buckets and retries."""
+
+    def test_aimd(self) -> None:
+        fake = FakeTime()
+        limiter = _limiter(fake, initial_concurrency=4, max_concurrency=8, decrease_cooldown_seconds=1.0)
+        for _ in range(4):
+            limiter.record("a.com", RequestOutcome(status=200))
+        assert limiter.host_stats("a.com").concurrency_limit == pytest.approx(4.9, abs=0.05)
+
+        limiter.record("a.com", RequestOutcome(status=429))
+        limiter.record("a.com", RequestOutcome(status=429))  # same congestion event (cooldown)
+        stats = limiter.host_stats("a.com")
+        assert stats.concurrency_limit == pytest.approx(2.45, abs=0.05)
+        assert stats.throttled == 2 and stats.successes == 4
+
+        fake.now += 1.0
+        for _ in range(3):
+            limiter.record("a.com", RequestOutcome(status=503))
+            fake.now += 1.0
+        assert limiter.host_stats("a.com").concurrency_limit == 1.0  # min_concurrency
+        assert limiter.host_stats("b.com").concurrency_limit == 4.0  # hosts are independent
+
+    def test_token_bucket_paces_acquire(self) -> None:
+        limiter = HostRateLimiter(rate_per_second=20.0, burst=1)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire("a.com")
+            limiter.release("a.com", RequestOutcome(status=200))
+        assert time.monotonic() - start >= 0.09  # the burst covers the first request, 20/s the others
+        assert limiter.host_stats("a.com").wait_seconds >= 0.09
+
+    def test_retry_after_pauses_host(self) -> None:
+        fake = FakeTime()
+        limiter = _limiter(fake)
+        limiter.record("a.com", RequestOutcome(status=429, retry_after="7"))
+        assert limiter.stats()["a.com"]["paused_seconds_remaining"] == 7.0
+        assert limiter.stats()["a.com"]["concurrency"] == 2
+
+    def test_call_with_retries(self) -> None:
+        fake = FakeTime()
+        limiter = _limiter(fake, max_retries=3, backoff_base_seconds=1.0)
+        results = iter([_result(429), _result(503), _result(200)])
+        result = limiter.call_with_retries("a.com", lambda: next(results), routine_outcome)
+
+        assert routine_outcome(result).status == 200
+        assert len(fake.sleeps) == 2
+        assert 0 <= fake.sleeps[0] <= 1.0 and 0 <= fake.sleeps[1] <= 2.0
+        stats = limiter.host_stats("a.com")
+        assert stats.retries == 2 and stats.in_flight == 0 and stats.throttled == 2
+
+    def test_call_with_retries_gives_up(self) -> None:
+        fake = FakeTime()
+        limiter = _limiter(fake, max_retries=1)
+        result = limiter.call_with_retries("a.com", lambda: _result(429), routine_outcome)
+        assert routine_outcome(result).status == 429
+        assert len(fake.sleeps) == 1
+
+    def test_exception_frees_slot(self) -> None:
+        limiter = _limiter(FakeTime(), initial_concurrency=1)
+
+        def boom() -> RoutineExecutionResult:
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            limiter.call_with_retries("a.com", boom, routine_outcome)
+        stats = limiter.host_stats("a.com")
+        assert stats.in_flight == 0 and stats.errors == 1
+
+    def test_batch_pacing(self) -> None:
+        limiter = _limiter(FakeTime(), initial_concurrency=6, rate_by_host={"a.com": 4.0})
+        concurrency, pacing = limiter.batch_pacing("a.com")
+        assert concurrency == 6
+        assert pacing.min_interval_seconds == 0.25
+        assert limiter.batch_pacing("b.com")[1].min_interval_seconds == 0.0
+
+
+class TestOutcomes:
+    """Tests for parse_retry_after, routine_outcome and routine_host."""
+
+    def test_parse_retry_after(self) -> None:
+        assert parse_retry_after("120") == 120.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", now=1445412500.0) == 10.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412500.0) == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_routine_outcome(self) -> None:
+        outcome = routine_outcome(_result(200, 429, 200, retry_after="3"))
+        assert outcome == RequestOutcome(status=429, retry_after="3", failed=False)
+        assert routine_outcome(_result(200, 404)).status == 404
+        assert routine_outcome(RoutineExecutionResult(ok=False)) == RequestOutcome(status=None, failed=True)
+
+    def test_routine_host(self) -> None:
+        routine = Routine(
+            name="r",
+            description="d",
+            parameters=[Parameter(name="host", description="Host")],
+            operations=[
+                RoutineNavigateOperation(url="https://www.a.com/"),
+                RoutineFetchOperation(
+                    endpoint=Endpoint(url='https://"{{host}}"/api', method="GET"), session_storage_key="x",
+                ),
+                RoutineReturnOperation(session_storage_key="x"),
+            ],
+        )
+        assert routine_host(routine, {"host": "api.a.com"}) == "api.a.com"
+        assert routine_host(
+            routine, {"host": "api.a.com"}, url_rewriter=lambda u: u.replace("a.com", "b.com"),
+        ) == "api.b.com"
+
+
+class TestExecutorRateLimiting:
+    """RoutineExecutor retries throttled executions through the shared limiter."""
+
+    def test_execute_retries_throttled(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        fake = FakeTime()
+        limiter = _limiter(fake, max_retries=2)
+        results = iter([_result(429), _result(200)])
+        monkeypatch.setattr(Routine, "execute", lambda self, **kwargs: next(results))
+        routine = Routine(
+            name="r",
+            description="d",
+            operations=[
+                RoutineFetchOperation(endpoint=Endpoint(url="https://a.com/api", method="GET"), session_storage_key="x"),
+                RoutineReturnOperation(session_storage_key="x"),
+            ],
+        )
+
+        result = RoutineExecutor(rate_limiter=limiter).execute(routine, {})
+        assert routine_outcome(result).status == 200
+        assert limiter.stats()["a.com"]["retries"] == 1
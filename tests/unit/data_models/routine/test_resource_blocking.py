@@ -0,0 +1,93 @@
+"""
+tests/unit/data_models/routine/test_resource_blocking.py
+
+Tests for resource blocking policies.
+"""
+
+from fnmatch import fnmatchcase
+
+from bluebox.data_models.routine.endpoint import Endpoint
+from bluebox.data_models.routine.operation import RoutineFetchOperation, RoutineReturnOperation
+from bluebox.data_models.routine.resource_blocking import (
+    ResourceBlockingPolicy,
+    ResourceCategory,
+    blocked_url_patterns,
+)
+from bluebox.data_models.routine.routine import Routine
+
+
+def _blocked(patterns: list[str], url: str) -> bool:
+    return any(fnmatchcase(url, pattern) for pattern in patterns)
+
+
+class TestBlockedUrlPatterns:
+    """Tests for blocked_url_patterns and ResourceBlockingPolicy."""
+
+    def test_categories(self) -> None:
+        patterns = blocked_url_patterns([ResourceCategory.IMAGE, ResourceCategory.FONT])
+        assert _blocked(patterns, "https://cdn.a.com/logo.png")
+        assert _blocked(patterns, "https://cdn.a.com/logo.webp?v=3")
+        assert _blocked(patterns, "https://cdn.a.com/f/inter.woff2")
+        assert not _blocked(patterns, "https://cdn.a.com/site.css")
+        assert not _blocked(patterns, "https://a.com/api/items?format=png")
+
+    def test_tracking_domains(self) -> None:
+        patterns = blocked_url_patterns([ResourceCategory.TRACKING])
+        assert _blocked(patterns, "https://www.google-analytics.com/collect?v=1")
+        assert _blocked(patterns, "https://google-analytics.com/g/collect")
+        assert not _blocked(patterns, "https://a.com/analytics")
+
+    def test_default_policy_blocks_every_category(self) -> None:
+        policy = ResourceBlockingPolicy(url_patterns=["*/ads/*"])
+        urls = policy.blocked_urls()
+        assert set(policy.categories) == set(ResourceCategory)
+        for url in ("https://a.com/site.css", "https://a.com/intro.mp4", "https://a.com/ads/banner.js"):
+            assert _blocked(urls, url)
+        assert not _blocked(urls, "https://a.com/app.js")
+        assert len(urls) == len(set(urls))
+
+    def test_routine_round_trip(self) -> None:
+        routine = Routine(
+            name="r",
+            description="d",
+            operations=[
+                RoutineFetchOperation(endpoint=Endpoint(url="https://a.com/api", method="GET"), session_storage_key="x"),
+                RoutineReturnOperation(session_storage_key="x"),
+            ],
+            resource_blocking={"categories": ["image", "tracking"]},
+        )
+        loaded = Routine.model_validate_json(routine.model_dump_json())
+        assert loaded.resource_blocking.categories == [ResourceCategory.IMAGE, ResourceCategory.TRACKING]
+        assert Routine.model_validate({**routine.model_dump(), "resource_blocking": None}).resource_blocking is None
+
+    def test_keeps_routine_urls_unblocked(self) -> None:
+        policy = ResourceBlockingPolicy(url_patterns=["*/ads/*"])
+        urls = policy.blocked_urls(keep_urls=["https://a.com/export/chart.svg", "https://a.com/ads/{{slot}}.json"])
+        assert not _blocked(urls, "https://a.com/export/chart.svg")
+        assert _blocked(urls, "https://a.com/logo.png")
+        assert "*/ads/*" not in urls
+        # a placeholder at the end of the path may be any file name, but not another host
+        urls = policy.blocked_urls(keep_urls=["https://a.com/files/{{name}}"])
+        assert not _blocked(urls, "https://a.com/files/a.png")
+        assert _blocked(urls, "https://www.google-analytics.com/collect")
+        assert not _blocked(policy.blocked_urls(keep_urls=["https://a.com/?f={{format}}"]), "https://a.com/?f=.css")
+
+    def test_routine_request_urls_are_kept(self) -> None:
+        routine = Routine(
+            name="r",
+            description="d",
+            parameters=[{"name": "chart", "description": "Chart id"}],
+            operations=[
+                RoutineFetchOperation(
+                    endpoint=Endpoint(url='https://a.com/charts/"{{chart}}".svg', method="GET"),
+                    session_storage_key="x",
+                ),
+                RoutineReturnOperation(session_storage_key="x"),
+            ],
+            resource_blocking={},
+        )
+        own_urls = routine._request_urls(routine.compile(), {"chart": "sales"}, None)
+        assert own_urls == ["https://a.com/charts/sales.svg"]
+        urls = routine.resource_blocking.blocked_urls(keep_urls=own_urls)
+        assert not _blocked(urls, "https://a.com/charts/sales.svg")
+        assert _blocked(urls, "https://a.com/logo.png")
@@ -0,0 +1,178 @@
+"""
+tests/unit/data_models/routine/test_result_cache.py
+
+Tests for the routine result cache.
+"""
+
+import pytest
+
+from bluebox.data_models.routine.endpoint import Endpoint
+from bluebox.data_models.routine.execution import OperationExecutionMetadata, RoutineExecutionResult
+from bluebox.data_models.routine.execution_options import RoutineExecutionOptions
+from bluebox.data_models.routine.operation import RoutineFetchOperation, RoutineReturnOperation
+from bluebox.data_models.routine.parameter import Parameter
+from bluebox.data_models.routine.result_cache import (
+    RoutineResultCache,
+    routine_cache_key,
+    ttl_from_cache_control,
+)
+from bluebox.data_models.routine.routine import Routine
+from bluebox.sdk.execution import RoutineExecutor
+
+
+def _routine(name: str = "search") -> Routine:
+    return Routine(
+        name=name,
+        description="Search items",
+        parameters=[Parameter(name="query", description="Search query")],
+        operations=[
+            RoutineFetchOperation(
+                endpoint=Endpoint(url='https://example.com/search?q="{{query}}"', method="GET"),
+                session_storage_key="result",
+            ),
+            RoutineReturnOperation(session_storage_key="result"),
+        ],
+    )
+
+
+def _result(data: object = None, cache_control: str | None = None, **headers: str) -> RoutineExecutionResult:
+    if cache_control is not None:
+        headers["cache-control"] = cache_control
+    return RoutineExecutionResult(
+        data=data,
+        operations_metadata=[
+            OperationExecutionMetadata(type="fetch", duration_seconds=0.1, details={"response": {"headers": headers}}),
+        ],
+    )
+
+
+class TestCacheKey:
+    """Tests for routine_cache_key."""
+
+    def test_normalizes_parameters(self) -> None:
+        routine = _routine()
+        assert routine_cache_key(routine, {"query": "a", "unused": 1}) == routine_cache_key(routine, {"query": "a"})
+        assert routine_cache_key(routine, {"query": "a"}) != routine_cache_key(routine, {"query": "b"})
+
+    def test_routine_changes_change_key(self) -> None:
+        assert routine_cache_key(_routine("a"), {"query": "x"}) != routine_cache_key(_routine("b"), {"query": "x"})
+
+
+class TestTtlFromCacheControl:
+    """Tests for ttl_from_cache_control."""
+
+    def test_smallest_max_age_minus_age(self) -> None:
+        result = _result(cache_control="public, max-age=600", age="100")
+        result.operations_metadata.append(
+            OperationExecutionMetadata(
+                type="fetch", duration_seconds=0.1, details={"response": {"headers": {"Cache-Control": "max-age=60"}}},
+            )
+        )
+        assert ttl_from_cache_control(result) == 60
+
+    def test_no_store_and_absent(self) -> None:
+        assert ttl_from_cache_control(_result(cache_control="no-store")) == 0
+        assert ttl_from_cache_control(_result()) is None
+
+
+class TestRoutineResultCache:
+    """Tests for RoutineResultCache."""
+
+    def test_hit_miss_and_copy(self) -> None:
+        cache = RoutineResultCache()
+        routine = _routine()
+        assert cache.get(routine, {"query": "a"}) is None
+        assert cache.put(routine, {"query": "a"}, _result({"items": [1]}))
+
+        cached = cache.get(routine, {"query": "a"})
+        assert cached.data == {"items": [1]}
+        cached.data["items"].append(2)
+        assert cache.get(routine, {"query": "a"}).data == {"items": [1]}
+        assert cache.stats.to_dict()["hits"] == 2
+        assert cache.stats.misses == 1
+
+    def test_uncacheable_results(self) -> None:
+        cache = RoutineResultCache()
+        routine = _routine()
+        assert not cache.put(routine, {}, RoutineExecutionResult(ok=False, error="boom"))
+        assert not cache.put(routine, {}, _result(cache_control="no-cache"))
+        failed_operation = _result()
+        failed_operation.operations_metadata[0].error = "Fetch failed"
+        assert not cache.put(routine, {}, failed_operation)
+        assert cache.stats.uncacheable == 3
+
+    def test_ttl_precedence_and_expiry(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        now = [1000.0]
+        monkeypatch.setattr("bluebox.data_models.routine.result_cache.time.time", lambda: now[0])
+        cache = RoutineResultCache(default_ttl_seconds=300, ttl_by_routine={"pinned": 10})
+        assert cache.ttl_for(_routine(), _result(cache_control="max-age=30")) == 30
+        assert cache.ttl_for(_routine("pinned"), _result(cache_control="max-age=30")) == 10
+        assert cache.ttl_for(_routine(), _result()) == 300
+
+        cache.put(_routine(), {"query": "a"}, _result("x", cache_control="max-age=30"))
+        now[0] += 31
+        assert cache.get(_routine(), {"query": "a"}) is None
+        assert cache.stats.expirations == 1
+
+    def test_lru_eviction(self) -> None:
+        cache = RoutineResultCache(max_entries=2)
+        routine = _routine()
+        for query in ("a", "b"):
+            cache.put(routine, {"query": query}, _result(query))
+        cache.get(routine, {"query": "a"})
+        cache.put(routine, {"query": "c"}, _result("c"))
+        assert cache.get(routine, {"query": "b"}) is None
+        assert cache.get(routine, {"query": "a"}).data == "a"
+        assert cache.stats.evictions == 1
+
+    def test_disk_tier_survives_new_instance(self, tmp_path) -> None:
+        routine = _routine()
+        RoutineResultCache(cache_dir=tmp_path).put(routine, {"query": "a"}, _result({"n": 1}))
+
+        fresh = RoutineResultCache(cache_dir=tmp_path)
+        assert fresh.get(routine, {"query": "a"}).data == {"n": 1}
+        assert fresh.stats.disk_hits == 1
+        assert fresh.get(routine, {"query": "a"}) is not None
+        assert fresh.stats.memory_hits == 1
+
+        fresh.clear()
+        assert list(tmp_path.glob("*.json")) == []
+
+    def test_get_or_execute(self) -> None:
+        cache = RoutineResultCache()
+        calls = []
+
+        def execute() -> RoutineExecutionResult:
+            calls.append(1)
+            return _result("fresh")
+
+        assert cache.get_or_execute(_routine(), {"query": "a"}, execute).data == "fresh"
+        assert cache.get_or_execute(_routine(), {"query": "a"}, execute).data == "fresh"
+        assert len(calls) == 1
+
+
+class TestCacheBypass:
+    """Executions whose results differ from a plain run neither read nor fill the cache."""
+
+    @pytest.mark.parametrize("kwargs", [{"url_rewriter": lambda url: url}, {"trace": True}])
+    def test_routine_execute(self, monkeypatch: pytest.MonkeyPatch, kwargs: dict) -> None:
+        monkeypatch.setattr(Routine, "_execute_in_tab", lambda self, run, **_: _result("fresh"))
+        cache = RoutineResultCache()
+        cache.put(_routine(), {"query": "a"}, _result("cached"))
+
+        options = RoutineExecutionOptions(result_cache=cache, **kwargs)
+        assert _routine().execute(parameters_dict={"query": "a"}, options=options).data == "fresh"
+        assert cache.get(_routine(), {"query": "a"}).data == "cached"
+        options = RoutineExecutionOptions(result_cache=cache)
+        assert _routine().execute(parameters_dict={"query": "a"}, options=options).data == "cached"
+
+    @pytest.mark.parametrize("kwargs", [{"url_rewriter": lambda url: url}, {"trace": True}])
+    def test_executor(self, monkeypatch: pytest.MonkeyPatch, kwargs: dict) -> None:
+        monkeypatch.setattr(Routine, "execute", lambda self, **_: _result("fresh"))
+        cache = RoutineResultCache()
+        cache.put(_routine(), {"query": "a"}, _result("cached"))
+        executor = RoutineExecutor(result_cache=cache)
+
+        assert executor.execute(_routine(), {"query": "a"}, **kwargs).data == "fresh"
+        assert cache.get(_routine(), {"query": "a"}).data == "cached"
+        assert executor.execute(_routine(), {"query": "a"}).data == "cached"
@@ -707,6 +707,41 @@ class TestBaseUrlExtraction:
         )
         assert routine.compute_base_urls_from_operations() == "downloads.com,example.com"
 
+    def test_preconnect_origins(self) -> None:
+        """Test that _preconnect_origins renders full origins and tracks credentialed connections."""
+        routine = Routine(
+            name="multi_origin",
+            description="Navigate, then call two APIs",
+            parameters=[Parameter(name="region", description="Region")],
+            operations=[
+                RoutineNavigateOperation(url="https://www.example.com/"),
+                RoutineFetchOperation(
+                    endpoint=Endpoint(url='https://"{{region}}".api.example.com/items', method=HTTPMethod.GET),
+                    session_storage_key="items",
+                ),
+                RoutineFetchOperation(
+                    endpoint=Endpoint(
+                        url="https://{{sessionStorage:items.next}}/more", method=HTTPMethod.GET, credentials="include",
+                    ),
+                    session_storage_key="more",
+                ),
+                RoutineDownloadOperation(
+                    endpoint=Endpoint(url="https://cdn.example.net/f.pdf", method=HTTPMethod.GET, credentials="omit"),
+                    filename="f.pdf",
+                ),
+            ],
+        )
+        origins = routine._preconnect_origins(routine.compile(), {"region": "eu"}, None)
+        assert origins == {
+            "https://www.example.com": True,
+            "https://eu.api.example.com": False,
+            "https://cdn.example.net": False,
+        }
+        rewritten = routine._preconnect_origins(
+            routine.compile(), {"region": "eu"}, lambda url: url.replace("https://", "http://127.0.0.1:9/"),
+        )
+        assert list(rewritten) == ["http://127.0.0.1:9"]
+
 
 class TestPremierLeagueRoutineValidation:
     """Test validation for Premier League Get Matchweek Games routine."""
@@ -1281,3 +1316,99 @@ class TestParameterTypeQuoteValidation:
         # Should not raise any validation errors
         routine.validate_parameter_usage()
 
+
+
+class TestRoutineCompile:
+    """Tests for Routine.compile() execution plans."""
+
+    @staticmethod
+    def _routine() -> Routine:
+        return Routine(
+            name="compiled",
+            description="Fetch with interpolated URL, headers and body",
+            parameters=[
+                Parameter(name="user_id", type=ParameterType.INTEGER, description="User id"),
+                Parameter(name="query", type=ParameterType.STRING, description="Search query"),
+            ],
+            operations=[
+                RoutineNavigateOperation(url="https://example.com"),
+                RoutineFetchOperation(
+                    endpoint=Endpoint(
+                        url='https://example.com/users/"{{user_id}}"',
+                        method=HTTPMethod.POST,
+                        headers={"x-static": "1"},
+                        body={"q": "\"{{query}}\"", "id": "{{user_id}}"},
+                    ),
+                    session_storage_key="result",
+                ),
+                RoutineReturnOperation(session_storage_key="result"),
+            ],
+        )
+
+    def test_plan_per_operation(self) -> None:
+        plan = self._routine().compile()
+        assert len(plan.operations) == 3
+        assert plan.operations[0].templates["url"].is_static
+        assert plan.operations[2].templates == {}
+
+        fetch_plan = plan.operations[1]
+        params = {"user_id": 7, "query": "shoes"}
+        assert fetch_plan.render("endpoint.url", params) == "https://example.com/users/7"
+        assert fetch_plan.render_json("endpoint.headers", params) == {"x-static": "1"}
+        assert fetch_plan.render_json("endpoint.body", params) == {"q": "shoes", "id": 7}
+
+    def test_plan_is_immutable(self) -> None:
+        plan = self._routine().compile()
+        with pytest.raises(AttributeError):
+            plan.operations = ()  # type: ignore[misc]
+        with pytest.raises(TypeError):
+            plan.operations[1].templates["endpoint.url"] = None  # type: ignore[index]
+
+    def test_execute_rejects_mismatched_plan(self) -> None:
+        routine = self._routine()
+        other_plan = Routine(
+            name="other",
+            description="Single navigate",
+            operations=[RoutineNavigateOperation(url="https://example.com")],
+        ).compile()
+        result = routine.execute(parameters_dict={"user_id": 1, "query": "x"}, plan=other_plan)
+        assert result.ok is False
+        assert "Plan has 1 operations" in result.error
+
+
+class TestRoutineExecuteBatch:
+    """Tests for Routine.execute_batch validation (checked before any tab is opened)."""
+
+    @staticmethod
+    def _routine(navigate_url: str = "https://example.com") -> Routine:
+        return Routine(
+            name="batch",
+            description="Fetch one user per parameter set",
+            parameters=[
+                Parameter(name="user_id", type=ParameterType.INTEGER, description="User id"),
+                Parameter(name="region", type=ParameterType.STRING, description="Region"),
+            ],
+            operations=[
+                RoutineNavigateOperation(url=navigate_url),
+                RoutineFetchOperation(
+                    endpoint=Endpoint(url='https://example.com/"{{region}}"/users/"{{user_id}}"', method=HTTPMethod.GET),
+                    session_storage_key="user",
+                ),
+                RoutineReturnOperation(session_storage_key="user"),
+            ],
+        )
+
+    def test_empty_batch(self) -> None:
+        assert self._routine().execute_batch([]) == []
+
+    def test_setup_using_varying_parameter_rejected(self) -> None:
+        routine = self._routine(navigate_url='https://example.com/"{{region}}"')
+        results = routine.execute_batch([{"user_id": 1, "region": "eu"}, {"user_id": 2, "region": "us"}])
+        assert len(results) == 2
+        assert all(not r.ok and "vary between sets: ['region']" in r.error for r in results)
+
+    def test_result_must_come_from_batch_fetch(self) -> None:
+        routine = self._routine()
+        routine.operations[2] = RoutineReturnOperation(session_storage_key="other")
+        results = routine.execute_batch([{"user_id": 1, "region": "eu"}])
+        assert "followed only by a return of its result" in results[0].error
@@ -0,0 +1,172 @@
+"""
+tests/unit/data_models/routine/test_schedule.py
+
+Tests for dependency-aware scheduling of routine operations.
+"""
+
+import re
+
+from bluebox.data_models.routine.endpoint import CREDENTIALS, Endpoint
+from bluebox.data_models.routine.execution import RoutineExecutionContext
+from bluebox.data_models.routine.operation import (
+    RoutineFetchOperation,
+    RoutineNavigateOperation,
+    RoutineReturnOperation,
+)
+from bluebox.data_models.routine.plan import RoutinePlan
+from bluebox.data_models.routine.schedule import (
+    build_execution_waves,
+    execute_operations,
+    get_operation_dependencies,
+)
+
+_URL_PATTERN = re.compile(r'url: "([^"]*)"')
+
+
+def _fetch(
+    url: str,
+    key: str | None = None,
+    headers: dict | None = None,
+    credentials: CREDENTIALS = CREDENTIALS.OMIT,
+    method: str = "GET",
+) -> RoutineFetchOperation:
+    return RoutineFetchOperation(
+        endpoint=Endpoint(url=url, method=method, headers=headers or {}, credentials=credentials),
+        session_storage_key=key,
+    )
+
+
+class TestOperationDependencies:
+    """Tests for get_operation_dependencies."""
+
+    def test_fetch_reads_and_writes(self) -> None:
+        deps = get_operation_dependencies(_fetch(
+            "https://api.example.com/items/{{sessionStorage:token.id}}?user={{user_id}}",
+            key="items",
+            headers={"Authorization": "\"{{sessionStorage:auth}}\""},
+        ))
+        assert deps.concurrent
+        assert deps.reads == {"token", "auth"}
+        assert deps.writes == {"items"}
+        assert not deps.reads_cookies
+        assert not deps.writes_cookies
+
+    def test_cookie_reads_and_non_fetch(self) -> None:
+        deps = get_operation_dependencies(_fetch("https://a.com/{{cookie:sid}}"))
+        assert deps.reads_cookies
+        assert not deps.writes_cookies
+        assert not get_operation_dependencies(RoutineReturnOperation(session_storage_key="x")).concurrent
+
+    def test_credentialed_fetches_and_navigations_read_and_write_cookies(self) -> None:
+        for credentials in (CREDENTIALS.INCLUDE, CREDENTIALS.SAME_ORIGIN):
+            deps = get_operation_dependencies(_fetch("https://a.com/1", credentials=credentials))
+            assert deps.concurrent
+            assert deps.reads_cookies and deps.writes_cookies
+        navigate = get_operation_dependencies(RoutineNavigateOperation(url="https://a.com"))
+        assert navigate.reads_cookies and navigate.writes_cookies
+        assert get_operation_dependencies(
+            RoutineFetchOperation(endpoint=Endpoint(url="https://a.com/1", method="GET", headers={}))
+        ).writes_cookies
+
+
+class TestBuildExecutionWaves:
+    """Tests for build_execution_waves."""
+
+    def test_independent_fetches_share_a_wave(self) -> None:
+        operations = [
+            RoutineNavigateOperation(url="https://a.com"),
+            _fetch("https://a.com/1", key="one"),
+            _fetch("https://a.com/2", key="two"),
+            _fetch("https://a.com/3?x={{sessionStorage:one.id}}", key="three"),
+            _fetch("https://a.com/4", key="four"),
+            RoutineReturnOperation(session_storage_key="three"),
+        ]
+        assert build_execution_waves(operations) == [[0], [1, 2, 4], [3], [5]]
+
+    def test_conflicting_writes_and_cookies_serialize(self) -> None:
+        operations = [
+            _fetch("https://a.com/1", key="same"),
+            _fetch("https://a.com/2", key="same", credentials=CREDENTIALS.INCLUDE),
+            _fetch("https://a.com/3?sid={{cookie:sid}}"),
+        ]
+        assert build_execution_waves(operations) == [[0], [1], [2]]
+
+    def test_login_then_credentialed_fetch_serialize(self) -> None:
+        """A login response may Set-Cookie the session the next credentialed request sends."""
+        operations = [
+            _fetch("https://a.com/login", method="POST", credentials=CREDENTIALS.INCLUDE),
+            _fetch("https://a.com/me", key="me", credentials=CREDENTIALS.SAME_ORIGIN),
+            _fetch("https://a.com/public", key="public"),
+            _fetch("https://a.com/token?sid={{cookie:sid}}", key="token"),
+        ]
+        assert build_execution_waves(operations) == [[0, 2], [1], [3]]
+
+    def test_barrier_splits_runs(self) -> None:
+        operations = [
+            _fetch("https://a.com/1", key="a"),
+            RoutineNavigateOperation(url="https://b.com"),
+            _fetch("https://b.com/2", key="b"),
+        ]
+        assert build_execution_waves(operations) == [[0], [1], [2]]
+
+
+class TestExecuteOperations:
+    """Tests for execute_operations with concurrent fetches."""
+
+    def _context(self, fail_url: str | None = None) -> tuple[RoutineExecutionContext, list, list]:
+        sent: list[str] = []
+        max_outstanding: list[int] = [0]
+        outstanding: dict[int, dict] = {}
+
+        def send_cmd(method, params=None, **kwargs) -> int:
+            msg_id = len(sent) + 1
+            url = _URL_PATTERN.search(params["expression"]).group(1)
+            sent.append(url)
+            value = {"__err": "boom"} if url == fail_url else {"status": 200, "value": "success", "resolvedValues": {}}
+            outstanding[msg_id] = {"id": msg_id, "result": {"result": {"value": value}}}
+            max_outstanding[0] = max(max_outstanding[0], len(outstanding))
+            return msg_id
+
+        def recv_until(predicate, deadline) -> dict:
+            # reply newest first, to exercise out-of-order replies
+            for msg_id in sorted(outstanding, reverse=True):
+                if predicate(outstanding[msg_id]):
+                    return outstanding.pop(msg_id)
+            raise TimeoutError("no reply")
+
+        context = RoutineExecutionContext(
+            session_id="s1", send_cmd=send_cmd, recv_until=recv_until, current_url="https://a.com",
+        )
+        return context, sent, max_outstanding
+
+    def _plan(self, operations: list) -> RoutinePlan:
+        return RoutinePlan(operations=tuple(operation.compile_plan() for operation in operations))
+
+    def test_fetches_in_flight_together_metadata_in_order(self) -> None:
+        operations = [
+            _fetch("https://a.com/1", key="one"),
+            _fetch("https://a.com/2?x={{sessionStorage:one}}", key="two"),
+            _fetch("https://a.com/3", key="three"),
+        ]
+        context, sent, max_outstanding = self._context(fail_url="https://a.com/3")
+        execute_operations(operations, self._plan(operations), context, parallel=True)
+
+        assert sent == ["https://a.com/1", "https://a.com/3", "https://a.com/2?x={{sessionStorage:one}}"]
+        assert max_outstanding[0] == 2
+        metadata = context.result.operations_metadata
+        assert [m.error for m in metadata] == [None, None, "Fetch failed: boom"]
+        assert all(m.type == "fetch" for m in metadata)
+
+    def test_sequential_when_parallel_disabled(self) -> None:
+        operations = [_fetch("https://a.com/1", key="one"), _fetch("https://a.com/2", key="two")]
+        context, sent, max_outstanding = self._context()
+        execute_operations(operations, self._plan(operations), context, parallel=False)
+
+        assert sent == ["https://a.com/1", "https://a.com/2"]
+        assert max_outstanding[0] == 1
+
+    def test_sequential_by_default(self) -> None:
+        operations = [_fetch("https://a.com/1", key="one"), _fetch("https://a.com/2", key="two")]
+        context, _, max_outstanding = self._context()
+        execute_operations(operations, self._plan(operations), context)
+        assert max_outstanding[0] == 1
@@ -0,0 +1,93 @@
+"""
+tests/unit/data_models/routine/test_session_state.py
+
+Tests for the session state store.
+"""
+
+import time
+
+import pytest
+
+from bluebox.data_models.routine.execution import OperationExecutionMetadata, RoutineExecutionResult
+from bluebox.data_models.routine.session_state import (
+    SessionStateStore,
+    auth_failure_status,
+    cookie_params,
+    session_state_key,
+)
+
+ORIGINS = ["https://www.a.com", "https://api.a.com"]
+COOKIES = [
+    {"name": "sid", "value": "1", "domain": ".a.com", "path": "/", "expires": -1, "session": True, "size": 4},
+    {"name": "pref", "value": "x", "domain": "a.com", "path": "/", "expires": time.time() + 3600, "session": False},
+    {"name": "old", "value": "y", "domain": "a.com", "path": "/", "expires": time.time() - 10, "session": False},
+]
+
+
+def _result(*statuses: int, ok: bool = True) -> RoutineExecutionResult:
+    return RoutineExecutionResult(
+        ok=ok,
+        operations_metadata=[
+            OperationExecutionMetadata(type="fetch", duration_seconds=0.1, details={"response": {"status": status}})
+            for status in statuses
+        ],
+    )
+
+
+class TestSessionStateStore:
+    """Tests for SessionStateStore."""
+
+    def test_round_trip_and_key_order(self) -> None:
+        store = SessionStateStore()
+        assert store.get(ORIGINS) is None
+        store.put(ORIGINS, COOKIES, {"https://www.a.com": {"localStorage": {"token": "t"}, "sessionStorage": {}}})
+
+        snapshot = store.get(list(reversed(ORIGINS)))
+        assert snapshot is not None and snapshot.cookies == COOKIES
+        assert snapshot.storage["https://www.a.com"]["localStorage"] == {"token": "t"}
+        assert session_state_key(ORIGINS) == session_state_key(reversed(ORIGINS))
+        assert store.get(["https://b.com"]) is None
+        assert store.stats.to_dict() == {"restores": 1, "misses": 2, "captures": 1, "invalidations": 0, "expirations": 0}
+
+    def test_ttl(self) -> None:
+        store = SessionStateStore()
+        store.put(ORIGINS, COOKIES, ttl_seconds=0.05)
+        assert store.get(ORIGINS) is not None
+        time.sleep(0.06)
+        assert store.get(ORIGINS) is None
+        assert store.stats.expirations == 1
+        with pytest.raises(ValueError):
+            SessionStateStore(default_ttl_seconds=0)
+
+    def test_disk_tier(self, tmp_path) -> None:
+        SessionStateStore(state_dir=tmp_path).put(ORIGINS, COOKIES)
+        assert (tmp_path / f"{session_state_key(ORIGINS)}.json").stat().st_mode & 0o777 == 0o600
+
+        other = SessionStateStore(state_dir=tmp_path)
+        assert other.get(ORIGINS).cookies == COOKIES
+        other.invalidate(ORIGINS)
+        assert other.stats.invalidations == 1
+        assert SessionStateStore(state_dir=tmp_path).get(ORIGINS) is None
+
+    def test_invalidation_statuses(self) -> None:
+        assert auth_failure_status(_result(200, 401, 403)) == 401
+        assert auth_failure_status([_result(200), _result(403, ok=False)]) == 403
+        assert auth_failure_status(_result(404, 500, ok=False)) is None
+        batch = RoutineExecutionResult(
+            ok=True,
+            operations_metadata=[
+                OperationExecutionMetadata(type="fetch", duration_seconds=0.1, details={"batch": {"statuses": [200, 401]}}),
+            ],
+        )
+        assert SessionStateStore().should_invalidate(batch) == 401
+        assert SessionStateStore(invalidate_statuses={419}).should_invalidate(_result(401)) is None
+
+
+class TestCookieParams:
+    """Tests for cookie_params."""
+
+    def test_session_and_expired_cookies(self) -> None:
+        params = cookie_params(COOKIES)
+        assert [p["name"] for p in params] == ["sid", "pref"]
+        assert params[0] == {"name": "sid", "value": "1", "domain": ".a.com", "path": "/"}
+        assert params[1]["expires"] == COOKIES[1]["expires"]
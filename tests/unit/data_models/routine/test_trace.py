@@ -0,0 +1,132 @@
+"""
+tests/unit/data_models/routine/test_trace.py
+
+Tests for per-operation execution tracing.
+"""
+
+from bluebox.data_models.routine.endpoint import Endpoint
+from bluebox.data_models.routine.execution import (
+    OperationExecutionMetadata,
+    RoutineExecutionContext,
+    RoutineExecutionResult,
+)
+from bluebox.data_models.routine.operation import RoutineFetchOperation, RoutineSleepOperation
+from bluebox.data_models.routine.trace import (
+    ExecutionTracer,
+    OperationTrace,
+    build_trace_profile,
+    to_chrome_trace,
+)
+
+
+class FakeClock:
+    """Clock advancing by a fixed step on every read."""
+
+    def __init__(self, step: float = 0.5) -> None:
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self) -> float:
+        self.now += self.step
+        return self.now
+
+
+def _traced_context(reply_value: dict) -> tuple[RoutineExecutionContext, ExecutionTracer]:
+    tracer = ExecutionTracer(clock=FakeClock())
+    replies: dict[int, dict] = {}
+
+    def send_cmd(method, params=None, **kwargs) -> int:
+        msg_id = len(replies) + 1
+        replies[msg_id] = {"id": msg_id, "result": {"result": {"value": reply_value}}}
+        return msg_id
+
+    def recv_until(predicate, deadline) -> dict:
+        return next(reply for reply in replies.values() if predicate(reply))
+
+    context = RoutineExecutionContext(
+        session_id="s1",
+        send_cmd=tracer.wrap_send_cmd(send_cmd),
+        recv_until=tracer.wrap_recv_until(recv_until),
+        current_url="https://a.com",
+        tracer=tracer,
+    )
+    return context, tracer
+
+
+class TestExecutionTracer:
+    """Tests for ExecutionTracer instrumentation of operations."""
+
+    def test_fetch_records_cdp_span_and_page_fetch(self) -> None:
+        context, tracer = _traced_context({
+            "status": 200,
+            "value": "success",
+            "resolvedValues": {},
+            "request": {"url": "https://a.com/api"},
+            "response": {"status": 200, "timing": {"totalMs": 400, "headersMs": 300, "bodyMs": 100, "ttfbMs": 250}},
+        })
+        RoutineFetchOperation(endpoint=Endpoint(url="https://a.com/api", method="GET")).execute(context)
+
+        trace = context.result.operations_metadata[0].trace
+        assert tracer.current is None
+        assert trace.cdp_commands == 1
+        assert trace.bytes_sent > 0 and trace.bytes_received > 0
+        (evaluate,) = trace.spans
+        assert evaluate.name == "Runtime.evaluate"
+        assert evaluate.duration_seconds == trace.cdp_round_trip_seconds == 0.5
+        (page_fetch,) = evaluate.children
+        assert page_fetch.name == "page_fetch"
+        assert page_fetch.duration_seconds == trace.page_fetch_seconds == 0.4
+        assert page_fetch.args == {"ttfbMs": 250, "url": "https://a.com/api", "status": 200}
+        assert [child.name for child in page_fetch.children] == ["headers", "body"]
+        assert page_fetch.start_seconds + page_fetch.duration_seconds == evaluate.start_seconds + evaluate.duration_seconds
+
+    def test_sleep_is_recorded(self) -> None:
+        context, _ = _traced_context({})
+        RoutineSleepOperation(timeout_seconds=0).execute(context)
+        trace = context.result.operations_metadata[0].trace
+        assert [(span.name, span.category) for span in trace.spans] == [("sleep", "sleep")]
+        assert trace.sleep_seconds == trace.spans[0].duration_seconds > 0
+        assert trace.cdp_commands == 0
+
+    def test_untraced_context_has_no_trace(self) -> None:
+        context = RoutineExecutionContext(session_id="s1", send_cmd=lambda *a, **k: 1, recv_until=lambda *a: {})
+        RoutineSleepOperation(timeout_seconds=0).execute(context)
+        assert context.result.operations_metadata[0].trace is None
+
+
+class TestTraceExport:
+    """Tests for build_trace_profile and to_chrome_trace."""
+
+    @staticmethod
+    def _results() -> list[RoutineExecutionResult]:
+        shared = OperationExecutionMetadata(
+            type="fetch",
+            duration_seconds=2.0,
+            details={"batch": {"size": 2, "concurrency": 2, "failed": 0}},
+            trace=OperationTrace(started_at=100.0, cdp_commands=3, bytes_sent=10, bytes_received=20),
+        )
+        navigate = OperationExecutionMetadata(
+            type="navigate", duration_seconds=1.0, trace=OperationTrace(started_at=99.0, cdp_commands=1),
+        )
+        untraced = OperationExecutionMetadata(type="sleep", duration_seconds=3.0, error="boom")
+        return [
+            RoutineExecutionResult(operations_metadata=[navigate, shared]),
+            RoutineExecutionResult(operations_metadata=[untraced, shared]),
+        ]
+
+    def test_profile_counts_shared_metadata_once(self) -> None:
+        profile = build_trace_profile(self._results())
+        assert profile["fetch"].count == 1
+        assert profile["fetch"].to_dict()["bytes_received"] == 20
+        assert profile["navigate"].cdp_commands == 1
+        assert profile["sleep"].errors == 1
+        assert profile["sleep"].to_dict()["p95_seconds"] == 3.0
+
+    def test_chrome_trace_events(self) -> None:
+        events = to_chrome_trace(self._results())["traceEvents"]
+        spans = [event for event in events if event["ph"] == "X"]
+        assert [(e["pid"], e["tid"], e["name"]) for e in spans] == [(1, 1, "navigate"), (1, 2, "fetch"), (2, 2, "fetch")]
+        fetch = spans[1]
+        assert fetch["ts"] == 100.0 * 1e6 and fetch["dur"] == 2.0 * 1e6
+        assert fetch["args"]["cdp_commands"] == 3 and fetch["args"]["batch"]["size"] == 2
+        assert {"name": "process_name", "ph": "M", "pid": 2, "args": {"name": "run 2"}} in events
@@ -0,0 +1,168 @@
+"""
+tests/unit/llms/test_data_store.py
+
+Tests for LocalDiscoveryDataStore capture processing and the CaptureDB-backed store.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+from openai import OpenAI
+
+from bluebox.llms.infra.data_store import CaptureDBDiscoveryDataStore, LocalDiscoveryDataStore
+from bluebox.utils.jsonl_utils import IndexedJsonlReader, build_jsonl_index
+
+
+@pytest.fixture
+def captures_dir(tmp_path: Path) -> Path:
+    """CDP captures directory with a network capture holding one large and one small response."""
+    network_dir = tmp_path / "captures" / "network"
+    network_dir.mkdir(parents=True)
+    records = [
+        {
+            "request_id": "r1", "url": "https://example.com/api/big", "method": "GET", "timestamp": 1.5,
+            "status": 200, "mime_type": "application/json", "response_body": "b" * 5000,
+        },
+        {
+            "request_id": "r2", "url": "https://example.com/api/small", "method": "GET", "timestamp": 2.5,
+            "status": 200, "mime_type": "application/json", "response_body": "small",
+        },
+    ]
+    (network_dir / "events.jsonl").write_text("".join(json.dumps(r) + "\n" for r in records))
+    return tmp_path / "captures"
+
+
+def _make_store(captures_dir: Path) -> LocalDiscoveryDataStore:
+    return LocalDiscoveryDataStore(client=OpenAI(api_key="test"), cdp_captures_dir=str(captures_dir))
+
+
+class TestProcessNetworkTransactionFiles:
+    """Tests for _process_network_transaction_files with and without a sidecar index."""
+
+    def test_without_index_writes_transaction_files(self, captures_dir: Path) -> None:
+        store = _make_store(captures_dir)
+        Path(store.network_transactions_dir).mkdir(parents=True)
+
+        store._process_network_transaction_files()
+
+        assert len(list(Path(store.network_transactions_dir).iterdir())) == 2
+        assert store.transaction_locations == {}
+
+    def test_with_index_seeks_into_capture(self, captures_dir: Path) -> None:
+        build_jsonl_index(captures_dir / "network" / "events.jsonl")
+        store = _make_store(captures_dir)
+        Path(store.network_transactions_dir).mkdir(parents=True)
+
+        store._process_network_transaction_files()
+
+        # no per-transaction copies; full bodies are read back from the capture
+        assert list(Path(store.network_transactions_dir).iterdir()) == []
+        big_id = next(tid for tid in store.get_all_transaction_ids() if "big" in tid)
+        transaction = store.get_transaction_by_id(big_id)
+        assert transaction["response"]["body"] == "b" * 5000
+        assert transaction["response"]["body_truncated"] is False
+        assert store.get_transaction_timestamp(big_id) == 1.5
+
+    def test_reloaded_store_rebuilds_locations_from_index(self, captures_dir: Path) -> None:
+        build_jsonl_index(captures_dir / "network" / "events.jsonl")
+        store = _make_store(captures_dir)
+        Path(store.network_transactions_dir).mkdir(parents=True)
+        store._process_network_transaction_files()
+
+        # a new store over the processed files, without reprocessing the capture
+        reloaded = _make_store(captures_dir)
+        big_id = next(tid for tid in reloaded.get_all_transaction_ids() if "big" in tid)
+        assert reloaded.get_transaction_by_id(big_id)["response"]["body"] == "b" * 5000
+        assert reloaded.get_transaction_timestamp(big_id) == 1.5
+        assert reloaded.scan_transaction_responses("b" * 2000) == [big_id]
+
+    def test_scan_reads_truncated_bodies_in_one_batch(
+        self, captures_dir: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        build_jsonl_index(captures_dir / "network" / "events.jsonl")
+        store = _make_store(captures_dir)
+        Path(store.network_transactions_dir).mkdir(parents=True)
+        store._process_network_transaction_files()
+
+        batches: list[int] = []
+        read_lines = IndexedJsonlReader.read_lines
+
+        def counting_read_lines(reader, entries):
+            entries = list(entries)
+            batches.append(len(entries))
+            return read_lines(reader, entries)
+
+        monkeypatch.setattr(IndexedJsonlReader, "read_lines", counting_read_lines)
+
+        assert len(store.scan_transaction_responses("b" * 2000)) == 1
+        assert store.scan_transaction_responses("b" * 2000, max_timestamp=1.0) == []
+        assert batches == [1]
+        store.clean_up()
+        assert store._capture_reader is None
+
+
+class TestCaptureDBDiscoveryDataStore:
+    """Tests for the SQLite-backed discovery data store."""
+
+    @pytest.fixture
+    def full_captures_dir(self, captures_dir: Path) -> Path:
+        """Capture with storage and window property events added."""
+        (captures_dir / "storage").mkdir()
+        (captures_dir / "storage" / "events.jsonl").write_text(
+            json.dumps({"type": "localStorageItemAdded", "key": "token", "value": "tok-123"}) + "\n"
+        )
+        (captures_dir / "window_properties").mkdir()
+        (captures_dir / "window_properties" / "events.jsonl").write_text(
+            json.dumps({"url": "https://example.com", "changes": [{"path": "app.user", "value": "tok-123"}]}) + "\n"
+        )
+        return captures_dir
+
+    def test_matches_local_store(self, full_captures_dir: Path) -> None:
+        local_store = _make_store(full_captures_dir)
+        for process in (
+            local_store._process_network_transaction_files,
+            local_store._process_storage_files,
+            local_store._process_window_properties_files,
+        ):
+            Path(local_store.network_transactions_dir).mkdir(parents=True, exist_ok=True)
+            process()
+        db_store = CaptureDBDiscoveryDataStore(client=OpenAI(api_key="test"), cdp_captures_dir=str(full_captures_dir))
+
+        assert (full_captures_dir / "capture.db").exists()
+        transaction_ids = local_store.get_all_transaction_ids()
+        assert db_store.get_all_transaction_ids() == transaction_ids
+        for transaction_id in transaction_ids:
+            assert db_store.get_transaction_by_id(transaction_id) == local_store.get_transaction_by_id(transaction_id)
+            assert db_store.get_transaction_timestamp(transaction_id) == local_store.get_transaction_timestamp(
+                transaction_id
+            )
+        assert db_store.get_transaction_ids_by_request_url("/api/sm") == local_store.get_transaction_ids_by_request_url(
+            "/api/sm"
+        )
+        for value, max_timestamp in [("bbb", None), ("small", None), ("small", 2.0), ("b", 2.0)]:
+            assert db_store.scan_transaction_responses(value, max_timestamp) == local_store.scan_transaction_responses(
+                value, max_timestamp
+            )
+        assert db_store.scan_storage_for_value("tok-123") == local_store.scan_storage_for_value("tok-123")
+        assert db_store.scan_window_properties_for_value("tok-123") == local_store.scan_window_properties_for_value(
+            "tok-123"
+        )
+        with pytest.raises(ValueError, match="not found"):
+            db_store.get_transaction_by_id("missing")
+
+    def test_exports_consolidated_files_from_db(self, full_captures_dir: Path) -> None:
+        db_store = CaptureDBDiscoveryDataStore(client=OpenAI(api_key="test"), cdp_captures_dir=str(full_captures_dir))
+        Path(db_store.tmp_dir).mkdir(parents=True)
+
+        db_store._process_network_transaction_files()
+
+        with open(db_store.consolidated_transactions_file_path, encoding="utf-8") as f:
+            consolidated = json.load(f)
+        assert list(consolidated) == db_store.get_all_transaction_ids()
+        big = next(t for tid, t in consolidated.items() if "big" in tid)
+        assert big["response"]["body_truncated"] is True
+
+    def test_requires_db_or_captures_dir(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="does not exist"):
+            CaptureDBDiscoveryDataStore(client=OpenAI(api_key="test"), capture_db_path=str(tmp_path / "missing.db"))
@@ -8,10 +8,19 @@ from pathlib import Path
 
 import pytest
 
+from bluebox.cdp.capture_db import CaptureDB
 from bluebox.llms.infra.network_data_store import (
+    CaptureDBNetworkDataStore,
     NetworkDataStore,
     NetworkStats,
 )
+from bluebox.data_models.cdp import NetworkTransactionEvent
+from bluebox.utils.jsonl_utils import (
+    SegmentCompression,
+    build_jsonl_index,
+    compress_jsonl_segment,
+    get_segment_path,
+)
 
 
 # --- Fixtures ---
@@ -136,6 +145,45 @@ class TestNetworkDataStoreInit:
         assert "good-003" in request_ids
 
 
+    def test_init_reads_rotated_segments(self, network_events_dir: Path, tmp_path: Path) -> None:
+        """Rotated and compressed segments are loaded together with the active file."""
+        lines = (network_events_dir / "network_basic.jsonl").read_text().splitlines(keepends=True)
+        jsonl_path = tmp_path / "events.jsonl"
+        half = len(lines) // 2
+        get_segment_path(jsonl_path, 1).write_text("".join(lines[:half]))
+        compress_jsonl_segment(get_segment_path(jsonl_path, 1), SegmentCompression.GZIP)
+        jsonl_path.write_text("".join(lines[half:]))
+
+        segmented = NetworkDataStore(str(jsonl_path))
+        single = NetworkDataStore(str(network_events_dir / "network_basic.jsonl"))
+        assert [e.request_id for e in segmented.entries] == [e.request_id for e in single.entries]
+
+
+    def test_init_with_index_matches_full_scan(
+        self, network_events_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """A complete sidecar index yields the same entries without parsing irrelevant records."""
+        jsonl_path = tmp_path / "events.jsonl"
+        jsonl_path.write_bytes((network_events_dir / "network_basic.jsonl").read_bytes())
+        build_jsonl_index(jsonl_path)
+
+        parsed: list[str] = []
+        original_validate = NetworkTransactionEvent.model_validate
+
+        def tracking_validate(data, *args, **kwargs):
+            parsed.append(data["request_id"])
+            return original_validate(data, *args, **kwargs)
+
+        monkeypatch.setattr(NetworkTransactionEvent, "model_validate", tracking_validate)
+        indexed = NetworkDataStore(str(jsonl_path))
+        monkeypatch.undo()
+        single = NetworkDataStore(str(network_events_dir / "network_basic.jsonl"))
+
+        assert [e.request_id for e in indexed.entries] == [e.request_id for e in single.entries]
+        assert len(parsed) < sum(1 for line in jsonl_path.read_text().splitlines() if line.strip())
+        assert indexed.stats.total_requests == single.stats.total_requests
+
+
 # --- Properties Tests ---
 
 class TestNetworkDataStoreProperties:
@@ -535,3 +583,62 @@ class TestFeatureDetection:
         """Detect presence of form data."""
         stats = hosts_store.stats
         assert stats.has_form_data is True
+
+
+# --- CaptureDB Backend Tests ---
+
+class TestCaptureDBNetworkDataStore:
+    """The SQLite-backed store answers every query like the JSONL store over the same capture."""
+
+    FIXTURES = ["network_basic.jsonl", "network_api.jsonl", "network_search.jsonl", "network_hosts.jsonl"]
+
+    @staticmethod
+    def _stores(path: Path, enable_fts: bool) -> tuple[NetworkDataStore, CaptureDBNetworkDataStore]:
+        db = CaptureDB(":memory:", enable_fts=enable_fts)
+        db.ingest_jsonl("AsyncNetworkMonitor", path)
+        return NetworkDataStore(str(path)), CaptureDBNetworkDataStore(db)
+
+    @staticmethod
+    def _dump(entry: NetworkTransactionEvent | None) -> dict | None:
+        # fixtures have no timestamps, so each parse gets a fresh default
+        return entry.model_dump(exclude={"timestamp"}) if entry else None
+
+    @pytest.mark.parametrize("fixture_name", FIXTURES)
+    @pytest.mark.parametrize("enable_fts", [True, False])
+    def test_matches_jsonl_store(self, network_events_dir: Path, fixture_name: str, enable_fts: bool) -> None:
+        jsonl_store, db_store = self._stores(network_events_dir / fixture_name, enable_fts)
+
+        assert [self._dump(e) for e in db_store.entries] == [self._dump(e) for e in jsonl_store.entries]
+        assert db_store.stats == jsonl_store.stats
+        assert list(db_store.url_counts.items()) == list(jsonl_store.url_counts.items())
+        assert db_store.api_urls == jsonl_store.api_urls
+        assert db_store.get_host_stats() == jsonl_store.get_host_stats()
+        assert db_store.get_host_stats(host_filter="API") == jsonl_store.get_host_stats(host_filter="API")
+        assert db_store.get_entry_ids_by_url_pattern("*api*") == jsonl_store.get_entry_ids_by_url_pattern("*api*")
+
+        filters = [{"method": "get"}, {"has_post_data": True, "content_type_contains": "JSON"}, {"status_code": 404}]
+        for kwargs in filters:
+            assert (
+                [e.request_id for e in db_store.search_entries(**kwargs)]
+                == [e.request_id for e in jsonl_store.search_entries(**kwargs)]
+            )
+
+        for value in ["user", "Data", "id", '"']:
+            for case_sensitive in [True, False]:
+                assert (
+                    db_store.search_response_bodies(value, case_sensitive)
+                    == jsonl_store.search_response_bodies(value, case_sensitive)
+                )
+        terms = ["user", "ID", "name", "missing-term"]
+        assert db_store.search_entries_by_terms(terms) == jsonl_store.search_entries_by_terms(terms)
+
+        for entry in jsonl_store.entries:
+            assert self._dump(db_store.get_entry(entry.request_id)) == self._dump(entry)
+            assert db_store.get_response_body_schema(entry.request_id) == jsonl_store.get_response_body_schema(
+                entry.request_id
+            )
+        assert db_store.get_entry("nonexistent-id") is None
+
+    def test_init_missing_database(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="does not exist"):
+            CaptureDBNetworkDataStore(tmp_path / "missing.db")
@@ -0,0 +1,103 @@
+"""
+tests/unit/utils/test_cdp_origin_utils.py
+
+Tests for same-origin bootstrap documents.
+"""
+
+import base64
+from collections import deque
+
+from bluebox.utils.cdp_origin_utils import OriginBootstrapStrategy, bootstrap_origin
+
+
+class FakeTab:
+    """Scripted tab answering bootstrap commands; `intercept` controls whether Fetch pauses the navigation."""
+
+    def __init__(self, intercept: bool = True) -> None:
+        self.intercept = intercept
+        self.fetch_enabled = False
+        self.sent: list[tuple[str, dict | None]] = []
+        self.messages: deque[dict] = deque()
+        self.navigate_id: int | None = None
+
+    def send_cmd(self, method: str, params: dict | None = None, **kwargs) -> int:
+        self.sent.append((method, params))
+        msg_id = len(self.sent)
+        if method == "Fetch.enable":
+            self.fetch_enabled = True
+            self.messages.append({"id": msg_id, "result": {}})
+        elif method == "Fetch.disable":
+            self.fetch_enabled = False
+        elif method == "Page.navigate":
+            self.navigate_id = msg_id
+            if self.fetch_enabled and self.intercept:
+                self.messages.append({
+                    "method": "Fetch.requestPaused", "sessionId": "s1",
+                    "params": {"requestId": "r1", "request": {"url": params["url"]}},
+                })
+            else:
+                self._commit()
+        elif method == "Fetch.fulfillRequest":
+            self._commit()
+        return msg_id
+
+    def _commit(self) -> None:
+        self.messages.append({"id": self.navigate_id, "result": {"frameId": "F", "loaderId": f"L{self.navigate_id}"}})
+        self.messages.append({
+            "method": "Page.lifecycleEvent", "sessionId": "s1",
+            "params": {"name": "load", "loaderId": f"L{self.navigate_id}"},
+        })
+
+    def recv_until(self, predicate, deadline: float) -> dict:
+        while self.messages:
+            msg = self.messages.popleft()
+            if predicate(msg):
+                return msg
+        raise TimeoutError("Timed out waiting for expected CDP message")
+
+
+class TestBootstrapOrigin:
+    """Tests for bootstrap_origin."""
+
+    def test_synthetic_fulfills_without_network(self) -> None:
+        tab = FakeTab()
+        result = bootstrap_origin(
+            tab.send_cmd, tab.recv_until, "s1", "https://a.com", strategy=OriginBootstrapStrategy.SYNTHETIC,
+        )
+
+        assert result.committed and not result.fell_back
+        assert result.url == "https://a.com/"
+        assert [method for method, _ in tab.sent] == [
+            "Fetch.enable", "Page.navigate", "Fetch.fulfillRequest", "Fetch.disable",
+        ]
+        assert tab.sent[0][1]["patterns"] == [{"urlPattern": "https://a.com/", "requestStage": "Request"}]
+        fulfill = tab.sent[2][1]
+        assert fulfill["requestId"] == "r1" and fulfill["responseCode"] == 200
+        assert base64.b64decode(fulfill["body"]).startswith(b"<!doctype html>")
+
+    def test_synthetic_falls_back_to_homepage(self) -> None:
+        tab = FakeTab(intercept=False)
+        result = bootstrap_origin(
+            tab.send_cmd, tab.recv_until, "s1", "https://a.com", strategy=OriginBootstrapStrategy.SYNTHETIC, timeout=0.2,
+        )
+
+        assert result.fell_back and result.committed
+        assert result.strategy == OriginBootstrapStrategy.SYNTHETIC
+        assert [p["url"] for m, p in tab.sent if m == "Page.navigate"] == ["https://a.com/", "https://a.com"]
+        assert ("Fetch.disable", None) in tab.sent
+
+    def test_lightweight_loads_robots_txt(self) -> None:
+        tab = FakeTab()
+        result = bootstrap_origin(
+            tab.send_cmd, tab.recv_until, "s1", "https://a.com", strategy=OriginBootstrapStrategy.LIGHTWEIGHT,
+        )
+        assert tab.sent == [("Page.navigate", {"url": "https://a.com/robots.txt"})]
+        assert result.committed and result.page_load["loaded"]
+        assert result.page_load["network_idle"]
+
+    def test_homepage_is_the_default(self) -> None:
+        tab = FakeTab()
+        result = bootstrap_origin(tab.send_cmd, tab.recv_until, "s1", "https://a.com")
+
+        assert tab.sent == [("Page.navigate", {"url": "https://a.com"})]
+        assert result.strategy == OriginBootstrapStrategy.HOMEPAGE and result.committed
@@ -0,0 +1,139 @@
+"""
+tests/unit/utils/test_cdp_transfer_utils.py
+
+Tests for pipelined, adaptive page -> Python transfers.
+"""
+
+import base64
+import gzip
+import re
+
+import pytest
+
+from bluebox.utils.cdp_transfer_utils import PageTransferReader, StagedTransfer, TransferEncoding
+from bluebox.utils.js_utils import generate_get_transfer_chunk_js, generate_stage_transfer_js
+
+_CHUNK_PATTERN = re.compile(r"const start = \((\d+) > 0.*const end = \((\d+) <", re.DOTALL)
+_ID_PATTERN = re.compile(r'__blueboxTransfers[^\[]*\[("[^"]*")\]')
+
+
+class FakePage:
+    """send_cmd/recv_until stand-in serving staged values; replies to outstanding commands newest first."""
+
+    def __init__(self, staged: dict[str, str]) -> None:
+        self.staged = staged
+        self.outstanding: list[dict] = []
+        self.max_outstanding = 0
+        self.released: list[str] = []
+        self.stage_payload: dict = {}
+        self._next_id = 0
+
+    def send_cmd(self, method: str, params: dict | None = None, **kwargs) -> int:
+        self._next_id += 1
+        expression = params["expression"]
+        transfer_id = _ID_PATTERN.search(expression)
+        if expression.startswith("delete"):
+            self.released.append(transfer_id.group(1).strip('"'))
+            return self._next_id
+        if (match := _CHUNK_PATTERN.search(expression)) is not None:
+            value = self.staged.get(transfer_id.group(1).strip('"'))
+            chunk = None if value is None else value[int(match.group(1)):int(match.group(2))]
+            reply = {"id": self._next_id, "result": {"result": {"value": chunk}}}
+        else:
+            reply = {"id": self._next_id, "result": {"result": {"value": self.stage_payload}}}
+        self.outstanding.append(reply)
+        self.max_outstanding = max(self.max_outstanding, len(self.outstanding))
+        return self._next_id
+
+    def recv_until(self, predicate, deadline: float) -> dict:
+        for reply in reversed(self.outstanding):
+            if predicate(reply):
+                self.outstanding.remove(reply)
+                return reply
+        raise TimeoutError("Timed out waiting for expected CDP message")
+
+    def reader(self, **kwargs) -> PageTransferReader:
+        return PageTransferReader(self.send_cmd, self.recv_until, "s1", timeout=5, **kwargs)
+
+
+def _staged(transfer_id: str, value: str, encoding: TransferEncoding) -> StagedTransfer:
+    return StagedTransfer(transfer_id=transfer_id, length=len(value), encoding=encoding)
+
+
+class TestPageTransferReader:
+    """Tests for PageTransferReader."""
+
+    def test_text_pipelined_in_order(self) -> None:
+        value = "".join(f"{i:06d}" for i in range(20_000))
+        page = FakePage({"t1": value})
+        reader = page.reader(min_chunk_chars=1024, max_chunk_chars=4096, max_in_flight=3)
+
+        assert reader.read_text(_staged("t1", value, TransferEncoding.TEXT)) == value
+        assert page.max_outstanding == 3
+        assert page.released == ["t1"]
+        assert reader.stats.chunks > 1
+        assert reader.stats.max_chunk_chars == 4096  # fast round trips grow the chunk size
+
+    def test_base64_chunks_decode_independently(self) -> None:
+        data = bytes(range(256)) * 300
+        encoded = base64.b64encode(data).decode()
+        page = FakePage({"b": encoded})
+        reader = page.reader(min_chunk_chars=1001, max_chunk_chars=2002)
+
+        assert reader.read_bytes(_staged("b", encoded, TransferEncoding.BASE64)) == data
+        assert reader.min_chunk_chars % 4 == 0
+
+    def test_gzip_base64_text_and_rebased_binary(self) -> None:
+        text = '{"rows": [' + ",".join('{"a": 1}' for _ in range(5000)) + "]}"
+        encoded = base64.b64encode(gzip.compress(text.encode())).decode()
+        page = FakePage({"g": encoded})
+        reader = page.reader(min_chunk_chars=64)
+
+        assert reader.read_text(_staged("g", encoded, TransferEncoding.GZIP_BASE64)) == text
+        page.staged["g"] = encoded
+        assert reader.read_base64(_staged("g", encoded, TransferEncoding.GZIP_BASE64)) == base64.b64encode(
+            text.encode()
+        ).decode()
+
+    def test_truncated_gzip_raises(self) -> None:
+        encoded = base64.b64encode(gzip.compress(b"x" * 10_000)[:-12]).decode()
+        page = FakePage({"g": encoded})
+        with pytest.raises(RuntimeError, match="ended early"):
+            page.reader(min_chunk_chars=64).read_bytes(_staged("g", encoded, TransferEncoding.GZIP_BASE64))
+
+    def test_missing_staged_value_raises_and_releases(self) -> None:
+        page = FakePage({})
+        with pytest.raises(RuntimeError, match="no longer available"):
+            page.reader().read_text(StagedTransfer("gone", 10, TransferEncoding.TEXT))
+        assert page.released == ["gone"]
+
+    def test_stage_parses_payload(self) -> None:
+        page = FakePage({})
+        page.stage_payload = {"transferId": "t", "transferLength": 12, "transferEncoding": "gzip_base64", "size": 3}
+        staged = page.reader().stage(generate_stage_transfer_js("'abc'", "t", compress=True))
+        assert staged == StagedTransfer("t", 12, TransferEncoding.GZIP_BASE64, page.stage_payload)
+
+    def test_stage_raises_on_exception(self) -> None:
+        def send_cmd(method, params=None, **kwargs) -> int:
+            return 1
+
+        def recv_until(predicate, deadline) -> dict:
+            return {"id": 1, "result": {"exceptionDetails": {"exception": {"description": "ReferenceError: x"}}}}
+
+        with pytest.raises(RuntimeError, match="ReferenceError"):
+            PageTransferReader(send_cmd, recv_until, "s1", timeout=1).stage("x")
+
+    def test_invalid_args(self) -> None:
+        with pytest.raises(ValueError, match="chunk sizes"):
+            PageTransferReader(lambda *a, **k: 0, lambda *a: {}, "s1", 1, min_chunk_chars=8, max_chunk_chars=4)
+        with pytest.raises(ValueError, match="max_in_flight"):
+            PageTransferReader(lambda *a, **k: 0, lambda *a: {}, "s1", 1, max_in_flight=0)
+
+
+class TestTransferChunkJs:
+    """The chunk script never splits a UTF-16 surrogate pair."""
+
+    def test_surrogate_adjustment_present(self) -> None:
+        js = generate_get_transfer_chunk_js("t", 10, 20)
+        assert "0xD800" in js and "0xDBFF" in js
+        assert "const start = (10 > 0 && isHigh(10 - 1)) ? 10 + 1 : 10;" in js
@@ -0,0 +1,188 @@
+"""
+tests/unit/utils/test_cdp_wait_utils.py
+
+Tests for event-driven CDP waits.
+"""
+
+import re
+import time
+from collections import deque
+
+import pytest
+from websocket import WebSocketTimeoutException
+
+from bluebox.utils.cdp_wait_utils import NetworkIdleTracker, wait_for_page_load, wait_for_url
+from bluebox.utils.web_socket_utils import recv_json
+
+
+class FakeRecv:
+    """recv_until stand-in replaying scripted messages, then timing out like the real one."""
+
+    def __init__(self, messages: list[dict]) -> None:
+        self.messages = deque(messages)
+
+    def __call__(self, predicate, deadline: float) -> dict:
+        while self.messages:
+            msg = self.messages.popleft()
+            if predicate(msg):
+                return msg
+        time.sleep(max(0.0, deadline - time.time()))
+        raise TimeoutError("Timed out waiting for expected CDP message")
+
+
+def _event(method: str, session_id: str = "s1", **params) -> dict:
+    return {"method": method, "params": params, "sessionId": session_id}
+
+
+NAVIGATE_REPLY = {"id": 7, "result": {"frameId": "F", "loaderId": "L2"}}
+
+
+class TestNetworkIdleTracker:
+    """Tests for NetworkIdleTracker."""
+
+    def test_tracks_inflight_requests(self) -> None:
+        tracker = NetworkIdleTracker()
+        tracker.observe("Network.requestWillBeSent", {"requestId": "1", "type": "XHR"})
+        tracker.observe("Network.requestWillBeSent", {"requestId": "2", "type": "EventSource"})
+        assert tracker.inflight == {"1"}
+        assert not tracker.is_idle(0)
+
+        tracker.observe("Network.loadingFinished", {"requestId": "1"})
+        assert tracker.is_idle(0)
+        assert not tracker.is_idle(60)
+
+
+class TestWaitForPageLoad:
+    """Tests for wait_for_page_load."""
+
+    def test_returns_after_load_and_network_idle(self) -> None:
+        recv = FakeRecv([
+            _event("Page.loadEventFired"),  # stale event from the previous document
+            NAVIGATE_REPLY,
+            _event("Network.requestWillBeSent", requestId="r1", type="Fetch"),
+            _event("Page.lifecycleEvent", name="load", loaderId="L2", frameId="F"),
+            _event("Network.loadingFinished", requestId="r1"),
+        ])
+        start = time.monotonic()
+        result = wait_for_page_load(recv, "s1", 7, timeout=5, network_idle_seconds=0.1)
+
+        assert result.loaded and result.network_idle and not result.timed_out
+        assert time.monotonic() - start < 1
+
+    def test_timeout_is_an_upper_bound(self) -> None:
+        recv = FakeRecv([NAVIGATE_REPLY, _event("Network.requestWillBeSent", requestId="r1")])
+        start = time.monotonic()
+        result = wait_for_page_load(recv, "s1", 7, timeout=0.3)
+
+        assert result.timed_out and not result.loaded
+        assert 0.3 <= time.monotonic() - start < 1
+
+    def test_stale_load_event_is_ignored(self) -> None:
+        recv = FakeRecv([_event("Page.loadEventFired"), _event("Page.lifecycleEvent", name="load", loaderId="L1")])
+        result = wait_for_page_load(recv, "s1", 7, timeout=0.2, network_idle_seconds=0)
+        assert not result.loaded and result.timed_out
+
+    def test_same_document_navigation(self) -> None:
+        recv = FakeRecv([{"id": 7, "result": {"frameId": "F"}}])
+        result = wait_for_page_load(recv, "s1", 7, timeout=5, network_idle_seconds=0)
+        assert result.same_document and result.loaded and not result.timed_out
+
+    def test_navigation_error_returns_immediately(self) -> None:
+        recv = FakeRecv([{"id": 7, "result": {"frameId": "F", "errorText": "net::ERR_NAME_NOT_RESOLVED"}}])
+        result = wait_for_page_load(recv, "s1", 7, timeout=5)
+        assert result.error == "net::ERR_NAME_NOT_RESOLVED"
+
+    def test_other_sessions_ignored(self) -> None:
+        recv = FakeRecv([NAVIGATE_REPLY, _event("Page.lifecycleEvent", "other", name="load", loaderId="L2")])
+        result = wait_for_page_load(recv, "s1", 7, timeout=0.2, network_idle_seconds=0)
+        assert not result.loaded
+
+
+class FakeSend:
+    """send_cmd stand-in numbering commands from 1."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    def __call__(self, method: str, params: dict | None = None, **kwargs) -> int:
+        self.sent.append(method)
+        return len(self.sent)
+
+
+# Replies to wait_for_url's pipelined Runtime.evaluate (id 1) and Page.getFrameTree (id 2)
+def _href_reply(url: str) -> dict:
+    return {"id": 1, "result": {"result": {"type": "string", "value": url}}}
+
+
+FRAME_TREE_REPLY = {"id": 2, "result": {"frameTree": {"frame": {"id": "MAIN", "url": "https://a.com/login"}}}}
+
+
+class TestWaitForUrl:
+    """Tests for wait_for_url."""
+
+    def test_initial_check_matches_without_events(self) -> None:
+        send = FakeSend()
+        result = wait_for_url(send, FakeRecv([_href_reply("https://a.com/dashboard")]), "s1", re.compile("/dash"), 5)
+        assert result.matched and result.source == "initial"
+        assert send.sent == ["Runtime.evaluate", "Page.getFrameTree"]
+
+    def test_matches_main_frame_navigation_events(self) -> None:
+        recv = FakeRecv([
+            _href_reply("https://a.com/login"),
+            FRAME_TREE_REPLY,
+            _event("Page.frameNavigated", frame={"id": "IFRAME", "parentId": "MAIN", "url": "https://ads.com/results"}),
+            _event("Page.frameNavigated", frame={"id": "MAIN", "url": "https://a.com/search", "urlFragment": "#top"}),
+            _event("Page.navigatedWithinDocument", frameId="IFRAME", url="https://ads.com/results?x"),
+            _event("Page.navigatedWithinDocument", frameId="MAIN", url="https://a.com/results?q=1"),
+        ])
+        start = time.monotonic()
+        result = wait_for_url(FakeSend(), recv, "s1", re.compile(r"results\?q="), 5)
+        assert time.monotonic() - start < 1
+        assert result.matched and result.url == "https://a.com/results?q=1"
+        assert result.source == "Page.navigatedWithinDocument" and result.navigations == 2
+
+    def test_same_document_event_before_frame_tree(self) -> None:
+        recv = FakeRecv([
+            _event("Page.navigatedWithinDocument", frameId="MAIN", url="https://a.com/#/done"),
+            _href_reply("https://a.com/#/start"),
+            FRAME_TREE_REPLY,
+        ])
+        result = wait_for_url(FakeSend(), recv, "s1", re.compile("#/done"), 5)
+        assert result.matched and result.source == "Page.navigatedWithinDocument"
+
+    def test_timeout_reports_last_url(self) -> None:
+        recv = FakeRecv([
+            _href_reply("https://a.com/login"),
+            FRAME_TREE_REPLY,
+            _event("Page.frameNavigated", session_id="other", frame={"id": "X", "url": "https://a.com/done"}),
+            _event("Page.frameNavigated", frame={"id": "MAIN", "url": "https://a.com/mfa"}),
+        ])
+        result = wait_for_url(FakeSend(), recv, "s1", re.compile("/done"), 0.1)
+        assert not result.matched and result.url == "https://a.com/mfa"
+        assert result.waited_seconds >= 0.1
+
+
+class TestRecvJsonTimeout:
+    """recv_json bounds blocking reads by the deadline."""
+
+    class SilentWebSocket:
+        def __init__(self) -> None:
+            self.timeout: float | None = 10
+
+        def gettimeout(self) -> float | None:
+            return self.timeout
+
+        def settimeout(self, timeout: float | None) -> None:
+            self.timeout = timeout
+
+        def recv(self) -> str:
+            time.sleep(self.timeout)
+            raise WebSocketTimeoutException("timed out")
+
+    def test_raises_timeout_error_at_deadline(self) -> None:
+        ws = self.SilentWebSocket()
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            recv_json(ws, time.time() + 0.1)  # type: ignore[arg-type]
+        assert time.monotonic() - start < 1
+        assert ws.timeout == 10  # restored
@@ -19,6 +19,7 @@ from bluebox.utils.data_utils import (
     resolve_dotted_path,
     get_text_from_html,
     apply_params,
+    compile_params_template,
     extract_object_schema,
 )
 
@@ -1210,6 +1211,38 @@ class TestApplyParamsURLScenarios:
         assert result == 'https://example.com/api?user_id=12345&page=2'
 
 
+class TestCompileParamsTemplate:
+    """Test pre-tokenized parameter templates."""
+
+    def test_fragments_and_slots(self) -> None:
+        """Quoted placeholders become slots; everything else stays in static fragments."""
+        template = compile_params_template('{"a": "{{ x }}", "b": "\\"{{y}}\\"", "c": {{z}}}')
+        assert template.slots == (("x", '"{{ x }}"'), ("y", '\\"{{y}}\\"'))
+        assert template.fragments == ('{"a": ', ', "b": "', '", "c": {{z}}}')
+        assert not template.is_static
+
+    def test_render_matches_apply_params(self) -> None:
+        """render() follows the same substitution rules as apply_params()."""
+        text = json.dumps({
+            "name": "\"{{name}}\"", "age": "{{age}}", "token": "{{sessionStorage:auth.token}}",
+            "tags": "{{tags}}", "missing": "{{missing}}",
+        })
+        params = {"name": "Ann", "age": 30, "tags": ["a", "b"]}
+        rendered = compile_params_template(text).render(params)
+        assert rendered == apply_params(text, params)
+        assert json.loads(rendered) == {
+            "name": "Ann", "age": 30, "token": "{{sessionStorage:auth.token}}", "tags": ["a", "b"],
+            "missing": "{{missing}}",
+        }
+
+    def test_static_text_and_cache(self) -> None:
+        """Text without placeholders renders as-is; templates are cached per text."""
+        template = compile_params_template("https://example.com/static")
+        assert template.is_static
+        assert template.render({"x": 1}) == "https://example.com/static"
+        assert compile_params_template("https://example.com/static") is template
+
+
 class TestExtractObjectSchema:
     """Test cases for extract_object_schema function."""
 
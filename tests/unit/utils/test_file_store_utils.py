@@ -0,0 +1,53 @@
+"""
+tests/unit/utils/test_file_store_utils.py
+
+Tests for the on-disk tier shared by the routine stores.
+"""
+
+import json
+import stat
+from dataclasses import dataclass
+
+from bluebox.utils.file_store_utils import JsonFileTier, StoreStats
+
+
+@dataclass
+class _Stats(StoreStats):
+    hits: int = 0
+
+
+class TestJsonFileTier:
+    """Tests for JsonFileTier."""
+
+    def test_write_read_delete(self, tmp_path) -> None:
+        tier = JsonFileTier(tmp_path / "store")
+        tier.write("k", json.dumps({"a": 1}))
+
+        assert tier.read("k", json.loads) == {"a": 1}
+        assert [path.name for path in (tmp_path / "store").iterdir()] == ["k.json"]
+        assert tier.delete("k")
+        assert not tier.delete("k")
+        assert tier.read("k", json.loads) is None
+
+    def test_private_files(self, tmp_path) -> None:
+        tier = JsonFileTier(tmp_path, private=True)
+        tier.write("k", "{}")
+        assert stat.S_IMODE(tier.path("k").stat().st_mode) == 0o600
+
+    def test_unparsable_file_is_missing(self, tmp_path) -> None:
+        tier = JsonFileTier(tmp_path)
+        tier.path("k").write_text("{not json", encoding="utf-8")
+        assert tier.read("k", json.loads) is None
+
+    def test_clear(self, tmp_path) -> None:
+        tier = JsonFileTier(tmp_path)
+        tier.write("a", "{}")
+        tier.write("b", "{}")
+        tier.clear()
+        assert list(tmp_path.iterdir()) == []
+
+
+def test_store_stats_to_dict() -> None:
+    stats = _Stats()
+    stats.hits += 2
+    assert stats.to_dict() == {"hits": 2}
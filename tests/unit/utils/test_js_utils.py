@@ -6,7 +6,19 @@ Tests for JavaScript utility functions.
 
 import pytest
 
-from bluebox.utils.js_utils import generate_js_evaluate_wrapper_js
+from bluebox.utils.js_utils import (
+    RUNTIME_MISSING_KEY,
+    RUNTIME_VERSION,
+    generate_download_js,
+    generate_fetch_batch_js,
+    generate_fetch_js,
+    generate_js_evaluate_wrapper_js,
+    generate_preconnect_js,
+    generate_runtime_library_js,
+    generate_storage_restore_js,
+    generate_storage_snapshot_js,
+)
+from bluebox.utils.data_utils import assert_balanced_js_delimiters
 
 
 class TestGenerateJsEvaluateWrapperJs:
@@ -200,3 +212,91 @@ class TestGenerateJsEvaluateWrapperJs:
 
         # Should embed as-is
         assert "await Promise.resolve((function() { return 42; })())" in result
+
+
+class TestRoutineRuntimeJs:
+    """Tests for the routine JS helper library and the calls into it."""
+
+    def test_library_is_idempotent_and_cached(self) -> None:
+        library = generate_runtime_library_js()
+        assert library is generate_runtime_library_js()
+        version_check = f"if (window.__blueboxRuntime && window.__blueboxRuntime.version === {RUNTIME_VERSION}) return true;"
+        assert version_check in library
+        assert "function resolvePlaceholders" in library
+        assert "fetch: runFetch, download: runDownload, fetchBatch: runFetchBatch" in library
+
+    def test_fetch_call_carries_only_arguments(self) -> None:
+        js = generate_fetch_js(
+            fetch_url="https://api.example.com/items?q=\"{{query}}\"",
+            headers={"X-Count": 3},
+            body_js_literal='{"a": 1}',
+            endpoint_method="POST",
+            endpoint_credentials="include",
+            session_storage_key="items",
+        )
+        assert "function resolvePlaceholders" not in js
+        assert "sleep(" not in js
+        assert "window.__blueboxRuntime.fetch({" in js
+        assert '"X-Count": "3"' in js
+        assert 'body: {"a": 1}' in js
+        assert 'sessionStorageKey: "items"' in js
+        assert f"{RUNTIME_MISSING_KEY}: true" in js
+
+    def test_download_call_carries_only_arguments(self) -> None:
+        js = generate_download_js(
+            download_url="https://example.com/r.pdf",
+            headers={},
+            body_js_literal="null",
+            endpoint_method="GET",
+            endpoint_credentials="same-origin",
+            filename="r.pdf",
+            transfer_id="t1",
+            compress=True,
+            compress_min_bytes=1024,
+        )
+        assert "__bbStage" not in js
+        assert "window.__blueboxRuntime.download({" in js
+        assert 'transferId: "t1", compress: true, compressMinBytes: 1024' in js
+
+    def test_fetch_batch_call(self) -> None:
+        js = generate_fetch_batch_js(
+            requests=[("https://a.com/1", {}, "null"), ("https://a.com/2", {"X-Id": 2}, '{"id": 2}')],
+            endpoint_method="POST",
+            endpoint_credentials="include",
+            transfer_id="b1",
+            concurrency=4,
+        )
+        assert "window.__blueboxRuntime.fetchBatch({" in js
+        assert '{url: "https://a.com/2", headers: {"X-Id": "2"}, body: {"id": 2}}' in js
+        assert 'concurrency: 4, transferId: "b1"' in js
+        assert "maxRetries: 0, retryStatuses: []" in js
+
+    def test_preconnect_hints(self) -> None:
+        js = generate_preconnect_js({"https://api.a.com": False, "https://www.a.com": True})
+        assert '{"https://api.a.com": false, "https://www.a.com": true}' in js
+        assert "link.rel = 'preconnect'" in js
+        assert "new MutationObserver" in js
+        assert_balanced_js_delimiters(js)
+
+    def test_storage_snapshot_and_restore(self) -> None:
+        snapshot_js = generate_storage_snapshot_js(["result", "result"])
+        assert 'new Set(["result"])' in snapshot_js
+        assert "sessionStorage: read(window.sessionStorage, excluded)" in snapshot_js
+        restore_js = generate_storage_restore_js({"https://a.com": {"localStorage": {"token": "t"}}})
+        assert '[window.location.origin]' in restore_js
+        assert "if (storage.getItem(key) === null)" in restore_js
+        for js in (snapshot_js, restore_js):
+            assert_balanced_js_delimiters(js)
+
+    def test_fetch_batch_pacing(self) -> None:
+        js = generate_fetch_batch_js(
+            requests=[("https://a.com/1", {}, "null")],
+            endpoint_method="GET",
+            endpoint_credentials="include",
+            transfer_id="b1",
+            concurrency=2,
+            min_interval_seconds=0.25,
+            max_retries=3,
+            retry_statuses={503, 429},
+        )
+        assert "minIntervalMs: 250.0, maxRetries: 3, retryStatuses: [429, 503]" in js
@@ -0,0 +1,216 @@
+"""
+tests/unit/utils/test_jsonl_utils.py
+
+Unit tests for segmented JSONL capture utilities.
+"""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from bluebox.utils.jsonl_utils import (
+    IndexedJsonlReader,
+    SegmentCompression,
+    build_jsonl_index,
+    compress_jsonl_segment,
+    get_index_path,
+    get_segment_path,
+    iter_jsonl_lines,
+    jsonl_exists,
+    list_jsonl_segments,
+    list_rotated_segments,
+    load_jsonl_index,
+    read_indexed_line,
+    read_indexed_lines,
+)
+
+
+def _write_lines(path: Path, records: list[dict]) -> None:
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+
+
+class TestGetSegmentPath:
+    """Tests for get_segment_path."""
+
+    def test_uncompressed(self, tmp_path: Path) -> None:
+        path = get_segment_path(tmp_path / "events.jsonl", 3)
+        assert path == tmp_path / "events.000003.jsonl"
+
+    def test_compressed(self, tmp_path: Path) -> None:
+        path = get_segment_path(tmp_path / "javascript_events.jsonl", 12, SegmentCompression.GZIP)
+        assert path == tmp_path / "javascript_events.000012.jsonl.gz"
+
+
+class TestListSegments:
+    """Tests for segment discovery."""
+
+    def test_missing_capture(self, tmp_path: Path) -> None:
+        assert list_jsonl_segments(tmp_path / "missing" / "events.jsonl") == []
+        assert not jsonl_exists(tmp_path / "missing" / "events.jsonl")
+
+    def test_active_file_only(self, tmp_path: Path) -> None:
+        path = tmp_path / "events.jsonl"
+        _write_lines(path, [{"id": 1}])
+        assert list_jsonl_segments(path) == [path]
+        assert jsonl_exists(path)
+
+    def test_segments_ordered_then_active(self, tmp_path: Path) -> None:
+        path = tmp_path / "events.jsonl"
+        _write_lines(get_segment_path(path, 2), [{"id": 2}])
+        _write_lines(get_segment_path(path, 1), [{"id": 1}])
+        _write_lines(path, [{"id": 3}])
+        # unrelated files are ignored
+        _write_lines(tmp_path / "javascript_events.000001.jsonl", [{"id": 99}])
+
+        assert list_jsonl_segments(path) == [
+            get_segment_path(path, 1),
+            get_segment_path(path, 2),
+            path,
+        ]
+
+    def test_rotated_only_still_exists(self, tmp_path: Path) -> None:
+        path = tmp_path / "events.jsonl"
+        _write_lines(get_segment_path(path, 1), [{"id": 1}])
+        assert jsonl_exists(path)
+
+    def test_compressed_preferred_over_raw(self, tmp_path: Path) -> None:
+        path = tmp_path / "events.jsonl"
+        _write_lines(get_segment_path(path, 1), [{"id": 1}])
+        (tmp_path / "events.000001.jsonl.gz").write_bytes(gzip.compress(b'{"id": 1}\n'))
+        assert list_rotated_segments(path) == {1: tmp_path / "events.000001.jsonl.gz"}
+
+
+class TestIterJsonlLines:
+    """Tests for iter_jsonl_lines across plain and compressed segments."""
+
+    def test_reads_across_segments(self, tmp_path: Path) -> None:
+        path = tmp_path / "events.jsonl"
+        _write_lines(get_segment_path(path, 1), [{"id": 1}, {"id": 2}])
+        compress_jsonl_segment(get_segment_path(path, 1), SegmentCompression.GZIP)
+        _write_lines(get_segment_path(path, 2), [{"id": 3}])
+        _write_lines(path, [{"id": 4}])
+
+        ids = [json.loads(line)["id"] for line in iter_jsonl_lines(path)]
+        assert ids == [1, 2, 3, 4]
+
+
+class TestCompressJsonlSegment:
+    """Tests for compress_jsonl_segment."""
+
+    def test_gzip_replaces_raw_segment(self, tmp_path: Path) -> None:
+        raw = get_segment_path(tmp_path / "events.jsonl", 1)
+        _write_lines(raw, [{"id": 1}])
+
+        target = compress_jsonl_segment(raw, SegmentCompression.GZIP)
+
+        assert target == tmp_path / "events.000001.jsonl.gz"
+        assert not raw.exists()
+        assert not (tmp_path / "events.000001.jsonl.gz.tmp").exists()
+        assert json.loads(gzip.decompress(target.read_bytes()))["id"] == 1
+
+    def test_none_is_noop(self, tmp_path: Path) -> None:
+        raw = get_segment_path(tmp_path / "events.jsonl", 1)
+        _write_lines(raw, [{"id": 1}])
+        assert compress_jsonl_segment(raw, SegmentCompression.NONE) == raw
+        assert raw.exists()
+
+    def test_zstd_roundtrip(self, tmp_path: Path) -> None:
+        pytest.importorskip("zstandard")
+        path = tmp_path / "events.jsonl"
+        _write_lines(get_segment_path(path, 1), [{"id": 1}])
+        target = compress_jsonl_segment(get_segment_path(path, 1), SegmentCompression.ZSTD)
+        assert target.name == "events.000001.jsonl.zst"
+        assert [json.loads(line)["id"] for line in iter_jsonl_lines(path)] == [1]
+
+
+class TestJsonlIndex:
+    """Tests for the sidecar index: build, load, staleness and indexed reads."""
+
+    @staticmethod
+    def _records() -> list[dict]:
+        return [
+            {"request_id": f"r{i}", "url": f"https://example.com/{i}", "timestamp": float(i),
+             "mime_type": "application/json", "status": 200, "body": "x" * i}
+            for i in range(6)
+        ]
+
+    def test_get_index_path(self, tmp_path: Path) -> None:
+        assert get_index_path(tmp_path / "events.jsonl") == tmp_path / "events.index.jsonl"
+
+    def test_index_path_is_not_a_segment(self, tmp_path: Path) -> None:
+        path = tmp_path / "events.jsonl"
+        _write_lines(path, [{"id": 1}])
+        build_jsonl_index(path)
+        assert list_jsonl_segments(path) == [path]
+
+    def test_build_and_load(self, tmp_path: Path) -> None:
+        path = tmp_path / "events.jsonl"
+        records = self._records()
+        _write_lines(path, records)
+
+        assert build_jsonl_index(path) == len(records)
+        entries = load_jsonl_index(path)
+
+        assert entries is not None
+        assert [e.request_id for e in entries] == [r["request_id"] for r in records]
+        assert entries[3].url == "https://example.com/3"
+        assert entries[3].timestamp == 3.0
+        assert entries[3].mime_type == "application/json"
+        assert entries[3].status == 200
+        assert entries[0].offset == 0
+        assert entries[1].offset == entries[0].length
+
+    def test_missing_index_returns_none(self, tmp_path: Path) -> None:
+        path = tmp_path / "events.jsonl"
+        _write_lines(path, self._records())
+        assert load_jsonl_index(path) is None
+
+    def test_stale_index_returns_none(self, tmp_path: Path) -> None:
+        """Records appended after the index was written make it incomplete."""
+        path = tmp_path / "events.jsonl"
+        _write_lines(path, self._records())
+        build_jsonl_index(path)
+        with open(path, mode="a", encoding="utf-8") as f:
+            f.write(json.dumps({"request_id": "late"}) + "\n")
+        assert load_jsonl_index(path) is None
+
+    def test_read_indexed_lines_across_plain_and_gzip_segments(self, tmp_path: Path) -> None:
+        path = tmp_path / "events.jsonl"
+        records = self._records()
+        _write_lines(get_segment_path(path, 1), records[:3])
+        compress_jsonl_segment(get_segment_path(path, 1), SegmentCompression.GZIP)
+        _write_lines(path, records[3:])
+        build_jsonl_index(path)
+
+        entries = load_jsonl_index(path)
+        assert entries is not None
+        wanted = [entries[1], entries[2], entries[4]]
+        got = [json.loads(line)["request_id"] for _, line in read_indexed_lines(path, reversed(wanted))]
+
+        assert got == ["r1", "r2", "r4"]
+        assert json.loads(read_indexed_line(path, entries[5]))["request_id"] == "r5"
+
+    def test_reader_keeps_segment_mapped_and_remaps_after_growth(self, tmp_path: Path) -> None:
+        path = tmp_path / "events.jsonl"
+        records = self._records()
+        _write_lines(path, records[:3])
+        build_jsonl_index(path)
+        entries = load_jsonl_index(path)
+        assert entries is not None
+
+        with IndexedJsonlReader(path) as reader:
+            assert json.loads(reader.read_line(entries[0]))["request_id"] == "r0"
+            first_map = reader._maps[1]
+            assert json.loads(reader.read_line(entries[2]))["request_id"] == "r2"
+            assert reader._maps[1] is first_map
+
+            # the active segment grew past the mapped length
+            with open(path, mode="a", encoding="utf-8") as f:
+                f.write(json.dumps(records[3]) + "\n")
+            build_jsonl_index(path)
+            grown = load_jsonl_index(path)
+            assert grown is not None
+            assert json.loads(reader.read_line(grown[3]))["request_id"] == "r3"
+        assert reader._maps == {}